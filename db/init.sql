@@ -109,6 +109,12 @@ CREATE TABLE trips (
     fuel_level_at_gas_entry DECIMAL(5,2),
     fuel_level_at_end DECIMAL(5,2),
 
+    -- Engine runtime (RPM > 400), added to engine_hours_counters at finalization
+    engine_seconds DOUBLE PRECISION,
+
+    -- Powertrain mode durations, transitions and sample count (computed at finalization)
+    powertrain_stats JSONB,
+
     -- Metadata
     ambient_temp_avg_f DECIMAL(5,1),
     is_closed BOOLEAN DEFAULT FALSE,
@@ -122,7 +128,30 @@ CREATE TABLE trips (
     weather_precipitation_in DECIMAL(5,3),
     weather_wind_mph DECIMAL(5,1),
     weather_conditions VARCHAR(50),
-    weather_impact_factor DECIMAL(4,3)
+    weather_impact_factor DECIMAL(4,3),
+
+    -- Route geometry (simplified at finalization for map display)
+    route_polyline TEXT,
+    route_bounds_north DOUBLE PRECISION,
+    route_bounds_south DOUBLE PRECISION,
+    route_bounds_east DOUBLE PRECISION,
+    route_bounds_west DOUBLE PRECISION,
+    gps_point_count INTEGER,
+    heatmap_indexed BOOLEAN DEFAULT FALSE,
+
+    -- Trip endpoints with geohashes for proximity search
+    start_lat DOUBLE PRECISION,
+    start_lon DOUBLE PRECISION,
+    end_lat DOUBLE PRECISION,
+    end_lon DOUBLE PRECISION,
+    start_geohash VARCHAR(12),
+    end_geohash VARCHAR(12),
+
+    -- Route fingerprint for similar-trip search (20 float64 lat/lon pairs)
+    route_fingerprint BYTEA,
+
+    -- Assigned route cluster (routes table is created by migration 004)
+    route_id INTEGER
 );
 
 CREATE INDEX idx_trips_start_time ON trips(start_time);
@@ -132,6 +161,9 @@ CREATE INDEX idx_trips_is_imported ON trips(is_imported);
 CREATE INDEX idx_trips_deleted_at ON trips(deleted_at);
 CREATE INDEX idx_trips_weather_conditions ON trips(weather_conditions);
 CREATE INDEX idx_trips_weather_temp ON trips(weather_temp_f);
+CREATE INDEX idx_trips_start_geohash ON trips(start_geohash);
+CREATE INDEX idx_trips_end_geohash ON trips(end_geohash);
+CREATE INDEX idx_trips_route_id ON trips(route_id);
 
 -- Table: fuel_events
 -- Tracks refueling events for tank-based efficiency calculations
@@ -0,0 +1,31 @@
+-- Migration 006: Store simplified route geometry on trips
+-- Run: docker exec -i volt-tracker-db psql -U volt -d volt_tracker < db/migrations/006_add_trip_route_geometry.sql
+
+-- =====================================================
+-- Trips: Encoded polyline and bounds computed at finalization
+-- =====================================================
+-- The map endpoint serves these directly instead of reading every
+-- telemetry row of every trip on each request. Trips finalized before
+-- this migration fall back to a batched telemetry query.
+ALTER TABLE trips
+ADD COLUMN IF NOT EXISTS route_polyline TEXT,
+ADD COLUMN IF NOT EXISTS route_bounds_north DOUBLE PRECISION,
+ADD COLUMN IF NOT EXISTS route_bounds_south DOUBLE PRECISION,
+ADD COLUMN IF NOT EXISTS route_bounds_east DOUBLE PRECISION,
+ADD COLUMN IF NOT EXISTS route_bounds_west DOUBLE PRECISION,
+ADD COLUMN IF NOT EXISTS gps_point_count INTEGER;
+
+-- Rollback (if needed):
+-- ALTER TABLE trips
+-- DROP COLUMN IF EXISTS route_polyline,
+-- DROP COLUMN IF EXISTS route_bounds_north,
+-- DROP COLUMN IF EXISTS route_bounds_south,
+-- DROP COLUMN IF EXISTS route_bounds_east,
+-- DROP COLUMN IF EXISTS route_bounds_west,
+-- DROP COLUMN IF EXISTS gps_point_count;
+
+-- Done!
+DO $$
+BEGIN
+    RAISE NOTICE 'Migration 006 completed successfully!';
+END $$;
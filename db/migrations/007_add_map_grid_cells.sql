@@ -0,0 +1,39 @@
+-- Migration 007: Spatial grid aggregation for the map heatmap
+-- Run: docker exec -i volt-tracker-db psql -U volt -d volt_tracker < db/migrations/007_add_map_grid_cells.sql
+
+-- =====================================================
+-- MapGridCells: Running totals per square cell and grid level
+-- =====================================================
+-- Cells are incremented when a trip is finalized. Existing trips can be
+-- indexed afterwards with: python -m scripts.backfill_heatmap_grid
+CREATE TABLE IF NOT EXISTS map_grid_cells (
+    id SERIAL PRIMARY KEY,
+    level INTEGER NOT NULL,                   -- Grid level (map zoom: 8, 11, 14)
+    cell_x INTEGER NOT NULL,                  -- Column counted from longitude -180
+    cell_y INTEGER NOT NULL,                  -- Row counted from latitude -90
+
+    -- Running totals
+    sample_count INTEGER NOT NULL DEFAULT 0,
+    speed_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    moving_count INTEGER NOT NULL DEFAULT 0,  -- Samples > 5 mph with power data
+    moving_speed_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    moving_power_kw_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    CONSTRAINT uq_map_grid_cell UNIQUE (level, cell_x, cell_y)
+);
+
+-- =====================================================
+-- Trips: Track which trips have been added to the grid
+-- =====================================================
+ALTER TABLE trips ADD COLUMN IF NOT EXISTS heatmap_indexed BOOLEAN DEFAULT FALSE;
+
+-- Rollback (if needed):
+-- DROP TABLE IF EXISTS map_grid_cells;
+-- ALTER TABLE trips DROP COLUMN IF EXISTS heatmap_indexed;
+
+-- Done!
+DO $$
+BEGIN
+    RAISE NOTICE 'Migration 007 completed successfully!';
+END $$;
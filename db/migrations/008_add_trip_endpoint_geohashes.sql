@@ -0,0 +1,48 @@
+-- Migration 008: Trip endpoints and geohashes for proximity search
+-- Run: docker exec -i volt-tracker-db psql -U volt -d volt_tracker < db/migrations/008_add_trip_endpoint_geohashes.sql
+
+-- =====================================================
+-- Trips: First/last GPS fix with 7-character geohashes
+-- =====================================================
+-- Radius queries (near_lat/near_lon on /api/trips) and similar-trip search
+-- prefilter candidates with geohash prefix ranges on these indexes, then
+-- check exact distance. Existing trips can be filled in with:
+--   python -m scripts.backfill_trip_geometry
+ALTER TABLE trips
+ADD COLUMN IF NOT EXISTS start_lat DOUBLE PRECISION,
+ADD COLUMN IF NOT EXISTS start_lon DOUBLE PRECISION,
+ADD COLUMN IF NOT EXISTS end_lat DOUBLE PRECISION,
+ADD COLUMN IF NOT EXISTS end_lon DOUBLE PRECISION,
+ADD COLUMN IF NOT EXISTS start_geohash VARCHAR(12),
+ADD COLUMN IF NOT EXISTS end_geohash VARCHAR(12);
+
+CREATE INDEX IF NOT EXISTS ix_trips_start_geohash ON trips(start_geohash);
+CREATE INDEX IF NOT EXISTS ix_trips_end_geohash ON trips(end_geohash);
+
+-- =====================================================
+-- Routes: Geohashes for route matching candidates
+-- =====================================================
+ALTER TABLE routes
+ADD COLUMN IF NOT EXISTS start_geohash VARCHAR(12),
+ADD COLUMN IF NOT EXISTS end_geohash VARCHAR(12);
+
+CREATE INDEX IF NOT EXISTS ix_routes_start_geohash ON routes(start_geohash);
+
+-- Rollback (if needed):
+-- DROP INDEX IF EXISTS ix_trips_start_geohash;
+-- DROP INDEX IF EXISTS ix_trips_end_geohash;
+-- DROP INDEX IF EXISTS ix_routes_start_geohash;
+-- ALTER TABLE trips
+-- DROP COLUMN IF EXISTS start_lat,
+-- DROP COLUMN IF EXISTS start_lon,
+-- DROP COLUMN IF EXISTS end_lat,
+-- DROP COLUMN IF EXISTS end_lon,
+-- DROP COLUMN IF EXISTS start_geohash,
+-- DROP COLUMN IF EXISTS end_geohash;
+-- ALTER TABLE routes DROP COLUMN IF EXISTS start_geohash, DROP COLUMN IF EXISTS end_geohash;
+
+-- Done!
+DO $$
+BEGIN
+    RAISE NOTICE 'Migration 008 completed successfully!';
+END $$;
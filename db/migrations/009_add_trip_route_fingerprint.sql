@@ -0,0 +1,22 @@
+-- Migration 009: Route fingerprints for similar-trip search
+-- Run: docker exec -i volt-tracker-db psql -U volt -d volt_tracker < db/migrations/009_add_trip_route_fingerprint.sql
+
+-- =====================================================
+-- Trips: Fixed-length resampled route fingerprint
+-- =====================================================
+-- 20 (lat, lon) points evenly spaced along the GPS track, packed as
+-- little-endian float64 (320 bytes). /api/trips/similar/<id> compares these
+-- instead of reading each candidate's telemetry. Existing trips can be
+-- filled in with:
+--   python -m scripts.backfill_trip_geometry
+ALTER TABLE trips
+ADD COLUMN IF NOT EXISTS route_fingerprint BYTEA;
+
+-- Rollback (if needed):
+-- ALTER TABLE trips DROP COLUMN IF EXISTS route_fingerprint;
+
+-- Done!
+DO $$
+BEGIN
+    RAISE NOTICE 'Migration 009 completed successfully!';
+END $$;
@@ -0,0 +1,37 @@
+-- Migration 010: Persisted route assignments for incremental clustering
+-- Run: docker exec -i volt-tracker-db psql -U volt -d volt_tracker < db/migrations/010_add_trip_route_assignments.sql
+
+-- =====================================================
+-- Trips: Assigned route cluster
+-- =====================================================
+-- Set at finalization (or by detect_routes for older trips) so route
+-- statistics are updated once per trip instead of re-scanning history.
+ALTER TABLE trips
+ADD COLUMN IF NOT EXISTS route_id INTEGER REFERENCES routes(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS ix_trips_route_id ON trips(route_id);
+
+-- =====================================================
+-- Routes: Mean fingerprint and efficiency sample count
+-- =====================================================
+-- fingerprint is the mean of the assigned trips' route fingerprints and is
+-- compared against new trips; efficiency_trip_count is the number of trips
+-- averaged into avg_efficiency_kwh_per_mile.
+ALTER TABLE routes
+ADD COLUMN IF NOT EXISTS fingerprint BYTEA,
+ADD COLUMN IF NOT EXISTS efficiency_trip_count INTEGER DEFAULT 0;
+
+-- Existing route statistics were accumulated without assignments (and
+-- counted trips again on every refresh). Rebuild them with:
+--   python -m scripts.recluster_routes
+
+-- Rollback (if needed):
+-- DROP INDEX IF EXISTS ix_trips_route_id;
+-- ALTER TABLE trips DROP COLUMN IF EXISTS route_id;
+-- ALTER TABLE routes DROP COLUMN IF EXISTS fingerprint, DROP COLUMN IF EXISTS efficiency_trip_count;
+
+-- Done!
+DO $$
+BEGIN
+    RAISE NOTICE 'Migration 010 completed successfully!';
+END $$;
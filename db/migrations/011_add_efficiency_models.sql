@@ -0,0 +1,35 @@
+-- Migration 011: Fitted multi-factor efficiency model
+-- Run: docker exec -i volt-tracker-db psql -U volt -d volt_tracker < db/migrations/011_add_efficiency_models.sql
+
+-- =====================================================
+-- EfficiencyModels: Regression coefficients and sufficient statistics
+-- =====================================================
+-- The model is folded forward when a trip is finalized and fully refit by
+-- the scheduler (or: python -m scripts.refit_efficiency_model) so edits,
+-- deletes and imports are picked up.
+CREATE TABLE IF NOT EXISTS efficiency_models (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(50) NOT NULL UNIQUE,
+
+    -- Least-squares sufficient statistics (X'X, X'y, y'y, total miles)
+    stats JSONB NOT NULL,
+    trip_count INTEGER NOT NULL DEFAULT 0,
+
+    -- Fit results
+    coefficients JSONB,
+    r_squared DOUBLE PRECISION,
+    rmse DOUBLE PRECISION,
+
+    data_version VARCHAR(200),                -- Data versions of the last full fit
+    fitted_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Rollback (if needed):
+-- DROP TABLE IF EXISTS efficiency_models;
+
+-- Done!
+DO $$
+BEGIN
+    RAISE NOTICE 'Migration 011 completed successfully!';
+END $$;
@@ -0,0 +1,36 @@
+-- Migration 012: Running battery degradation regression
+-- Run: docker exec -i volt-tracker-db psql -U volt -d volt_tracker < db/migrations/012_add_battery_degradation_stats.sql
+
+-- =====================================================
+-- BatteryDegradationStats: Capacity vs odometer regression sums
+-- =====================================================
+-- Updated as battery health readings are inserted (which now also store
+-- their resolved odometer). Resolve odometers for existing readings and
+-- build the sums with: python -m scripts.refit_battery_degradation
+CREATE TABLE IF NOT EXISTS battery_degradation_stats (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(50) NOT NULL UNIQUE,
+
+    -- Least-squares sums over (odometer_miles, capacity_kwh) points
+    n INTEGER NOT NULL DEFAULT 0,
+    sum_x DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sum_y DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sum_xy DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sum_xx DOUBLE PRECISION NOT NULL DEFAULT 0,
+
+    -- Background robust (Theil-Sen) refit
+    robust_slope DOUBLE PRECISION,
+    robust_intercept DOUBLE PRECISION,
+    refit_at TIMESTAMPTZ,
+
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Rollback (if needed):
+-- DROP TABLE IF EXISTS battery_degradation_stats;
+
+-- Done!
+DO $$
+BEGIN
+    RAISE NOTICE 'Migration 012 completed successfully!';
+END $$;
@@ -0,0 +1,32 @@
+-- Migration 013: Engine hours accumulated at trip finalization
+-- Run: docker exec -i volt-tracker-db psql -U volt -d volt_tracker < db/migrations/013_add_engine_hours_counter.sql
+
+-- =====================================================
+-- Trips: Engine runtime per trip
+-- =====================================================
+ALTER TABLE trips ADD COLUMN IF NOT EXISTS engine_seconds DOUBLE PRECISION;
+
+-- =====================================================
+-- EngineHoursCounters: Lifetime engine runtime
+-- =====================================================
+-- Each trip's engine seconds are added when it is finalized. Fill in
+-- existing trips and the lifetime total with:
+-- python -m scripts.backfill_engine_hours
+CREATE TABLE IF NOT EXISTS engine_hours_counters (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(50) NOT NULL UNIQUE,
+    total_seconds DOUBLE PRECISION NOT NULL DEFAULT 0,
+    trip_count INTEGER NOT NULL DEFAULT 0,
+    counted_through TIMESTAMPTZ,              -- Latest telemetry included in total_seconds
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Rollback (if needed):
+-- DROP TABLE IF EXISTS engine_hours_counters;
+-- ALTER TABLE trips DROP COLUMN IF EXISTS engine_seconds;
+
+-- Done!
+DO $$
+BEGIN
+    RAISE NOTICE 'Migration 013 completed successfully!';
+END $$;
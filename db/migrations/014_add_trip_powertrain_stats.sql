@@ -0,0 +1,18 @@
+-- Migration 014: Per-trip powertrain mode summary
+-- Run: docker exec -i volt-tracker-db psql -U volt -d volt_tracker < db/migrations/014_add_trip_powertrain_stats.sql
+
+-- =====================================================
+-- Trips: Powertrain mode durations and transitions
+-- =====================================================
+-- Computed when a trip is finalized. Trips without it are analyzed from
+-- telemetry when their summary is requested.
+ALTER TABLE trips ADD COLUMN IF NOT EXISTS powertrain_stats JSONB;
+
+-- Rollback (if needed):
+-- ALTER TABLE trips DROP COLUMN IF EXISTS powertrain_stats;
+
+-- Done!
+DO $$
+BEGIN
+    RAISE NOTICE 'Migration 014 completed successfully!';
+END $$;
@@ -0,0 +1,19 @@
+-- Migration 015: Packed battery cell voltages
+-- Run: docker exec -i volt-tracker-db psql -U volt -d volt_tracker < db/migrations/015_add_packed_cell_voltages.sql
+
+-- =====================================================
+-- BatteryCellReadings: float32 cell voltage blob
+-- =====================================================
+-- New readings store their voltages both as JSON and as a packed
+-- little-endian float32 array (NaN = missing) used by cell trend analysis.
+-- Pack existing readings with: python -m scripts.backfill_packed_cell_voltages
+ALTER TABLE battery_cell_readings ADD COLUMN IF NOT EXISTS cell_voltages_packed BYTEA;
+
+-- Rollback (if needed):
+-- ALTER TABLE battery_cell_readings DROP COLUMN IF EXISTS cell_voltages_packed;
+
+-- Done!
+DO $$
+BEGIN
+    RAISE NOTICE 'Migration 015 completed successfully!';
+END $$;
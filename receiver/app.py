@@ -10,13 +10,15 @@ import logging
 from config import Config
 from database import init_app as init_db
 from flask import Flask, jsonify
-from flask_caching import Cache
 from flask_compress import Compress
 from flask_httpauth import HTTPBasicAuth
 from flask_socketio import SocketIO
 from extensions import limiter
 from routes import register_blueprints
+from services.cache_warmer import init_cache_warmer, is_cache_warm_request
 from services.scheduler import init_scheduler, shutdown_scheduler
+from utils.invalidation_bus import start_invalidation_listener, stop_invalidation_listener
+from utils.serialization import FastJSONProvider
 from werkzeug.security import check_password_hash
 
 
@@ -71,6 +73,9 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 app.config.from_object(Config)
 
+# Serialize JSON responses with orjson when available (stdlib json otherwise)
+app.json = FastJSONProvider(app)
+
 # Set request size limits
 app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH
 
@@ -78,22 +83,6 @@ app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH
 compress = Compress()
 compress.init_app(app)
 
-# Initialize cache (disabled in testing mode)
-cache = Cache()
-
-
-def init_cache(app):
-    """Initialize cache based on environment."""
-    import os
-
-    if app.config.get("TESTING") or os.environ.get("FLASK_TESTING"):
-        cache.init_app(app, config={"CACHE_TYPE": "NullCache"})
-    else:
-        cache.init_app(app, config={"CACHE_TYPE": "SimpleCache", "CACHE_DEFAULT_TIMEOUT": Config.CACHE_TIMEOUT_SECONDS})
-
-
-init_cache(app)
-
 # Initialize SocketIO for real-time updates
 # Use 'threading' async_mode in testing to avoid gevent dependency
 import os
@@ -213,6 +202,8 @@ limiter.init_app(app)
 if Config.RATE_LIMIT_ENABLED:
     limiter._default_limits = ["200 per day", "50 per hour"]
 limiter._enabled = Config.RATE_LIMIT_ENABLED
+# Background cache warm requests come from 127.0.0.1 and must not use up its budget
+limiter.request_filter(is_cache_warm_request)
 
 
 @app.before_request
@@ -440,9 +431,11 @@ def cache_stats():
     Returns cache hit rate, memory usage, and performance metrics.
     Useful for monitoring cache effectiveness.
     """
+    from services.cache_warmer import get_last_warm_report
     from utils.cache_utils import get_cache_stats
 
     stats = get_cache_stats()
+    stats["last_warm"] = get_last_warm_report()
     return jsonify(stats), 200
 
 
@@ -526,12 +519,15 @@ def readiness_check():
     return response, 200 if all_healthy else 503
 
 
-# Initialize background scheduler
+# Initialize background scheduler, cross-process cache invalidation and cache warming
 import os  # noqa: E402
 
 if not os.environ.get("FLASK_TESTING"):
     scheduler = init_scheduler()
     atexit.register(shutdown_scheduler)
+    start_invalidation_listener()
+    atexit.register(stop_invalidation_listener)
+    init_cache_warmer(app)
 
 
 # ============================================================================
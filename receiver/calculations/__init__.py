@@ -67,6 +67,9 @@ from .financial import (
 
 # Statistical calculations
 from .statistics import (
+    QuantileSketch,
+    RunningCovariance,
+    RunningStats,
     calculate_confidence_interval,
     calculate_correlation_simple,
     calculate_moving_average,
@@ -74,7 +77,11 @@ from .statistics import (
     calculate_percent_change,
     calculate_trend_vs_previous,
     calculate_z_score,
+    confidence_interval_from_stats,
     filter_outliers,
+    iter_moving_average,
+    iter_within_bounds,
+    outlier_bounds_from_sketch,
 )
 
 # Constants (re-export for convenience)
@@ -143,6 +150,13 @@ __all__ = [
     "filter_outliers",
     "calculate_correlation_simple",
     "calculate_z_score",
+    "RunningStats",
+    "RunningCovariance",
+    "QuantileSketch",
+    "confidence_interval_from_stats",
+    "iter_moving_average",
+    "outlier_bounds_from_sketch",
+    "iter_within_bounds",
     # Constants
     "BATTERY_CAPACITY_KWH",
     "TANK_CAPACITY_GALLONS",
@@ -47,6 +47,8 @@ DEFAULT_CONFIDENCE_LEVEL = 0.95  # 95% confidence interval
 T_CRITICAL_SMALL_SAMPLE = 2.0  # Approximation for t-distribution (n < 30)
 Z_CRITICAL_95_PERCENT = 1.96  # Z-score for 95% CI (large samples)
 SMALL_SAMPLE_THRESHOLD = 30  # Sample size below which to use t-distribution
+QUANTILE_SKETCH_COMPRESSION = 300  # t-digest compression (higher = more accurate tails, ~compression/2 centroids)
+STREAMING_BATCH_SIZE = 4096  # Values folded into streaming accumulators per batch
 
 # Smoothing Constants
 FUEL_LEVEL_SMOOTHING_WINDOW = 10  # Number of readings for median filter
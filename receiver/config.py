@@ -74,13 +74,39 @@ class Config:
     # API Configuration
     FLASK_HOST = os.environ.get("FLASK_HOST", "0.0.0.0")  # nosec B104 - intentional for server
     FLASK_PORT = int(os.environ.get("FLASK_PORT", 8080))
-    CACHE_TIMEOUT_SECONDS = int(os.environ.get("CACHE_TIMEOUT", 60))
+    CACHE_L1_MAX_ENTRIES = int(os.environ.get("CACHE_L1_MAX_ENTRIES", 1024))  # In-process cache entries
+    CACHE_L1_MAX_BYTES = int(os.environ.get("CACHE_L1_MAX_MB", 64)) * 1024 * 1024  # In-process cache budget
     WEATHER_CACHE_TIMEOUT_SECONDS = int(os.environ.get("WEATHER_CACHE_TIMEOUT", 3600))  # 1 hour
+
+    # Cache warmer: dashboard endpoints precomputed after trips close or are imported
+    _default_cache_warm_paths = ",".join([
+        "/api/stats/quick/7d",
+        "/api/stats/quick/30d",
+        "/api/stats/quick/90d",
+        "/api/efficiency/summary",
+        "/api/analytics/weather/efficiency-correlation",
+        "/api/analytics/weather/temperature-bands",
+        "/api/analytics/weather/precipitation-impact",
+        "/api/analytics/weather/wind-impact",
+        "/api/analytics/weather/seasonal-trends",
+        "/api/analytics/elevation/efficiency-correlation",
+        "/api/analytics/elevation/gradient",
+        "/api/analytics/elevation/summary",
+        "/api/trips/map?date_range=last_30_days&format=polyline&zoom=14",
+    ])
+    CACHE_WARM_ENABLED = os.environ.get("CACHE_WARM_ENABLED", "true").lower() == "true"
+    CACHE_WARM_PATHS = [
+        path.strip()
+        for path in os.environ.get("CACHE_WARM_PATHS", _default_cache_warm_paths).split(",")
+        if path.strip()
+    ]
+    CACHE_WARM_CONCURRENCY = int(os.environ.get("CACHE_WARM_CONCURRENCY", 2))  # Parallel warm requests
     WEATHER_SAMPLE_INTERVAL_MINUTES = int(os.environ.get("WEATHER_SAMPLE_INTERVAL", 15))  # Sample weather every N minutes
     API_DEFAULT_PER_PAGE = int(os.environ.get("API_DEFAULT_PER_PAGE", 50))
     API_MAX_PER_PAGE = int(os.environ.get("API_MAX_PER_PAGE", 100))
     API_TELEMETRY_LIMIT_DEFAULT = int(os.environ.get("API_TELEMETRY_LIMIT_DEFAULT", 500))
     API_TELEMETRY_LIMIT_MAX = int(os.environ.get("API_TELEMETRY_LIMIT_MAX", 2000))
+    API_COLUMNAR_BATCH_SIZE = int(os.environ.get("API_COLUMNAR_BATCH_SIZE", 4096))  # Rows per columnar batch
 
     # Trip Processing Thresholds
     MIN_TRIP_MILES = float(os.environ.get("MIN_TRIP_MILES", 0.1))  # Minimum distance for valid trip
@@ -88,9 +114,6 @@ class Config:
     # Charging Session Configuration
     MAX_CHARGING_CURVE_POINTS = int(os.environ.get("MAX_CHARGING_CURVE_POINTS", 1000))  # Max curve data points
 
-    # Maintenance Service Configuration
-    MAX_ENGINE_TELEMETRY_POINTS = int(os.environ.get("MAX_ENGINE_TELEMETRY_POINTS", 50000))  # Limit for engine hours calc
-
     # External API Configuration
     WEATHER_API_MAX_RETRIES = int(os.environ.get("WEATHER_API_MAX_RETRIES", 2))
     WEATHER_API_RETRY_DELAY = float(os.environ.get("WEATHER_API_RETRY_DELAY", 0.5))
@@ -134,7 +157,8 @@ class Config:
     # Request size limits (prevent DoS via large uploads)
     MAX_CONTENT_LENGTH = int(os.environ.get("MAX_CONTENT_LENGTH", 50 * 1024 * 1024))  # 50MB default
     MAX_CSV_FILE_SIZE = int(os.environ.get("MAX_CSV_FILE_SIZE", 25 * 1024 * 1024))  # 25MB for CSV imports
-    MAX_CSV_ROWS = int(os.environ.get("MAX_CSV_ROWS", 100000))  # Max rows in CSV import
+    MAX_CSV_ROWS = int(os.environ.get("MAX_CSV_ROWS", 500000))  # Max rows in CSV import (streamed)
+    CSV_IMPORT_CHUNK_SIZE = int(os.environ.get("CSV_IMPORT_CHUNK_SIZE", 1000))  # Rows deduped/inserted per chunk
 
     # CORS - WebSocket allowed origins
     # Default allows local development and common private network ranges
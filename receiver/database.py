@@ -15,6 +15,9 @@ from sqlalchemy import event
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import scoped_session, sessionmaker
 
+# Registers session listeners that bump per-kind data versions on commit
+import utils.data_version  # noqa: F401
+
 logger = logging.getLogger(__name__)
 
 # Create engine and session factory
@@ -11,6 +11,7 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     String,
     Text,
     TypeDecorator,
@@ -20,6 +21,7 @@ from sqlalchemy import (
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
+from utils.cell_voltages import pack_cell_voltages
 from utils.timezone import utc_now
 
 Base = declarative_base()
@@ -242,6 +244,12 @@ class Trip(Base):
     fuel_level_at_gas_entry = Column(Float)
     fuel_level_at_end = Column(Float)
 
+    # Engine runtime (RPM > 400), added to engine_hours_counters at finalization
+    engine_seconds = Column(Float)
+
+    # Powertrain mode durations, transitions and sample count (computed at finalization)
+    powertrain_stats = Column(JSONType())
+
     # Metadata
     ambient_temp_avg_f = Column(Float)
     is_closed = Column(Boolean, default=False, index=True)
@@ -267,6 +275,25 @@ class Trip(Base):
     elevation_max_m = Column(Float)  # Maximum elevation during trip
     elevation_min_m = Column(Float)  # Minimum elevation during trip
 
+    # Route geometry (simplified at finalization for map display)
+    route_polyline = Column(Text)  # Google encoded polyline, RDP-simplified
+    route_bounds_north = Column(Float)
+    route_bounds_south = Column(Float)
+    route_bounds_east = Column(Float)
+    route_bounds_west = Column(Float)
+    gps_point_count = Column(Integer)  # GPS points before simplification
+    heatmap_indexed = Column(Boolean, default=False)  # Telemetry added to map_grid_cells
+
+    # Trip endpoints (first/last GPS fix) with geohashes for indexed proximity search
+    start_lat = Column(Float)
+    start_lon = Column(Float)
+    end_lat = Column(Float)
+    end_lon = Column(Float)
+    start_geohash = Column(String(12), index=True)
+    end_geohash = Column(String(12), index=True)
+    route_fingerprint = Column(LargeBinary)  # Packed float64 (lat, lon) pairs resampled along the route
+    route_id = Column(Integer, ForeignKey("routes.id", ondelete="SET NULL"), index=True)  # Assigned route cluster
+
     # Relationships
     soc_transitions = relationship("SocTransition", back_populates="trip")
 
@@ -305,6 +332,7 @@ class Trip(Base):
             "elevation_net_change_m": self.elevation_net_change_m,
             "elevation_max_m": self.elevation_max_m,
             "elevation_min_m": self.elevation_min_m,
+            "route_id": self.route_id,
         }
 
 
@@ -482,6 +510,36 @@ class BatteryHealthReading(Base):
         return None
 
 
+class BatteryDegradationStats(Base):
+    """
+    Running regression sums of battery capacity against odometer.
+
+    Updated as battery health readings are inserted (see
+    services.battery_degradation_service), so the degradation trend is
+    available without re-reading every reading. A background refit rebuilds
+    the sums and stores a robust (Theil-Sen) fit alongside them.
+    """
+
+    __tablename__ = "battery_degradation_stats"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(50), nullable=False, unique=True)
+
+    # Least-squares sums over (odometer_miles, capacity_kwh) points
+    n = Column(Integer, nullable=False, default=0)
+    sum_x = Column(Float, nullable=False, default=0)
+    sum_y = Column(Float, nullable=False, default=0)
+    sum_xy = Column(Float, nullable=False, default=0)
+    sum_xx = Column(Float, nullable=False, default=0)
+
+    # Background robust refit
+    robust_slope = Column(Float)
+    robust_intercept = Column(Float)
+    refit_at = Column(DateTime(timezone=True))
+
+    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now)
+
+
 class BatteryCellReading(Base):
     """Stores individual cell voltage readings from the HV battery pack.
 
@@ -498,6 +556,9 @@ class BatteryCellReading(Base):
     # Format: [cell1_v, cell2_v, ..., cell96_v]
     cell_voltages = Column(JSONType())
 
+    # Same voltages packed as little-endian float32 (NaN = missing) for analysis
+    cell_voltages_packed = Column(LargeBinary)
+
     # Summary statistics (calculated at insert time for quick queries)
     min_voltage = Column(Float)
     max_voltage = Column(Float)
@@ -557,6 +618,7 @@ class BatteryCellReading(Base):
         return cls(
             timestamp=timestamp,
             cell_voltages=cell_voltages,
+            cell_voltages_packed=pack_cell_voltages(cell_voltages),
             min_voltage=round(min_v, 4),
             max_voltage=round(max_v, 4),
             avg_voltage=round(avg_v, 4),
@@ -669,6 +731,25 @@ class WebVital(Base):
         return f"<WebVital(name={self.name}, value={self.value}, rating={self.rating})>"
 
 
+class EngineHoursCounter(Base):
+    """
+    Lifetime engine runtime accumulated from finalized trips.
+
+    Each trip's engine seconds are added when it is finalized (see
+    services.maintenance_service), so lifetime engine hours are read
+    without scanning telemetry.
+    """
+
+    __tablename__ = "engine_hours_counters"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(50), nullable=False, unique=True)
+    total_seconds = Column(Float, nullable=False, default=0)
+    trip_count = Column(Integer, nullable=False, default=0)
+    counted_through = Column(DateTime(timezone=True))  # Latest telemetry included in total_seconds
+    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now)
+
+
 class MaintenanceRecord(Base):
     """Track maintenance items and predict when service is due."""
 
@@ -717,7 +798,11 @@ class Route(Base):
     start_lon = Column(Float, nullable=False)
     end_lat = Column(Float, nullable=False)
     end_lon = Column(Float, nullable=False)
+    start_geohash = Column(String(12), index=True)  # Candidate lookup for route matching
+    end_geohash = Column(String(12))
+    fingerprint = Column(LargeBinary)  # Mean route fingerprint of the assigned trips
     trip_count = Column(Integer, default=1)
+    efficiency_trip_count = Column(Integer, default=0)  # Trips included in avg_efficiency_kwh_per_mile
     avg_distance_miles = Column(Float)
     avg_efficiency_kwh_per_mile = Column(Float)
     avg_duration_minutes = Column(Float)
@@ -964,6 +1049,46 @@ class ChargingHourlyStats(Base):
         }
 
 
+class MapGridCell(Base):
+    """
+    Spatial grid aggregation of telemetry for the map heatmap.
+
+    Each row holds running totals for one square cell at one grid level
+    (see utils.spatial_grid). Totals are incremented when a trip is
+    finalized, so averages are derived at read time.
+    """
+
+    __tablename__ = "map_grid_cells"
+    __table_args__ = (
+        # Cell key; also serves bbox range lookups within a level
+        UniqueConstraint("level", "cell_x", "cell_y", name="uq_map_grid_cell"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    level = Column(Integer, nullable=False)  # Grid level (map zoom)
+    cell_x = Column(Integer, nullable=False)  # Column counted from longitude -180
+    cell_y = Column(Integer, nullable=False)  # Row counted from latitude -90
+
+    # Running totals
+    sample_count = Column(Integer, nullable=False, default=0)
+    speed_sum = Column(Float, nullable=False, default=0)
+    moving_count = Column(Integer, nullable=False, default=0)  # Samples > 5 mph with power data
+    moving_speed_sum = Column(Float, nullable=False, default=0)
+    moving_power_kw_sum = Column(Float, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now)
+
+    @property
+    def avg_speed_mph(self):
+        """Mean speed over all samples in the cell."""
+        return self.speed_sum / self.sample_count if self.sample_count else None
+
+    @property
+    def kwh_per_mile(self):
+        """Energy per mile while moving (sum of kW over sum of mph)."""
+        return self.moving_power_kw_sum / self.moving_speed_sum if self.moving_speed_sum else None
+
+
 class MonthlySummary(Base):
     """
     Monthly summary statistics for high-level overview.
@@ -1040,6 +1165,35 @@ class MonthlySummary(Base):
         }
 
 
+class EfficiencyModel(Base):
+    """
+    Fitted multi-factor efficiency regression (see services.efficiency_model_service).
+
+    Stores the least-squares sufficient statistics alongside the fitted
+    coefficients, so closing a trip refits the model without re-reading
+    trip history. data_version records the data versions of the last full
+    fit.
+    """
+
+    __tablename__ = "efficiency_models"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(50), nullable=False, unique=True)
+
+    # Sufficient statistics: {"xtx": [[...]], "xty": [...], "yty": float, "miles_sum": float}
+    stats = Column(JSONType(), nullable=False)
+    trip_count = Column(Integer, nullable=False, default=0)
+
+    # Fit results
+    coefficients = Column(JSONType())  # {feature: coefficient}
+    r_squared = Column(Float)
+    rmse = Column(Float)
+
+    data_version = Column(String(200))
+    fitted_at = Column(DateTime(timezone=True))  # Last full fit
+    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now)
+
+
 class AuditLog(Base):
     """
     Audit log for tracking data changes and operations.
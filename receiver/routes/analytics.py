@@ -7,6 +7,7 @@ plus advanced analytics features (powertrain, range prediction, etc.).
 
 import logging
 
+from config import Config
 from database import get_db
 from flask import Blueprint, jsonify, request
 from models import WebVital
@@ -17,6 +18,7 @@ from services import (
     range_prediction_service,
     route_service,
 )
+from utils.downsampling import parse_max_points
 
 logger = logging.getLogger(__name__)
 
@@ -94,7 +96,16 @@ def get_powertrain_analysis(trip_id):
     Get powertrain mode analysis for a specific trip.
 
     Returns timeline of operating modes and statistics.
+
+    Query params:
+        - max_points: Downsample the timeline to at most N points with LTTB
+          (default: 10,000). The whole trip is always analyzed.
     """
+    try:
+        max_points = parse_max_points(request.args.get("max_points"), Config.API_TELEMETRY_LIMIT_MAX)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         db = get_db()
         from models import Trip
@@ -103,7 +114,7 @@ def get_powertrain_analysis(trip_id):
         if not trip:
             return jsonify({"error": "Trip not found"}), 404
 
-        analysis = powertrain_service.analyze_trip_powertrain(db, str(trip.session_id))
+        analysis = powertrain_service.analyze_trip_powertrain(db, str(trip.session_id), max_points=max_points)
         return jsonify(analysis), 200
 
     except Exception as e:
@@ -5,13 +5,13 @@ Handles battery health and cell voltage endpoints.
 """
 
 import logging
-import statistics
 from datetime import datetime, timedelta
 
 from config import Config
 from database import get_db
 from flask import Blueprint, jsonify, request
 from models import BatteryCellReading, BatteryHealthReading, TelemetryRaw
+from services.battery_cell_service import analyze_cell_history
 from sqlalchemy import desc, func
 from sqlalchemy.exc import IntegrityError, OperationalError
 from utils import utc_now
@@ -155,64 +155,19 @@ def get_cell_analysis():
     Get battery cell health analysis.
 
     Analyzes voltage delta trends, weak cells, and module balance.
+    Per-cell drift, persistently weak cells and the module balance trend
+    are computed across every reading in the period.
     """
     db = get_db()
 
     days = request.args.get("days", 30, type=int)
     cutoff = utc_now() - timedelta(days=days)
 
-    readings = (
-        db.query(BatteryCellReading)
-        .filter(BatteryCellReading.timestamp >= cutoff)
-        .order_by(BatteryCellReading.timestamp)
-        .all()
-    )
-
-    if not readings:
+    analysis = analyze_cell_history(db, cutoff)
+    if analysis is None:
         return jsonify({"message": "No cell readings in the specified period", "analysis": None})
 
-    # Calculate statistics
-    deltas = [r.voltage_delta for r in readings if r.voltage_delta]
-    avg_voltages = [r.avg_voltage for r in readings if r.avg_voltage]
-
-    # Find cells that are consistently low or high
-    weak_cells = []
-    if readings and readings[-1].cell_voltages:
-        latest = readings[-1]
-        voltages = latest.cell_voltages
-        if voltages and latest.avg_voltage:
-            threshold = latest.avg_voltage * 0.02  # 2% below average
-            for i, v in enumerate(voltages):
-                if v and v < (latest.avg_voltage - threshold):
-                    weak_cells.append(
-                        {"cell_index": i + 1, "voltage": v, "deviation": round(v - latest.avg_voltage, 4)}
-                    )
-
-    analysis = {
-        "period_days": days,
-        "reading_count": len(readings),
-        "avg_voltage_delta": round(statistics.mean(deltas), 4) if deltas else None,
-        "max_voltage_delta": round(max(deltas), 4) if deltas else None,
-        "min_voltage_delta": round(min(deltas), 4) if deltas else None,
-        "avg_cell_voltage": round(statistics.mean(avg_voltages), 4) if avg_voltages else None,
-        "weak_cells": weak_cells[:5],  # Top 5 weakest cells
-        "health_status": "good" if deltas and max(deltas) < 0.05 else "monitor",
-    }
-
-    # Module balance analysis
-    if readings:
-        latest = readings[-1]
-        if all([latest.module1_avg, latest.module2_avg, latest.module3_avg]):
-            module_avgs = [latest.module1_avg, latest.module2_avg, latest.module3_avg]
-            module_delta = max(module_avgs) - min(module_avgs)
-            analysis["module_balance"] = {
-                "module1_avg": latest.module1_avg,
-                "module2_avg": latest.module2_avg,
-                "module3_avg": latest.module3_avg,
-                "module_delta": round(module_delta, 4),
-                "balanced": module_delta < 0.02,
-            }
-
+    analysis["period_days"] = days
     return jsonify({"analysis": analysis})
 
 
@@ -11,8 +11,11 @@ import logging
 from flask import Blueprint, jsonify, request
 from database import get_db
 from models import Trip, TelemetryRaw, FuelEvent
+from services.heatmap_service import remove_trip_from_heatmap, restore_trip_to_heatmap
+from services.route_service import remove_trips_from_routes, restore_trip_to_route
 from sqlalchemy import and_
 from utils import utc_now
+from utils.query_utils import parse_fields_param, project_columns, serialize_row
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +71,11 @@ def bulk_delete_trips():
             # First delete associated data
             session_ids = [t.session_id for t in trips]
 
+            # Subtract heatmap cells while the telemetry still exists
+            for trip in trips:
+                remove_trip_from_heatmap(db, trip)
+            remove_trips_from_routes(db, trips)
+
             # Delete telemetry
             telemetry_deleted = db.query(TelemetryRaw).filter(
                 TelemetryRaw.session_id.in_(session_ids)
@@ -89,6 +97,8 @@ def bulk_delete_trips():
             # Soft delete - mark as deleted
             for trip in trips:
                 trip.deleted_at = utc_now()
+                remove_trip_from_heatmap(db, trip)
+            remove_trips_from_routes(db, trips)
 
             db.commit()
 
@@ -144,6 +154,8 @@ def bulk_restore_trips():
         # Restore trips
         for trip in trips:
             trip.deleted_at = None
+            restore_trip_to_heatmap(db, trip)
+            restore_trip_to_route(db, trip)
 
         db.commit()
 
@@ -243,6 +255,7 @@ def bulk_export_trips():
     Request body (JSON):
         trip_ids: List of trip IDs to export
         format: "csv" or "json" (default: csv)
+        fields: Optional list of trip fields to export (also sets the CSV columns)
 
     Returns:
         CSV or JSON file with selected trips
@@ -267,11 +280,43 @@ def bulk_export_trips():
         return jsonify({"error": "Maximum 10000 trips per export"}), 400
 
     try:
-        # Fetch selected trips
-        trips = db.query(Trip).filter(
+        fields = parse_fields_param(data.get("fields"), Trip)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        query = db.query(Trip).filter(
             Trip.id.in_(trip_ids),
             Trip.is_closed.is_(True)
-        ).order_by(Trip.start_time.desc()).all()
+        ).order_by(Trip.start_time.desc())
+
+        if fields:
+            # Column-projected export: only the requested columns are read
+            rows = query.with_entities(*project_columns(Trip, fields)).all()
+            if not rows:
+                return jsonify({
+                    "error": "No trips found for export"
+                }), 404
+
+            records = [serialize_row(row, fields) for row in rows]
+            if export_format == "json":
+                return jsonify(records), 200
+
+            output = io.StringIO()
+            writer = csv.writer(output)
+            writer.writerow(fields)
+            for record in records:
+                writer.writerow(["" if record[name] is None else record[name] for name in fields])
+
+            output.seek(0)
+            return Response(
+                output.getvalue(),
+                mimetype="text/csv",
+                headers={"Content-Disposition": "attachment; filename=trips_bulk_export.csv"}
+            ), 200
+
+        # Fetch selected trips
+        trips = query.all()
 
         if not trips:
             return jsonify({
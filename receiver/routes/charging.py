@@ -11,9 +11,11 @@ from config import Config
 from database import get_db
 from flask import Blueprint, jsonify, request
 from models import ChargingSession, Trip
+from services.charging_service import build_charging_curve
 from sqlalchemy import desc, func
 from sqlalchemy.exc import IntegrityError, OperationalError
 from utils import utc_now
+from utils.downsampling import downsample_points, parse_max_points
 
 logger = logging.getLogger(__name__)
 
@@ -115,54 +117,39 @@ def get_charging_curve(session_id):
     """
     Get charging curve data for visualization.
 
-    Returns time-series power and SOC data for the charging session.
-    If charging_curve is not stored, attempts to reconstruct from telemetry.
-    """
-    from models import TelemetryRaw
+    Returns time-series power and SOC data for the charging session. The
+    curve is stored when the session is finalized; for older sessions it is
+    reconstructed from telemetry.
 
+    Query params:
+        max_points: Downsample the curve to at most N points with LTTB
+    """
     db = get_db()
 
+    try:
+        max_points = parse_max_points(request.args.get("max_points"), Config.MAX_CHARGING_CURVE_POINTS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def curve_response(curve, source):
+        total = len(curve)
+        if max_points:
+            curve = downsample_points(curve, max_points, "timestamp", ["power_kw", "soc"])
+        return jsonify({"session_id": session_id, "curve": curve, "source": source, "total_points": total})
+
     session = db.query(ChargingSession).filter(ChargingSession.id == session_id).first()
     if not session:
         return jsonify({"error": "Charging session not found"}), 404
 
     # Check if we have stored curve data
     if session.charging_curve and len(session.charging_curve) > 0:
-        return jsonify({"session_id": session_id, "curve": session.charging_curve, "source": "stored"})
+        return curve_response(session.charging_curve, "stored")
 
-    # Try to reconstruct from telemetry data
+    # Sessions finalized before curves were stored
     if session.start_time and session.end_time:
-        telemetry = (
-            db.query(TelemetryRaw)
-            .filter(
-                TelemetryRaw.timestamp >= session.start_time,
-                TelemetryRaw.timestamp <= session.end_time,
-                TelemetryRaw.charger_connected.is_(True),
-            )
-            .order_by(TelemetryRaw.timestamp)
-            .all()
-        )
-
-        if telemetry:
-            curve_data = []
-            for t in telemetry:
-                # Use charger AC power or HV battery power (negative during charging)
-                power = t.charger_ac_power_kw
-                if power is None and t.hv_battery_power_kw is not None:
-                    # HV power is negative during charging
-                    power = abs(t.hv_battery_power_kw) if t.hv_battery_power_kw < 0 else None
-
-                if power is not None:
-                    curve_data.append(
-                        {
-                            "timestamp": t.timestamp.isoformat() if t.timestamp else None,
-                            "power_kw": round(power, 2),
-                            "soc": t.state_of_charge,
-                        }
-                    )
-
-            if curve_data:
-                return jsonify({"session_id": session_id, "curve": curve_data, "source": "telemetry"})
+        curve_data = build_charging_curve(db, session.start_time, session.end_time)
+        if curve_data:
+            return curve_response(curve_data, "telemetry")
 
     # No curve data available
     return jsonify(
@@ -11,6 +11,7 @@ from datetime import datetime
 from database import get_db
 from flask import Blueprint, jsonify, request
 from services import combined_analytics_service
+from utils.data_version import etag_by_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +29,7 @@ def _parse_date(date_str: str) -> datetime | None:
 
 
 @combined_analytics_bp.route("/api/analytics/efficiency/multi-factor", methods=["GET"])
+@etag_by_data_version("trips")
 def get_multi_factor_analysis():
     """
     Get comprehensive multi-factor efficiency analysis.
@@ -58,6 +60,7 @@ def get_multi_factor_analysis():
 
 
 @combined_analytics_bp.route("/api/analytics/efficiency/predictions", methods=["GET"])
+@etag_by_data_version("trips")
 def get_efficiency_predictions():
     """
     Predict efficiency for given conditions.
@@ -66,6 +69,7 @@ def get_efficiency_predictions():
         temperature_f: Expected temperature in Fahrenheit (optional)
         elevation_change_m: Expected net elevation change in meters (optional)
         is_raining: Whether precipitation is expected (optional, default false)
+        distance_miles: Expected trip distance for the elevation grade (optional)
 
     Returns:
         JSON with predicted efficiency and adjustments
@@ -82,11 +86,15 @@ def get_efficiency_predictions():
 
         is_raining = request.args.get("is_raining", "false").lower() == "true"
 
+        distance_str = request.args.get("distance_miles")
+        distance_miles = float(distance_str) if distance_str else None
+
         result = combined_analytics_service.get_efficiency_predictions(
             db,
             temperature_f=temperature_f,
             elevation_change_m=elevation_change_m,
             is_raining=is_raining,
+            distance_miles=distance_miles,
         )
         return jsonify(result), 200
 
@@ -98,6 +106,7 @@ def get_efficiency_predictions():
 
 
 @combined_analytics_bp.route("/api/analytics/efficiency/time-series", methods=["GET"])
+@etag_by_data_version("trips")
 def get_efficiency_time_series():
     """
     Get efficiency data formatted for time series charts.
@@ -134,6 +143,7 @@ def get_efficiency_time_series():
 
 
 @combined_analytics_bp.route("/api/analytics/efficiency/optimal-conditions", methods=["GET"])
+@etag_by_data_version("trips")
 def get_optimal_conditions():
     """
     Get the best combined conditions for efficiency.
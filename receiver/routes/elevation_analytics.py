@@ -11,6 +11,7 @@ from datetime import datetime
 from database import get_db
 from flask import Blueprint, jsonify, request
 from services import elevation_analytics_service
+from utils.data_version import etag_by_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +29,7 @@ def _parse_date(date_str: str) -> datetime | None:
 
 
 @elevation_analytics_bp.route("/api/analytics/elevation/efficiency-correlation", methods=["GET"])
+@etag_by_data_version("trips")
 def get_efficiency_by_elevation():
     """
     Get efficiency statistics grouped by net elevation change.
@@ -62,6 +64,7 @@ def get_efficiency_by_elevation():
 
 
 @elevation_analytics_bp.route("/api/analytics/elevation/gradient", methods=["GET"])
+@etag_by_data_version("trips")
 def get_efficiency_by_gradient():
     """
     Get efficiency statistics by average gradient (meters gained per mile).
@@ -96,6 +99,7 @@ def get_efficiency_by_gradient():
 
 
 @elevation_analytics_bp.route("/api/analytics/elevation/summary", methods=["GET"])
+@etag_by_data_version("trips")
 def get_elevation_summary():
     """
     Get overall elevation statistics summary.
@@ -114,6 +118,7 @@ def get_elevation_summary():
 
 
 @elevation_analytics_bp.route("/api/analytics/elevation/route-comparison", methods=["GET"])
+@etag_by_data_version("trips")
 def get_route_comparison():
     """
     Compare routes by their elevation characteristics.
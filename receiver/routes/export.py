@@ -9,19 +9,25 @@ import io
 import logging
 import os
 import json
+import shutil
 import time
-from datetime import datetime, timedelta, timezone
+import uuid
+from datetime import datetime
+from itertools import islice
 from pathlib import Path
 
 from database import get_db
 from exceptions import CSVImportError
 from flask import Blueprint, Response, jsonify, request
 from models import ChargingSession, CsvImport, FuelEvent, SocTransition, TelemetryRaw, Trip
+from services.cache_warmer import schedule_cache_warm
 from services.trip_service import finalize_trip
 from sqlalchemy import and_, desc, func, or_
 from sqlalchemy.exc import IntegrityError
 from utils import utc_now
-from utils.import_utils import generate_import_code, get_file_hash, format_reportable, get_failure_suggestion
+from utils.import_utils import generate_import_code, format_reportable, get_failure_suggestion, scan_file_stream
+from utils.query_utils import parse_fields_param, project_columns, serialize_row
+from utils.serialization import dumps_json
 
 # Import limiter for rate limiting sensitive endpoints
 from extensions import limiter
@@ -75,7 +81,7 @@ def export_trips():
             # Streaming JSON (newline-delimited JSON)
             def generate_json():
                 for trip in query.yield_per(100):
-                    yield json.dumps(trip.to_dict()) + "\n"
+                    yield dumps_json(trip.to_dict()) + b"\n"
 
             return Response(
                 generate_json(),
@@ -225,6 +231,7 @@ def export_all():
         start_date: Start date (ISO format, optional)
         end_date: End date (ISO format, optional)
         limit: Max records per table (default 10000, optional)
+        fields: Comma-separated trip fields to export (default: all trip fields)
 
     Returns trips, fuel events, SOC transitions, charging sessions, and summary stats.
     """
@@ -232,6 +239,11 @@ def export_all():
 
     db = get_db()
 
+    try:
+        trip_fields = parse_fields_param(request.args.get("fields"), Trip)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     # Parse date range filters
     start_date = request.args.get("start_date")
     end_date = request.args.get("end_date")
@@ -268,7 +280,11 @@ def export_all():
             return jsonify({"error": "Invalid end_date format. Use ISO 8601 format."}), 400
 
     # Apply limit and fetch
-    trips = trip_query.limit(limit).all()
+    if trip_fields:
+        trip_rows = trip_query.with_entities(*project_columns(Trip, trip_fields)).limit(limit).all()
+        trips = [serialize_row(row, trip_fields) for row in trip_rows]
+    else:
+        trips = [t.to_dict() for t in trip_query.limit(limit).all()]
     fuel_events = fuel_query.limit(limit).all()
     soc_transitions = soc_query.limit(limit).all()
     charging_sessions = charging_query.limit(limit).all()
@@ -276,8 +292,8 @@ def export_all():
     return jsonify(
         {
             "exported_at": utc_now().isoformat(),
-            "filters": {"start_date": start_date, "end_date": end_date, "limit": limit},
-            "trips": [t.to_dict() for t in trips],
+            "filters": {"start_date": start_date, "end_date": end_date, "limit": limit, "fields": trip_fields},
+            "trips": trips,
             "fuel_events": [e.to_dict() for e in fuel_events],
             "soc_transitions": [s.to_dict() for s in soc_transitions],
             "charging_sessions": [c.to_dict() for c in charging_sessions],
@@ -335,6 +351,60 @@ Ambient Air Temp,AmbTemp,22004F,(A-40),-40,100,C,7E4
     )
 
 
+def _telemetry_mapping(record):
+    """Map a parsed CSV record to TelemetryRaw columns for bulk insert."""
+    return {
+        "session_id": record["session_id"],
+        "timestamp": record["timestamp"],
+        "latitude": record.get("latitude"),
+        "longitude": record.get("longitude"),
+        "speed_mph": record.get("speed_mph"),
+        "engine_rpm": record.get("engine_rpm"),
+        "throttle_position": record.get("throttle_position"),
+        "coolant_temp_f": record.get("coolant_temp_f"),
+        "intake_air_temp_f": record.get("intake_air_temp_f"),
+        "fuel_level_percent": record.get("fuel_level_percent"),
+        "fuel_remaining_gallons": record.get("fuel_remaining_gallons"),
+        "state_of_charge": record.get("state_of_charge"),
+        "battery_voltage": record.get("battery_voltage"),
+        "ambient_temp_f": record.get("ambient_temp_f"),
+        "odometer_miles": record.get("odometer_miles"),
+        "hv_battery_power_kw": record.get("hv_battery_power_kw"),
+        "raw_data": record.get("raw_data", {}),
+    }
+
+
+def _dedupe_import_chunk(db, chunk, stats, session_id):
+    """
+    Drop records from a chunk whose timestamps already exist in telemetry.
+
+    Only the chunk's own timestamps are looked up, so memory stays bounded
+    by the chunk size however much telemetry is stored. Rows inserted by
+    earlier chunks of the same import are not treated as duplicates.
+
+    Args:
+        db: Database session
+        chunk: Parsed CSV records
+        stats: Import stats; duplicates_removed is incremented
+        session_id: Session ID of the import in progress
+
+    Returns:
+        Records not yet in the database
+    """
+    from utils.csv_importer import TorqueCSVImporter
+
+    timestamps = {r["timestamp"] for r in chunk}
+    existing = {
+        t[0]
+        for t in db.query(TelemetryRaw.timestamp).filter(
+            TelemetryRaw.timestamp.in_(timestamps), TelemetryRaw.session_id != session_id
+        )
+    }
+    unique_records, duplicate_count = TorqueCSVImporter._find_duplicates(chunk, existing)
+    stats["duplicates_removed"] += duplicate_count
+    return unique_records
+
+
 @export_bp.route("/import/csv", methods=["POST"])
 @limiter.limit("5 per hour")  # Limit CSV imports (resource-intensive operation)
 def import_csv():
@@ -347,6 +417,8 @@ def import_csv():
     - Generates unique import code (IMP-YYYYMMDD-XXXXXX) for tracking
     - File hash duplicate detection (rejects exact duplicate files)
     - Timestamp duplicate detection (skips records already in DB)
+    - Streams the upload: rows are parsed, deduplicated and inserted in
+      chunks of Config.CSV_IMPORT_CHUNK_SIZE, so memory doesn't grow with file size
     - Records all imports in csv_imports table for audit trail
 
     Returns:
@@ -493,9 +565,8 @@ def import_csv():
                                "Only CSV files are supported. Please upload a .csv file", http_status=400)
 
     try:
-        # Read file content as bytes first for hashing
-        file_bytes = file.read()
-        file_size = len(file_bytes)
+        # Hash, size and encoding-check the upload in chunks (never held in memory)
+        file_hash, file_size, decode_error = scan_file_stream(file.stream)
 
         # Validate file size
         from config import Config as AppConfig
@@ -511,7 +582,6 @@ def import_csv():
                                   f"CSV file must be less than {max_size_mb:.1f} MB. Your file is {actual_size_mb:.1f} MB.",
                                   http_status=413)
 
-        file_hash = get_file_hash(file_bytes)
         import_event["file_hash"] = file_hash
         import_event["file_size_bytes"] = file_size
 
@@ -530,7 +600,7 @@ def import_csv():
             _log_import_event()
             _record_import("duplicate", "duplicate_file",
                            f"This exact file was already imported as {existing_import.import_code}",
-                           filename=file.filename, file_hash=file_hash, file_size=len(file_bytes))
+                           filename=file.filename, file_hash=file_hash, file_size=file_size)
             return jsonify({
                 "status": "duplicate",
                 "import_code": import_code,
@@ -541,8 +611,8 @@ def import_csv():
                 "reportable": f"{import_code} | DUPLICATE | Same as {existing_import.import_code}",
             }), 409
 
-        # Decode file content
-        csv_content = file_bytes.decode("utf-8")
+        if decode_error is not None:
+            raise decode_error
 
         # Backup original CSV file
         try:
@@ -550,22 +620,49 @@ def import_csv():
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             safe_filename = "".join(c for c in file.filename if c.isalnum() or c in "._-")
             backup_path = CSV_BACKUP_DIR / f"{timestamp}_{import_code}_{safe_filename}"
-            backup_path.write_text(csv_content, encoding="utf-8")
+            with open(backup_path, "wb") as backup_file:
+                shutil.copyfileobj(file.stream, backup_file)
             logger.debug(f"Backed up CSV to {backup_path}")
         except Exception as e:
             logger.warning(f"Failed to backup CSV: {e}")  # Don't fail import if backup fails
-
-        # Get existing timestamps from last 60 days for duplicate detection
-        cutoff = datetime.now(timezone.utc) - timedelta(days=60)
-        existing_timestamps = set(
-            t[0] for t in db.query(TelemetryRaw.timestamp)
-            .filter(TelemetryRaw.timestamp >= cutoff)
-            .all()
-        )
-        logger.debug(f"Loaded {len(existing_timestamps)} existing timestamps for duplicate detection")
-
-        # Parse CSV with duplicate detection enabled
-        records, stats = TorqueCSVImporter.parse_csv(csv_content, existing_timestamps=existing_timestamps)
+        finally:
+            file.stream.seek(0)
+
+        # Stream rows through parse -> dedupe -> insert in fixed-size chunks.
+        # Only one chunk of records is held at a time; the insert is committed
+        # once the whole file has been read.
+        stats = TorqueCSVImporter.new_stats()
+        session_id = uuid.uuid4()
+        inserted_count = 0
+        last_fuel_level = None
+        text_stream = io.TextIOWrapper(file.stream, encoding="utf-8", newline="")
+        try:
+            records = TorqueCSVImporter.iter_records(text_stream, stats, session_id=session_id)
+            while True:
+                chunk = list(islice(records, AppConfig.CSV_IMPORT_CHUNK_SIZE))
+                if not chunk:
+                    break
+                unique_records = _dedupe_import_chunk(db, chunk, stats, session_id)
+                if not unique_records:
+                    continue
+
+                db.bulk_insert_mappings(TelemetryRaw, [_telemetry_mapping(r) for r in unique_records])
+                inserted_count += len(unique_records)
+                last_fuel_level = unique_records[-1].get("fuel_level_percent")
+
+                # Rolling timestamp range of inserted records
+                chunk_start = min(r["timestamp"] for r in unique_records)
+                chunk_end = max(r["timestamp"] for r in unique_records)
+                if stats.get("timestamp_range_start") is None or chunk_start < stats["timestamp_range_start"]:
+                    stats["timestamp_range_start"] = chunk_start
+                if stats.get("timestamp_range_end") is None or chunk_end > stats["timestamp_range_end"]:
+                    stats["timestamp_range_end"] = chunk_end
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            text_stream.detach()
+        TorqueCSVImporter.finalize_stats(stats)
 
         # Update import event with stats
         import_event["total_rows"] = stats.get("total_rows", 0)
@@ -583,7 +680,7 @@ def import_csv():
         if errors and isinstance(errors[0], dict):
             import_event["first_error"] = errors[0]
 
-        if not records:
+        if not inserted_count:
             # Check if all records were duplicates (detected before other failure reasons)
             if stats.get("duplicates_removed", 0) > 0:
                 failure_reason = "all_duplicates"
@@ -591,7 +688,7 @@ def import_csv():
                 _log_import_event()
                 suggestion = "All records in this file already exist in the database. This file may have been imported previously."
                 _record_import("failed", failure_reason, suggestion, stats,
-                               filename=file.filename, file_hash=file_hash, file_size=len(file_bytes))
+                               filename=file.filename, file_hash=file_hash, file_size=file_size)
                 return _build_response("failed", "All records already imported", failure_reason,
                                        suggestion, stats, http_status=400)
             else:
@@ -600,42 +697,10 @@ def import_csv():
                 _log_import_event()
                 suggestion = get_failure_suggestion(failure_reason, stats.get("columns_detected"))
                 _record_import("failed", failure_reason, suggestion, stats,
-                               filename=file.filename, file_hash=file_hash, file_size=len(file_bytes))
+                               filename=file.filename, file_hash=file_hash, file_size=file_size)
                 return _build_response("failed", "No valid records found in CSV", failure_reason,
                                        suggestion, stats, http_status=400)
 
-        # Insert records into database using batch operations for performance
-        inserted_count = 0
-
-        # Prepare batch insert data (much faster than individual db.add() calls)
-        telemetry_batch = []
-        for record in records:
-            telemetry_data = {
-                "session_id": record["session_id"],
-                "timestamp": record["timestamp"],
-                "latitude": record.get("latitude"),
-                "longitude": record.get("longitude"),
-                "speed_mph": record.get("speed_mph"),
-                "engine_rpm": record.get("engine_rpm"),
-                "throttle_position": record.get("throttle_position"),
-                "coolant_temp_f": record.get("coolant_temp_f"),
-                "intake_air_temp_f": record.get("intake_air_temp_f"),
-                "fuel_level_percent": record.get("fuel_level_percent"),
-                "fuel_remaining_gallons": record.get("fuel_remaining_gallons"),
-                "state_of_charge": record.get("state_of_charge"),
-                "battery_voltage": record.get("battery_voltage"),
-                "ambient_temp_f": record.get("ambient_temp_f"),
-                "odometer_miles": record.get("odometer_miles"),
-                "hv_battery_power_kw": record.get("hv_battery_power_kw"),
-                "raw_data": record.get("raw_data", {}),
-            }
-            telemetry_batch.append(telemetry_data)
-
-        # Bulk insert all records at once (10-50x faster than individual inserts)
-        if telemetry_batch:
-            db.bulk_insert_mappings(TelemetryRaw, telemetry_batch)
-            inserted_count = len(telemetry_batch)
-
         try:
             db.commit()
         except Exception as commit_error:
@@ -645,25 +710,15 @@ def import_csv():
             _log_import_event()
             logger.error(f"CSV import commit failed: {commit_error}", exc_info=True)
             _record_import("failed", "database_commit_error", "Database commit failed during bulk insert",
-                           filename=file.filename if file else None, file_hash=file_hash, file_size=len(file_bytes))
+                           filename=file.filename if file else None, file_hash=file_hash, file_size=file_size)
             return _build_response("failed", f"Database commit failed: {str(commit_error)}", "database_commit_error",
                                    http_status=500)
 
-        # Get timestamp range for the import
-        if records:
-            timestamps = [r["timestamp"] for r in records if r.get("timestamp")]
-            if timestamps:
-                stats["timestamp_range_start"] = min(timestamps)
-                stats["timestamp_range_end"] = max(timestamps)
-
         # Create a trip for the imported data
         trip_id = None
         session_id_str = None
-        if records:
-            session_id = records[0]["session_id"]
+        if inserted_count:
             session_id_str = str(session_id)
-            first_record = records[0]
-            last_record = records[-1]
 
             # Check for duplicate trip (same session_id already exists)
             existing_trip = db.query(Trip).filter(Trip.session_id == session_id).first()
@@ -681,7 +736,7 @@ def import_csv():
 
                 status = "partial" if stats.get("duplicates_removed", 0) > 0 else "success"
                 _record_import(status, None, None, stats, trip_id, session_id_str,
-                               file_hash, file.filename, len(file_bytes))
+                               file_hash, file.filename, file_size)
                 return _build_response(status,
                                        f"Imported {inserted_count} records (trip already exists)",
                                        stats=stats, trip_id=trip_id)
@@ -709,12 +764,12 @@ def import_csv():
 
             trip = Trip(
                 session_id=session_id,
-                start_time=time_range[0] if time_range else first_record["timestamp"],
-                end_time=time_range[1] if time_range else last_record["timestamp"],
+                start_time=time_range[0] if time_range else stats["timestamp_range_start"],
+                end_time=time_range[1] if time_range else stats["timestamp_range_end"],
                 start_odometer=odometer_range[0] if odometer_range else None,  # MIN (trip start)
                 end_odometer=odometer_range[1] if odometer_range else None,  # MAX (trip end)
                 start_soc=soc_range[1] if soc_range else None,  # MAX SOC (start of trip)
-                fuel_level_at_end=last_record.get("fuel_level_percent"),
+                fuel_level_at_end=last_fuel_level,
                 is_imported=True,  # Mark as imported for soft-delete protection
                 is_closed=False,  # Will be closed by finalize_trip
             )
@@ -734,7 +789,7 @@ def import_csv():
                 logger.error(f"Failed to create trip for import: {trip_commit_error}", exc_info=True)
                 _record_import("partial", "trip_creation_failed",
                                f"Telemetry imported but trip creation failed: {trip_commit_error}",
-                               stats, None, session_id_str, file_hash, file.filename, len(file_bytes))
+                               stats, None, session_id_str, file_hash, file.filename, file_size)
                 return _build_response("partial", f"Telemetry imported ({inserted_count} records) but trip creation failed",
                                        "trip_creation_failed", stats=stats, http_status=200)
 
@@ -767,7 +822,9 @@ def import_csv():
             status = "partial"
 
         _record_import(status, None, None, stats, trip_id, session_id_str,
-                       file_hash, file.filename, len(file_bytes))
+                       file_hash, file.filename, file_size)
+        if trip_id is not None:
+            schedule_cache_warm("csv_import")
         return _build_response(status, f"Successfully imported {inserted_count} records",
                                stats=stats, trip_id=trip_id)
 
@@ -881,6 +938,7 @@ def api_docs():
                     "per_page": "Items per page (default: 50, max: 100)",
                     "start_date": "Filter start date (YYYY-MM-DD)",
                     "end_date": "Filter end date (YYYY-MM-DD)",
+                    "fields": "Comma-separated trip fields to return (default: all)",
                 },
             },
             {
@@ -957,7 +1015,12 @@ def api_docs():
                 "query_params": {"format": "csv|json (default: csv)"},
             },
             {"path": "/export/fuel", "methods": ["GET"], "description": "Export fuel events as CSV"},
-            {"path": "/export/all", "methods": ["GET"], "description": "Export all data as JSON backup"},
+            {
+                "path": "/export/all",
+                "methods": ["GET"],
+                "description": "Export all data as JSON backup",
+                "query_params": {"fields": "Comma-separated trip fields to export (default: all)"},
+            },
             {
                 "path": "/import/csv",
                 "methods": ["POST"],
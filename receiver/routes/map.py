@@ -14,45 +14,115 @@ from sqlalchemy.orm import Session
 
 from database import get_db
 from models import Trip, TelemetryRaw
+from services.heatmap_service import get_heatmap_cells
+from utils.data_version import etag_by_data_version
 from utils.time_utils import parse_query_date_range, parse_date_shortcut
 from utils.route_clustering import find_similar_trips, calculate_route_bounds
+from utils.polyline import (
+    DEFAULT_MAP_ZOOM,
+    calculate_bounds,
+    decode_polyline,
+    encode_polyline,
+    simplify_indices,
+    tolerance_for_zoom,
+)
+from utils.spatial_grid import parse_bbox
 
 logger = logging.getLogger(__name__)
 
 map_bp = Blueprint("map", __name__)
 
 
-def subsample_gps_points(points: List[Dict[str, Any]], max_points: int = 100) -> List[Dict[str, Any]]:
+# Summary columns needed to render a trip on the map
+MAP_TRIP_COLUMNS = [
+    Trip.id,
+    Trip.session_id,
+    Trip.start_time,
+    Trip.end_time,
+    Trip.distance_miles,
+    Trip.kwh_per_mile,
+    Trip.gas_mpg,
+    Trip.electric_miles,
+    Trip.gas_miles,
+    Trip.ambient_temp_avg_f,
+    Trip.route_polyline,
+    Trip.route_bounds_north,
+    Trip.route_bounds_south,
+    Trip.route_bounds_east,
+    Trip.route_bounds_west,
+    Trip.gps_point_count,
+]
+
+# Very long tracks are thinned in SQL to at most this many points before
+# simplification, so one batched query stays bounded for any trip length
+MAP_PREFILTER_POINTS = 2000
+
+
+def load_gps_tracks(db: Session, session_ids: List[Any]) -> Dict[Any, Dict[str, Any]]:
     """
-    Subsample GPS points to reduce data size while preserving route shape.
-    Uses systematic sampling (every Nth point).
+    Load GPS tracks for many trips with a single query.
+
+    Numbers each session's GPS points with a window function, keeps every
+    Nth point of tracks longer than MAP_PREFILTER_POINTS (plus the last
+    point), and selects only the columns the map needs.
 
     Args:
-        points: List of GPS points with lat, lon, and optional metadata
-        max_points: Maximum number of points to return
+        db: Database session
+        session_ids: Trip session IDs to load
 
     Returns:
-        Subsampled list of GPS points
+        Dict of session_id -> {'points': [...], 'total': original GPS point count}
     """
-    if len(points) <= max_points:
-        return points
-
-    # Calculate step size
-    step = len(points) / max_points
-
-    # Always include first and last points
-    sampled = [points[0]]
+    if not session_ids:
+        return {}
+
+    numbered = (
+        db.query(
+            TelemetryRaw.session_id,
+            TelemetryRaw.latitude,
+            TelemetryRaw.longitude,
+            TelemetryRaw.speed_mph,
+            TelemetryRaw.hv_battery_power_kw,
+            TelemetryRaw.timestamp,
+            func.row_number().over(
+                partition_by=TelemetryRaw.session_id, order_by=TelemetryRaw.timestamp
+            ).label('rn'),
+            func.count().over(partition_by=TelemetryRaw.session_id).label('total'),
+        )
+        .filter(
+            TelemetryRaw.session_id.in_(session_ids),
+            TelemetryRaw.latitude.isnot(None),
+            TelemetryRaw.longitude.isnot(None)
+        )
+        .subquery()
+    )
+    step = (numbered.c.total + MAP_PREFILTER_POINTS - 1) // MAP_PREFILTER_POINTS
 
-    # Sample intermediate points
-    for i in range(1, max_points - 1):
-        index = int(i * step)
-        if index < len(points):
-            sampled.append(points[index])
+    rows = (
+        db.query(numbered)
+        .filter(or_((numbered.c.rn - 1) % step == 0, numbered.c.rn == numbered.c.total))
+        .order_by(numbered.c.session_id, numbered.c.rn)
+        .all()
+    )
 
-    # Always include last point
-    sampled.append(points[-1])
+    tracks: Dict[Any, Dict[str, Any]] = {}
+    for row in rows:
+        # Calculate instantaneous efficiency if data available
+        # Simplified: kWh/mile ≈ kW / mph
+        efficiency = None
+        if row.hv_battery_power_kw and row.speed_mph and row.speed_mph > 5 and row.hv_battery_power_kw > 0:
+            efficiency = row.hv_battery_power_kw / row.speed_mph
+
+        track = tracks.setdefault(row.session_id, {'points': [], 'total': row.total})
+        track['points'].append({
+            'lat': float(row.latitude),
+            'lon': float(row.longitude),
+            'speed': float(row.speed_mph) if row.speed_mph else 0,
+            'efficiency': round(efficiency, 3) if efficiency else None,
+            'timestamp': row.timestamp.isoformat() if row.timestamp else None
+        })
 
-    return sampled
+    return tracks
 
 
 def calculate_efficiency_color(kwh_per_mile: Optional[float], speed_mph: Optional[float]) -> str:
@@ -83,6 +153,7 @@ def calculate_efficiency_color(kwh_per_mile: Optional[float], speed_mph: Optiona
 
 
 @map_bp.route("/api/trips/map", methods=["GET"])
+@etag_by_data_version("trips")
 def get_trips_map_data():
     """
     Get aggregated GPS data for all trips to display on map.
@@ -99,11 +170,16 @@ def get_trips_map_data():
         gas_only: If true, only gas-mode trips
         ev_only: If true, only EV trips
         max_points_per_trip: Maximum GPS points per trip (default 100)
+        zoom: Map zoom level; routes are simplified with Ramer-Douglas-Peucker
+            to about one pixel at this zoom (default 12)
+        format: "points" (default) for per-point dicts, or "polyline" for
+            encoded polylines built from geometry stored at finalization
 
     Returns:
         JSON with trips list containing:
         - trip_id, start_time, distance, efficiency metrics
-        - points: List of [lat, lon, efficiency, speed] for route
+        - points: List of {lat, lon, speed, efficiency, timestamp} (format=points)
+        - polyline: Google encoded polyline of the route (format=polyline)
         - bounds: {north, south, east, west} for quick filtering
     """
     db = get_db()
@@ -174,61 +250,61 @@ def get_trips_map_data():
     if max_points_per_trip > 500:
         max_points_per_trip = 500
 
-    # Get trips ordered by start time (most recent first)
-    trips = query.order_by(Trip.start_time.desc()).limit(max_trips).all()
+    zoom = request.args.get("zoom", default=DEFAULT_MAP_ZOOM, type=float)
+    tolerance = tolerance_for_zoom(zoom)
+    response_format = request.args.get("format", "points").lower()
+    if response_format not in ("points", "polyline"):
+        return jsonify({'error': "format must be 'points' or 'polyline'"}), 400
+
+    # Get trips ordered by start time (most recent first), summary columns only
+    trips = query.with_entities(*MAP_TRIP_COLUMNS).order_by(Trip.start_time.desc()).limit(max_trips).all()
+
+    # Trips simplified at finalization skip telemetry entirely in polyline mode;
+    # everything else is loaded in one batched query
+    if response_format == "polyline":
+        pending = [trip.session_id for trip in trips if not trip.route_polyline]
+    else:
+        pending = [trip.session_id for trip in trips]
+    tracks = load_gps_tracks(db, pending)
 
     # Build response
     trips_data = []
 
     for trip in trips:
-        # Get GPS points for this trip
-        telemetry = db.query(TelemetryRaw).filter(
-            TelemetryRaw.session_id == trip.session_id,
-            TelemetryRaw.latitude.isnot(None),
-            TelemetryRaw.longitude.isnot(None)
-        ).order_by(TelemetryRaw.timestamp).all()
-
-        if not telemetry or len(telemetry) < 2:
+        track = tracks.get(trip.session_id)
+        if track is not None:
+            coords = [(p['lat'], p['lon']) for p in track['points']]
+            point_count = track['total']
+        elif trip.route_polyline:
+            coords = decode_polyline(trip.route_polyline)
+            point_count = trip.gps_point_count or len(coords)
+        else:
+            continue
+
+        if len(coords) < 2:
             continue  # Skip trips without GPS data
 
-        # Build points list with efficiency/speed data
-        points = []
-        for t in telemetry:
-            # Calculate instantaneous efficiency if data available
-            efficiency = None
-            if t.hv_battery_power_kw and t.speed_mph and t.speed_mph > 5:
-                # kW to kWh (power * time), distance = speed * time
-                # Simplified: kWh/mile ≈ kW / mph
-                efficiency = abs(t.hv_battery_power_kw) / t.speed_mph if t.hv_battery_power_kw > 0 else None
-
-            points.append({
-                'lat': float(t.latitude),
-                'lon': float(t.longitude),
-                'speed': float(t.speed_mph) if t.speed_mph else 0,
-                'efficiency': round(efficiency, 3) if efficiency else None,
-                'timestamp': t.timestamp.isoformat() if t.timestamp else None
-            })
+        # Simplify to the requested zoom, bounded by max_points_per_trip
+        keep = simplify_indices(coords, tolerance, max_points_per_trip)
+        simplified = [coords[i] for i in keep]
 
-        # Subsample points to reduce data size
-        points = subsample_gps_points(points, max_points_per_trip)
-
-        # Calculate route bounds
-        lats = [p['lat'] for p in points]
-        lons = [p['lon'] for p in points]
-        bounds = {
-            'north': max(lats),
-            'south': min(lats),
-            'east': max(lons),
-            'west': min(lons),
-            'center': {
-                'lat': sum(lats) / len(lats),
-                'lon': sum(lons) / len(lons)
+        if track is None and trip.route_bounds_north is not None:
+            bounds = {
+                'north': trip.route_bounds_north,
+                'south': trip.route_bounds_south,
+                'east': trip.route_bounds_east,
+                'west': trip.route_bounds_west
             }
+        else:
+            bounds = calculate_bounds(coords)
+        bounds['center'] = {
+            'lat': (bounds['north'] + bounds['south']) / 2,
+            'lon': (bounds['east'] + bounds['west']) / 2
         }
 
-        trips_data.append({
+        trip_data = {
             'id': trip.id,
-            'session_id': trip.session_id,
+            'session_id': str(trip.session_id),
             'start_time': trip.start_time.isoformat(),
             'end_time': trip.end_time.isoformat() if trip.end_time else None,
             'distance_miles': round(trip.distance_miles, 2) if trip.distance_miles else 0,
@@ -237,14 +313,21 @@ def get_trips_map_data():
             'electric_miles': round(trip.electric_miles, 2) if trip.electric_miles else 0,
             'gas_miles': round(trip.gas_miles, 2) if trip.gas_miles else 0,
             'avg_temp_f': round(trip.ambient_temp_avg_f, 1) if trip.ambient_temp_avg_f else None,
-            'points': points,
             'bounds': bounds,
-            'point_count': len(telemetry)  # Original point count before subsampling
-        })
+            'point_count': point_count  # Original point count before simplification
+        }
+        if response_format == "polyline":
+            trip_data['polyline'] = encode_polyline(simplified)
+        else:
+            trip_data['points'] = [track['points'][i] for i in keep]
+
+        trips_data.append(trip_data)
 
     return jsonify({
         'trips': trips_data,
         'total_trips': len(trips_data),
+        'format': response_format,
+        'zoom': zoom,
         'filters_applied': {
             'date_range': date_range_shortcut or 'custom',
             'min_efficiency': min_efficiency,
@@ -258,6 +341,44 @@ def get_trips_map_data():
     })
 
 
+@map_bp.route("/api/map/heatmap", methods=["GET"])
+@etag_by_data_version("trips", bucket_seconds=None)
+def get_map_heatmap():
+    """
+    Get aggregated heatmap cells for a map viewport.
+
+    Served from the map_grid_cells grid maintained at trip finalization,
+    so the cost depends on the cells in view rather than on telemetry volume.
+
+    Query params:
+        bbox: Viewport as "west,south,east,north" in degrees (default: everywhere)
+        zoom: Map zoom level, selects the grid level (default 12)
+        min_samples: Skip cells with fewer samples (default 1)
+
+    Returns:
+        JSON with grid_level, cell_size_degrees and cells list containing:
+        - id, lat, lon (cell center)
+        - samples, avg_speed_mph, kwh_per_mile, color
+    """
+    try:
+        bbox = parse_bbox(request.args.get("bbox"))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    zoom = request.args.get("zoom", default=DEFAULT_MAP_ZOOM, type=float)
+    min_samples = max(request.args.get("min_samples", default=1, type=int), 1)
+
+    db = get_db()
+    result = get_heatmap_cells(db, zoom, bbox=bbox, min_samples=min_samples)
+
+    for cell in result['cells']:
+        cell['color'] = calculate_efficiency_color(cell['kwh_per_mile'], cell['avg_speed_mph'])
+
+    result['zoom'] = zoom
+    result['total_cells'] = len(result['cells'])
+    return jsonify(result)
+
+
 @map_bp.route("/api/trips/<trip_id>/route", methods=["GET"])
 def get_trip_route_detailed(trip_id: str):
     """
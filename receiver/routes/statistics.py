@@ -9,14 +9,17 @@ Provides enhanced statistics with:
 """
 
 import logging
-import statistics as stats_module
+import math
 from datetime import timedelta
+
+import numpy as np
 from flask import Blueprint, jsonify, request
 from database import get_db
 from models import Trip, TelemetryRaw, ChargingSession
-from sqlalchemy import func, and_
+from sqlalchemy import and_, case, func, or_
 from utils.time_utils import utc_now, parse_date_shortcut, days_ago
-from utils.cache_utils import cache_result
+from utils.cache_utils import cache_result, generate_cache_key
+from utils.data_version import etag_by_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -34,12 +37,34 @@ def calculate_confidence_interval(values, confidence=0.95):
     Returns:
         Dict with mean, ci_lower, ci_upper, margin, sample_size
     """
-    if not values or len(values) < 2:
+    if not values:
+        return None
+    return confidence_interval_from_sums(
+        len(values), math.fsum(values), math.fsum(v * v for v in values), confidence
+    )
+
+
+def confidence_interval_from_sums(n, total, sum_sq, confidence=0.95):
+    """
+    Calculate a confidence interval from sufficient statistics.
+
+    Args:
+        n: Number of values
+        total: Sum of the values
+        sum_sq: Sum of the squared values
+        confidence: Confidence level (default 0.95 for 95% CI)
+
+    Returns:
+        Dict with mean, ci_lower, ci_upper, margin, sample_size, std_dev
+        (None for fewer than two values)
+    """
+    if not n or n < 2:
         return None
 
-    mean = stats_module.mean(values)
-    stdev = stats_module.stdev(values)
-    n = len(values)
+    mean = total / n
+    # Sample variance; clamp rounding noise for (near-)identical values
+    variance = max((sum_sq - total * total / n) / (n - 1), 0.0)
+    stdev = math.sqrt(variance)
 
     # Use t-distribution for small samples, z for large
     if n < 30:
@@ -101,7 +126,7 @@ def calculate_trend_vs_previous(current_value, previous_value):
 
 
 @statistics_bp.route("/stats/quick/<timeframe>", methods=["GET"])
-@cache_result("stats:quick", ttl=300, tags=["statistics", "trips"])
+@etag_by_data_version("trips")
 def get_quick_stats(timeframe):
     """
     Get quick statistics for common timeframes.
@@ -133,22 +158,51 @@ def get_quick_stats(timeframe):
     if not date_range:
         return jsonify({"error": f"Invalid timeframe: {timeframe}"}), 400
 
-    start_date, end_date = date_range
     include_trend = request.args.get("include_trend", "true").lower() == "true"
     units = request.args.get("units", "imperial").lower()
 
-    # Get current period trips
-    current_trips = db.query(Trip).filter(
-        and_(
-            Trip.is_closed.is_(True),
-            Trip.deleted_at.is_(None),
-            Trip.start_time >= start_date,
-            Trip.start_time <= end_date
-        )
-    ).all()
+    result = compute_quick_stats(db, timeframe, date_range, include_trend, units)
+    return jsonify(result), 200
+
+
+# Invalidated on every trip/charging/fuel commit (see utils.invalidation_bus);
+# the TTL only bounds how far the rolling date windows can drift.
+@cache_result(
+    "stats:quick",
+    ttl=3600,
+    tags=["statistics", "trips"],
+    key_func=lambda db, timeframe, date_range, include_trend, units: generate_cache_key(
+        "stats:quick", timeframe, include_trend=include_trend, units=units
+    ),
+)
+def compute_quick_stats(db, timeframe, date_range, include_trend, units):
+    """
+    Compute the quick statistics payload (cached per timeframe, trend flag and units).
+
+    Args:
+        db: Database session
+        timeframe: Timeframe name from the URL
+        date_range: (start_date, end_date) for the timeframe
+        include_trend: Compare with the previous period
+        units: "imperial" or "metric"
+
+    Returns:
+        Dict with statistics and optional trend indicators
+    """
+    start_date, end_date = date_range
+
+    periods = {"current": and_(Trip.start_time >= start_date, Trip.start_time <= end_date)}
+
+    # Previous period: same duration, shifted back
+    period_duration = end_date - start_date
+    prev_start = start_date - period_duration
+    prev_end = start_date
+    if include_trend:
+        periods["previous"] = and_(Trip.start_time >= prev_start, Trip.start_time < prev_end)
 
-    # Calculate current stats
-    current_stats = calculate_period_stats(current_trips, units)
+    # Both periods come from one query
+    aggregates = query_period_aggregates(db, periods)
+    current_stats = period_stats_from_aggregates(aggregates["current"], units)
 
     result = {
         "timeframe": timeframe,
@@ -160,21 +214,7 @@ def get_quick_stats(timeframe):
 
     # Add trend comparison if requested
     if include_trend:
-        # Calculate previous period (same duration, shifted back)
-        period_duration = end_date - start_date
-        prev_start = start_date - period_duration
-        prev_end = start_date
-
-        previous_trips = db.query(Trip).filter(
-            and_(
-                Trip.is_closed.is_(True),
-                Trip.deleted_at.is_(None),
-                Trip.start_time >= prev_start,
-                Trip.start_time < prev_end
-            )
-        ).all()
-
-        prev_stats = calculate_period_stats(previous_trips, units)
+        prev_stats = period_stats_from_aggregates(aggregates["previous"], units)
 
         # Calculate trends
         trends = calculate_trends(current_stats, prev_stats)
@@ -185,10 +225,11 @@ def get_quick_stats(timeframe):
             "stats": prev_stats
         }
 
-    return jsonify(result), 200
+    return result
 
 
 @statistics_bp.route("/stats/detailed", methods=["GET"])
+@etag_by_data_version("trips")
 def get_detailed_stats():
     """
     Get detailed statistics with confidence intervals.
@@ -220,17 +261,11 @@ def get_detailed_stats():
     include_ci = request.args.get("include_ci", "true").lower() == "true"
     units = request.args.get("units", "imperial").lower()
 
-    # Get trips
-    trips = db.query(Trip).filter(
-        and_(
-            Trip.is_closed.is_(True),
-            Trip.deleted_at.is_(None),
-            Trip.start_time >= start_date,
-            Trip.start_time <= end_date
-        )
-    ).all()
+    # Sums, sufficient statistics and medians in one query
+    in_range = and_(Trip.start_time >= start_date, Trip.start_time <= end_date)
+    aggregates = query_period_aggregates(db, {"current": in_range}, include_median=True)["current"]
 
-    if not trips:
+    if not aggregates["trip_count"]:
         return jsonify({
             "message": "No trips found in date range",
             "trip_count": 0
@@ -242,70 +277,213 @@ def get_detailed_stats():
             "start": start_date.isoformat(),
             "end": end_date.isoformat()
         },
-        "trip_count": len(trips),
+        "trip_count": aggregates["trip_count"],
         "units": units
     }
 
     # MPG analysis
-    if metric in ["mpg", "all"]:
-        gas_trips = [t for t in trips if t.gas_mode_entered and t.gas_mpg]
-        if gas_trips:
-            mpg_values = [t.gas_mpg for t in gas_trips]
-            mpg_ci = calculate_confidence_interval(mpg_values) if include_ci else None
-
-            result["mpg_analysis"] = {
-                "trip_count": len(gas_trips),
-                "mean": round(stats_module.mean(mpg_values), 2),
-                "median": round(stats_module.median(mpg_values), 2),
-                "min": round(min(mpg_values), 2),
-                "max": round(max(mpg_values), 2),
-                "confidence_interval": mpg_ci
-            }
+    mpg = aggregates["mpg"]
+    if metric in ["mpg", "all"] and mpg["n"]:
+        result["mpg_analysis"] = {
+            "trip_count": mpg["n"],
+            "mean": round(mpg["total"] / mpg["n"], 2),
+            "median": round(mpg["median"], 2),
+            "min": round(mpg["min"], 2),
+            "max": round(mpg["max"], 2),
+            "confidence_interval": _metric_confidence_interval(mpg) if include_ci else None
+        }
 
     # kWh/mile analysis
-    if metric in ["kwh_per_mile", "all"]:
-        ev_trips = [t for t in trips if t.kwh_per_mile and t.kwh_per_mile > 0]
-        if ev_trips:
-            kwh_values = [t.kwh_per_mile for t in ev_trips]
-            kwh_ci = calculate_confidence_interval(kwh_values) if include_ci else None
-
-            result["kwh_per_mile_analysis"] = {
-                "trip_count": len(ev_trips),
-                "mean": round(stats_module.mean(kwh_values), 3),
-                "median": round(stats_module.median(kwh_values), 3),
-                "min": round(min(kwh_values), 3),
-                "max": round(max(kwh_values), 3),
-                "confidence_interval": kwh_ci
-            }
-
-    # Distance analysis
-    if metric in ["distance", "all"]:
-        distance_values = [t.distance_miles for t in trips if t.distance_miles]
-        if distance_values:
-            distance_ci = calculate_confidence_interval(distance_values) if include_ci else None
-
-            # Convert to metric if needed
-            if units == "metric":
-                distance_values = [d * 1.60934 for d in distance_values]
-                unit_label = "km"
-            else:
-                unit_label = "miles"
-
-            result["distance_analysis"] = {
-                "trip_count": len(distance_values),
-                "total": round(sum(distance_values), 2),
-                "mean": round(stats_module.mean(distance_values), 2),
-                "median": round(stats_module.median(distance_values), 2),
-                "confidence_interval": distance_ci,
-                "unit": unit_label
-            }
+    kwh = aggregates["kwh_per_mile"]
+    if metric in ["kwh_per_mile", "all"] and kwh["n"]:
+        result["kwh_per_mile_analysis"] = {
+            "trip_count": kwh["n"],
+            "mean": round(kwh["total"] / kwh["n"], 3),
+            "median": round(kwh["median"], 3),
+            "min": round(kwh["min"], 3),
+            "max": round(kwh["max"], 3),
+            "confidence_interval": _metric_confidence_interval(kwh) if include_ci else None
+        }
+
+    # Distance analysis (confidence interval stays in miles)
+    distance = aggregates["distance"]
+    if metric in ["distance", "all"] and distance["n"]:
+        if units == "metric":
+            factor, unit_label = 1.60934, "km"
+        else:
+            factor, unit_label = 1.0, "miles"
+
+        result["distance_analysis"] = {
+            "trip_count": distance["n"],
+            "total": round(distance["total"] * factor, 2),
+            "mean": round(distance["total"] / distance["n"] * factor, 2),
+            "median": round(distance["median"] * factor, 2),
+            "confidence_interval": _metric_confidence_interval(distance) if include_ci else None,
+            "unit": unit_label
+        }
 
     return jsonify(result), 200
 
 
+def _metric_confidence_interval(metric):
+    """Confidence interval for one metric's aggregates."""
+    return confidence_interval_from_sums(metric["n"], metric["total"], metric["sum_sq"])
+
+
+# Per-trip metrics summarized for each period (see _metric_conditions)
+METRICS = ("mpg", "kwh_per_mile", "distance")
+
+
+def _metric_conditions():
+    """SQL conditions and value columns for each metric."""
+    return {
+        "mpg": (and_(Trip.gas_mode_entered.is_(True), Trip.gas_mpg.isnot(None), Trip.gas_mpg != 0), Trip.gas_mpg),
+        "kwh_per_mile": (Trip.kwh_per_mile > 0, Trip.kwh_per_mile),
+        "distance": (and_(Trip.distance_miles.isnot(None), Trip.distance_miles != 0), Trip.distance_miles),
+    }
+
+
+def _trip_metric_value(trip, metric):
+    """Python equivalent of _metric_conditions for an in-memory trip."""
+    if metric == "mpg":
+        return trip.gas_mpg if trip.gas_mode_entered and trip.gas_mpg else None
+    if metric == "kwh_per_mile":
+        return trip.kwh_per_mile if trip.kwh_per_mile and trip.kwh_per_mile > 0 else None
+    return trip.distance_miles or None
+
+
+def _empty_aggregates():
+    """Aggregates for a period without trips."""
+    return {
+        "trip_count": 0,
+        "total_distance": 0.0,
+        "electric_miles": 0.0,
+        "gas_miles": 0.0,
+        **{metric: {"n": 0, "total": 0.0, "sum_sq": 0.0, "min": None, "max": None, "median": None}
+           for metric in METRICS},
+    }
+
+
+def query_period_aggregates(db, periods, include_median=False):
+    """
+    Aggregate closed trips for several periods in one query.
+
+    Each period is folded in with conditional aggregation (SUM/COUNT over
+    CASE expressions), so the table is scanned once however many periods
+    are requested. Metrics carry count, sum and sum of squares, enough for
+    means and variances. Medians use percentile_cont on PostgreSQL; other
+    databases fetch the metric columns once into a NumPy matrix and take
+    each column's median.
+
+    Args:
+        db: Database session
+        periods: Dict of period name to a SQL condition on Trip
+        include_median: Also compute each metric's median
+
+    Returns:
+        Dict of period name to aggregates: trip_count, total_distance,
+        electric_miles, gas_miles and, per metric in METRICS, a dict with
+        n, total, sum_sq, min, max and median
+    """
+    use_percentile = include_median and db.get_bind().dialect.name == "postgresql"
+    conditions = _metric_conditions()
+
+    columns, values = [], []
+    for name, in_period in periods.items():
+        columns += [
+            func.count(case((in_period, Trip.id))).label(f"{name}__trip_count"),
+            func.sum(case((in_period, Trip.distance_miles))).label(f"{name}__total_distance"),
+            func.sum(case((in_period, Trip.electric_miles))).label(f"{name}__electric_miles"),
+            func.sum(case((in_period, Trip.gas_miles))).label(f"{name}__gas_miles"),
+        ]
+        for metric in METRICS:
+            condition, column = conditions[metric]
+            value = case((and_(in_period, condition), column))
+            prefix = f"{name}__{metric}"
+            columns += [
+                func.count(value).label(f"{prefix}__n"),
+                func.sum(value).label(f"{prefix}__total"),
+                func.sum(value * value).label(f"{prefix}__sum_sq"),
+                func.min(value).label(f"{prefix}__min"),
+                func.max(value).label(f"{prefix}__max"),
+            ]
+            if use_percentile:
+                columns.append(func.percentile_cont(0.5).within_group(value).label(f"{prefix}__median"))
+            values.append((name, metric, value))
+
+    closed = and_(Trip.is_closed.is_(True), Trip.deleted_at.is_(None))
+    any_period = or_(*periods.values())
+    row = db.query(*columns).filter(closed, any_period).one()._mapping
+
+    aggregates = {}
+    for name in periods:
+        period = _empty_aggregates()
+        period["trip_count"] = row[f"{name}__trip_count"]
+        for key in ("total_distance", "electric_miles", "gas_miles"):
+            period[key] = float(row[f"{name}__{key}"] or 0)
+        for metric in METRICS:
+            prefix = f"{name}__{metric}"
+            period[metric].update(
+                n=row[f"{prefix}__n"],
+                total=float(row[f"{prefix}__total"] or 0),
+                sum_sq=float(row[f"{prefix}__sum_sq"] or 0),
+                min=row[f"{prefix}__min"],
+                max=row[f"{prefix}__max"],
+            )
+            if use_percentile and row[f"{prefix}__median"] is not None:
+                period[metric]["median"] = float(row[f"{prefix}__median"])
+        aggregates[name] = period
+
+    if include_median and not use_percentile:
+        # One pass over the metric columns: trips x (period, metric) matrix, NULL as NaN
+        value_rows = db.query(*[value for _, _, value in values]).filter(closed, any_period).all()
+        matrix = np.array(value_rows, dtype=float).reshape(len(value_rows), len(values))
+        present = ~np.isnan(matrix)
+        for column, (name, metric, _) in enumerate(values):
+            if present[:, column].any():
+                aggregates[name][metric]["median"] = float(np.median(matrix[present[:, column], column]))
+
+    return aggregates
+
+
+def aggregate_trips(trips):
+    """
+    Aggregate an in-memory list of trips the way query_period_aggregates does.
+
+    Args:
+        trips: List of Trip objects
+
+    Returns:
+        Aggregates dict (see query_period_aggregates), medians included
+    """
+    aggregates = _empty_aggregates()
+    aggregates["trip_count"] = len(trips)
+    aggregates["total_distance"] = sum(t.distance_miles or 0 for t in trips)
+    aggregates["electric_miles"] = sum(t.electric_miles or 0 for t in trips)
+    aggregates["gas_miles"] = sum(t.gas_miles or 0 for t in trips)
+
+    for metric in METRICS:
+        metric_values = [v for v in (_trip_metric_value(t, metric) for t in trips) if v is not None]
+        if metric_values:
+            aggregates[metric].update(
+                n=len(metric_values),
+                total=math.fsum(metric_values),
+                sum_sq=math.fsum(v * v for v in metric_values),
+                min=min(metric_values),
+                max=max(metric_values),
+                median=float(np.median(metric_values)),
+            )
+    return aggregates
+
+
 def calculate_period_stats(trips, units="imperial"):
-    """Calculate aggregate statistics for a period."""
-    if not trips:
+    """Calculate aggregate statistics for a list of trips."""
+    return period_stats_from_aggregates(aggregate_trips(trips), units)
+
+
+def period_stats_from_aggregates(aggregates, units="imperial"):
+    """Build period statistics from query_period_aggregates output."""
+    if not aggregates["trip_count"]:
         return {
             "trip_count": 0,
             "total_distance": 0,
@@ -316,17 +494,17 @@ def calculate_period_stats(trips, units="imperial"):
             "ev_percent": 0
         }
 
-    total_distance = sum(t.distance_miles or 0 for t in trips)
-    electric_miles = sum(t.electric_miles or 0 for t in trips)
-    gas_miles = sum(t.gas_miles or 0 for t in trips)
+    total_distance = aggregates["total_distance"]
+    electric_miles = aggregates["electric_miles"]
+    gas_miles = aggregates["gas_miles"]
 
     # MPG (gas trips only)
-    gas_trips = [t for t in trips if t.gas_mode_entered and t.gas_mpg]
-    avg_mpg = round(stats_module.mean([t.gas_mpg for t in gas_trips]), 2) if gas_trips else None
+    mpg = aggregates["mpg"]
+    avg_mpg = round(mpg["total"] / mpg["n"], 2) if mpg["n"] else None
 
     # kWh/mile (EV trips only)
-    ev_trips = [t for t in trips if t.kwh_per_mile and t.kwh_per_mile > 0]
-    avg_kwh = round(stats_module.mean([t.kwh_per_mile for t in ev_trips]), 3) if ev_trips else None
+    kwh = aggregates["kwh_per_mile"]
+    avg_kwh = round(kwh["total"] / kwh["n"], 3) if kwh["n"] else None
 
     # EV percentage
     ev_percent = round((electric_miles / total_distance * 100), 1) if total_distance > 0 else 0
@@ -341,7 +519,7 @@ def calculate_period_stats(trips, units="imperial"):
         distance_unit = "miles"
 
     return {
-        "trip_count": len(trips),
+        "trip_count": aggregates["trip_count"],
         "total_distance": round(total_distance, 2),
         "distance_unit": distance_unit,
         "avg_mpg": avg_mpg,
@@ -349,8 +527,8 @@ def calculate_period_stats(trips, units="imperial"):
         "electric_miles": round(electric_miles, 2),
         "gas_miles": round(gas_miles, 2),
         "ev_percent": ev_percent,
-        "gas_trip_count": len(gas_trips),
-        "ev_trip_count": len(ev_trips)
+        "gas_trip_count": mpg["n"],
+        "ev_trip_count": kwh["n"]
     }
 
 
@@ -10,16 +10,27 @@ from datetime import timedelta
 
 from config import Config
 from database import get_db
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from models import FuelEvent, SocTransition, TelemetryRaw, Trip
+from services.heatmap_service import remove_trip_from_heatmap, restore_trip_to_heatmap
+from services.route_service import remove_trips_from_routes, restore_trip_to_route
 from sqlalchemy import desc, func
 from utils import analyze_soc_floor
+from utils.columnar import COLUMNAR_MIMETYPE, column_dtype, iter_columnar
+from utils.data_version import etag_by_data_version
+from utils.downsampling import downsample, parse_max_points
+from utils.query_utils import parse_fields_param, project_columns, serialize_row
+from utils.route_clustering import find_trip_ids_near
 from utils.time_utils import utc_now, parse_query_date_range, parse_date_shortcut
 
 logger = logging.getLogger(__name__)
 
 trips_bp = Blueprint("trips", __name__)
 
+# Proximity search radius for near_lat/near_lon (miles)
+DEFAULT_NEAR_RADIUS_MILES = 5
+MAX_NEAR_RADIUS_MILES = 50
+
 
 @trips_bp.route("/trips", methods=["GET"])
 def get_trips():
@@ -64,9 +75,18 @@ def get_trips():
         # Sorting
         sort_by: Field to sort by (start_time, distance_miles, kwh_per_mile, mpg)
         sort_order: asc or desc (default desc)
+
+        # Sparse fieldsets
+        fields: Comma-separated trip fields to return (e.g. id,start_time,distance_miles).
+                Only these columns are selected from the database.
     """
     db = get_db()
 
+    try:
+        fields = parse_fields_param(request.args.get("fields"), Trip)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     # Filter for closed trips that aren't soft-deleted
     query = db.query(Trip).filter(Trip.is_closed.is_(True), Trip.deleted_at.is_(None))
 
@@ -178,6 +198,32 @@ def get_trips():
             logger.warning(f"Invalid max_elevation parameter: {max_elevation}")
             return jsonify({"error": f"Invalid max_elevation value: {max_elevation}. Must be a number."}), 400
 
+    # Location filter: trips starting or ending within radius_miles of near_lat/near_lon
+    near_lat = request.args.get("near_lat")
+    near_lon = request.args.get("near_lon")
+    if near_lat or near_lon:
+        if not (near_lat and near_lon):
+            return jsonify({"error": "near_lat and near_lon must be provided together"}), 400
+        try:
+            lat, lon = float(near_lat), float(near_lon)
+        except (ValueError, TypeError):
+            logger.warning(f"Invalid near_lat/near_lon parameters: {near_lat}, {near_lon}")
+            error = f"Invalid near_lat/near_lon values: {near_lat}, {near_lon}. Must be numbers."
+            return jsonify({"error": error}), 400
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return jsonify({"error": "near_lat must be within -90..90 and near_lon within -180..180"}), 400
+
+        radius_param = request.args.get("radius_miles", DEFAULT_NEAR_RADIUS_MILES)
+        try:
+            radius_miles = float(radius_param)
+        except (ValueError, TypeError):
+            return jsonify({"error": f"Invalid radius_miles value: {radius_param}. Must be a number."}), 400
+        if radius_miles <= 0:
+            return jsonify({"error": "radius_miles must be greater than 0"}), 400
+        radius_miles = min(radius_miles, MAX_NEAR_RADIUS_MILES)
+
+        query = query.filter(Trip.id.in_(find_trip_ids_near(query, lat, lon, radius_miles)))
+
     # Filter out trips with 0 or very small distance (likely GPS errors or no movement)
     # Unless explicitly requested with include_zero=true
     include_zero = request.args.get("include_zero", "").lower() == "true"
@@ -224,12 +270,17 @@ def get_trips():
 
     # Apply pagination
     offset = (page - 1) * per_page
-    trips = query.offset(offset).limit(per_page).all()
+    if fields:
+        # Column-only SELECT: skips ORM hydration and unused columns entirely
+        rows = query.with_entities(*project_columns(Trip, fields)).offset(offset).limit(per_page).all()
+        trip_dicts = [serialize_row(row, fields) for row in rows]
+    else:
+        trip_dicts = [t.to_dict() for t in query.offset(offset).limit(per_page).all()]
 
     # Return consistent paginated response with metadata
     return jsonify(
         {
-            "trips": [t.to_dict() for t in trips],
+            "trips": trip_dicts,
             "pagination": {
                 "page": page,
                 "per_page": per_page,
@@ -240,6 +291,57 @@ def get_trips():
     )
 
 
+# Series whose peaks LTTB preserves when downsampling trip telemetry
+DOWNSAMPLE_SERIES = [
+    TelemetryRaw.speed_mph,
+    TelemetryRaw.state_of_charge,
+    TelemetryRaw.hv_battery_power_kw,
+    TelemetryRaw.engine_rpm,
+]
+
+
+def _lttb_telemetry_ids(db, session_id, max_points):
+    """Pick a trip's telemetry ids with LTTB over the whole trip.
+
+    Only the id, timestamp and DOWNSAMPLE_SERIES columns are scanned, so
+    callers load full rows for the selected ids only.
+
+    Returns:
+        Tuple of (selected ids in timestamp order, total point count)
+    """
+    scan = (
+        db.query(TelemetryRaw.id, TelemetryRaw.timestamp, *DOWNSAMPLE_SERIES)
+        .filter(TelemetryRaw.session_id == session_id)
+        .order_by(TelemetryRaw.timestamp)
+        .all()
+    )
+    series = [lambda row, i=i: row[i] for i in range(2, 2 + len(DOWNSAMPLE_SERIES))]
+    selected = downsample(scan, max_points, lambda row: row.timestamp, series)
+    return [row.id for row in selected], len(scan)
+
+
+def _downsampled_telemetry(db, session_id, max_points, telemetry_fields=None):
+    """Build the telemetry part of a trip detail response downsampled with LTTB."""
+    selected_ids, total = _lttb_telemetry_ids(db, session_id, max_points)
+
+    telemetry_query = db.query(TelemetryRaw).filter(TelemetryRaw.id.in_(selected_ids)).order_by(TelemetryRaw.timestamp)
+    if telemetry_fields:
+        rows = telemetry_query.with_entities(*project_columns(TelemetryRaw, telemetry_fields)).all()
+        telemetry = [serialize_row(row, telemetry_fields) for row in rows]
+    else:
+        telemetry = [t.to_dict() for t in telemetry_query.all()]
+
+    return {
+        "telemetry": telemetry,
+        "telemetry_downsampling": {
+            "method": "lttb",
+            "max_points": max_points,
+            "total": total,
+            "returned": len(telemetry),
+        },
+    }
+
+
 @trips_bp.route("/trips/<int:trip_id>", methods=["GET"])
 def get_trip_detail(trip_id):
     """Get detailed trip data including telemetry points.
@@ -247,12 +349,37 @@ def get_trip_detail(trip_id):
     Query params:
         limit: Max telemetry points to return (configurable via API_TELEMETRY_LIMIT_DEFAULT/MAX)
         offset: Skip first N telemetry points (default 0)
+        fields: Comma-separated trip fields to return (default: all)
+        telemetry_fields: Comma-separated telemetry fields to return (default: all)
+        max_points: Downsample the whole trip to at most N telemetry points with
+            LTTB instead of paginating (limit/offset are ignored)
     """
     db = get_db()
 
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
-    if not trip:
+    try:
+        fields = parse_fields_param(request.args.get("fields"), Trip)
+        telemetry_fields = parse_fields_param(request.args.get("telemetry_fields"), TelemetryRaw)
+        max_points = parse_max_points(request.args.get("max_points"), Config.API_TELEMETRY_LIMIT_MAX)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # session_id is always needed to look up the trip's telemetry
+    trip_row = (
+        db.query(*project_columns(Trip, fields), Trip.session_id).filter(Trip.id == trip_id).first()
+        if fields
+        else db.query(Trip).filter(Trip.id == trip_id).first()
+    )
+    if not trip_row:
         return jsonify({"error": "Trip not found"}), 404
+    session_id = trip_row.session_id
+
+    if max_points:
+        return jsonify(
+            {
+                "trip": serialize_row(trip_row, fields) if fields else trip_row.to_dict(),
+                **_downsampled_telemetry(db, session_id, max_points, telemetry_fields),
+            }
+        )
 
     # Pagination for telemetry to avoid huge responses
     try:
@@ -266,22 +393,26 @@ def get_trip_detail(trip_id):
         offset = 0
 
     # Get total count for pagination info
-    total_count = db.query(TelemetryRaw).filter(TelemetryRaw.session_id == trip.session_id).count()
+    total_count = db.query(TelemetryRaw).filter(TelemetryRaw.session_id == session_id).count()
 
     # Get paginated telemetry for this trip
-    telemetry = (
+    telemetry_query = (
         db.query(TelemetryRaw)
-        .filter(TelemetryRaw.session_id == trip.session_id)
+        .filter(TelemetryRaw.session_id == session_id)
         .order_by(TelemetryRaw.timestamp)
         .offset(offset)
         .limit(limit)
-        .all()
     )
+    if telemetry_fields:
+        rows = telemetry_query.with_entities(*project_columns(TelemetryRaw, telemetry_fields)).all()
+        telemetry = [serialize_row(row, telemetry_fields) for row in rows]
+    else:
+        telemetry = [t.to_dict() for t in telemetry_query.all()]
 
     return jsonify(
         {
-            "trip": trip.to_dict(),
-            "telemetry": [t.to_dict() for t in telemetry],
+            "trip": serialize_row(trip_row, fields) if fields else trip_row.to_dict(),
+            "telemetry": telemetry,
             "telemetry_pagination": {
                 "offset": offset,
                 "limit": limit,
@@ -292,6 +423,76 @@ def get_trip_detail(trip_id):
     )
 
 
+# Default series for trip charts and the trip map
+DEFAULT_COLUMNAR_FIELDS = [
+    "timestamp",
+    "latitude",
+    "longitude",
+    "speed_mph",
+    "state_of_charge",
+    "engine_rpm",
+    "hv_battery_power_kw",
+    "fuel_level_percent",
+]
+
+
+@trips_bp.route("/trips/<int:trip_id>/telemetry/columnar", methods=["GET"])
+def get_trip_telemetry_columnar(trip_id):
+    """Stream a trip's telemetry as packed typed arrays for charting.
+
+    The body is a binary stream (see utils/columnar.py for the layout) read
+    from a server-side cursor, so memory stays flat for long drives.
+
+    Query params:
+        fields: Comma-separated numeric telemetry fields (default: chart series)
+        max_points: Downsample the trip to at most N points with LTTB
+    """
+    db = get_db()
+
+    try:
+        fields = parse_fields_param(request.args.get("fields"), TelemetryRaw) or DEFAULT_COLUMNAR_FIELDS
+        max_points = parse_max_points(request.args.get("max_points"), Config.API_TELEMETRY_LIMIT_MAX)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    columns = [(name, column_dtype(TelemetryRaw, name)) for name in fields]
+    unpackable = [name for name, dtype in columns if dtype is None]
+    if unpackable:
+        return jsonify({"error": f"Non-numeric fields: {', '.join(unpackable)}"}), 400
+
+    session_id = db.query(Trip.session_id).filter(Trip.id == trip_id).scalar()
+    if session_id is None:
+        return jsonify({"error": "Trip not found"}), 404
+
+    if max_points:
+        selected_ids, total = _lttb_telemetry_ids(db, session_id, max_points)
+        telemetry_query = db.query(TelemetryRaw).filter(TelemetryRaw.id.in_(selected_ids))
+        row_count = len(selected_ids)
+    else:
+        telemetry_query = db.query(TelemetryRaw).filter(TelemetryRaw.session_id == session_id)
+        row_count = total = telemetry_query.count()
+
+    rows = (
+        telemetry_query.with_entities(*project_columns(TelemetryRaw, fields))
+        .order_by(TelemetryRaw.timestamp)
+        .yield_per(Config.API_COLUMNAR_BATCH_SIZE)
+    )
+
+    return Response(
+        stream_with_context(
+            iter_columnar(
+                rows,
+                columns,
+                batch_size=Config.API_COLUMNAR_BATCH_SIZE,
+                trip_id=trip_id,
+                row_count=row_count,
+                total_points=total,
+            )
+        ),
+        mimetype=COLUMNAR_MIMETYPE,
+    )
+
+
 @trips_bp.route("/trips/<int:trip_id>", methods=["DELETE"])
 def delete_trip(trip_id: int):
     """Delete a trip and its associated data.
@@ -309,6 +510,8 @@ def delete_trip(trip_id: int):
     if trip.is_imported:
         try:
             trip.deleted_at = utc_now()
+            remove_trip_from_heatmap(db, trip)
+            remove_trips_from_routes(db, [trip])
             db.commit()
             logger.info(f"Soft-deleted imported trip {trip_id}")
             return jsonify({"message": f"Trip {trip_id} archived (can be restored)"})
@@ -319,6 +522,9 @@ def delete_trip(trip_id: int):
 
     # Hard delete for real-time trips
     try:
+        # Subtract the trip's grid cells while its telemetry still exists
+        remove_trip_from_heatmap(db, trip)
+        remove_trips_from_routes(db, [trip])
         db.query(SocTransition).filter(SocTransition.trip_id == trip_id).delete()
         db.query(TelemetryRaw).filter(TelemetryRaw.session_id == trip.session_id).delete()
         db.delete(trip)
@@ -346,6 +552,8 @@ def restore_trip(trip_id: int):
 
     try:
         trip.deleted_at = None
+        restore_trip_to_heatmap(db, trip)
+        restore_trip_to_route(db, trip)
         db.commit()
 
         logger.info(f"Restored trip {trip_id}")
@@ -419,6 +627,7 @@ def update_trip(trip_id):
 
 
 @trips_bp.route("/efficiency/summary", methods=["GET"])
+@etag_by_data_version("trips", "fuel")
 def get_efficiency_summary():
     """
     Get efficiency statistics.
@@ -529,6 +738,7 @@ def get_efficiency_summary():
 
 
 @trips_bp.route("/soc/analysis", methods=["GET"])
+@etag_by_data_version("trips")
 def get_soc_analysis():
     """
     Get SOC floor analysis.
@@ -566,6 +776,7 @@ def get_soc_analysis():
 
 
 @trips_bp.route("/mpg/trend", methods=["GET"])
+@etag_by_data_version("trips")
 def get_mpg_trend():
     """
     Get MPG trend data for charting.
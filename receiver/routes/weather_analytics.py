@@ -11,6 +11,7 @@ from datetime import datetime
 from database import get_db
 from flask import Blueprint, jsonify, request
 from services import weather_analytics_service
+from utils.data_version import etag_by_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +29,7 @@ def _parse_date(date_str: str) -> datetime | None:
 
 
 @weather_analytics_bp.route("/api/analytics/weather/efficiency-correlation", methods=["GET"])
+@etag_by_data_version("trips")
 def get_efficiency_correlation():
     """
     Get overall weather-efficiency correlation statistics.
@@ -55,6 +57,7 @@ def get_efficiency_correlation():
 
 
 @weather_analytics_bp.route("/api/analytics/weather/temperature-bands", methods=["GET"])
+@etag_by_data_version("trips")
 def get_temperature_bands():
     """
     Get efficiency statistics grouped by temperature bands.
@@ -91,6 +94,7 @@ def get_temperature_bands():
 
 
 @weather_analytics_bp.route("/api/analytics/weather/precipitation-impact", methods=["GET"])
+@etag_by_data_version("trips")
 def get_precipitation_impact():
     """
     Get efficiency comparison for rain vs dry conditions.
@@ -124,6 +128,7 @@ def get_precipitation_impact():
 
 
 @weather_analytics_bp.route("/api/analytics/weather/wind-impact", methods=["GET"])
+@etag_by_data_version("trips")
 def get_wind_impact():
     """
     Get efficiency statistics grouped by wind speed bands.
@@ -155,6 +160,7 @@ def get_wind_impact():
 
 
 @weather_analytics_bp.route("/api/analytics/weather/seasonal-trends", methods=["GET"])
+@etag_by_data_version("trips")
 def get_seasonal_trends():
     """
     Get efficiency trends by month/season over time.
@@ -181,6 +187,7 @@ def get_seasonal_trends():
 
 
 @weather_analytics_bp.route("/api/analytics/weather/best-conditions", methods=["GET"])
+@etag_by_data_version("trips")
 def get_best_conditions():
     """
     Identify optimal driving conditions based on historical data.
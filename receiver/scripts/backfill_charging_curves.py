@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Backfill charging curves for completed charging sessions.
+
+Charging curves are now captured from telemetry when a session is
+finalized. Sessions finalized earlier have no stored curve, so the curve
+endpoint rebuilds it from telemetry on every request. This script stores
+their curves, committing per batch. Sessions that already have a curve are
+skipped, so the script can be re-run safely.
+
+Usage:
+    python -m scripts.backfill_charging_curves [--batch-size N]
+
+Options:
+    --batch-size N  Number of sessions to process per commit (default: 50)
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add receiver directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database import get_db  # noqa: E402
+from services.charging_service import backfill_charging_curves  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill charging curves for completed charging sessions")
+    parser.add_argument("--batch-size", type=int, default=50, help="Sessions per commit")
+    args = parser.parse_args()
+
+    logger.info("Starting charging curve backfill...")
+
+    db = get_db()
+
+    try:
+        last_id, total_captured = 0, 0
+        while True:
+            last_id, captured = backfill_charging_curves(db, after_id=last_id, limit=args.batch_size)
+            db.commit()
+            if last_id is None:
+                break
+
+            total_captured += captured
+            logger.info(f"Progress: through session {last_id}, {total_captured} curves captured")
+
+        logger.info(f"Backfill complete: {total_captured} curves captured")
+
+    except Exception as e:
+        logger.exception(f"Backfill failed: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
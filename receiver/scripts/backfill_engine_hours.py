@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Backfill per-trip engine runtime and the lifetime engine hours counter.
+
+Trips finalized before engine runtime was stored have no engine_seconds
+and aren't in the lifetime counter. This script recomputes every closed
+trip's runtime in one window-function query over telemetry and resets the
+counter to their total, so it can be re-run safely.
+
+Usage:
+    python -m scripts.backfill_engine_hours
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+# Add receiver directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database import get_db  # noqa: E402
+from services.maintenance_service import backfill_engine_hours  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    logger.info("Starting engine hours backfill...")
+
+    db = get_db()
+
+    try:
+        counter = backfill_engine_hours(db)
+        db.commit()
+        logger.info(
+            f"Backfill complete: {counter.trip_count} trips, {counter.total_seconds / 3600.0:.1f} engine hours"
+        )
+
+    except Exception as e:
+        logger.exception(f"Backfill failed: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Backfill the map heatmap grid for historical trips.
+
+Trips finalized before the heatmap grid existed are not counted in
+map_grid_cells. This script adds their telemetry, committing per batch.
+Trips are flagged as indexed, so the script can be re-run safely.
+
+With --rebuild the grid is cleared first and rebuilt from every closed trip
+that isn't deleted, repairing totals left by trips deleted before deletes
+subtracted their cells.
+
+Usage:
+    python -m scripts.backfill_heatmap_grid [--limit N] [--batch-size N] [--rebuild]
+
+Options:
+    --limit N       Process only N trips (default: all)
+    --batch-size N  Number of trips to index per commit (default: 50)
+    --rebuild       Clear the grid and re-index all trips
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add receiver directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database import get_db  # noqa: E402
+from services.heatmap_service import index_unindexed_trips, reset_heatmap_grid  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the map heatmap grid for historical trips")
+    parser.add_argument("--limit", type=int, help="Maximum number of trips to process")
+    parser.add_argument("--batch-size", type=int, default=50, help="Trips per commit")
+    parser.add_argument("--rebuild", action="store_true", help="Clear the grid and re-index all trips")
+    args = parser.parse_args()
+
+    logger.info("Starting heatmap grid backfill...")
+
+    db = get_db()
+
+    try:
+        if args.rebuild:
+            removed = reset_heatmap_grid(db)
+            db.commit()
+            logger.info(f"Cleared {removed} grid cells for rebuild")
+
+        total_trips = total_cells = 0
+        while args.limit is None or total_trips < args.limit:
+            batch = args.batch_size
+            if args.limit is not None:
+                batch = min(batch, args.limit - total_trips)
+
+            trips, cells = index_unindexed_trips(db, limit=batch)
+            db.commit()
+            if trips == 0:
+                break
+
+            total_trips += trips
+            total_cells += cells
+            logger.info(f"Progress: {total_trips} trips indexed")
+
+        logger.info(f"Backfill complete: {total_trips} trips, {total_cells} cell updates")
+
+    except Exception as e:
+        logger.exception(f"Backfill failed: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
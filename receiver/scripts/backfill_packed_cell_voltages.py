@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Pack cell voltages for battery cell readings stored as JSON only.
+
+New cell readings store their voltages as a packed float32 blob next to
+the JSON array. Cell analysis still reads the JSON for older readings;
+this script packs them, committing per batch. Readings that are already
+packed are skipped, so the script can be re-run safely.
+
+Usage:
+    python -m scripts.backfill_packed_cell_voltages [--batch-size N]
+
+Options:
+    --batch-size N  Number of readings to process per commit (default: 500)
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add receiver directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database import get_db  # noqa: E402
+from services.battery_cell_service import backfill_packed_cell_voltages  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack cell voltages for battery cell readings stored as JSON only")
+    parser.add_argument("--batch-size", type=int, default=500, help="Readings per commit")
+    args = parser.parse_args()
+
+    logger.info("Starting cell voltage packing backfill...")
+
+    db = get_db()
+
+    try:
+        last_id, total_packed = 0, 0
+        while True:
+            last_id, packed = backfill_packed_cell_voltages(db, after_id=last_id, limit=args.batch_size)
+            db.commit()
+            if last_id is None:
+                break
+
+            total_packed += packed
+            logger.info(f"Progress: through reading {last_id}, {total_packed} readings packed")
+
+        logger.info(f"Backfill complete: {total_packed} readings packed")
+
+    except Exception as e:
+        logger.exception(f"Backfill failed: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
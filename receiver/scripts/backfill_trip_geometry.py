@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Backfill route geometry and geohashed endpoints for historical trips.
+
+Trips finalized before route geometry was stored have no polyline, bounds,
+start/end geohashes or route fingerprint, so the map falls back to telemetry
+for them, proximity search can't find them and similar-trip search has to
+read their telemetry. This script computes those columns from
+each trip's GPS telemetry, and fills in geohashes for detected routes.
+
+Usage:
+    python -m scripts.backfill_trip_geometry [--limit N] [--batch-size N]
+
+Options:
+    --limit N       Process only N trips (default: all)
+    --batch-size N  Number of trips to process per commit (default: 50)
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add receiver directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database import get_db  # noqa: E402
+from models import Route, TelemetryRaw, Trip  # noqa: E402
+from sqlalchemy import and_, or_  # noqa: E402
+from services.trip_service import compute_trip_geometry  # noqa: E402
+from utils.geohash import encode as encode_geohash  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def get_trips_needing_geometry(db, limit: int | None = None):
+    """Get closed trips without stored geometry."""
+    query = (
+        db.query(Trip)
+        .filter(
+            Trip.is_closed == True,  # noqa: E712
+            Trip.deleted_at.is_(None),
+            or_(
+                Trip.gps_point_count.is_(None),
+                # Geometry stored before route fingerprints were added
+                and_(Trip.gps_point_count >= 2, Trip.route_fingerprint.is_(None)),
+            ),
+        )
+        .order_by(Trip.start_time.desc())
+    )
+
+    if limit:
+        query = query.limit(limit)
+
+    return query.all()
+
+
+def backfill_trip_geometry(db, trip: Trip) -> None:
+    """Compute geometry columns for a single trip from its GPS telemetry."""
+    rows = (
+        db.query(TelemetryRaw.latitude, TelemetryRaw.longitude)
+        .filter(
+            TelemetryRaw.session_id == trip.session_id,
+            TelemetryRaw.latitude.isnot(None),
+            TelemetryRaw.longitude.isnot(None),
+        )
+        .order_by(TelemetryRaw.timestamp)
+        .all()
+    )
+    compute_trip_geometry(trip, [row._asdict() for row in rows])
+
+
+def backfill_route_geohashes(db) -> int:
+    """Fill in geohashes for routes created before they were stored."""
+    routes = db.query(Route).filter(Route.start_geohash.is_(None)).all()
+    for route in routes:
+        route.start_geohash = encode_geohash(route.start_lat, route.start_lon)
+        route.end_geohash = encode_geohash(route.end_lat, route.end_lon)
+    return len(routes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill route geometry for historical trips")
+    parser.add_argument("--limit", type=int, help="Maximum number of trips to process")
+    parser.add_argument("--batch-size", type=int, default=50, help="Batch size for commits")
+    args = parser.parse_args()
+
+    logger.info("Starting trip geometry backfill...")
+
+    db = get_db()
+
+    try:
+        trips = get_trips_needing_geometry(db, args.limit)
+        total = len(trips)
+        logger.info(f"Found {total} trips needing geometry")
+
+        errors = 0
+        for i, trip in enumerate(trips, 1):
+            try:
+                backfill_trip_geometry(db, trip)
+            except Exception as e:
+                errors += 1
+                logger.error(f"Trip {trip.id}: Error - {e}")
+
+            # Commit in batches
+            if i % args.batch_size == 0:
+                db.commit()
+                logger.info(f"Progress: {i}/{total} trips processed")
+
+        routes = backfill_route_geohashes(db)
+        db.commit()
+
+        logger.info(f"Backfill complete: {total - errors} trips, {routes} routes, {errors} errors")
+
+    except Exception as e:
+        logger.exception(f"Backfill failed: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON response and cache payload serialization.
+
+Requests a few of the largest API responses from the configured database
+through the Flask test client, then reports:
+
+- End-to-end request time with Flask's stdlib JSON provider vs
+  FastJSONProvider (orjson when installed)
+- Encode time for the response payload alone (stdlib json vs dumps_json)
+- Redis cache payload encode/decode time and size (pickle vs
+  encode_cache_value)
+
+Run it against a database with a realistic amount of data; results on an
+empty database only measure framework overhead.
+
+Usage:
+    python -m scripts.benchmark_serialization [--iterations N] [--path PATH ...]
+
+Options:
+    --iterations N  Repetitions per measurement (default: 20)
+    --path PATH     Endpoint to benchmark (repeatable; default: /api/trips,
+                    /api/export/all, /api/trips/map)
+"""
+
+import argparse
+import json
+import logging
+import os
+import pickle
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add receiver directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Don't start the scheduler or cache listener for a one-off benchmark
+os.environ.setdefault("FLASK_TESTING", "1")
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from utils.serialization import (  # noqa: E402
+    FastJSONProvider,
+    decode_cache_value,
+    dumps_json,
+    encode_cache_value,
+    msgpack,
+    orjson,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATHS = ["/api/trips", "/api/export/all", "/api/trips/map"]
+
+
+def time_ms(func, iterations: int) -> float:
+    """Median wall time of func() in milliseconds."""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def benchmark_path(app, path: str, iterations: int) -> None:
+    """Benchmark one endpoint and log the results."""
+    client = app.test_client()
+
+    response = client.get(path)
+    if response.status_code != 200:
+        logger.warning(f"{path}: HTTP {response.status_code}, skipping")
+        return
+    payload = json.loads(response.data)
+    size_kb = len(response.data) / 1024
+
+    timings = {}
+    for name, provider in (("stdlib", DefaultJSONProvider(app)), ("fast", FastJSONProvider(app))):
+        app.json = provider
+        timings[name] = time_ms(lambda: client.get(path), iterations)
+
+    encode_stdlib = time_ms(lambda: json.dumps(payload, separators=(",", ":")), iterations)
+    encode_fast = time_ms(lambda: dumps_json(payload), iterations)
+
+    pickled = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    encoded = encode_cache_value(payload)
+    pickle_ms = time_ms(
+        lambda: pickle.loads(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)),  # nosec B301 - own payload
+        iterations,
+    )
+    codec_ms = time_ms(lambda: decode_cache_value(encode_cache_value(payload)), iterations)
+
+    logger.info(f"{path} ({size_kb:.0f} KB)")
+    logger.info(f"  request:       stdlib {timings['stdlib']:.1f} ms, fast {timings['fast']:.1f} ms")
+    logger.info(f"  encode JSON:   stdlib {encode_stdlib:.2f} ms, fast {encode_fast:.2f} ms")
+    logger.info(
+        f"  cache payload: pickle {pickle_ms:.2f} ms / {len(pickled) / 1024:.0f} KB, "
+        f"codec {codec_ms:.2f} ms / {len(encoded) / 1024:.0f} KB (round trip)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response and cache serialization")
+    parser.add_argument("--iterations", type=int, default=20, help="Repetitions per measurement")
+    parser.add_argument("--path", action="append", dest="paths", help="Endpoint to benchmark")
+    args = parser.parse_args()
+
+    from app import app
+
+    logger.info(
+        f"orjson: {'yes' if orjson is not None else 'no (stdlib fallback)'}, "
+        f"msgpack: {'yes' if msgpack is not None else 'no (pickle fallback)'}"
+    )
+
+    original_provider = app.json
+    try:
+        for path in args.paths or DEFAULT_PATHS:
+            benchmark_path(app, path, args.iterations)
+    finally:
+        app.json = original_provider
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Rebuild route clusters from scratch.
+
+Trips are normally assigned to a route incrementally at finalization, with
+a periodic rebalance pass handling drift. This script clears every
+assignment, resets route statistics and reassigns all closed trips in
+chronological order, committing per batch. Run it after upgrading (route
+statistics accumulated before assignments were stored are not reliable) or
+after changing the clustering thresholds.
+
+Usage:
+    python -m scripts.recluster_routes [--batch-size N]
+
+Options:
+    --batch-size N  Number of trips to assign per commit (default: 200)
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add receiver directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database import get_db  # noqa: E402
+from services.route_service import recluster_all_routes  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild route clusters from scratch")
+    parser.add_argument("--batch-size", type=int, default=200, help="Trips per commit")
+    args = parser.parse_args()
+
+    logger.info("Starting full route recluster...")
+
+    db = get_db()
+
+    try:
+        result = recluster_all_routes(db, batch_size=args.batch_size)
+        logger.info(
+            f"Recluster complete: {result['trips_assigned']} trips assigned to "
+            f"{result['routes']} routes ({result['routes_deleted']} empty routes deleted)"
+        )
+
+    except Exception as e:
+        logger.exception(f"Recluster failed: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
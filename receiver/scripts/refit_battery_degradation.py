@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Rebuild the battery degradation regression from all readings.
+
+New battery health readings store their odometer and are folded into the
+running regression as they're inserted, and the scheduler refits daily.
+This script forces a full refit, e.g. after applying migration 012.
+
+Usage:
+    python -m scripts.refit_battery_degradation
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+# Add receiver directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database import get_db  # noqa: E402
+from services.battery_degradation_service import refit_degradation_stats  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    logger.info("Starting battery degradation refit...")
+
+    db = get_db()
+
+    try:
+        stats = refit_degradation_stats(db)
+        db.commit()
+        logger.info(
+            f"Refit complete: {stats.n} readings, robust slope={stats.robust_slope}, "
+            f"robust intercept={stats.robust_intercept}"
+        )
+
+    except Exception as e:
+        logger.exception(f"Refit failed: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
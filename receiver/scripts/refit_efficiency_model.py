@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Fit the efficiency model from scratch.
+
+The model is folded forward as trips are finalized and refit every few
+hours by the scheduler when data has changed. This script forces a full
+refit, e.g. after applying migration 011 or importing historical trips.
+
+Usage:
+    python -m scripts.refit_efficiency_model
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+# Add receiver directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database import get_db  # noqa: E402
+from services.efficiency_model_service import MODEL_CACHE_TAG, refit_efficiency_model  # noqa: E402
+from utils.cache_utils import invalidate_cache_by_tag  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    logger.info("Starting efficiency model refit...")
+
+    db = get_db()
+
+    try:
+        model = refit_efficiency_model(db)
+        db.commit()
+        invalidate_cache_by_tag(MODEL_CACHE_TAG)
+        logger.info(
+            f"Refit complete: {model.trip_count} trips, R²={model.r_squared}, RMSE={model.rmse}"
+        )
+        for feature, value in (model.coefficients or {}).items():
+            logger.info(f"  {feature}: {value:.6f}")
+
+    except Exception as e:
+        logger.exception(f"Refit failed: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Battery Cell Analysis Service
+
+Analyze cell voltage snapshots over a period as a readings x cells NumPy
+matrix: per-cell drift, persistently weak cells and module balance trends
+are computed with column operations over the whole matrix.
+"""
+
+import logging
+import math
+import statistics
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from models import BatteryCellReading
+from sqlalchemy.orm import Session
+from utils import normalize_datetime
+from utils.cell_voltages import pack_cell_voltages, unpack_cell_voltages
+
+logger = logging.getLogger(__name__)
+
+# Gen 2 Volt pack layout: 96 cells in 3 modules of 32
+CELLS_PER_MODULE = 32
+MODULE_COUNT = 3
+
+# A cell is weak in a reading when it sits this far below the reading's mean
+WEAK_CELL_FRACTION = 0.02
+
+# Share of readings a cell must be weak in to count as persistently weak
+PERSISTENT_WEAK_SCORE = 0.5
+
+# Modules further apart than this (volts) are out of balance
+MODULE_BALANCE_THRESHOLD = 0.02
+
+MAX_REPORTED_CELLS = 5
+DAYS_PER_MONTH = 30.0
+
+# (timestamps, readings x cells voltages) with NaN for missing cells
+CellMatrix = Tuple[List[datetime], np.ndarray]
+
+
+def _json_row(cell_voltages: Optional[list]) -> List[float]:
+    """Convert a legacy JSON voltage list into a matrix row."""
+    return [float(v) if isinstance(v, (int, float)) else math.nan for v in cell_voltages or []]
+
+
+def stack_cell_rows(rows: Sequence[Sequence[float]]) -> np.ndarray:
+    """
+    Stack per-reading voltage rows into a readings x cells matrix.
+
+    Args:
+        rows: Voltage rows (unpacked blobs or lists); shorter rows are
+            padded with NaN
+
+    Returns:
+        float64 matrix with NaN for missing cells
+    """
+    width = max((len(row) for row in rows), default=0)
+    matrix = np.full((len(rows), width), np.nan)
+    for i, row in enumerate(rows):
+        matrix[i, : len(row)] = row
+    return matrix
+
+
+def load_cell_matrix(db: Session, since: datetime) -> Tuple[CellMatrix, list]:
+    """
+    Load cell readings since a cutoff as a voltage matrix.
+
+    Summary columns and packed voltages come from one column query; the
+    JSON voltages are only fetched for legacy rows that haven't been packed.
+
+    Args:
+        db: Database session
+        since: Only readings at or after this time
+
+    Returns:
+        ((timestamps, rows), summaries) oldest first; summaries are the
+        per-reading summary rows (avg_voltage, voltage_delta, module averages)
+    """
+    rows = (
+        db.query(
+            BatteryCellReading.id,
+            BatteryCellReading.timestamp,
+            BatteryCellReading.cell_voltages_packed,
+            BatteryCellReading.avg_voltage,
+            BatteryCellReading.voltage_delta,
+            BatteryCellReading.module1_avg,
+            BatteryCellReading.module2_avg,
+            BatteryCellReading.module3_avg,
+        )
+        .filter(BatteryCellReading.timestamp >= since)
+        .order_by(BatteryCellReading.timestamp)
+        .all()
+    )
+
+    legacy_ids = [row.id for row in rows if row.cell_voltages_packed is None]
+    legacy = {}
+    if legacy_ids:
+        legacy = dict(
+            db.query(BatteryCellReading.id, BatteryCellReading.cell_voltages)
+            .filter(BatteryCellReading.id.in_(legacy_ids))
+            .all()
+        )
+
+    timestamps = [normalize_datetime(row.timestamp) for row in rows]
+    matrix = stack_cell_rows(
+        [
+            unpack_cell_voltages(row.cell_voltages_packed)
+            if row.cell_voltages_packed is not None
+            else _json_row(legacy.get(row.id))
+            for row in rows
+        ]
+    )
+    return (timestamps, matrix), rows
+
+
+def _slopes(n, sum_x, sum_y, sum_xy, sum_xx) -> np.ndarray:
+    """Least-squares slopes from running sums, elementwise (NaN without spread in x)."""
+    n, sum_x, sum_y, sum_xy, sum_xx = (np.asarray(v, dtype=float) for v in (n, sum_x, sum_y, sum_xy, sum_xx))
+    denominator = n * sum_xx - sum_x * sum_x
+    defined = (n >= 2) & (denominator > 1e-12 * n * sum_xx)
+    return np.divide(
+        n * sum_xy - sum_x * sum_y, denominator, out=np.full(denominator.shape, np.nan), where=defined
+    )
+
+
+def _mv_per_month(slope: float) -> Optional[float]:
+    """Convert a volts/day slope to rounded mV/month (None if undefined)."""
+    return None if math.isnan(slope) else round(slope * 1000 * DAYS_PER_MONTH, 3)
+
+
+def analyze_cell_matrix(matrix: Tuple[Sequence[datetime], Sequence[Sequence[float]]]) -> Dict:
+    """
+    Analyze a readings x cells voltage matrix with column operations.
+
+    For every cell, the deviation from its reading's mean is regressed
+    against time (drift) and the share of readings where it sits more than
+    WEAK_CELL_FRACTION below the mean is counted (weak score). The spread
+    between module averages is regressed against time as well. Missing,
+    NaN and zero cells are masked out.
+
+    Args:
+        matrix: (timestamps, rows) from load_cell_matrix; rows may also be
+            a list of voltage lists
+
+    Returns:
+        Dict with cell_trends (per-cell drift and weak score), persistent
+        weak and drifting cells, and module_balance_trend
+    """
+    timestamps, rows = matrix
+    voltages = rows if isinstance(rows, np.ndarray) else stack_cell_rows(rows)
+    if not voltages.size:
+        return {"cell_trends": [], "persistent_weak_cells": [], "drifting_cells": [], "module_balance_trend": None}
+
+    origin = timestamps[0]
+    t = np.array([(timestamp - origin).total_seconds() / 86400.0 for timestamp in timestamps])
+
+    with np.errstate(invalid="ignore"):
+        valid = voltages > 0  # False for NaN
+    filled = np.where(valid, voltages, 0.0)
+    counts = valid.sum(axis=1)
+    means = np.divide(filled.sum(axis=1), counts, out=np.zeros(len(counts)), where=counts > 0)
+
+    # Per-cell regression sums over the readings each cell is valid in
+    deviation = np.where(valid, voltages - means[:, None], 0.0)
+    t_valid = np.where(valid, t[:, None], 0.0)
+    n = valid.sum(axis=0)
+    sum_dev = deviation.sum(axis=0)
+    sum_t = t_valid.sum(axis=0)
+    slopes = _slopes(n, sum_t, sum_dev, (t_valid * deviation).sum(axis=0), (t_valid * t_valid).sum(axis=0))
+    weak = (valid & (voltages < (means * (1 - WEAK_CELL_FRACTION))[:, None])).sum(axis=0)
+
+    cell_trends = [
+        {
+            "cell_index": int(i) + 1,
+            "readings": int(n[i]),
+            "avg_deviation_mv": round(float(sum_dev[i] / n[i] * 1000), 2),
+            "drift_mv_per_month": _mv_per_month(float(slopes[i])),
+            "weak_score": round(float(weak[i] / n[i]), 3),
+        }
+        for i in np.flatnonzero(n)
+    ]
+
+    persistent_weak = sorted(
+        (c for c in cell_trends if c["weak_score"] >= PERSISTENT_WEAK_SCORE),
+        key=lambda c: (-c["weak_score"], c["avg_deviation_mv"]),
+    )
+    drifting = sorted(
+        (c for c in cell_trends if c["drift_mv_per_month"] is not None and c["drift_mv_per_month"] < 0),
+        key=lambda c: c["drift_mv_per_month"],
+    )
+
+    # Module averages per reading; only readings with every module present count
+    modules = np.minimum(np.arange(voltages.shape[1]) // CELLS_PER_MODULE, MODULE_COUNT - 1)
+    module_sums = np.column_stack([filled[:, modules == m].sum(axis=1) for m in range(MODULE_COUNT)])
+    module_counts = np.column_stack([valid[:, modules == m].sum(axis=1) for m in range(MODULE_COUNT)])
+    complete = (module_counts > 0).all(axis=1)
+
+    module_balance_trend = None
+    if complete.any():
+        module_avgs = module_sums[complete] / module_counts[complete]
+        deltas = module_avgs.max(axis=1) - module_avgs.min(axis=1)
+        module_t = t[complete]
+        slope = float(
+            _slopes(len(deltas), module_t.sum(), deltas.sum(), (module_t * deltas).sum(), (module_t * module_t).sum())
+        )
+        module_balance_trend = {
+            "readings": int(len(deltas)),
+            "first_module_delta": round(float(deltas[0]), 4),
+            "last_module_delta": round(float(deltas[-1]), 4),
+            "avg_module_delta": round(float(deltas.mean()), 4),
+            "delta_mv_per_month": _mv_per_month(slope),
+        }
+
+    return {
+        "cell_trends": cell_trends,
+        "persistent_weak_cells": persistent_weak[:MAX_REPORTED_CELLS],
+        "drifting_cells": drifting[:MAX_REPORTED_CELLS],
+        "module_balance_trend": module_balance_trend,
+    }
+
+
+def _latest_weak_cells(row: Sequence[float], avg_voltage: Optional[float]) -> List[Dict]:
+    """Cells in a single reading more than WEAK_CELL_FRACTION below its average."""
+    if not avg_voltage:
+        return []
+    values = np.asarray(row, dtype=float)
+    with np.errstate(invalid="ignore"):
+        weak = (values > 0) & (values < avg_voltage * (1 - WEAK_CELL_FRACTION))
+    return [
+        {"cell_index": int(i) + 1, "voltage": round(float(v), 4), "deviation": round(float(v) - avg_voltage, 4)}
+        for i, v in zip(np.flatnonzero(weak), values[weak])
+    ]
+
+
+def analyze_cell_history(db: Session, since: datetime) -> Optional[Dict]:
+    """
+    Analyze cell readings since a cutoff.
+
+    Combines the latest reading's weak cells and module balance with
+    trends across the whole period.
+
+    Args:
+        db: Database session
+        since: Start of the analysis period
+
+    Returns:
+        Analysis dict, or None if there are no readings in the period
+    """
+    matrix, summaries = load_cell_matrix(db, since)
+    if not summaries:
+        return None
+
+    deltas = [r.voltage_delta for r in summaries if r.voltage_delta]
+    avg_voltages = [r.avg_voltage for r in summaries if r.avg_voltage]
+    latest = summaries[-1]
+
+    analysis = {
+        "reading_count": len(summaries),
+        "avg_voltage_delta": round(statistics.mean(deltas), 4) if deltas else None,
+        "max_voltage_delta": round(max(deltas), 4) if deltas else None,
+        "min_voltage_delta": round(min(deltas), 4) if deltas else None,
+        "avg_cell_voltage": round(statistics.mean(avg_voltages), 4) if avg_voltages else None,
+        "weak_cells": _latest_weak_cells(matrix[1][-1], latest.avg_voltage)[:MAX_REPORTED_CELLS],
+        "health_status": "good" if deltas and max(deltas) < 0.05 else "monitor",
+    }
+    analysis.update(analyze_cell_matrix(matrix))
+
+    if all([latest.module1_avg, latest.module2_avg, latest.module3_avg]):
+        module_avgs = [latest.module1_avg, latest.module2_avg, latest.module3_avg]
+        module_delta = max(module_avgs) - min(module_avgs)
+        analysis["module_balance"] = {
+            "module1_avg": latest.module1_avg,
+            "module2_avg": latest.module2_avg,
+            "module3_avg": latest.module3_avg,
+            "module_delta": round(module_delta, 4),
+            "balanced": module_delta < MODULE_BALANCE_THRESHOLD,
+        }
+
+    return analysis
+
+
+def backfill_packed_cell_voltages(db: Session, after_id: int = 0, limit: int = 500) -> Tuple[Optional[int], int]:
+    """
+    Pack the JSON voltages of readings stored before packing existed.
+
+    Args:
+        db: Database session
+        after_id: Only readings with id greater than this
+        limit: Maximum readings to process
+
+    Returns:
+        (last processed id or None when done, number of readings packed)
+    """
+    readings = (
+        db.query(BatteryCellReading)
+        .filter(BatteryCellReading.id > after_id, BatteryCellReading.cell_voltages_packed.is_(None))
+        .order_by(BatteryCellReading.id)
+        .limit(limit)
+        .all()
+    )
+    if not readings:
+        return None, 0
+
+    packed = 0
+    for reading in readings:
+        if reading.cell_voltages:
+            reading.cell_voltages_packed = pack_cell_voltages(_json_row(reading.cell_voltages))
+            packed += 1
+
+    return readings[-1].id, packed
@@ -4,32 +4,113 @@ Battery Degradation Forecasting Service
 Predict future battery capacity based on historical degradation trends.
 """
 
+import bisect
 import logging
-from typing import Dict, List, Tuple
+import statistics
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 
-from models import BatteryHealthReading, Trip
+from models import BatteryDegradationStats, BatteryHealthReading, TelemetryRaw, Trip
 from calculations import (
     capacity_kwh_to_percent,
     calculate_degradation_rate_per_10k_miles,
     is_degradation_rate_normal,
     predict_capacity_at_mileage,
 )
-from sqlalchemy import and_
+from sqlalchemy import and_, event, inspect, or_
 from sqlalchemy.orm import Session
+from utils import normalize_datetime, utc_now
 
 logger = logging.getLogger(__name__)
 
+STATS_NAME = "capacity_vs_odometer"
+
+# How far back telemetry is searched for the odometer at a new reading
+ODOMETER_LOOKBACK = timedelta(days=1)
+
+# Pairwise slopes grow quadratically; larger histories are evenly subsampled
+MAX_ROBUST_FIT_POINTS = 2000
+
+# Parallel (timestamps, capacity kWh) lists, oldest first
+CapacitySeries = Tuple[List[datetime], List[float]]
+
+
+def get_capacity_series(db: Session) -> CapacitySeries:
+    """
+    Get all battery capacity readings as a time series in one query.
+
+    Normalized capacity is preferred over raw capacity; readings with
+    neither are skipped.
+
+    Args:
+        db: Database session
+
+    Returns:
+        (timestamps, capacities_kwh), oldest first, timestamps naive UTC
+    """
+    rows = (
+        db.query(
+            BatteryHealthReading.timestamp,
+            BatteryHealthReading.normalized_capacity_kwh,
+            BatteryHealthReading.capacity_kwh,
+        )
+        .order_by(BatteryHealthReading.timestamp)
+        .all()
+    )
+
+    timestamps, capacities = [], []
+    for timestamp, normalized, raw in rows:
+        capacity = normalized or raw
+        if capacity:
+            timestamps.append(normalize_datetime(timestamp))
+            capacities.append(float(capacity))
+    return timestamps, capacities
+
+
+def capacity_at(
+    series: CapacitySeries,
+    when: Optional[datetime],
+    tolerance: timedelta = timedelta(0),
+) -> Optional[float]:
+    """
+    Get the capacity of the latest reading at or before a time (an as-of merge).
+
+    Args:
+        series: Series from get_capacity_series()
+        when: Time to look up
+        tolerance: Also accept readings up to this long after ``when``
+
+    Returns:
+        Capacity in kWh, or None if there is no such reading
+
+    Example:
+        >>> series = get_capacity_series(db)
+        >>> [capacity_at(series, trip.start_time) for trip in trips]
+        [17.9, 17.9, 17.6]
+    """
+    timestamps, capacities = series
+    if when is None:
+        return None
+    index = bisect.bisect_right(timestamps, normalize_datetime(when) + tolerance) - 1
+    return capacities[index] if index >= 0 else None
+
 
 def get_degradation_history(db: Session) -> List[Tuple[float, float]]:
     """
     Get historical battery capacity data.
 
+    Odometers are stored on readings as they're inserted; older readings
+    without one are matched to the next trip's end odometer in bulk.
+
     Returns: List of (odometer_miles, capacity_kwh)
     """
-    from sqlalchemy import or_
-
-    readings = (
-        db.query(BatteryHealthReading)
+    rows = (
+        db.query(
+            BatteryHealthReading.timestamp,
+            BatteryHealthReading.odometer_miles,
+            BatteryHealthReading.normalized_capacity_kwh,
+            BatteryHealthReading.capacity_kwh,
+        )
         .filter(
             or_(
                 BatteryHealthReading.normalized_capacity_kwh.isnot(None),
@@ -40,80 +121,298 @@ def get_degradation_history(db: Session) -> List[Tuple[float, float]]:
         .all()
     )
 
-    # Get odometer at time of each reading (approximate from nearby trip)
+    missing = [timestamp for timestamp, odometer, _, _ in rows if not odometer]
+    next_trip_odometer = _next_trip_odometer_lookup(db, missing)
+
     data = []
-    for reading in readings:
-        # Use normalized capacity, fallback to raw capacity
-        capacity_kwh = reading.normalized_capacity_kwh
-        if capacity_kwh is None and reading.capacity_kwh:
-            capacity_kwh = reading.capacity_kwh
-
-        # Use odometer from reading if available, otherwise find nearest trip
-        odometer = reading.odometer_miles
-        if not odometer:
-            nearby_trip = (
-                db.query(Trip.end_odometer)
-                .filter(
-                    and_(
-                        Trip.end_odometer.isnot(None),
-                        Trip.start_time >= reading.timestamp,
-                    )
-                )
-                .order_by(Trip.start_time)
-                .first()
+    for timestamp, odometer, normalized, raw in rows:
+        point = _reading_point(odometer or next_trip_odometer(timestamp), normalized, raw)
+        if point:
+            data.append(point)
+
+    return data
+
+
+def _reading_point(odometer, normalized_capacity_kwh, capacity_kwh) -> Optional[Tuple[float, float]]:
+    """(odometer, capacity) regression point for a reading, or None if unusable."""
+    # Use normalized capacity, fallback to raw capacity
+    capacity = normalized_capacity_kwh or capacity_kwh
+    if odometer and capacity:
+        return (float(odometer), float(capacity))
+    return None
+
+
+def _next_trip_odometer_lookup(db: Session, timestamps: List[datetime]):
+    """
+    Build a lookup of the end odometer of the first trip starting at or after a time.
+
+    Loads the candidate trips in one query instead of one per reading.
+
+    Args:
+        db: Database session
+        timestamps: Reading times that need an odometer
+
+    Returns:
+        Function mapping a timestamp to an odometer (or None)
+    """
+    if not timestamps:
+        return lambda timestamp: None
+
+    trips = (
+        db.query(Trip.start_time, Trip.end_odometer)
+        .filter(
+            and_(
+                Trip.end_odometer.isnot(None),
+                Trip.start_time >= min(timestamps),
             )
-            if nearby_trip and nearby_trip[0]:
-                odometer = nearby_trip[0]
+        )
+        .order_by(Trip.start_time)
+        .all()
+    )
+    starts = [normalize_datetime(start_time) for start_time, _ in trips]
+    odometers = [end_odometer for _, end_odometer in trips]
 
-        if odometer and capacity_kwh:
-            data.append((float(odometer), float(capacity_kwh)))
+    def lookup(timestamp):
+        index = bisect.bisect_left(starts, normalize_datetime(timestamp))
+        return odometers[index] if index < len(odometers) else None
 
-    return data
+    return lookup
 
 
-def simple_linear_regression(data: List[Tuple[float, float]]) -> Tuple[float, float]:
+def resolve_odometer(db: Session, timestamp: datetime) -> Optional[float]:
     """
-    Simple linear regression: y = mx + b
+    Resolve the odometer at the time of a new battery health reading.
+
+    Uses the latest telemetry odometer within ODOMETER_LOOKBACK of the
+    reading, falling back to the end odometer of the latest earlier trip.
 
     Args:
-        data: List of (x, y) tuples
+        db: Database session
+        timestamp: Time of the reading
+
+    Returns:
+        Odometer in miles, or None if nothing was recorded before the reading
+    """
+    telemetry = (
+        db.query(TelemetryRaw.odometer_miles)
+        .filter(
+            TelemetryRaw.timestamp <= timestamp,
+            TelemetryRaw.timestamp >= timestamp - ODOMETER_LOOKBACK,
+            TelemetryRaw.odometer_miles.isnot(None),
+        )
+        .order_by(TelemetryRaw.timestamp.desc())
+        .first()
+    )
+    if telemetry and telemetry[0]:
+        return telemetry[0]
+
+    trip = (
+        db.query(Trip.end_odometer)
+        .filter(Trip.end_odometer.isnot(None), Trip.start_time <= timestamp)
+        .order_by(Trip.start_time.desc())
+        .first()
+    )
+    return trip[0] if trip else None
+
+
+def regression_from_sums(n: int, sum_x: float, sum_y: float, sum_xy: float, sum_xx: float) -> Tuple[float, float]:
+    """
+    Least-squares line from running sums: y = mx + b
+
+    Args:
+        n: Number of points
+        sum_x, sum_y, sum_xy, sum_xx: Running sums over the points
 
     Returns:
         (slope, intercept)
     """
-    n = len(data)
     if n < 2:
         return (0, 100)  # No degradation if insufficient data
 
-    sum_x = sum(x for x, y in data)
-    sum_y = sum(y for x, y in data)
-    sum_xy = sum(x * y for x, y in data)
-    sum_xx = sum(x * x for x, y in data)
-
-    # Calculate slope and intercept
     slope = (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x * sum_x)
     intercept = (sum_y - slope * sum_x) / n
 
     return (slope, intercept)
 
 
-def forecast_degradation(db: Session) -> Dict:
+def simple_linear_regression(data: List[Tuple[float, float]]) -> Tuple[float, float]:
     """
-    Forecast battery degradation at key mileage milestones.
+    Simple linear regression: y = mx + b
+
+    Args:
+        data: List of (x, y) tuples
+
+    Returns:
+        (slope, intercept)
+    """
+    sums = _empty_sums()
+    for x, y in data:
+        _add_point(sums, x, y)
+    return regression_from_sums(**sums)
+
+
+def theil_sen_regression(data: List[Tuple[float, float]]) -> Tuple[float, float]:
+    """
+    Robust regression: the median of pairwise slopes.
+
+    Unlike least squares, a few bad capacity readings (e.g. taken at a
+    low state of charge) don't drag the trend.
+
+    Args:
+        data: List of (x, y) tuples
+
+    Returns:
+        (slope, intercept)
+    """
+    if len(data) > MAX_ROBUST_FIT_POINTS:
+        step = len(data) / MAX_ROBUST_FIT_POINTS
+        data = [data[int(i * step)] for i in range(MAX_ROBUST_FIT_POINTS)]
+
+    slopes = [
+        (y2 - y1) / (x2 - x1)
+        for i, (x1, y1) in enumerate(data)
+        for x2, y2 in data[i + 1:]
+        if x2 != x1
+    ]
+    if not slopes:
+        # All readings at the same mileage: no trend to fit
+        return (0, statistics.median(y for _, y in data))
+
+    slope = statistics.median(slopes)
+    intercept = statistics.median(y - slope * x for x, y in data)
+    return (slope, intercept)
+
+
+def _empty_sums() -> Dict:
+    return {"n": 0, "sum_x": 0.0, "sum_y": 0.0, "sum_xy": 0.0, "sum_xx": 0.0}
+
+
+def _add_point(sums: Dict, x: float, y: float) -> None:
+    sums["n"] += 1
+    sums["sum_x"] += x
+    sums["sum_y"] += y
+    sums["sum_xy"] += x * y
+    sums["sum_xx"] += x * x
+
+
+def _get_stats(db: Session) -> Optional[BatteryDegradationStats]:
+    """The running regression row, including one pending in this session."""
+    for obj in db.new:
+        if isinstance(obj, BatteryDegradationStats) and obj.name == STATS_NAME:
+            return obj
+    return db.query(BatteryDegradationStats).filter_by(name=STATS_NAME).first()
+
+
+@event.listens_for(Session, "before_flush")
+def _fold_new_health_readings(session, flush_context, instances):
+    """
+    Store the odometer on new battery health readings and fold them into the running regression.
+
+    Keeps forecast_degradation() O(1) as readings arrive. Edits and deletes
+    are picked up by the background refit.
+    """
+    readings = [obj for obj in session.new if isinstance(obj, BatteryHealthReading)]
+    if not readings:
+        return
+
+    deltas = _empty_sums()
+    with session.no_autoflush:
+        for reading in readings:
+            if not reading.odometer_miles and reading.timestamp is not None:
+                reading.odometer_miles = resolve_odometer(session, reading.timestamp)
+
+            point = _reading_point(reading.odometer_miles, reading.normalized_capacity_kwh, reading.capacity_kwh)
+            if point:
+                _add_point(deltas, *point)
+
+        if not deltas["n"]:
+            return
+
+        stats = _get_stats(session)
+        if stats is None:
+            session.add(BatteryDegradationStats(name=STATS_NAME, **deltas))
+            return
+
+        state = inspect(stats)
+        for field, delta in deltas.items():
+            if state.pending or field in state.committed_state:
+                setattr(stats, field, (getattr(stats, field) or 0) + delta)
+            else:
+                # Increment in SQL so concurrent writers don't lose updates
+                setattr(stats, field, getattr(BatteryDegradationStats, field) + delta)
+
+
+def refit_degradation_stats(db: Session) -> BatteryDegradationStats:
     """
-    # Get historical data
+    Rebuild the running regression from all readings and fit a robust trend.
+
+    Also stores resolved odometers on readings that don't have one, so
+    later history lookups don't need to match them to trips. Does not
+    commit.
+
+    Args:
+        db: Database session
+
+    Returns:
+        The updated BatteryDegradationStats row
+    """
+    missing = (
+        db.query(BatteryHealthReading)
+        .filter(or_(BatteryHealthReading.odometer_miles.is_(None), BatteryHealthReading.odometer_miles == 0))
+        .all()
+    )
+    if missing:
+        next_trip_odometer = _next_trip_odometer_lookup(db, [reading.timestamp for reading in missing])
+        for reading in missing:
+            odometer = next_trip_odometer(reading.timestamp)
+            if odometer:
+                reading.odometer_miles = odometer
+        db.flush()
+
     history = get_degradation_history(db)
+    sums = _empty_sums()
+    for x, y in history:
+        _add_point(sums, x, y)
+
+    stats = _get_stats(db)
+    if stats is None:
+        stats = BatteryDegradationStats(name=STATS_NAME)
+        db.add(stats)
+    for field, value in sums.items():
+        setattr(stats, field, value)
+
+    if len(history) >= 2:
+        stats.robust_slope, stats.robust_intercept = theil_sen_regression(history)
+    else:
+        stats.robust_slope = stats.robust_intercept = None
+    stats.refit_at = utc_now()
 
-    if len(history) < 2:
+    db.flush()
+    logger.info(f"Refit battery degradation from {len(history)} readings (robust slope {stats.robust_slope})")
+    return stats
+
+
+def forecast_degradation(db: Session) -> Dict:
+    """
+    Forecast battery degradation at key mileage milestones.
+    """
+    # Use the running sums when readings have been folded in, otherwise fit history
+    stats = _get_stats(db)
+    if stats is not None and stats.n >= 2:
+        data_points = stats.n
+        slope, intercept = regression_from_sums(stats.n, stats.sum_x, stats.sum_y, stats.sum_xy, stats.sum_xx)
+    else:
+        history = get_degradation_history(db)
+        data_points = len(history)
+        slope, intercept = simple_linear_regression(history)
+
+    if data_points < 2:
         return {
             "error": "Not enough battery health data",
             "min_readings_needed": 2,
-            "current_readings": len(history),
+            "current_readings": data_points,
         }
 
-    # Perform regression
-    slope, intercept = simple_linear_regression(history)
-
     # Get current status
     latest_reading = db.query(BatteryHealthReading).order_by(BatteryHealthReading.timestamp.desc()).first()
 
@@ -181,9 +480,23 @@ def forecast_degradation(db: Session) -> Dict:
             else "Slower than typical",
         },
         "forecasts": forecasts,
-        "data_points": len(history),
+        "data_points": data_points,
         "model": {"slope": slope, "intercept": intercept},
+        "robust_model": _robust_model(stats),
         "recommendation": "Battery health is normal"
         if is_normal
         else "Consider having battery inspected if degradation continues",
     }
+
+
+def _robust_model(stats: Optional[BatteryDegradationStats]) -> Optional[Dict]:
+    """Latest background robust fit, if one has been made."""
+    if stats is None or stats.robust_slope is None:
+        return None
+    return {
+        "method": "theil_sen",
+        "slope": stats.robust_slope,
+        "intercept": stats.robust_intercept,
+        "percent_per_10k_miles": round(calculate_degradation_rate_per_10k_miles(stats.robust_slope), 2),
+        "fitted_at": stats.refit_at.isoformat() if stats.refit_at else None,
+    }
@@ -0,0 +1,196 @@
+"""
+Dashboard cache warmer for VoltTracker.
+
+Closing or importing a trip changes the data versions behind every
+dashboard endpoint, so the next dashboard load would recompute all of
+them. The warmer requests the configured endpoints (Config.CACHE_WARM_PATHS)
+in the background right after the commit, through the app itself, which
+fills the same query and response-body caches a real request would. The
+dashboard load after a drive is then served from cache.
+
+Warms run on a single background thread with at most
+Config.CACHE_WARM_CONCURRENCY requests in flight. Triggers arriving while a
+warm is running are coalesced into one follow-up warm.
+
+Warm requests carry a per-process token header and are exempt from rate
+limiting (see is_cache_warm_request), so they neither use up nor get
+rejected by the per-IP budget they would otherwise share with clients
+behind the same address.
+"""
+
+import hmac
+import logging
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from flask import request
+from utils import utc_now
+
+logger = logging.getLogger(__name__)
+
+_app = None
+_lock = threading.Lock()
+_running = False
+_rerun_reason: Optional[str] = None
+_last_report: Optional[Dict[str, Any]] = None
+
+# Header identifying warm requests; the token never leaves this process
+WARM_REQUEST_HEADER = "X-Cache-Warm-Token"
+_warm_token = secrets.token_hex(16)
+
+
+def init_cache_warmer(app) -> None:
+    """
+    Register the Flask app used to issue warm requests.
+
+    Until this is called, schedule_cache_warm() does nothing (as in tests
+    and one-off scripts).
+
+    Args:
+        app: Flask application
+    """
+    global _app
+    _app = app
+
+
+def is_cache_warm_request() -> bool:
+    """
+    Check whether the current request was issued by the cache warmer.
+
+    Registered as a rate limiter request filter so warm requests are exempt.
+
+    Returns:
+        True if the request carries this process's warm token
+    """
+    token = request.headers.get(WARM_REQUEST_HEADER)
+    return bool(token) and hmac.compare_digest(token, _warm_token)
+
+
+def _warm_path(app, path: str) -> Dict[str, Any]:
+    """Request one endpoint and time it."""
+    start = time.perf_counter()
+    try:
+        with app.test_client() as client:
+            headers = {"Accept-Encoding": "gzip", WARM_REQUEST_HEADER: _warm_token}
+            status = client.get(path, headers=headers).status_code
+        error = None
+    except Exception as e:
+        status, error = None, str(e)
+        logger.warning(f"Cache warm failed for {path}: {e}")
+
+    result = {"path": path, "status": status, "duration_ms": round((time.perf_counter() - start) * 1000, 1)}
+    if error:
+        result["error"] = error
+    return result
+
+
+def warm_dashboard_cache(
+    app=None,
+    paths: Optional[List[str]] = None,
+    concurrency: Optional[int] = None,
+    reason: str = "manual",
+) -> Dict[str, Any]:
+    """
+    Request each dashboard endpoint once so its results are cached.
+
+    Args:
+        app: Flask application (default: the registered app)
+        paths: Endpoint paths, optionally with query strings
+            (default: Config.CACHE_WARM_PATHS)
+        concurrency: Maximum parallel requests (default: Config.CACHE_WARM_CONCURRENCY)
+        reason: What triggered the warm (for the report)
+
+    Returns:
+        Report with per-endpoint status and duration
+
+    Example:
+        >>> report = warm_dashboard_cache(app, ["/api/stats/quick/7d"])
+        >>> report["endpoints"][0]["duration_ms"]
+        42.0
+    """
+    global _last_report
+
+    app = app or _app
+    if app is None:
+        raise RuntimeError("Cache warmer has no app; call init_cache_warmer(app) first")
+
+    paths = list(Config.CACHE_WARM_PATHS if paths is None else paths)
+    concurrency = max(1, concurrency or Config.CACHE_WARM_CONCURRENCY)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="cache-warm") as executor:
+        results = list(executor.map(lambda path: _warm_path(app, path), paths))
+
+    report = {
+        "reason": reason,
+        "finished_at": utc_now().isoformat(),
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+        "warmed": sum(1 for result in results if result["status"] == 200),
+        "failed": sum(1 for result in results if result["status"] != 200),
+        "endpoints": results,
+    }
+    _last_report = report
+
+    slowest = max(results, key=lambda result: result["duration_ms"], default=None)
+    logger.info(
+        f"Cache warm ({reason}) finished in {report['duration_ms']:.0f} ms: "
+        f"{report['warmed']} warmed, {report['failed']} failed"
+        + (f", slowest {slowest['path']} ({slowest['duration_ms']:.0f} ms)" if slowest else "")
+    )
+    return report
+
+
+def _run_warms(reason: str) -> None:
+    """Background loop: warm, then warm again if triggered meanwhile."""
+    global _running, _rerun_reason
+
+    while True:
+        try:
+            warm_dashboard_cache(reason=reason)
+        except Exception as e:
+            logger.exception(f"Cache warm ({reason}) failed: {e}")
+
+        with _lock:
+            if _rerun_reason is None:
+                _running = False
+                return
+            reason, _rerun_reason = _rerun_reason, None
+
+
+def schedule_cache_warm(reason: str) -> bool:
+    """
+    Warm the dashboard cache in the background.
+
+    Call after committing writes that change dashboard data (trip
+    finalization, imports). Returns immediately.
+
+    Args:
+        reason: What triggered the warm (logged and reported)
+
+    Returns:
+        True if a warm was started or queued, False if warming is disabled
+        or no app is registered
+    """
+    global _running, _rerun_reason
+
+    if _app is None or not Config.CACHE_WARM_ENABLED or not Config.CACHE_WARM_PATHS:
+        return False
+
+    with _lock:
+        if _running:
+            # The running warm may have read pre-commit data: go again after it
+            _rerun_reason = reason
+            return True
+        _running = True
+
+    threading.Thread(target=_run_warms, args=(reason,), name="cache-warmer", daemon=True).start()
+    return True
+
+
+def get_last_warm_report() -> Optional[Dict[str, Any]]:
+    """Get the report of the most recent warm (None if none has run)."""
+    return _last_report
@@ -1,15 +1,21 @@
 """
 Charging session service for VoltTracker.
 
-Handles charging session detection and finalization.
+Handles charging session detection and finalization. The charging curve
+is captured from telemetry once, when the session is finalized, and stored
+on the session downsampled to MAX_CHARGING_CURVE_POINTS.
 """
 
 import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
 from config import Config
 from exceptions import ChargingSessionError
 from models import ChargingSession, TelemetryRaw
 from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+from utils.downsampling import downsample_points
 from utils.timezone import utc_now
 
 logger = logging.getLogger(__name__)
@@ -39,6 +45,8 @@ def detect_and_finalize_charging_session(
 
         active_session.is_complete = True
 
+        capture_charging_curve(db, active_session)
+
         # Calculate kWh added from SOC change
         if active_session.start_soc is not None and active_session.end_soc is not None:
             from utils import soc_to_kwh
@@ -148,3 +156,126 @@ def update_charging_session(session: ChargingSession, telemetry: TelemetryRaw) -
         # Log once when we hit the limit
         logger.debug(f"Charging curve reached max size ({Config.MAX_CHARGING_CURVE_POINTS} points)")
         session.charging_curve.append(curve_point)  # Allow one more to indicate truncation
+
+
+def build_charging_curve(
+    db: Session,
+    start_time: datetime,
+    end_time: datetime,
+    max_points: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Build a charging curve from the charger-connected telemetry in a time window.
+
+    Power is the charger AC power, falling back to HV battery power (which
+    is negative while charging).
+
+    Args:
+        db: Database session
+        start_time: Start of the charging session
+        end_time: End of the charging session
+        max_points: Downsample to at most this many points with LTTB, which
+            keeps the shape of the taper
+
+    Returns:
+        List of {timestamp, power_kw, soc} points, oldest first
+    """
+    rows = (
+        db.query(
+            TelemetryRaw.timestamp,
+            TelemetryRaw.charger_ac_power_kw,
+            TelemetryRaw.hv_battery_power_kw,
+            TelemetryRaw.state_of_charge,
+        )
+        .filter(
+            TelemetryRaw.timestamp >= start_time,
+            TelemetryRaw.timestamp <= end_time,
+            TelemetryRaw.charger_connected.is_(True),
+        )
+        .order_by(TelemetryRaw.timestamp)
+        .all()
+    )
+
+    curve = []
+    for timestamp, charger_ac_power_kw, hv_battery_power_kw, soc in rows:
+        power = charger_ac_power_kw
+        if power is None and hv_battery_power_kw is not None:
+            # HV power is negative during charging
+            power = abs(hv_battery_power_kw) if hv_battery_power_kw < 0 else None
+
+        if power is not None:
+            curve.append(
+                {
+                    "timestamp": timestamp.isoformat() if timestamp else None,
+                    "power_kw": round(power, 2),
+                    "soc": soc,
+                }
+            )
+
+    if max_points:
+        curve = downsample_points(curve, max_points, "timestamp", ["power_kw", "soc"])
+    return curve
+
+
+def capture_charging_curve(db: Session, session: ChargingSession) -> int:
+    """
+    Compute and store a session's charging curve when it is finalized.
+
+    Replaces any curve collected while charging. If there is no usable
+    telemetry, an existing curve is kept (downsampled to the limit).
+
+    Args:
+        db: Database session
+        session: ChargingSession with start and end times set
+
+    Returns:
+        Number of curve points stored
+    """
+    curve = []
+    if session.start_time and session.end_time:
+        curve = build_charging_curve(db, session.start_time, session.end_time, Config.MAX_CHARGING_CURVE_POINTS)
+
+    if not curve and session.charging_curve:
+        curve = downsample_points(
+            session.charging_curve, Config.MAX_CHARGING_CURVE_POINTS, "timestamp", ["power_kw", "soc"]
+        )
+
+    # Assign a new list so the JSON column is marked as changed
+    session.charging_curve = list(curve)
+    return len(curve)
+
+
+def backfill_charging_curves(db: Session, after_id: int = 0, limit: int = 50) -> Tuple[Optional[int], int]:
+    """
+    Capture curves for completed sessions finalized before curves were stored.
+
+    Processes sessions in id order so callers can page through them; sessions
+    that already have a curve are skipped. Does not commit.
+
+    Args:
+        db: Database session
+        after_id: Only consider sessions with a greater id
+        limit: Maximum sessions to consider
+
+    Returns:
+        (last session id considered or None when done, curves captured)
+    """
+    sessions = (
+        db.query(ChargingSession)
+        .filter(ChargingSession.is_complete.is_(True), ChargingSession.id > after_id)
+        .order_by(ChargingSession.id)
+        .limit(limit)
+        .all()
+    )
+    if not sessions:
+        return None, 0
+
+    captured = 0
+    for session in sessions:
+        if session.charging_curve:
+            continue
+        if capture_charging_curve(db, session):
+            captured += 1
+
+    db.flush()
+    return sessions[-1].id, captured
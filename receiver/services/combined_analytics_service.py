@@ -13,7 +13,7 @@ from sqlalchemy import and_, case, extract, func
 from sqlalchemy.orm import Session
 
 from models import Trip
-from services import elevation_analytics_service, weather_analytics_service
+from services import efficiency_model_service, elevation_analytics_service, weather_analytics_service
 from utils.timezone import utc_now
 
 logger = logging.getLogger(__name__)
@@ -71,6 +71,7 @@ def get_multi_factor_analysis(
     }
 
     return {
+        "model": _summarize_model(efficiency_model_service.get_efficiency_model(db)),
         "overall": {
             "total_trips": overall_stats.total_trips or 0,
             "avg_efficiency_kwh_per_mile": (
@@ -95,18 +96,28 @@ def get_efficiency_predictions(
     temperature_f: Optional[float] = None,
     elevation_change_m: Optional[float] = None,
     is_raining: bool = False,
+    distance_miles: Optional[float] = None,
 ) -> Dict[str, Any]:
     """
     Predict efficiency for given conditions based on historical data.
 
+    Uses the fitted efficiency model once it covers enough trips, and the
+    hand-tuned factors below until then.
+
     Args:
         temperature_f: Expected temperature in Fahrenheit
         elevation_change_m: Expected net elevation change in meters
         is_raining: Whether precipitation is expected
+        distance_miles: Expected trip distance, used to turn the elevation
+            change into a grade (default: the average trip distance)
 
     Returns:
         Predicted efficiency and confidence
     """
+    model = efficiency_model_service.get_efficiency_model(db)
+    if model and model["trip_count"] >= efficiency_model_service.MIN_MODEL_TRIPS:
+        return _predict_with_model(model, temperature_f, elevation_change_m, is_raining, distance_miles)
+
     base_efficiency = BASELINE_KWH_PER_MILE
     adjustments = []
     total_adjustment = 0.0
@@ -155,6 +166,81 @@ def get_efficiency_predictions(
         "total_adjustment_percent": round((total_adjustment / base_efficiency) * 100, 1),
         "adjustments": adjustments,
         "confidence": "medium" if len(adjustments) > 0 else "low",
+        "source": "factors",
+    }
+
+
+# Typical rain intensity used for is_raining predictions (inches)
+RAIN_PRECIPITATION_IN = 0.1
+
+
+def _predict_with_model(
+    model: Dict[str, Any],
+    temperature_f: Optional[float],
+    elevation_change_m: Optional[float],
+    is_raining: bool,
+    distance_miles: Optional[float],
+) -> Dict[str, Any]:
+    """Prediction from the fitted efficiency model, in the same shape as the factor-based one."""
+    grade = None
+    if elevation_change_m is not None:
+        miles = distance_miles or model["avg_trip_miles"]
+        grade = elevation_change_m / miles if miles else 0.0
+
+    contributions = efficiency_model_service.feature_contributions(
+        model,
+        temperature_f=temperature_f,
+        grade_m_per_mile=grade,
+        precipitation_in=RAIN_PRECIPITATION_IN if is_raining else None,
+    )
+    base_efficiency = contributions["intercept"]
+
+    adjustments = []
+    factors = [
+        ("temperature", temperature_f is not None, ("cold_degrees_f", "heat_degrees_f"),
+         lambda: f"{temperature_f:.0f}°F"),
+        ("elevation", elevation_change_m is not None, ("grade_m_per_mile",),
+         lambda: f"{elevation_change_m:+.0f}m"),
+        ("precipitation", is_raining, ("precipitation_in",), lambda: "rain"),
+    ]
+    for factor, present, features, label in factors:
+        if not present:
+            continue
+        adjustment = sum(contributions[feature] for feature in features)
+        adjustments.append({
+            "factor": factor,
+            "value": label(),
+            "impact_percent": round(adjustment / base_efficiency * 100, 1) if base_efficiency else None,
+            "adjustment_kwh": round(adjustment, 4),
+        })
+
+    total_adjustment = sum(contributions.values()) - base_efficiency
+    r_squared = model["r_squared"]
+
+    return {
+        "predicted_kwh_per_mile": round(base_efficiency + total_adjustment, 4),
+        "baseline_kwh_per_mile": round(base_efficiency, 4),
+        "total_adjustment_percent": (
+            round(total_adjustment / base_efficiency * 100, 1) if base_efficiency else None
+        ),
+        "adjustments": adjustments,
+        "confidence": "high" if r_squared is not None and r_squared >= 0.5 else "medium",
+        "source": "model",
+        "model": _summarize_model(model),
+    }
+
+
+def _summarize_model(model: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Fit quality and coefficients of the efficiency model for API responses."""
+    if model is None:
+        return None
+    return {
+        "trip_count": model["trip_count"],
+        "r_squared": round(model["r_squared"], 3) if model["r_squared"] is not None else None,
+        "rmse_kwh_per_mile": round(model["rmse"], 4) if model["rmse"] is not None else None,
+        "coefficients": {feature: round(value, 6) for feature, value in model["coefficients"].items()},
+        "data_version": model["data_version"],
+        "fitted_at": model["fitted_at"],
     }
 
 
@@ -0,0 +1,487 @@
+"""
+Fitted multi-factor efficiency model for VoltTracker.
+
+Models electric efficiency (kWh/mile) as a linear function of trip
+conditions, fitted by least squares over trip history:
+
+    kwh_per_mile = b0 + b1*cold + b2*heat + b3*grade + b4*speed + b5*precip + b6*health_loss
+
+Features are deviations from reference conditions (the "ideal" temperature
+band, flat, REFERENCE_SPEED_MPH, dry, full battery health), so the intercept
+is the expected efficiency under those conditions and each coefficient is
+the cost of one unit away from them.
+
+Only the sufficient statistics (X'X, X'y, y'y) are stored, in the
+efficiency_models table. A full fit builds the trips x features design
+matrix with NumPy and takes X'X and X'y as matrix products; finalizing a
+trip folds its outer product into them and re-solves the 7x7 normal
+equations with numpy.linalg, so the fit stays current without re-reading
+trip history. The scheduler periodically refits from scratch to pick up edits,
+deletes and imports; the data versions at that fit are stored with the
+model. Predictions only read the (cached) coefficients.
+"""
+
+import logging
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from config import Config
+from models import BatteryHealthReading, EfficiencyModel, Trip
+from services.battery_degradation_service import capacity_at, get_capacity_series
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+from utils import utc_now
+from utils.cache_utils import cache_result, invalidate_cache_by_tag
+from utils.data_version import get_data_versions
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "kwh_per_mile"
+
+FEATURES = (
+    "intercept",
+    "cold_degrees_f",  # Degrees below the ideal temperature band
+    "heat_degrees_f",  # Degrees above the ideal temperature band
+    "grade_m_per_mile",  # Net elevation change per mile
+    "speed_mph",  # Average speed minus REFERENCE_SPEED_MPH
+    "precipitation_in",
+    "battery_health_loss_pct",  # 100 - battery health %
+)
+
+# Reference conditions (missing trip values are assumed to be these)
+IDEAL_TEMP_RANGE_F = next((low, high) for name, low, high in Config.ANALYTICS_TEMP_BANDS if name == "ideal")
+REFERENCE_SPEED_MPH = 30.0
+
+# Trips eligible for training (matches the analytics services)
+MIN_TRIP_MILES = 0.5
+MAX_KWH_PER_MILE = 1.0
+
+# Predictions fall back to the hand-tuned factors below this many trips
+MIN_MODEL_TRIPS = 20
+
+# Tiny ridge penalty on the non-intercept coefficients. Negligible once a
+# feature varies; keeps the system solvable while one is constant (e.g. no
+# rainy trips yet), pinning its coefficient to zero.
+RIDGE_PENALTY = 1e-6
+
+# Seconds to cache loaded coefficients (trip commits invalidate sooner)
+MODEL_CACHE_TTL = 3600
+MODEL_CACHE_TAG = "efficiency_model"
+
+# Seconds an expired model may still be served while it reloads in the background
+MODEL_STALE_TTL = 600
+
+_K = len(FEATURES)
+
+
+def feature_vector(
+    temperature_f: Optional[float] = None,
+    grade_m_per_mile: Optional[float] = None,
+    speed_mph: Optional[float] = None,
+    precipitation_in: Optional[float] = None,
+    battery_health_pct: Optional[float] = None,
+) -> List[float]:
+    """
+    Build the model's feature vector for a set of conditions.
+
+    Args:
+        temperature_f: Temperature in Fahrenheit
+        grade_m_per_mile: Net elevation change per mile in meters
+        speed_mph: Average speed
+        precipitation_in: Precipitation in inches
+        battery_health_pct: Battery capacity as % of original
+
+    Returns:
+        Feature values in FEATURES order (missing conditions count as reference)
+    """
+    ideal_low, ideal_high = IDEAL_TEMP_RANGE_F
+    cold = heat = 0.0
+    if temperature_f is not None:
+        cold = max(0.0, ideal_low - temperature_f)
+        heat = max(0.0, temperature_f - ideal_high)
+
+    return [
+        1.0,
+        cold,
+        heat,
+        grade_m_per_mile or 0.0,
+        speed_mph - REFERENCE_SPEED_MPH if speed_mph is not None else 0.0,
+        precipitation_in or 0.0,
+        max(0.0, 100.0 - battery_health_pct) if battery_health_pct is not None else 0.0,
+    ]
+
+
+def design_matrix(
+    temperature_f: np.ndarray,
+    grade_m_per_mile: np.ndarray,
+    speed_mph: np.ndarray,
+    precipitation_in: np.ndarray,
+    battery_health_pct: np.ndarray,
+) -> np.ndarray:
+    """
+    Vectorized feature_vector over arrays of conditions.
+
+    Args:
+        temperature_f: Temperatures in Fahrenheit (NaN = missing)
+        grade_m_per_mile: Net elevation change per mile (NaN = missing)
+        speed_mph: Average speeds (NaN = missing)
+        precipitation_in: Precipitation in inches (NaN = missing)
+        battery_health_pct: Battery health % (NaN = missing)
+
+    Returns:
+        (n x len(FEATURES)) matrix; missing conditions count as reference
+    """
+    ideal_low, ideal_high = IDEAL_TEMP_RANGE_F
+    return np.column_stack(
+        [
+            np.ones_like(temperature_f),
+            np.nan_to_num(np.maximum(0.0, ideal_low - temperature_f)),
+            np.nan_to_num(np.maximum(0.0, temperature_f - ideal_high)),
+            np.nan_to_num(grade_m_per_mile),
+            np.nan_to_num(speed_mph - REFERENCE_SPEED_MPH),
+            np.nan_to_num(precipitation_in),
+            np.nan_to_num(np.maximum(0.0, 100.0 - battery_health_pct)),
+        ]
+    )
+
+
+def _health_pct(reading_capacity: Optional[float]) -> Optional[float]:
+    """Battery health % from a capacity reading in kWh."""
+    if not reading_capacity:
+        return None
+    return reading_capacity / Config.BATTERY_ORIGINAL_CAPACITY_KWH * 100.0
+
+
+def _trip_observation(
+    start_time: Optional[datetime],
+    end_time: Optional[datetime],
+    distance_miles: Optional[float],
+    electric_miles: Optional[float],
+    kwh_per_mile: Optional[float],
+    temperature_f: Optional[float],
+    precipitation_in: Optional[float],
+    elevation_net_change_m: Optional[float],
+    battery_health_pct: Optional[float],
+) -> Optional[Tuple[List[float], float, float]]:
+    """Turn a trip's values into (features, kwh_per_mile, miles), or None if not usable."""
+    if not kwh_per_mile or not 0 < kwh_per_mile < MAX_KWH_PER_MILE:
+        return None
+    if not electric_miles or electric_miles <= MIN_TRIP_MILES:
+        return None
+
+    miles = distance_miles or electric_miles
+    grade = elevation_net_change_m / miles if elevation_net_change_m is not None else None
+
+    hours = _duration_hours(start_time, end_time)
+    speed = miles / hours if hours and hours > 0 else None
+
+    x = feature_vector(temperature_f, grade, speed, precipitation_in, battery_health_pct)
+    return x, kwh_per_mile, miles
+
+
+def _duration_hours(start_time: Optional[datetime], end_time: Optional[datetime]) -> Optional[float]:
+    """Trip duration in hours (None without both timestamps)."""
+    if not start_time or not end_time:
+        return None
+    return (end_time - start_time).total_seconds() / 3600.0
+
+
+def _stats_from_observations(values: np.ndarray) -> Tuple[Dict[str, Any], int]:
+    """
+    Compute sufficient statistics over many trips at once.
+
+    Applies the same eligibility rules and features as _trip_observation,
+    vectorized over the rows.
+
+    Args:
+        values: (trips x 8) array of distance_miles, electric_miles,
+            kwh_per_mile, temperature_f, precipitation_in,
+            elevation_net_change_m, duration_hours, battery_health_pct
+            (NaN = missing)
+
+    Returns:
+        (stats, number of usable trips)
+    """
+    distance, electric, y, temperature, precipitation, elevation, hours, health = values.T
+    usable = (y > 0) & (y < MAX_KWH_PER_MILE) & (electric > MIN_TRIP_MILES)
+    distance, electric, y = distance[usable], electric[usable], y[usable]
+
+    miles = np.where(distance > 0, distance, electric)
+    speed = np.divide(miles, hours[usable], out=np.full_like(miles, np.nan), where=hours[usable] > 0)
+    x = design_matrix(temperature[usable], elevation[usable] / miles, speed, precipitation[usable], health[usable])
+
+    stats = {
+        "xtx": (x.T @ x).tolist(),
+        "xty": (x.T @ y).tolist(),
+        "yty": float(y @ y),
+        "miles_sum": float(miles.sum()),
+    }
+    return stats, int(usable.sum())
+
+
+def _accumulate(stats: Dict[str, Any], x: Sequence[float], y: float, miles: float) -> None:
+    """Fold one observation into sufficient statistics (replaces the stored lists)."""
+    x = np.asarray(x, dtype=float)
+    stats["xtx"] = (np.asarray(stats["xtx"], dtype=float) + np.outer(x, x)).tolist()
+    stats["xty"] = (np.asarray(stats["xty"], dtype=float) + x * y).tolist()
+    stats["yty"] += y * y
+    stats["miles_sum"] += miles
+
+
+def fit_from_stats(stats: Dict[str, Any], n: int) -> Optional[Dict[str, Any]]:
+    """
+    Solve the (ridge-regularized) normal equations.
+
+    Args:
+        stats: Sufficient statistics
+        n: Number of observations folded into stats
+
+    Returns:
+        Dict with coefficients (by feature), r_squared and rmse, or None if
+        there is no data
+    """
+    if n <= 0:
+        return None
+
+    xtx = np.asarray(stats["xtx"], dtype=float)
+    xty = np.asarray(stats["xty"], dtype=float)
+    yty = stats["yty"]
+
+    penalty = np.full(_K, RIDGE_PENALTY)
+    penalty[0] = 0.0
+    try:
+        beta = np.linalg.solve(xtx + np.diag(penalty), xty)
+    except np.linalg.LinAlgError:
+        return None
+
+    # SSE = y'y - 2b'X'y + b'X'Xb
+    sse = max(0.0, float(yty - 2 * beta @ xty + beta @ xtx @ beta))
+    sst = yty - xty[0] ** 2 / n
+
+    return {
+        "coefficients": dict(zip(FEATURES, beta.tolist())),
+        "r_squared": 1 - sse / sst if sst > 1e-12 else None,
+        "rmse": math.sqrt(sse / n),
+    }
+
+
+def _current_data_version() -> str:
+    versions = get_data_versions(("trips", "battery"))
+    return ",".join(f"{kind}={version}" for kind, version in sorted(versions.items()))
+
+
+def _apply_fit(model: EfficiencyModel, stats: Dict[str, Any], trip_count: int) -> None:
+    """Store new statistics and their fit on the model row."""
+    fit = fit_from_stats(stats, trip_count) or {}
+    model.stats = stats
+    model.trip_count = trip_count
+    model.coefficients = fit.get("coefficients")
+    model.r_squared = fit.get("r_squared")
+    model.rmse = fit.get("rmse")
+
+
+def refit_efficiency_model(db: Session) -> EfficiencyModel:
+    """
+    Fit the model from scratch over all eligible closed trips.
+
+    Reads trips and battery health readings once each (readings are merged
+    onto trips by timestamp), then builds the design matrix and its normal
+    equations in one vectorized pass. Does not commit.
+
+    Args:
+        db: Database session
+
+    Returns:
+        The updated (or newly created) model row
+    """
+    data_version = _current_data_version()
+    capacities = get_capacity_series(db)
+
+    rows = db.query(
+        Trip.start_time,
+        Trip.end_time,
+        Trip.distance_miles,
+        Trip.electric_miles,
+        Trip.kwh_per_mile,
+        Trip.ambient_temp_avg_f,
+        Trip.weather_temp_f,
+        Trip.weather_precipitation_in,
+        Trip.elevation_net_change_m,
+    ).filter(
+        and_(
+            Trip.is_closed == True,  # noqa: E712
+            Trip.deleted_at.is_(None),
+            Trip.kwh_per_mile > 0,
+            Trip.kwh_per_mile < MAX_KWH_PER_MILE,
+            Trip.electric_miles > MIN_TRIP_MILES,
+        )
+    )
+
+    values = np.array(
+        [
+            (
+                row.distance_miles,
+                row.electric_miles,
+                row.kwh_per_mile,
+                row.ambient_temp_avg_f if row.ambient_temp_avg_f is not None else row.weather_temp_f,
+                row.weather_precipitation_in,
+                row.elevation_net_change_m,
+                _duration_hours(row.start_time, row.end_time),
+                _health_pct(capacity_at(capacities, row.start_time)),
+            )
+            for row in rows
+        ],
+        dtype=float,
+    ).reshape(-1, 8)
+    stats, trip_count = _stats_from_observations(values)
+
+    model = db.query(EfficiencyModel).filter(EfficiencyModel.name == MODEL_NAME).first()
+    if model is None:
+        model = EfficiencyModel(name=MODEL_NAME)
+        db.add(model)
+
+    _apply_fit(model, stats, trip_count)
+    model.data_version = data_version
+    model.fitted_at = utc_now()
+
+    logger.info(f"Efficiency model refit on {trip_count} trips (R²={model.r_squared})")
+    return model
+
+
+def refit_if_stale(db: Session) -> bool:
+    """
+    Refit and commit the model if trips or battery readings changed since the last full fit.
+
+    Args:
+        db: Database session
+
+    Returns:
+        True if the model was refit
+    """
+    model = db.query(EfficiencyModel).filter(EfficiencyModel.name == MODEL_NAME).first()
+    if model is not None and model.data_version == _current_data_version():
+        return False
+
+    refit_efficiency_model(db)
+    db.commit()
+    invalidate_cache_by_tag(MODEL_CACHE_TAG)
+    return True
+
+
+def add_trip_to_model(db: Session, trip: Trip) -> bool:
+    """
+    Fold a finalized trip into the model and refit from the updated statistics.
+
+    Called during trip finalization; reads only the model row and the
+    battery health reading preceding the trip. The first call (no model
+    yet) fits the model from existing history instead. Does not commit.
+
+    Args:
+        db: Database session
+        trip: Trip being finalized (efficiency, weather and elevation set)
+
+    Returns:
+        True if the trip was added to the model
+    """
+    model = db.query(EfficiencyModel).filter(EfficiencyModel.name == MODEL_NAME).first()
+    if model is None:
+        model = refit_efficiency_model(db)
+
+    reading = (
+        db.query(BatteryHealthReading.normalized_capacity_kwh, BatteryHealthReading.capacity_kwh)
+        .filter(BatteryHealthReading.timestamp <= trip.start_time)
+        .order_by(BatteryHealthReading.timestamp.desc())
+        .first()
+    )
+
+    observation = _trip_observation(
+        trip.start_time,
+        trip.end_time,
+        trip.distance_miles,
+        trip.electric_miles,
+        trip.kwh_per_mile,
+        trip.ambient_temp_avg_f if trip.ambient_temp_avg_f is not None else trip.weather_temp_f,
+        trip.weather_precipitation_in,
+        trip.elevation_net_change_m,
+        _health_pct(reading.normalized_capacity_kwh or reading.capacity_kwh) if reading else None,
+    )
+    if observation is None:
+        return False
+
+    # Copy: JSON columns only detect reassignment
+    stats = dict(model.stats)
+    _accumulate(stats, *observation)
+    _apply_fit(model, stats, (model.trip_count or 0) + 1)
+    return True
+
+
+@cache_result(
+    "efficiency_model",
+    ttl=MODEL_CACHE_TTL,
+    stale_ttl=MODEL_STALE_TTL,
+    tags=["trips", MODEL_CACHE_TAG],
+    key_func=lambda db: "efficiency_model:" + MODEL_NAME,
+)
+def get_efficiency_model(db: Session) -> Optional[Dict[str, Any]]:
+    """
+    Get the fitted model for predictions.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Dict with coefficients, trip_count, r_squared, rmse,
+        avg_trip_miles, data_version and fitted_at, or None if no model
+        has been fitted. Cached; treat as read-only.
+    """
+    model = db.query(EfficiencyModel).filter(EfficiencyModel.name == MODEL_NAME).first()
+    if model is None or not model.coefficients:
+        return None
+
+    return {
+        "coefficients": model.coefficients,
+        "trip_count": model.trip_count,
+        "r_squared": model.r_squared,
+        "rmse": model.rmse,
+        "avg_trip_miles": model.stats["miles_sum"] / model.trip_count if model.trip_count else None,
+        "data_version": model.data_version,
+        "fitted_at": model.fitted_at.isoformat() if model.fitted_at else None,
+    }
+
+
+def feature_contributions(model: Dict[str, Any], **conditions) -> Dict[str, float]:
+    """
+    Split a prediction into per-feature contributions (kWh/mile).
+
+    Args:
+        model: Model from get_efficiency_model()
+        **conditions: Keyword arguments for feature_vector()
+
+    Returns:
+        Dict mapping feature name to coefficient * value; the values sum to
+        the predicted kWh/mile
+    """
+    coefficients = model["coefficients"]
+    x = feature_vector(**conditions)
+    return {feature: coefficients[feature] * value for feature, value in zip(FEATURES, x)}
+
+
+def predict_kwh_per_mile(model: Dict[str, Any], **conditions) -> float:
+    """
+    Predict efficiency for a set of conditions.
+
+    Args:
+        model: Model from get_efficiency_model()
+        **conditions: Keyword arguments for feature_vector()
+
+    Returns:
+        Predicted kWh/mile
+
+    Example:
+        >>> model = get_efficiency_model(db)
+        >>> predict_kwh_per_mile(model, temperature_f=20.0, speed_mph=55.0)
+        0.3412
+    """
+    return sum(feature_contributions(model, **conditions).values())
@@ -0,0 +1,270 @@
+"""
+Map heatmap service for VoltTracker.
+
+Maintains the map_grid_cells spatial aggregation (sample count, speed and
+kWh/mile per cell at a few grid levels) and serves the cells inside a map
+viewport. Cells are incremented once per trip at finalization, so drawing
+years of driving only reads the cells in view. Deleting a trip subtracts its
+cells again (restoring adds them back), and rebuild_heatmap_grid recomputes
+the grid from scratch if the totals ever drift.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import MapGridCell, TelemetryRaw, Trip
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from utils.spatial_grid import (
+    accumulate_cells,
+    cell_center,
+    cell_id,
+    cell_index,
+    cell_size,
+    grid_level_for_zoom,
+)
+
+logger = logging.getLogger(__name__)
+
+# Cells written per upsert statement
+UPSERT_BATCH_SIZE = 500
+
+# Maximum cells returned for one viewport (densest first)
+MAX_HEATMAP_CELLS = 20000
+
+# Running-total columns incremented on conflict
+_TOTAL_COLUMNS = ("sample_count", "speed_sum", "moving_count", "moving_speed_sum", "moving_power_kw_sum")
+
+
+def _upsert_cells(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Insert cells, adding to the running totals of cells that already exist."""
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    table = MapGridCell.__table__
+
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        stmt = insert(table).values(rows[start:start + UPSERT_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["level", "cell_x", "cell_y"],
+            set_={name: table.c[name] + stmt.excluded[name] for name in _TOTAL_COLUMNS},
+        )
+        db.execute(stmt)
+
+
+def _cell_rows(cells: Dict[Tuple[int, int, int], Dict[str, float]], sign: int = 1) -> List[Dict[str, Any]]:
+    """Convert accumulated cells to upsert rows, negating the totals for sign=-1."""
+    return [
+        {"level": level, "cell_x": cell_x, "cell_y": cell_y, **{k: v * sign for k, v in totals.items()}}
+        for (level, cell_x, cell_y), totals in cells.items()
+    ]
+
+
+def _load_trip_points(db: Session, trip: Trip) -> List[dict]:
+    """Load the positioned telemetry the grid is built from for one trip."""
+    rows = (
+        db.query(
+            TelemetryRaw.latitude,
+            TelemetryRaw.longitude,
+            TelemetryRaw.speed_mph,
+            TelemetryRaw.hv_battery_power_kw,
+        )
+        .filter(
+            TelemetryRaw.session_id == trip.session_id,
+            TelemetryRaw.latitude.isnot(None),
+            TelemetryRaw.longitude.isnot(None),
+        )
+        .all()
+    )
+    return [row._asdict() for row in rows]
+
+
+def update_heatmap_grid(db: Session, trip: Trip, points: List[dict]) -> int:
+    """
+    Add a trip's telemetry to the heatmap grid.
+
+    Idempotent per trip: trips already indexed are skipped, so re-running
+    finalization never double counts.
+
+    Args:
+        db: Database session
+        trip: Trip being finalized
+        points: List of telemetry dicts (from to_dict())
+
+    Returns:
+        Number of cells updated
+    """
+    if trip.heatmap_indexed:
+        return 0
+
+    cells = accumulate_cells(points)
+    if cells:
+        _upsert_cells(db, _cell_rows(cells))
+
+    trip.heatmap_indexed = True
+    return len(cells)
+
+
+def remove_trip_from_heatmap(db: Session, trip: Trip) -> int:
+    """
+    Subtract a trip's telemetry from the heatmap grid.
+
+    Call before the trip's telemetry is deleted (or when it is soft-deleted).
+    Cells left without samples are removed. No-op for trips that aren't
+    indexed, so it never subtracts twice.
+
+    Args:
+        db: Database session
+        trip: Trip being deleted
+
+    Returns:
+        Number of cells updated
+    """
+    if not trip.heatmap_indexed:
+        return 0
+
+    cells = accumulate_cells(_load_trip_points(db, trip))
+    if cells:
+        _upsert_cells(db, _cell_rows(cells, sign=-1))
+        db.query(MapGridCell).filter(MapGridCell.sample_count <= 0).delete()
+
+    trip.heatmap_indexed = False
+    return len(cells)
+
+
+def restore_trip_to_heatmap(db: Session, trip: Trip) -> int:
+    """
+    Add a restored (previously soft-deleted) trip back to the heatmap grid.
+
+    Args:
+        db: Database session
+        trip: Trip being restored
+
+    Returns:
+        Number of cells updated
+    """
+    if not trip.is_closed:
+        return 0
+    return update_heatmap_grid(db, trip, _load_trip_points(db, trip))
+
+
+def index_unindexed_trips(db: Session, limit: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Backfill the heatmap grid for closed trips that aren't indexed yet.
+
+    Args:
+        db: Database session
+        limit: Maximum number of trips to index (default: all)
+
+    Returns:
+        Tuple of (trips indexed, cells updated)
+    """
+    query = (
+        db.query(Trip)
+        .filter(
+            Trip.is_closed.is_(True),
+            Trip.deleted_at.is_(None),
+            Trip.heatmap_indexed.isnot(True),
+        )
+        .order_by(Trip.start_time)
+    )
+    if limit:
+        query = query.limit(limit)
+
+    trips_indexed = cells_updated = 0
+    for trip in query.all():
+        cells_updated += update_heatmap_grid(db, trip, _load_trip_points(db, trip))
+        trips_indexed += 1
+
+    return trips_indexed, cells_updated
+
+
+def reset_heatmap_grid(db: Session) -> int:
+    """
+    Clear the heatmap grid and mark every trip as not indexed.
+
+    Follow with index_unindexed_trips to rebuild the grid from the trips
+    that aren't deleted (see scripts/backfill_heatmap_grid.py --rebuild).
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of cells removed
+    """
+    removed = db.query(MapGridCell).delete()
+    db.query(Trip).filter(Trip.heatmap_indexed.is_(True)).update(
+        {Trip.heatmap_indexed: False}, synchronize_session="fetch"
+    )
+    return removed
+
+
+def rebuild_heatmap_grid(db: Session) -> Tuple[int, int]:
+    """
+    Recompute the heatmap grid from scratch in one transaction.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Tuple of (trips indexed, cells updated)
+    """
+    reset_heatmap_grid(db)
+    return index_unindexed_trips(db)
+
+
+def get_heatmap_cells(
+    db: Session,
+    zoom: float,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    min_samples: int = 1,
+) -> Dict[str, Any]:
+    """
+    Get heatmap cells inside a viewport.
+
+    Args:
+        db: Database session
+        zoom: Map zoom level (selects the grid level)
+        bbox: Optional (west, south, east, north) viewport in degrees
+        min_samples: Skip cells with fewer samples
+
+    Returns:
+        Dict with grid level, cell size and the list of cells
+    """
+    level = grid_level_for_zoom(zoom)
+
+    query = db.query(MapGridCell).filter(
+        MapGridCell.level == level,
+        MapGridCell.sample_count >= min_samples,
+    )
+    if bbox is not None:
+        west, south, east, north = bbox
+        min_x, min_y = cell_index(south, west, level)
+        max_x, max_y = cell_index(north, east, level)
+        query = query.filter(
+            MapGridCell.cell_x.between(min_x, max_x),
+            MapGridCell.cell_y.between(min_y, max_y),
+        )
+
+    rows = query.order_by(MapGridCell.sample_count.desc()).limit(MAX_HEATMAP_CELLS + 1).all()
+    truncated = len(rows) > MAX_HEATMAP_CELLS
+
+    cells = []
+    for row in rows[:MAX_HEATMAP_CELLS]:
+        lat, lon = cell_center(level, row.cell_x, row.cell_y)
+        avg_speed = row.avg_speed_mph
+        kwh_per_mile = row.kwh_per_mile
+        cells.append({
+            "id": cell_id(level, row.cell_x, row.cell_y),
+            "lat": round(lat, 6),
+            "lon": round(lon, 6),
+            "samples": row.sample_count,
+            "avg_speed_mph": round(avg_speed, 1) if avg_speed is not None else None,
+            "kwh_per_mile": round(kwh_per_mile, 3) if kwh_per_mile is not None else None,
+        })
+
+    return {
+        "grid_level": level,
+        "cell_size_degrees": cell_size(level),
+        "cells": cells,
+        "truncated": truncated,
+    }
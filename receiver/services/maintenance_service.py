@@ -2,20 +2,33 @@
 Maintenance Tracking Service
 
 Calculate engine hours, predict maintenance due dates for Volt Gen 2.
+
+Engine runtime is stored per trip and added to a lifetime counter when the
+trip is finalized, so lifetime engine hours don't require a telemetry scan.
 """
 
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
-from config import Config
-from models import MaintenanceRecord, TelemetryRaw, Trip
+from models import EngineHoursCounter, MaintenanceRecord, TelemetryRaw, Trip
+from sqlalchemy import and_, case, extract, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from utils.query_cache import cached_query
 from utils.timezone import normalize_datetime, utc_now
 
 logger = logging.getLogger(__name__)
 
+# Engine hour = 1 hour with engine_rpm above this
+ENGINE_RUNNING_RPM = 400
+
+# Longer gaps between readings are dropouts, not runtime
+MAX_ENGINE_INTERVAL_SECONDS = 600
+
+COUNTER_NAME = "lifetime"
+
 # Volt Gen 2 maintenance intervals
 MAINTENANCE_INTERVALS = {
     "oil_change": {
@@ -62,39 +75,201 @@ MAINTENANCE_INTERVALS = {
 }
 
 
-@cached_query(ttl=600, key_prefix="maintenance")  # Cache for 10 minutes
+def calculate_engine_seconds(telemetry: List[TelemetryRaw]) -> float:
+    """
+    Sum engine runtime over a trip's telemetry.
+
+    Counts the interval between consecutive readings with the engine
+    running, skipping gaps of MAX_ENGINE_INTERVAL_SECONDS or more.
+
+    Args:
+        telemetry: Telemetry ordered by timestamp
+
+    Returns:
+        Engine runtime in seconds
+    """
+    running = [
+        normalize_datetime(t.timestamp)
+        for t in telemetry
+        if t.engine_rpm is not None and t.engine_rpm > ENGINE_RUNNING_RPM
+    ]
+
+    total_seconds = 0.0
+    for previous, current in zip(running, running[1:]):
+        duration_seconds = (current - previous).total_seconds()
+        if 0 < duration_seconds < MAX_ENGINE_INTERVAL_SECONDS:
+            total_seconds += duration_seconds
+    return total_seconds
+
+
+def add_trip_engine_hours(db: Session, trip: Trip, telemetry: List[TelemetryRaw]) -> float:
+    """
+    Store a trip's engine runtime and add it to the lifetime counter.
+
+    Re-finalizing a trip only adds the difference from its previous value,
+    so the counter never double counts.
+
+    Args:
+        db: Database session
+        trip: Trip being finalized
+        telemetry: The trip's telemetry ordered by timestamp
+
+    Returns:
+        The trip's engine runtime in seconds
+    """
+    seconds = calculate_engine_seconds(telemetry)
+    previous = trip.engine_seconds
+    trip.engine_seconds = seconds
+
+    _add_to_counter(
+        db,
+        seconds - (previous or 0),
+        trips=0 if previous is not None else 1,
+        counted_through=telemetry[-1].timestamp if telemetry else None,
+    )
+    return seconds
+
+
+def _add_to_counter(db: Session, seconds: float, trips: int, counted_through: Optional[datetime]) -> None:
+    """Add to the lifetime counter, creating it if needed, in one upsert."""
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    table = EngineHoursCounter.__table__
+
+    stmt = insert(table).values(
+        name=COUNTER_NAME,
+        total_seconds=seconds,
+        trip_count=trips,
+        counted_through=counted_through,
+        updated_at=utc_now(),
+    )
+    latest = table.c.counted_through
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["name"],
+        set_={
+            "total_seconds": table.c.total_seconds + stmt.excluded.total_seconds,
+            "trip_count": table.c.trip_count + stmt.excluded.trip_count,
+            "counted_through": case(
+                (or_(latest.is_(None), latest < stmt.excluded.counted_through), stmt.excluded.counted_through),
+                else_=latest,
+            ),
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.execute(stmt)
+
+
+def _seconds_between(db: Session, start, end):
+    """SQL expression for the seconds between two timestamp columns."""
+    if db.get_bind().dialect.name == "postgresql":
+        return extract("epoch", end - start)
+    return (func.julianday(end) - func.julianday(start)) * 86400.0
+
+
+def engine_seconds_by_session(
+    db: Session,
+    since: Optional[datetime] = None,
+    after: Optional[datetime] = None,
+):
+    """
+    Build a query summing engine runtime per session in the database.
+
+    Uses a lag() window over each session's engine-running telemetry, so
+    no telemetry rows are loaded into Python.
+
+    Args:
+        db: Database session
+        since: Only count telemetry at or after this time
+        after: Only count telemetry strictly after this time
+
+    Returns:
+        Select of (session_id, engine_seconds)
+    """
+    conditions = [TelemetryRaw.engine_rpm > ENGINE_RUNNING_RPM]
+    if since is not None:
+        conditions.append(TelemetryRaw.timestamp >= since)
+    if after is not None:
+        conditions.append(TelemetryRaw.timestamp > after)
+
+    intervals = (
+        select(
+            TelemetryRaw.session_id,
+            TelemetryRaw.timestamp,
+            func.lag(TelemetryRaw.timestamp)
+            .over(partition_by=TelemetryRaw.session_id, order_by=TelemetryRaw.timestamp)
+            .label("previous_timestamp"),
+        )
+        .where(and_(*conditions))
+        .subquery()
+    )
+    duration = _seconds_between(db, intervals.c.previous_timestamp, intervals.c.timestamp)
+
+    return (
+        select(intervals.c.session_id, func.sum(duration).label("engine_seconds"))
+        .where(duration > 0, duration < MAX_ENGINE_INTERVAL_SECONDS)
+        .group_by(intervals.c.session_id)
+    )
+
+
+def _sum_engine_seconds(db: Session, since: Optional[datetime] = None, after: Optional[datetime] = None) -> float:
+    per_session = engine_seconds_by_session(db, since=since, after=after).subquery()
+    return float(db.execute(select(func.coalesce(func.sum(per_session.c.engine_seconds), 0))).scalar() or 0)
+
+
+@cached_query(ttl=600, key_prefix="maintenance", tags=["trips"])  # Cache for 10 minutes
 def calculate_engine_hours(db: Session, since_date: Optional[datetime] = None) -> float:
     """
-    Calculate total engine hours from telemetry.
+    Calculate engine hours (time with engine_rpm > 400).
 
-    Engine hour = 1 hour when engine_rpm > 400
+    Lifetime hours come from the counter maintained at trip finalization,
+    plus telemetry recorded since (e.g. a trip still in progress). Hours
+    since a date are summed in the database.
 
-    Note: For very large datasets, this may need to be optimized with
-    aggregation queries or time-based batching.
+    Cached for 10 minutes.
+    """
+    if since_date is not None:
+        return _sum_engine_seconds(db, since=since_date) / 3600.0
 
-    Cached for 10 minutes to avoid expensive recomputation.
+    counter = db.query(EngineHoursCounter).filter_by(name=COUNTER_NAME).first()
+    if counter is None:
+        # Not backfilled yet
+        return _sum_engine_seconds(db) / 3600.0
+
+    pending = _sum_engine_seconds(db, after=counter.counted_through) if counter.counted_through else 0.0
+    return (counter.total_seconds + pending) / 3600.0
+
+
+def backfill_engine_hours(db: Session) -> EngineHoursCounter:
     """
-    # Limit to configurable max points to prevent memory issues
-    # Default 50,000 covers ~13 hours of engine runtime at 1 point/second
-    query = db.query(TelemetryRaw).filter(TelemetryRaw.engine_rpm > 400)
+    Recompute engine runtime for all closed trips and reset the lifetime counter.
 
-    if since_date:
-        query = query.filter(TelemetryRaw.timestamp >= since_date)
+    Does not commit.
 
-    telemetry = query.order_by(TelemetryRaw.timestamp).limit(Config.MAX_ENGINE_TELEMETRY_POINTS).all()
+    Args:
+        db: Database session
 
-    if len(telemetry) < 2:
-        return 0.0
+    Returns:
+        The rebuilt EngineHoursCounter
+    """
+    seconds_by_session = dict(db.execute(engine_seconds_by_session(db)).all())
 
-    total_hours = 0.0
-    for i in range(1, len(telemetry)):
-        duration_seconds = (telemetry[i].timestamp - telemetry[i - 1].timestamp).total_seconds()
+    trips = db.query(Trip.id, Trip.session_id, Trip.end_time).filter(Trip.is_closed.is_(True)).all()
+    trip_seconds = {trip_id: float(seconds_by_session.get(session_id) or 0) for trip_id, session_id, _ in trips}
+    db.bulk_update_mappings(
+        Trip, [{"id": trip_id, "engine_seconds": seconds} for trip_id, seconds in trip_seconds.items()]
+    )
 
-        # Only count if engine was running and duration is reasonable
-        if telemetry[i].engine_rpm > 400 and duration_seconds < 600:  # < 10 min
-            total_hours += duration_seconds / 3600.0
+    counter = db.query(EngineHoursCounter).filter_by(name=COUNTER_NAME).first()
+    if counter is None:
+        counter = EngineHoursCounter(name=COUNTER_NAME)
+        db.add(counter)
+    counter.total_seconds = sum(trip_seconds.values())
+    counter.trip_count = len(trips)
+    end_times = [end_time for _, _, end_time in trips if end_time is not None]
+    counter.counted_through = max(end_times, key=normalize_datetime) if end_times else None
 
-    return total_hours
+    db.flush()
+    logger.info(f"Backfilled engine hours for {len(trips)} trips: {counter.total_seconds / 3600.0:.1f} hours")
+    return counter
 
 
 def get_current_odometer(db: Session) -> float:
@@ -164,7 +339,7 @@ def calculate_next_due(
     return result
 
 
-@cached_query(ttl=300, key_prefix="maintenance")  # Cache for 5 minutes
+@cached_query(ttl=300, key_prefix="maintenance", tags=["trips"])  # Cache for 5 minutes
 def get_maintenance_summary(db: Session) -> Dict:
     """
     Get summary of all maintenance items and their status.
@@ -2,14 +2,20 @@
 Powertrain Analysis Service
 
 Analyzes motor and generator RPM data to identify Volt operating modes
-and provide insights into hybrid system operation.
+and provide insights into hybrid system operation. Modes are classified a
+column at a time as NumPy arrays and run-length encoded into segments;
+per-trip durations and transitions are stored when the trip is finalized.
 """
 
 import logging
-from typing import Dict, Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from models import TelemetryRaw
+import numpy as np
+from models import TelemetryRaw, Trip
 from sqlalchemy.orm import Session
+from utils.downsampling import lttb_indices
+from utils.timezone import normalize_datetime
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +31,98 @@ class PowertrainMode:
     UNKNOWN = "unknown"
 
 
+# Classification thresholds
+MOTOR_ACTIVE_THRESHOLD = 100  # RPM
+MOTOR_B_SIGNIFICANT_THRESHOLD = 1500  # RPM for hybrid assist
+ENGINE_ACTIVE_THRESHOLD = 400  # RPM
+GENERATOR_ACTIVE_THRESHOLD = 100  # RPM
+MOUNTAIN_CHARGE_KW = -1.0  # Battery charging at 1kW or more
+
+# Timeline points returned when max_points isn't given; longer trips are
+# still analyzed completely and the timeline is downsampled with LTTB
+DEFAULT_TIMELINE_POINTS = 10000
+
+MODES = (
+    PowertrainMode.EV_MODE,
+    PowertrainMode.HOLD_MODE,
+    PowertrainMode.MOUNTAIN_MODE,
+    PowertrainMode.ENGINE_DIRECT,
+    PowertrainMode.HYBRID_ASSIST,
+    PowertrainMode.UNKNOWN,
+)
+
+MODE_DESCRIPTIONS = {
+    PowertrainMode.EV_MODE: "Pure Electric - Motors Only",
+    PowertrainMode.HOLD_MODE: "Hold Mode - Engine Maintaining Battery",
+    PowertrainMode.MOUNTAIN_MODE: "Mountain Mode - Engine Charging Battery",
+    PowertrainMode.ENGINE_DIRECT: "Engine Direct Drive",
+    PowertrainMode.HYBRID_ASSIST: "Hybrid Assist - Battery + Engine",
+    PowertrainMode.UNKNOWN: "Unknown/Transition",
+}
+
+# (mode, first sample index, last sample index)
+ModeSegment = Tuple[str, int, int]
+
+
+def _column(values: Sequence[Optional[float]]) -> np.ndarray:
+    """Convert a telemetry column to a float array (None becomes NaN, which fails every threshold)."""
+    return np.array(values, dtype=float)
+
+
+def classify_modes(
+    motor_a_rpm: Sequence[Optional[float]],
+    motor_b_rpm: Sequence[Optional[float]],
+    generator_rpm: Sequence[Optional[float]],
+    engine_rpm: Sequence[Optional[float]],
+    hv_battery_power_kw: Sequence[Optional[float]],
+) -> List[str]:
+    """
+    Classify operating modes for whole columns of powertrain data at once.
+
+    Each threshold is applied to its whole column as an array comparison,
+    then the flags are combined with np.select in rule order.
+
+    Args:
+        motor_a_rpm: Front motor RPM per sample
+        motor_b_rpm: Rear motor RPM per sample
+        generator_rpm: Generator RPM per sample
+        engine_rpm: Engine RPM per sample
+        hv_battery_power_kw: Battery power per sample (positive = discharging)
+
+    Returns:
+        Operating mode per sample
+
+    Example:
+        >>> classify_modes([1500, 1500], [1000, 1000], [0, 1800], [0, 1500], [-8.0, 0.5])
+        ['ev', 'hold']
+    """
+    motor_a = _column(motor_a_rpm) > MOTOR_ACTIVE_THRESHOLD
+    motor_b = _column(motor_b_rpm)
+    motor_b_active = motor_b > MOTOR_ACTIVE_THRESHOLD
+    motor_b_significant = motor_b > MOTOR_B_SIGNIFICANT_THRESHOLD
+    generator = _column(generator_rpm) > GENERATOR_ACTIVE_THRESHOLD
+    engine = _column(engine_rpm) > ENGINE_ACTIVE_THRESHOLD
+    charging = _column(hv_battery_power_kw) <= MOUNTAIN_CHARGE_KW
+
+    engine_generating = motor_a & engine & generator
+
+    # First matching rule wins
+    rules = [
+        # EV Mode: Motors active, no engine (generator may spin during regen/coasting)
+        (motor_a & ~engine, PowertrainMode.EV_MODE),
+        # Hybrid Assist: All systems active with motor B providing significant power
+        (engine_generating & motor_b_significant, PowertrainMode.HYBRID_ASSIST),
+        # Mountain/Hold Mode: Engine and generator running, motor A active
+        (engine_generating & charging, PowertrainMode.MOUNTAIN_MODE),
+        (engine_generating, PowertrainMode.HOLD_MODE),
+        # Engine Direct: Engine running, motor B only (high speed)
+        (~motor_a & motor_b_active & engine, PowertrainMode.ENGINE_DIRECT),
+    ]
+    return np.select(
+        [condition for condition, _ in rules], [mode for _, mode in rules], default=PowertrainMode.UNKNOWN
+    ).tolist()
+
+
 def detect_operating_mode(
     motor_a_rpm: float,
     motor_b_rpm: float,
@@ -45,126 +143,171 @@ def detect_operating_mode(
     Returns:
         Operating mode string
     """
-    # Thresholds
-    MOTOR_ACTIVE_THRESHOLD = 100  # RPM
-    MOTOR_B_SIGNIFICANT_THRESHOLD = 1500  # RPM for hybrid assist
-    ENGINE_ACTIVE_THRESHOLD = 400  # RPM
-    GENERATOR_ACTIVE_THRESHOLD = 100  # RPM
+    return classify_modes([motor_a_rpm], [motor_b_rpm], [generator_rpm], [engine_rpm], [hv_battery_power_kw])[0]
+
 
-    motor_a_active = motor_a_rpm and motor_a_rpm > MOTOR_ACTIVE_THRESHOLD
-    motor_b_active = motor_b_rpm and motor_b_rpm > MOTOR_ACTIVE_THRESHOLD
-    motor_b_significant = motor_b_rpm and motor_b_rpm > MOTOR_B_SIGNIFICANT_THRESHOLD
-    generator_active = generator_rpm and generator_rpm > GENERATOR_ACTIVE_THRESHOLD
-    engine_active = engine_rpm and engine_rpm > ENGINE_ACTIVE_THRESHOLD
+def run_length_encode(modes: Sequence[str]) -> List[ModeSegment]:
+    """
+    Collapse a per-sample mode sequence into segments of consecutive equal modes.
+
+    Args:
+        modes: Operating mode per sample
 
-    # EV Mode: Motors active, no engine (generator may spin during regen/coasting)
-    if motor_a_active and not engine_active:
-        return PowertrainMode.EV_MODE
+    Returns:
+        List of (mode, first index, last index)
 
-    # Hybrid Assist: All systems active with motor B providing significant power
-    if motor_a_active and motor_b_significant and engine_active and generator_active:
-        return PowertrainMode.HYBRID_ASSIST
+    Example:
+        >>> run_length_encode(["ev", "ev", "hold", "ev"])
+        [('ev', 0, 1), ('hold', 2, 2), ('ev', 3, 3)]
+    """
+    if not len(modes):
+        return []
+    values = np.asarray(modes)
+    starts = np.concatenate(([0], np.flatnonzero(values[1:] != values[:-1]) + 1))
+    ends = np.append(starts[1:] - 1, len(values) - 1)
+    return [(str(values[first]), int(first), int(last)) for first, last in zip(starts, ends)]
 
-    # Hold/Mountain Mode: Engine and generator running, motor A active
-    if motor_a_active and engine_active and generator_active:
-        # Check if battery is charging (Mountain mode)
-        if hv_battery_power_kw and hv_battery_power_kw <= -1.0:  # Charging at 1kW or more
-            return PowertrainMode.MOUNTAIN_MODE
-        return PowertrainMode.HOLD_MODE
 
-    # Engine Direct: Engine running, motor B only (high speed)
-    if not motor_a_active and motor_b_active and engine_active:
-        return PowertrainMode.ENGINE_DIRECT
+def summarize_segments(timestamps: Sequence[datetime], segments: List[ModeSegment]) -> Dict:
+    """
+    Compute time spent in each mode and the number of mode transitions.
 
-    return PowertrainMode.UNKNOWN
+    Each sample is credited with the time since the previous sample.
 
+    Args:
+        timestamps: Sample timestamps, ascending
+        segments: Segments from run_length_encode()
 
-def analyze_trip_powertrain(db: Session, session_id: str) -> Dict:
+    Returns:
+        Dict with duration_seconds (per mode), transitions and total_samples
     """
-    Analyze powertrain operation for a trip.
+    durations = {mode: 0.0 for mode in MODES}
+    if segments:
+        seconds = np.array([(t - timestamps[0]).total_seconds() for t in timestamps])
+        firsts = np.array([first for _, first, _ in segments])
+        lasts = np.array([last for _, _, last in segments])
+        segment_seconds = seconds[lasts] - seconds[np.maximum(firsts - 1, 0)]
+        for (mode, _, _), duration in zip(segments, segment_seconds.tolist()):
+            durations[mode] += duration
+
+    return {
+        "duration_seconds": durations,
+        "transitions": max(len(segments) - 1, 0),
+        "total_samples": len(timestamps),
+    }
+
+
+def _mode_percentages(durations: Dict[str, float]) -> Dict[str, float]:
+    total_duration = sum(durations.values())
+    return {
+        mode: (duration / total_duration * 100) if total_duration > 0 else 0 for mode, duration in durations.items()
+    }
+
 
-    Returns timeline of operating modes and statistics.
+def store_trip_powertrain(trip: Trip, telemetry: List[TelemetryRaw]) -> Dict:
     """
-    # Limit to 10,000 points to prevent memory issues on very long trips
-    # At 1 point/second, this covers ~2.7 hours of data
-    MAX_TELEMETRY_POINTS = 10000
+    Classify a trip's telemetry and store its mode durations and transitions.
 
-    telemetry = (
-        db.query(TelemetryRaw)
-        .filter(TelemetryRaw.session_id == session_id)
-        .order_by(TelemetryRaw.timestamp)
-        .limit(MAX_TELEMETRY_POINTS)
-        .all()
+    Called at finalization so summaries don't re-read telemetry.
+
+    Args:
+        trip: Trip being finalized
+        telemetry: The trip's telemetry ordered by timestamp
+
+    Returns:
+        The stored summary
+    """
+    modes = classify_modes(
+        [t.motor_a_rpm for t in telemetry],
+        [t.motor_b_rpm for t in telemetry],
+        [t.generator_rpm for t in telemetry],
+        [t.engine_rpm for t in telemetry],
+        [t.hv_battery_power_kw for t in telemetry],
     )
+    timestamps = [normalize_datetime(t.timestamp) for t in telemetry]
+    trip.powertrain_stats = summarize_segments(timestamps, run_length_encode(modes))
+    return trip.powertrain_stats
 
-    if not telemetry:
-        return {"error": "No telemetry data found"}
 
-    # Analyze each point
-    timeline = []
-    mode_durations = {
-        PowertrainMode.EV_MODE: 0,
-        PowertrainMode.HOLD_MODE: 0,
-        PowertrainMode.MOUNTAIN_MODE: 0,
-        PowertrainMode.ENGINE_DIRECT: 0,
-        PowertrainMode.HYBRID_ASSIST: 0,
-        PowertrainMode.UNKNOWN: 0,
-    }
+def analyze_trip_powertrain(db: Session, session_id: str, max_points: Optional[int] = None) -> Dict:
+    """
+    Analyze powertrain operation for a trip.
 
-    for i, point in enumerate(telemetry):
-        mode = detect_operating_mode(
-            point.motor_a_rpm or 0,
-            point.motor_b_rpm or 0,
-            point.generator_rpm or 0,
-            point.engine_rpm or 0,
-            point.hv_battery_power_kw,
-        )
+    Returns timeline of operating modes and statistics. Every sample is
+    classified; durations and transitions always cover the whole trip.
 
-        timeline.append(
-            {
-                "timestamp": point.timestamp.isoformat(),
-                "mode": mode,
-                "motor_a_rpm": point.motor_a_rpm,
-                "motor_b_rpm": point.motor_b_rpm,
-                "generator_rpm": point.generator_rpm,
-                "engine_rpm": point.engine_rpm,
-                "speed_mph": point.speed_mph,
-                "soc": point.state_of_charge,
-            }
+    Args:
+        db: Database session
+        session_id: Trip session ID
+        max_points: Downsample the returned timeline to at most this many
+            points with LTTB (default: DEFAULT_TIMELINE_POINTS)
+    """
+    rows = (
+        db.query(
+            TelemetryRaw.timestamp,
+            TelemetryRaw.motor_a_rpm,
+            TelemetryRaw.motor_b_rpm,
+            TelemetryRaw.generator_rpm,
+            TelemetryRaw.engine_rpm,
+            TelemetryRaw.hv_battery_power_kw,
+            TelemetryRaw.speed_mph,
+            TelemetryRaw.state_of_charge,
         )
+        .filter(TelemetryRaw.session_id == session_id)
+        .order_by(TelemetryRaw.timestamp)
+        .all()
+    )
 
-        # Calculate duration (time since last point)
-        if i > 0:
-            duration_seconds = (point.timestamp - telemetry[i - 1].timestamp).total_seconds()
-            mode_durations[mode] += duration_seconds
+    if not rows:
+        return {"error": "No telemetry data found"}
 
-    # Calculate percentages
-    total_duration = sum(mode_durations.values())
-    mode_percentages = {
-        mode: (duration / total_duration * 100) if total_duration > 0 else 0
-        for mode, duration in mode_durations.items()
-    }
+    timestamps, motor_a, motor_b, generator, engine, hv_power, speed, soc = (list(column) for column in zip(*rows))
+
+    modes = classify_modes(motor_a, motor_b, generator, engine, hv_power)
+    segments = run_length_encode(modes)
+    stats = summarize_segments(timestamps, segments)
+
+    transitions = [
+        {
+            "timestamp": timestamps[first].isoformat(),
+            "from_mode": segments[i - 1][0],
+            "to_mode": mode,
+            "speed_mph": speed[first],
+            "soc": soc[first],
+        }
+        for i, (mode, first, _) in enumerate(segments)
+        if i > 0
+    ]
+
+    # Engine and motor RPM keep engine starts; speed keeps the drive shape
+    indices = lttb_indices(
+        timestamps,
+        [engine, motor_a, generator, speed],
+        max_points if max_points is not None else DEFAULT_TIMELINE_POINTS,
+    )
 
-    # Find mode transitions
-    transitions = []
-    prev_mode = None
-    for point in timeline:
-        if point["mode"] != prev_mode and prev_mode is not None:
-            transitions.append(
-                {
-                    "timestamp": point["timestamp"],
-                    "from_mode": prev_mode,
-                    "to_mode": point["mode"],
-                    "speed_mph": point["speed_mph"],
-                    "soc": point["soc"],
-                }
-            )
-        prev_mode = point["mode"]
+    timeline = [
+        {
+            "timestamp": timestamps[i].isoformat(),
+            "mode": modes[i],
+            "motor_a_rpm": motor_a[i],
+            "motor_b_rpm": motor_b[i],
+            "generator_rpm": generator[i],
+            "engine_rpm": engine[i],
+            "speed_mph": speed[i],
+            "soc": soc[i],
+        }
+        for i in indices
+    ]
+
+    mode_durations = stats["duration_seconds"]
+    mode_percentages = _mode_percentages(mode_durations)
 
     return {
         "session_id": session_id,
         "timeline": timeline,
-        "total_samples": len(telemetry),
+        "total_samples": len(timestamps),
+        "timeline_points": len(timeline),
         "mode_percentages": mode_percentages,
         "statistics": {
             "duration_seconds": mode_durations,
@@ -172,14 +315,11 @@ def analyze_trip_powertrain(db: Session, session_id: str) -> Dict:
             "transitions": len(transitions),
         },
         "transitions": transitions,
-        "mode_descriptions": {
-            PowertrainMode.EV_MODE: "Pure Electric - Motors Only",
-            PowertrainMode.HOLD_MODE: "Hold Mode - Engine Maintaining Battery",
-            PowertrainMode.MOUNTAIN_MODE: "Mountain Mode - Engine Charging Battery",
-            PowertrainMode.ENGINE_DIRECT: "Engine Direct Drive",
-            PowertrainMode.HYBRID_ASSIST: "Hybrid Assist - Battery + Engine",
-            PowertrainMode.UNKNOWN: "Unknown/Transition",
-        },
+        "segments": [
+            {"mode": mode, "start": timestamps[first].isoformat(), "end": timestamps[last].isoformat()}
+            for mode, first, last in segments
+        ],
+        "mode_descriptions": MODE_DESCRIPTIONS,
     }
 
 
@@ -187,24 +327,30 @@ def get_powertrain_summary(db: Session, trip_id: int) -> Optional[Dict]:
     """
     Get powertrain mode summary for a trip.
 
-    Simplified version for dashboard display.
+    Simplified version for dashboard display. Uses the summary stored at
+    finalization; older trips are analyzed from telemetry.
     """
-    from models import Trip
-
     trip = db.query(Trip).filter(Trip.id == trip_id).first()
     if not trip:
         return None
 
-    analysis = analyze_trip_powertrain(db, str(trip.session_id))
-
-    if "error" in analysis:
-        return None
-
+    stats = trip.powertrain_stats
+    if not stats:
+        analysis = analyze_trip_powertrain(db, str(trip.session_id))
+        if "error" in analysis:
+            return None
+        stats = {
+            "duration_seconds": analysis["statistics"]["duration_seconds"],
+            "transitions": analysis["statistics"]["transitions"],
+            "total_samples": analysis["total_samples"],
+        }
+
+    percentages = _mode_percentages(stats["duration_seconds"])
     return {
         "trip_id": trip_id,
         "session_id": str(trip.session_id),
-        "mode_percentages": analysis["statistics"]["percentages"],
-        "primary_mode": max(analysis["statistics"]["percentages"].items(), key=lambda x: x[1])[0],
-        "transitions": analysis["statistics"]["transitions"],
-        "total_samples": analysis["total_samples"],
+        "mode_percentages": percentages,
+        "primary_mode": max(percentages.items(), key=lambda x: x[1])[0],
+        "transitions": stats["transitions"],
+        "total_samples": stats["total_samples"],
     }
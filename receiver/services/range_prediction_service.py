@@ -10,22 +10,52 @@ from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Tuple
 
 from models import BatteryHealthReading, Trip
+from services.battery_degradation_service import capacity_at, get_capacity_series
 from sqlalchemy import and_
 from sqlalchemy.orm import Session
+from utils.cache_utils import cache_result, generate_cache_key
 
 logger = logging.getLogger(__name__)
 
 
+# Battery readings up to this long after a trip still describe its battery
+HEALTH_READING_TOLERANCE = timedelta(days=7)
+
+# Seconds to cache the training set (trip and battery commits invalidate sooner)
+HISTORY_CACHE_TTL = 3600
+
+# Seconds an expired training set may still be served while it reloads in the background
+HISTORY_STALE_TTL = 600
+
+
+@cache_result(
+    "range_prediction:history",
+    ttl=HISTORY_CACHE_TTL,
+    stale_ttl=HISTORY_STALE_TTL,
+    tags=["trips", "battery"],
+    key_func=lambda db, days=90: generate_cache_key("range_prediction:history", days),
+)
 def get_historical_efficiency(db: Session, days: int = 90) -> List[Tuple[float, float, float, float]]:
     """
     Get historical efficiency data for training.
 
+    Trips and battery health readings are each read once and joined with an
+    as-of merge (latest reading up to a week after the trip start). The
+    result is cached until trips or readings change.
+
     Returns: List of (temperature, battery_health, avg_speed, efficiency)
     """
     cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
 
     trips = (
-        db.query(Trip)
+        db.query(
+            Trip.start_time,
+            Trip.end_time,
+            Trip.distance_miles,
+            Trip.kwh_per_mile,
+            Trip.ambient_temp_avg_f,
+            Trip.weather_temp_f,
+        )
         .filter(
             and_(
                 Trip.start_time >= cutoff_date,
@@ -36,23 +66,16 @@ def get_historical_efficiency(db: Session, days: int = 90) -> List[Tuple[float,
         )
         .all()
     )
+    if not trips:
+        return []
+
+    capacities = get_capacity_series(db)
 
-    # Get battery health near each trip
     data = []
     for trip in trips:
-        battery_health = (
-            db.query(BatteryHealthReading)
-            .filter(BatteryHealthReading.timestamp <= trip.start_time + timedelta(days=7))
-            .order_by(BatteryHealthReading.timestamp.desc())
-            .first()
-        )
-
         # Calculate capacity percent from kWh (18.4 kWh is 100% for Volt Gen 2)
-        if battery_health:
-            capacity_kwh = battery_health.normalized_capacity_kwh or battery_health.capacity_kwh
-            capacity_pct = (capacity_kwh / 18.4) * 100.0 if capacity_kwh else 100.0
-        else:
-            capacity_pct = 100.0  # Default 100%
+        capacity_kwh = capacity_at(capacities, trip.start_time, HEALTH_READING_TOLERANCE)
+        capacity_pct = (capacity_kwh / 18.4) * 100.0 if capacity_kwh else 100.0
 
         # Use ambient temp if available, otherwise use weather temp
         temp = trip.ambient_temp_avg_f or trip.weather_temp_f or 70.0
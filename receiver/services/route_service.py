@@ -3,18 +3,50 @@ Route Analysis Service
 
 Detect common routes from GPS data using clustering.
 Simplified implementation without complex ML libraries.
+
+Trips are clustered incrementally: each finalized trip is assigned to the
+route whose endpoints and mean fingerprint it matches (or starts a new
+route), and the route's statistics are updated as running aggregates.
+rebalance_routes periodically splits trips that drifted away from their
+route and merges routes that converged; recluster_all_routes rebuilds every
+assignment from scratch as an offline job.
 """
 
 import logging
 from math import asin, cos, radians, sin, sqrt
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from models import Route, TelemetryRaw, Trip
-from sqlalchemy import and_
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
+from utils import is_after
+from utils.geohash import encode as encode_geohash
+from utils.geohash import prefix_filter, prefixes_for_radius
+from utils.route_clustering import (
+    fingerprint_distances,
+    pack_fingerprint,
+    similarity_from_distance,
+    trip_fingerprint,
+    unpack_fingerprint,
+)
 
 logger = logging.getLogger(__name__)
 
+# Both endpoints must be this close (miles) to a route's endpoints to join it
+ROUTE_MATCH_RADIUS_MILES = 0.5
+
+# Minimum fingerprint similarity (0-100) for a trip to join or stay in a route
+ROUTE_MIN_SIMILARITY = 75.0
+
+# Routes whose mean fingerprints are at least this similar are merged
+ROUTE_MERGE_SIMILARITY = 90.0
+
+# Shorter trips aren't assigned to routes (nor are gas-only trips)
+MIN_ROUTE_DISTANCE_MILES = 0.5
+
+# Maximum unassigned trips clustered per detect_routes call
+MAX_TRIPS_PER_DETECT = 500
+
 
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -44,6 +76,10 @@ def get_trip_endpoints(db: Session, trip_id: int) -> Optional[Tuple]:
     if not trip:
         return None
 
+    # Endpoints stored at finalization
+    if trip.start_lat is not None and trip.end_lat is not None:
+        return (trip.start_lat, trip.start_lon, trip.end_lat, trip.end_lon)
+
     # Get first GPS point
     start_point = (
         db.query(TelemetryRaw)
@@ -82,110 +118,441 @@ def get_trip_endpoints(db: Session, trip_id: int) -> Optional[Tuple]:
     return (start_point.latitude, start_point.longitude, end_point.latitude, end_point.longitude)
 
 
-def find_matching_route(
+def find_candidate_routes(
     db: Session, start_lat: float, start_lon: float, end_lat: float, end_lon: float, threshold_miles: float = 0.5
-) -> Optional[Route]:
+) -> List[Route]:
     """
-    Find existing route that matches these endpoints.
+    Find routes whose start and end points are both within threshold_miles.
 
     Args:
         threshold_miles: Max distance in miles to consider a match
 
     Returns:
-        Closest matching route, or None if no routes within threshold
+        Matching routes, closest (sum of endpoint distances) first
     """
-    routes = db.query(Route).all()
-
-    best_match = None
-    best_distance = float("inf")
+    # Only routes starting in the geohash cells around this start point can
+    # match; routes created before geohashes were stored are always checked
+    prefixes = prefixes_for_radius(start_lat, start_lon, threshold_miles)
+    routes = (
+        db.query(Route)
+        .filter(or_(prefix_filter(Route.start_geohash, prefixes), Route.start_geohash.is_(None)))
+        .all()
+    )
 
+    matches = []
     for route in routes:
         start_dist = haversine_distance(start_lat, start_lon, route.start_lat, route.start_lon)
         end_dist = haversine_distance(end_lat, end_lon, route.end_lat, route.end_lon)
 
         # Match if both endpoints are within threshold
         if start_dist <= threshold_miles and end_dist <= threshold_miles:
-            total_dist = start_dist + end_dist
-            if total_dist < best_distance:
-                best_distance = total_dist
-                best_match = route
+            matches.append((start_dist + end_dist, route))
 
-    return best_match
+    matches.sort(key=lambda match: (match[0], match[1].id))
+    return [route for _, route in matches]
 
 
-def detect_routes(db: Session, min_trips: int = 3) -> List[Dict]:
+def find_matching_route(
+    db: Session, start_lat: float, start_lon: float, end_lat: float, end_lon: float, threshold_miles: float = 0.5
+) -> Optional[Route]:
     """
-    Detect common routes from trip history.
+    Find existing route that matches these endpoints.
 
-    Simplified clustering: group trips with similar start/end points.
+    Args:
+        threshold_miles: Max distance in miles to consider a match
+
+    Returns:
+        Closest matching route, or None if no routes within threshold
+    """
+    matches = find_candidate_routes(db, start_lat, start_lon, end_lat, end_lon, threshold_miles)
+    return matches[0] if matches else None
+
+
+def _fingerprint_endpoints(fingerprint: Sequence[float]) -> Tuple[float, float, float, float]:
+    """Get (start_lat, start_lon, end_lat, end_lon) from a flat fingerprint."""
+    return fingerprint[0], fingerprint[1], fingerprint[-2], fingerprint[-1]
+
+
+def _pack_flat(values: Sequence[float]) -> bytes:
+    """Pack a flat (lat, lon, lat, lon, ...) fingerprint."""
+    return pack_fingerprint(list(zip(values[0::2], values[1::2])))
+
+
+def _running_mean(mean: Optional[float], value: float, count: int) -> float:
+    """Fold a value into a mean over count values (count includes the new one)."""
+    if count <= 1 or mean is None:
+        return value
+    return mean + (value - mean) / count
+
+
+def _set_route_endpoints(route: Route, fingerprint: Sequence[float]) -> None:
+    """Move a route's endpoints (and geohashes) to a fingerprint's ends."""
+    route.start_lat, route.start_lon, route.end_lat, route.end_lon = _fingerprint_endpoints(fingerprint)
+    route.start_geohash = encode_geohash(route.start_lat, route.start_lon)
+    route.end_geohash = encode_geohash(route.end_lat, route.end_lon)
+
+
+def _reset_route_stats(route: Route) -> None:
+    """Clear a route's aggregates before refolding its trips."""
+    route.trip_count = 0
+    route.efficiency_trip_count = 0
+    route.avg_distance_miles = None
+    route.avg_efficiency_kwh_per_mile = None
+    route.avg_duration_minutes = None
+    route.best_efficiency = None
+    route.worst_efficiency = None
+    route.last_traveled = None
+
+
+def add_trip_to_route_stats(route: Route, trip: Trip, fingerprint: Optional[Sequence[float]] = None) -> None:
+    """
+    Fold one trip into a route's running aggregates.
+
+    Args:
+        route: Route to update
+        trip: Trip joining the route
+        fingerprint: Trip's flat route fingerprint, folded into the route's
+            mean fingerprint when given
+    """
+    n = (route.trip_count or 0) + 1
+    route.trip_count = n
+    route.avg_distance_miles = _running_mean(route.avg_distance_miles, trip.distance_miles or 0, n)
+
+    if trip.kwh_per_mile:
+        e = (route.efficiency_trip_count or 0) + 1
+        route.efficiency_trip_count = e
+        route.avg_efficiency_kwh_per_mile = _running_mean(route.avg_efficiency_kwh_per_mile, trip.kwh_per_mile, e)
+
+        # Track best/worst
+        if not route.best_efficiency or trip.kwh_per_mile < route.best_efficiency:
+            route.best_efficiency = trip.kwh_per_mile
+
+        if not route.worst_efficiency or trip.kwh_per_mile > route.worst_efficiency:
+            route.worst_efficiency = trip.kwh_per_mile
+
+    if trip.start_time and trip.end_time:
+        duration = (trip.end_time - trip.start_time).total_seconds() / 60
+        route.avg_duration_minutes = _running_mean(route.avg_duration_minutes, duration, n)
+
+    if route.last_traveled is None or is_after(trip.start_time, route.last_traveled):
+        route.last_traveled = trip.start_time
+
+    if fingerprint:
+        if route.fingerprint and n > 1:
+            mean = unpack_fingerprint(route.fingerprint)
+            route.fingerprint = _pack_flat([m + (f - m) / n for m, f in zip(mean, fingerprint)])
+        else:
+            route.fingerprint = _pack_flat(fingerprint)
+
+
+def find_best_route(db: Session, fingerprint: Sequence[float], exclude_id: Optional[int] = None) -> Optional[Route]:
+    """
+    Find the route a trip fingerprint belongs to.
+
+    Candidates come from the geohash endpoint index; among those, the route
+    with the most similar mean fingerprint wins if it reaches
+    ROUTE_MIN_SIMILARITY. Routes detected before fingerprints were stored
+    match on endpoints alone.
+
+    Args:
+        db: Database session
+        fingerprint: Flat route fingerprint
+        exclude_id: Route to ignore
+
+    Returns:
+        Best matching route, or None
+    """
+    candidates = [
+        route
+        for route in find_candidate_routes(db, *_fingerprint_endpoints(fingerprint), ROUTE_MATCH_RADIUS_MILES)
+        if route.id != exclude_id
+    ]
+
+    with_fingerprint = [route for route in candidates if route.fingerprint]
+    distances = fingerprint_distances(fingerprint, [unpack_fingerprint(r.fingerprint) for r in with_fingerprint])
+    scored = [
+        (similarity_from_distance(distance), route)
+        for route, distance in zip(with_fingerprint, distances)
+    ]
+    scored = [match for match in scored if match[0] >= ROUTE_MIN_SIMILARITY]
+    if scored:
+        return max(scored, key=lambda match: match[0])[1]
+
+    legacy = [route for route in candidates if not route.fingerprint]
+    return legacy[0] if legacy else None
+
+
+def assign_trip_to_route(db: Session, trip: Trip) -> Optional[Route]:
+    """
+    Assign a trip to its route cluster, creating a route if none matches.
+
+    Only reads the trip's stored fingerprint (telemetry for trips finalized
+    before fingerprints were stored) and the routes near its endpoints.
+    Does not commit.
+
+    Args:
+        db: Database session
+        trip: Closed trip
+
+    Returns:
+        Assigned route, or None if the trip is too short, gas-only or has no
+        GPS track
+    """
+    if trip.route_id is not None:
+        return db.query(Route).filter(Route.id == trip.route_id).first()
+
+    if not trip.distance_miles or trip.distance_miles <= MIN_ROUTE_DISTANCE_MILES:
+        return None
+    if not trip.electric_miles or trip.electric_miles <= 0:
+        return None
+
+    fingerprint = trip_fingerprint(db, trip)
+    if not fingerprint:
+        return None
+
+    route = find_best_route(db, fingerprint)
+    if route is None:
+        route = Route(trip_count=0, efficiency_trip_count=0)
+        _set_route_endpoints(route, fingerprint)
+        db.add(route)
+        db.flush()
+        route.name = f"Route {route.id}"  # Auto-name
+
+    add_trip_to_route_stats(route, trip, fingerprint)
+    trip.route_id = route.id
+    return route
+
+
+def refresh_route_stats(db: Session, route: Route) -> None:
+    """
+    Recompute a route's aggregates and mean fingerprint from its assigned trips.
+
+    Args:
+        db: Database session
+        route: Route to refresh
     """
-    # Get trips with GPS data
     trips = (
-        (db.query(Trip).filter(and_(Trip.distance_miles > 0.5, Trip.electric_miles > 0)))
-        .order_by(Trip.start_time.desc())
-        .limit(100)
+        db.query(Trip)
+        .filter(Trip.route_id == route.id, Trip.deleted_at.is_(None))
+        .order_by(Trip.start_time)
         .all()
     )
+    fingerprints = [unpack_fingerprint(t.route_fingerprint) for t in trips if t.route_fingerprint]
+
+    _reset_route_stats(route)
+    for trip in trips:
+        add_trip_to_route_stats(route, trip)
+
+    if fingerprints:
+        mean = [sum(values) / len(fingerprints) for values in zip(*fingerprints)]
+        route.fingerprint = _pack_flat(mean)
+        _set_route_endpoints(route, mean)
+
 
-    routes_data = []
+def remove_trips_from_routes(db: Session, trips: Sequence[Trip]) -> int:
+    """
+    Take deleted trips out of their routes' aggregates and mean fingerprints.
+
+    Call before hard-deleted trips' rows are removed (or when they are
+    soft-deleted). The trips are detached and each affected route is
+    refreshed once from its remaining trips; routes left without trips are
+    deleted. Does not commit.
+
+    Args:
+        db: Database session
+        trips: Trips being deleted
+
+    Returns:
+        Number of routes updated
+    """
+    route_ids = {trip.route_id for trip in trips if trip.route_id is not None}
+    if not route_ids:
+        return 0
 
     for trip in trips:
-        endpoints = get_trip_endpoints(db, trip.id)
-        if not endpoints:
-            continue
+        trip.route_id = None
+    db.flush()
 
-        start_lat, start_lon, end_lat, end_lon = endpoints
+    routes = db.query(Route).filter(Route.id.in_(route_ids)).all()
+    for route in routes:
+        refresh_route_stats(db, route)
+        if not route.trip_count:
+            db.delete(route)
+    return len(routes)
 
-        # Check if matches existing route
-        existing_route = find_matching_route(db, start_lat, start_lon, end_lat, end_lon)
 
-        if existing_route:
-            # Update existing route statistics
-            existing_route.trip_count += 1
+def restore_trip_to_route(db: Session, trip: Trip) -> Optional[Route]:
+    """
+    Add a restored (previously soft-deleted) trip back to a route.
 
-            # Update averages
-            n = existing_route.trip_count
-            existing_route.avg_distance_miles = (
-                (existing_route.avg_distance_miles or 0) * (n - 1) + trip.distance_miles
-            ) / n
+    The trip is matched again like a newly finalized trip. Trips archived
+    while still attached to a route just refresh that route's stats.
+    Does not commit.
 
-            if trip.kwh_per_mile:
-                existing_route.avg_efficiency_kwh_per_mile = (
-                    (existing_route.avg_efficiency_kwh_per_mile or 0) * (n - 1) + trip.kwh_per_mile
-                ) / n
+    Args:
+        db: Database session
+        trip: Trip being restored
 
-                # Track best/worst
-                if not existing_route.best_efficiency or trip.kwh_per_mile < existing_route.best_efficiency:
-                    existing_route.best_efficiency = trip.kwh_per_mile
+    Returns:
+        Route the trip belongs to, or None if it isn't eligible
+    """
+    if not trip.is_closed:
+        return None
 
-                if not existing_route.worst_efficiency or trip.kwh_per_mile > existing_route.worst_efficiency:
-                    existing_route.worst_efficiency = trip.kwh_per_mile
+    if trip.route_id is not None:
+        route = db.query(Route).filter(Route.id == trip.route_id).first()
+        if route is not None:
+            db.flush()
+            refresh_route_stats(db, route)
+            return route
+        trip.route_id = None
 
-            duration = (trip.end_time - trip.start_time).total_seconds() / 60
-            existing_route.avg_duration_minutes = ((existing_route.avg_duration_minutes or 0) * (n - 1) + duration) / n
-            existing_route.last_traveled = trip.start_time
+    return assign_trip_to_route(db, trip)
 
-            db.commit()
-        else:
-            # Create new route
-            new_route = Route(
-                name=f"Route {len(routes_data) + 1}",  # Auto-name
-                start_lat=start_lat,
-                start_lon=start_lon,
-                end_lat=end_lat,
-                end_lon=end_lon,
-                trip_count=1,
-                avg_distance_miles=trip.distance_miles,
-                avg_efficiency_kwh_per_mile=trip.kwh_per_mile,
-                avg_duration_minutes=(trip.end_time - trip.start_time).total_seconds() / 60,
-                best_efficiency=trip.kwh_per_mile,
-                worst_efficiency=trip.kwh_per_mile,
-                last_traveled=trip.start_time,
+
+def split_drifted_routes(db: Session) -> int:
+    """
+    Reassign trips that no longer resemble their route's mean fingerprint.
+
+    A route's mean moves as trips join it, so early members can end up
+    below ROUTE_MIN_SIMILARITY. Those trips are removed, the route's stats
+    are refreshed, and each trip is assigned again (possibly to a new route).
+
+    Returns:
+        Number of trips reassigned
+    """
+    routes = {route.id: route for route in db.query(Route).filter(Route.fingerprint.isnot(None)).all()}
+    members = (
+        db.query(Trip.id, Trip.route_id, Trip.route_fingerprint)
+        .filter(Trip.route_id.isnot(None), Trip.route_fingerprint.isnot(None), Trip.deleted_at.is_(None))
+        .all()
+    )
+
+    by_route: Dict[int, List] = {}
+    for member in members:
+        if member.route_id in routes:
+            by_route.setdefault(member.route_id, []).append(member)
+
+    drifted_ids = []
+    drifted_routes = []
+    for route_id, rows in by_route.items():
+        mean = unpack_fingerprint(routes[route_id].fingerprint)
+        distances = fingerprint_distances(mean, [unpack_fingerprint(row.route_fingerprint) for row in rows])
+        outliers = [row.id for row, d in zip(rows, distances) if similarity_from_distance(d) < ROUTE_MIN_SIMILARITY]
+        if outliers:
+            drifted_ids.extend(outliers)
+            drifted_routes.append(routes[route_id])
+
+    if not drifted_ids:
+        return 0
+
+    db.query(Trip).filter(Trip.id.in_(drifted_ids)).update({Trip.route_id: None}, synchronize_session="fetch")
+    for route in drifted_routes:
+        refresh_route_stats(db, route)
+        if not route.trip_count:
+            db.delete(route)
+    db.flush()
+
+    for trip in db.query(Trip).filter(Trip.id.in_(drifted_ids)).order_by(Trip.start_time).all():
+        assign_trip_to_route(db, trip)
+
+    return len(drifted_ids)
+
+
+def merge_similar_routes(db: Session) -> int:
+    """
+    Merge routes whose mean fingerprints converged.
+
+    Larger routes absorb smaller ones with ROUTE_MERGE_SIMILARITY or more,
+    keeping the larger route's id and name.
+
+    Returns:
+        Number of routes merged away
+    """
+    routes = (
+        db.query(Route)
+        .filter(Route.fingerprint.isnot(None))
+        .order_by(Route.trip_count.desc(), Route.id)
+        .all()
+    )
+
+    merged_ids = set()
+    for route in routes:
+        if route.id in merged_ids:
+            continue
+
+        mean = unpack_fingerprint(route.fingerprint)
+        candidates = [
+            other
+            for other in find_candidate_routes(db, *_fingerprint_endpoints(mean), ROUTE_MATCH_RADIUS_MILES)
+            if other.id != route.id and other.id not in merged_ids and other.fingerprint
+        ]
+        distances = fingerprint_distances(mean, [unpack_fingerprint(other.fingerprint) for other in candidates])
+        absorbed = [
+            other
+            for other, distance in zip(candidates, distances)
+            if similarity_from_distance(distance) >= ROUTE_MERGE_SIMILARITY
+        ]
+
+        for other in absorbed:
+            db.query(Trip).filter(Trip.route_id == other.id).update(
+                {Trip.route_id: route.id}, synchronize_session="fetch"
             )
-            db.add(new_route)
-            db.commit()
+            db.delete(other)
+            merged_ids.add(other.id)
+
+        if absorbed:
+            db.flush()
+            refresh_route_stats(db, route)
+
+    return len(merged_ids)
+
+
+def rebalance_routes(db: Session) -> Dict[str, int]:
+    """
+    Periodic maintenance pass for incremental route clustering.
+
+    Splits drifted trips out of their routes, then merges routes that
+    converged. Commits once at the end.
+
+    Returns:
+        Dict with trips reassigned and routes merged
+    """
+    reassigned = split_drifted_routes(db)
+    merged = merge_similar_routes(db)
+    db.commit()
+
+    if reassigned or merged:
+        logger.info(f"Route rebalance: {reassigned} trips reassigned, {merged} routes merged")
+
+    return {"trips_reassigned": reassigned, "routes_merged": merged}
+
+
+def _unassigned_trips_query(db: Session):
+    """Closed trips eligible for a route that don't have one yet."""
+    return db.query(Trip).filter(
+        Trip.is_closed.is_(True),
+        Trip.deleted_at.is_(None),
+        Trip.route_id.is_(None),
+        Trip.distance_miles > MIN_ROUTE_DISTANCE_MILES,
+        Trip.electric_miles > 0,
+    )
+
+
+def detect_routes(db: Session, min_trips: int = 3) -> List[Dict]:
+    """
+    Detect common routes from trip history.
 
-            routes_data.append(new_route.to_dict())
+    Assigns trips that aren't on a route yet (oldest first), so repeated
+    calls only do new work, then returns the routes with at least
+    min_trips trips.
+    """
+    trips = _unassigned_trips_query(db).order_by(Trip.start_time).limit(MAX_TRIPS_PER_DETECT).all()
+
+    for trip in trips:
+        assign_trip_to_route(db, trip)
+
+    db.commit()
 
     # Get all routes that meet minimum trip threshold
     all_routes = db.query(Route).filter(Route.trip_count >= min_trips).order_by(Route.trip_count.desc()).all()
@@ -193,6 +560,51 @@ def detect_routes(db: Session, min_trips: int = 3) -> List[Dict]:
     return [route.to_dict() for route in all_routes]
 
 
+def recluster_all_routes(db: Session, batch_size: int = 200) -> Dict[str, int]:
+    """
+    Rebuild every route assignment from scratch.
+
+    Existing routes are kept as seeds (so names survive when a route still
+    exists) but their stats are reset; every eligible trip is reassigned in
+    chronological order, routes left empty are deleted, and a rebalance pass
+    runs at the end. Meant for offline use (scripts.recluster_routes).
+
+    Args:
+        db: Database session
+        batch_size: Trips assigned per commit
+
+    Returns:
+        Dict with trips assigned, routes remaining and routes deleted
+    """
+    db.query(Trip).filter(Trip.route_id.isnot(None)).update({Trip.route_id: None}, synchronize_session="fetch")
+    for route in db.query(Route).all():
+        _reset_route_stats(route)
+    db.commit()
+
+    trip_ids = [
+        row.id
+        for row in _unassigned_trips_query(db).with_entities(Trip.id).order_by(Trip.start_time, Trip.id).all()
+    ]
+
+    assigned = 0
+    for start in range(0, len(trip_ids), batch_size):
+        batch_ids = trip_ids[start:start + batch_size]
+        trips = db.query(Trip).filter(Trip.id.in_(batch_ids)).order_by(Trip.start_time, Trip.id).all()
+        assigned += sum(1 for trip in trips if assign_trip_to_route(db, trip))
+        db.commit()
+
+    deleted = db.query(Route).filter(Route.trip_count == 0).delete(synchronize_session="fetch")
+    db.commit()
+
+    rebalance_routes(db)
+
+    return {
+        "trips_assigned": assigned,
+        "routes": db.query(Route).count(),
+        "routes_deleted": deleted,
+    }
+
+
 def get_route_summary(db: Session) -> Dict:
     """
     Get summary of detected routes.
@@ -2,7 +2,8 @@
 Background scheduler service for VoltTracker.
 
 Handles periodic background tasks for trip finalization, refuel detection,
-and charging session management.
+charging session management, route cluster maintenance and efficiency
+model and battery degradation refits.
 """
 
 import logging
@@ -13,6 +14,11 @@ from config import Config
 from database import SessionLocal
 from exceptions import ChargingSessionError, DatabaseError
 from models import ChargingSession, FuelEvent, TelemetryRaw, Trip
+from services.battery_degradation_service import refit_degradation_stats
+from services.cache_warmer import schedule_cache_warm
+from services.charging_service import capture_charging_curve
+from services.efficiency_model_service import refit_if_stale
+from services.route_service import rebalance_routes
 from services.trip_service import finalize_trip
 from sqlalchemy import desc, func
 from sqlalchemy.exc import IntegrityError, OperationalError
@@ -31,7 +37,8 @@ def get_scheduler_db():
 
 def _finalize_charging_session(db, active_session, end_time=None, reason="completed"):
     """
-    Finalize a charging session by setting end time, calculating kWh added, and logging.
+    Finalize a charging session by setting end time, storing the charging curve,
+    calculating kWh added, and logging.
 
     Args:
         db: Database session
@@ -42,6 +49,8 @@ def _finalize_charging_session(db, active_session, end_time=None, reason="comple
     active_session.end_time = end_time or utc_now()
     active_session.is_complete = True
 
+    capture_charging_curve(db, active_session)
+
     # Calculate kWh added from SOC change
     if active_session.start_soc is not None and active_session.end_soc is not None:
         from utils import soc_to_kwh
@@ -102,6 +111,9 @@ def close_stale_trips():
             finalize_trip(db, trip)
 
         db.commit()
+
+        if stale_trips:
+            schedule_cache_warm("trip_finalized")
     except (IntegrityError, OperationalError) as e:
         error = DatabaseError(f"Failed to close stale trips: {e}")
         logger.error(str(error), exc_info=True)
@@ -268,6 +280,55 @@ def check_charging_sessions():
         SessionLocal.remove()
 
 
+def rebalance_route_clusters():
+    """Split drifted trips out of their routes and merge converged routes."""
+    db = get_scheduler_db()
+    try:
+        rebalance_routes(db)
+    except (IntegrityError, OperationalError) as e:
+        error = DatabaseError(f"Failed to rebalance routes: {e}")
+        logger.error(str(error), exc_info=True)
+        db.rollback()
+    except Exception as e:
+        logger.exception(f"Unexpected error rebalancing routes: {e}")
+        db.rollback()
+    finally:
+        SessionLocal.remove()
+
+
+def refit_efficiency_model():
+    """Refit the efficiency model from scratch if trips or battery readings changed."""
+    db = get_scheduler_db()
+    try:
+        refit_if_stale(db)
+    except (IntegrityError, OperationalError) as e:
+        error = DatabaseError(f"Failed to refit efficiency model: {e}")
+        logger.error(str(error), exc_info=True)
+        db.rollback()
+    except Exception as e:
+        logger.exception(f"Unexpected error refitting efficiency model: {e}")
+        db.rollback()
+    finally:
+        SessionLocal.remove()
+
+
+def refit_battery_degradation():
+    """Rebuild the battery degradation regression and its robust fit from all readings."""
+    db = get_scheduler_db()
+    try:
+        refit_degradation_stats(db)
+        db.commit()
+    except (IntegrityError, OperationalError) as e:
+        error = DatabaseError(f"Failed to refit battery degradation: {e}")
+        logger.error(str(error), exc_info=True)
+        db.rollback()
+    except Exception as e:
+        logger.exception(f"Unexpected error refitting battery degradation: {e}")
+        db.rollback()
+    finally:
+        SessionLocal.remove()
+
+
 def init_scheduler():
     """
     Initialize and start the background scheduler.
@@ -280,6 +341,9 @@ def init_scheduler():
     scheduler.add_job(close_stale_trips, "interval", minutes=1)
     scheduler.add_job(check_refuel_events, "interval", minutes=5)
     scheduler.add_job(check_charging_sessions, "interval", minutes=2)
+    scheduler.add_job(rebalance_route_clusters, "interval", hours=6)
+    scheduler.add_job(refit_efficiency_model, "interval", hours=6)
+    scheduler.add_job(refit_battery_degradation, "interval", hours=24)
     scheduler.start()
     logger.info("Background scheduler initialized")
     return scheduler
@@ -11,6 +11,11 @@ from datetime import datetime
 from config import Config
 from exceptions import WeatherAPIError
 from models import SocTransition, TelemetryRaw, Trip
+from services.efficiency_model_service import add_trip_to_model
+from services.heatmap_service import update_heatmap_grid
+from services.maintenance_service import add_trip_engine_hours
+from services.powertrain_service import store_trip_powertrain
+from services.route_service import assign_trip_to_route
 from utils import (
     calculate_average_temp,
     calculate_electric_kwh,
@@ -27,6 +32,15 @@ from utils.elevation import (
     sample_coordinates,
 )
 from utils.error_codes import ErrorCode, StructuredError
+from utils.geohash import encode as encode_geohash
+from utils.polyline import (
+    STORED_GEOMETRY_ZOOM,
+    calculate_bounds,
+    encode_polyline,
+    simplify,
+    tolerance_for_zoom,
+)
+from utils.route_clustering import compute_route_fingerprint, pack_fingerprint
 from utils.weather import get_weather_for_location, get_weather_impact_factor
 from utils.wide_events import WideEvent
 
@@ -374,15 +388,63 @@ def fetch_trip_elevation(trip: Trip, points: list) -> None:
         logger.exception(f"Unexpected error fetching elevation for trip {trip.id}: {e}")
 
 
+def compute_trip_geometry(trip: Trip, points: list) -> None:
+    """
+    Store the trip's route geometry for map display and proximity search.
+
+    The GPS track is simplified with Ramer-Douglas-Peucker at a street-level
+    tolerance, so the map endpoint can serve it without reading telemetry
+    and only simplify further for lower zoom levels. The first and last GPS
+    fixes are stored with their geohashes for indexed radius queries.
+
+    Args:
+        trip: Trip to update
+        points: List of telemetry dicts (ordered by timestamp)
+    """
+    coords = [
+        (float(p["latitude"]), float(p["longitude"]))
+        for p in points
+        if p.get("latitude") is not None and p.get("longitude") is not None
+    ]
+    trip.gps_point_count = len(coords)
+
+    if len(coords) < 2:
+        trip.route_polyline = None
+        trip.route_bounds_north = trip.route_bounds_south = None
+        trip.route_bounds_east = trip.route_bounds_west = None
+        trip.start_lat = trip.start_lon = trip.start_geohash = None
+        trip.end_lat = trip.end_lon = trip.end_geohash = None
+        trip.route_fingerprint = None
+        return
+
+    bounds = calculate_bounds(coords)
+    trip.route_polyline = encode_polyline(simplify(coords, tolerance_for_zoom(STORED_GEOMETRY_ZOOM)))
+    trip.route_bounds_north = bounds["north"]
+    trip.route_bounds_south = bounds["south"]
+    trip.route_bounds_east = bounds["east"]
+    trip.route_bounds_west = bounds["west"]
+
+    (trip.start_lat, trip.start_lon), (trip.end_lat, trip.end_lon) = coords[0], coords[-1]
+    trip.start_geohash = encode_geohash(trip.start_lat, trip.start_lon)
+    trip.end_geohash = encode_geohash(trip.end_lat, trip.end_lon)
+    trip.route_fingerprint = pack_fingerprint(compute_route_fingerprint(coords))
+
+
 def finalize_trip(db, trip: Trip):
     """
     Finalize a trip by calculating statistics.
 
     Orchestrates the trip finalization process by calling specialized helpers:
     - calculate_trip_basics: End time, distance, temperature
+    - add_trip_engine_hours: Engine runtime and lifetime engine hours
+    - store_trip_powertrain: Powertrain mode durations and transitions
     - process_gas_mode: Gas/electric split, MPG, SOC transition
     - calculate_electric_efficiency: kWh used, efficiency
     - fetch_trip_weather: Weather conditions during trip
+    - compute_trip_geometry: Route polyline, bounds and geohashed endpoints
+    - update_heatmap_grid: Spatial heatmap cell totals
+    - assign_trip_to_route: Incremental route clustering
+    - add_trip_to_model: Incremental efficiency model refit
 
     Args:
         db: Database session
@@ -449,6 +511,14 @@ def finalize_trip(db, trip: Trip):
             avg_temp_f=trip.ambient_temp_avg_f,
         )
 
+        # Store engine runtime and add it to the lifetime engine hours
+        with event.timer("update_engine_hours"):
+            add_trip_engine_hours(db, trip, telemetry)
+
+        # Store time spent in each powertrain mode
+        with event.timer("classify_powertrain"):
+            store_trip_powertrain(trip, telemetry)
+
         # Process gas mode entry and related calculations
         with event.timer("process_gas_mode"):
             process_gas_mode(db, trip, telemetry, points)
@@ -475,6 +545,22 @@ def finalize_trip(db, trip: Trip):
         event.add_business_metric("electric_kwh_used", trip.electric_kwh_used)
         event.add_business_metric("kwh_per_mile", trip.kwh_per_mile)
 
+        # Simplify the GPS track once so map requests don't re-read telemetry
+        with event.timer("compute_geometry"):
+            compute_trip_geometry(trip, points)
+
+        event.add_business_metric("gps_points", trip.gps_point_count)
+
+        # Add this trip's samples to the map heatmap grid
+        with event.timer("update_heatmap_grid"):
+            update_heatmap_grid(db, trip, points)
+
+        # Join (or start) a route cluster using the fingerprint stored above
+        with event.timer("assign_route"):
+            route = assign_trip_to_route(db, trip)
+
+        event.add_business_metric("route_id", route.id if route else None)
+
         # Fetch weather data (if feature enabled)
         if Config.FEATURE_WEATHER_INTEGRATION:
             with event.timer("fetch_weather"):
@@ -506,6 +592,10 @@ def finalize_trip(db, trip: Trip):
                 elevation_net_change_m=trip.elevation_net_change_m,
             )
 
+        # Fold the trip into the efficiency model (needs weather and elevation)
+        with event.timer("update_efficiency_model"):
+            add_trip_to_model(db, trip)
+
         # Enrich event with vehicle context (loggingsucks.com progressive enrichment pattern)
         # Include battery health for trip finalization (business-critical operation)
         with event.timer("context_enrichment"):
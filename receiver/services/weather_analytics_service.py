@@ -11,10 +11,11 @@ from typing import Any, Dict, List, Optional
 
 from config import Config
 from calculations import calculate_efficiency_impact_percent, BASELINE_KWH_PER_MILE
-from sqlalchemy import and_, case, extract, func, literal_column
+from sqlalchemy import and_, case, func, literal, literal_column, null, select, tuple_
 from sqlalchemy.orm import Session
 
 from models import Trip
+from utils.cache_utils import cache_result, generate_cache_key
 from utils.timezone import utc_now
 
 
@@ -48,6 +49,286 @@ def _get_base_trip_filter():
     )
 
 
+# ============================================================================
+# Weather cube
+# ============================================================================
+#
+# The band endpoints, seasonal trends and the correlation summary are all
+# aggregates of the same filtered trips, and the dashboard requests them
+# together. The cube computes every dimension (temperature, precipitation,
+# wind, day and the grand total) in one pass over trips: a GROUPING SETS
+# query on PostgreSQL, a single scan in Python elsewhere. The result is
+# cached per date range and invalidated when trips change.
+
+# Seconds to cache a cube (trip commits invalidate it sooner)
+CUBE_CACHE_TTL = 3600
+
+# Seconds an expired cube may still be served while it rebuilds in the background
+CUBE_STALE_TTL = 600
+
+# Aggregates kept for every cube cell
+_CELL_FIELDS = (
+    "n", "eff_sum", "eff_min", "eff_max",
+    "temp_sum", "temp_n", "precip_sum", "precip_n", "wind_sum", "wind_n",
+    "miles", "kwh", "impact_sum", "impact_n",
+)
+
+
+def _range_band(value: Optional[float], bands) -> Optional[str]:
+    """Classify a value into (name, low, high) bands (low inclusive, high exclusive)."""
+    if value is None:
+        return None
+    for name, _low, high in bands:
+        if high is None or value < high:
+            return name
+    return None
+
+
+def _range_band_case(column, bands):
+    """SQL counterpart of _range_band."""
+    whens = [(column.is_(None), null())]
+    else_ = null()
+    for name, _low, high in bands:
+        if high is None:
+            else_ = literal(name)
+        else:
+            whens.append((column < high, literal(name)))
+    return case(*whens, else_=else_)
+
+
+def _precip_band(value: Optional[float]) -> Optional[str]:
+    """Classify precipitation (inches) into dry/light/moderate/heavy."""
+    if value is None:
+        return None
+    if value == 0:
+        return "dry"
+    if value <= 0.1:
+        return "light_rain"
+    if value <= 0.25:
+        return "moderate_rain"
+    return "heavy_rain"
+
+
+def _precip_band_case(column):
+    """SQL counterpart of _precip_band."""
+    return case(
+        (column.is_(None), null()),
+        (column == 0, literal("dry")),
+        (column <= 0.1, literal("light_rain")),
+        (column <= 0.25, literal("moderate_rain")),
+        else_=literal("heavy_rain"),
+    )
+
+
+def _empty_cell() -> Dict[str, Any]:
+    cell = dict.fromkeys(_CELL_FIELDS, 0)
+    cell["eff_min"] = cell["eff_max"] = cell["kwh"] = None
+    return cell
+
+
+def _add_to_cell(cell: Dict[str, Any], kwh_per_mile, miles, kwh_used, temp, precip, wind, impact) -> None:
+    """Accumulate one trip into a cube cell."""
+    cell["n"] += 1
+    cell["eff_sum"] += kwh_per_mile
+    cell["eff_min"] = kwh_per_mile if cell["eff_min"] is None else min(cell["eff_min"], kwh_per_mile)
+    cell["eff_max"] = kwh_per_mile if cell["eff_max"] is None else max(cell["eff_max"], kwh_per_mile)
+    cell["miles"] += miles
+    if kwh_used is not None:
+        cell["kwh"] = (cell["kwh"] or 0) + kwh_used
+    if temp is not None:
+        cell["temp_sum"] += temp
+        cell["temp_n"] += 1
+    if precip is not None:
+        cell["precip_sum"] += precip
+        cell["precip_n"] += 1
+    if wind is not None:
+        cell["wind_sum"] += wind
+        cell["wind_n"] += 1
+    if impact is not None:
+        cell["impact_sum"] += impact
+        cell["impact_n"] += 1
+
+
+def _merge_cells(cells) -> Dict[str, Any]:
+    """Combine cube cells (e.g. the days of a month)."""
+    merged = _empty_cell()
+    for cell in cells:
+        for field in _CELL_FIELDS:
+            value = cell[field]
+            if value is None:
+                continue
+            if field == "eff_min":
+                merged[field] = value if merged[field] is None else min(merged[field], value)
+            elif field == "eff_max":
+                merged[field] = value if merged[field] is None else max(merged[field], value)
+            elif field == "kwh":
+                merged[field] = (merged[field] or 0) + value
+            else:
+                merged[field] += value
+    return merged
+
+
+def _cell_avg(cell: Dict[str, Any], sum_field: str, count_field: str) -> Optional[float]:
+    """Average of a summed field (None when nothing was counted)."""
+    return cell[sum_field] / cell[count_field] if cell[count_field] else None
+
+
+def _empty_cube() -> Dict[str, Any]:
+    return {"total": _empty_cell(), "temperature": {}, "precipitation": {}, "wind": {}, "daily": {}}
+
+
+def _cube_filters(start_date: Optional[datetime], end_date: Optional[datetime]) -> List:
+    filters = [_get_base_trip_filter()]
+    if start_date:
+        filters.append(Trip.start_time >= start_date)
+    if end_date:
+        filters.append(Trip.start_time <= end_date)
+    return filters
+
+
+def _build_cube_grouping_sets(db: Session, filters: List) -> Dict[str, Any]:
+    """Compute the cube with one GROUPING SETS query (PostgreSQL)."""
+    banded = (
+        select(
+            _range_band_case(Trip.weather_temp_f, TEMP_BANDS).label("temp_band"),
+            _precip_band_case(Trip.weather_precipitation_in).label("precip_band"),
+            _range_band_case(Trip.weather_wind_mph, WIND_BANDS).label("wind_band"),
+            func.date(Trip.start_time).label("day"),
+            Trip.kwh_per_mile,
+            Trip.electric_miles,
+            Trip.electric_kwh_used,
+            Trip.weather_temp_f,
+            Trip.weather_precipitation_in,
+            Trip.weather_wind_mph,
+            Trip.weather_impact_factor,
+        )
+        .where(and_(*filters))
+        .subquery()
+    )
+    c = banded.c
+    dimensions = (c.temp_band, c.precip_band, c.wind_band, c.day)
+
+    stmt = select(
+        *dimensions,
+        func.grouping(*dimensions).label("grouping"),
+        func.count().label("n"),
+        func.sum(c.kwh_per_mile).label("eff_sum"),
+        func.min(c.kwh_per_mile).label("eff_min"),
+        func.max(c.kwh_per_mile).label("eff_max"),
+        func.sum(c.weather_temp_f).label("temp_sum"),
+        func.count(c.weather_temp_f).label("temp_n"),
+        func.sum(c.weather_precipitation_in).label("precip_sum"),
+        func.count(c.weather_precipitation_in).label("precip_n"),
+        func.sum(c.weather_wind_mph).label("wind_sum"),
+        func.count(c.weather_wind_mph).label("wind_n"),
+        func.sum(c.electric_miles).label("miles"),
+        func.sum(c.electric_kwh_used).label("kwh"),
+        func.sum(c.weather_impact_factor).label("impact_sum"),
+        func.count(c.weather_impact_factor).label("impact_n"),
+    ).group_by(func.grouping_sets(*[tuple_(dimension) for dimension in dimensions], tuple_()))
+
+    # GROUPING() bitmask: a bit is set for each dimension NOT grouped by
+    # (temp is the most significant bit)
+    sets = {0b0111: ("temperature", "temp_band"), 0b1011: ("precipitation", "precip_band"),
+            0b1101: ("wind", "wind_band"), 0b1110: ("daily", "day")}
+
+    cube = _empty_cube()
+    for row in db.execute(stmt):
+        cell = _empty_cell()
+        for field in _CELL_FIELDS:
+            value = getattr(row, field)
+            if value is not None:
+                cell[field] = value if field == "n" or field.endswith("_n") else float(value)
+
+        if row.grouping == 0b1111:
+            cube["total"] = cell
+            continue
+        dimension, column = sets.get(row.grouping, (None, None))
+        key = getattr(row, column) if column else None
+        if key is None:
+            continue  # Trips without that weather reading
+        if dimension == "daily":
+            key = key.isoformat() if hasattr(key, "isoformat") else str(key)
+        cube[dimension][key] = cell
+
+    return cube
+
+
+def _build_cube_single_scan(db: Session, filters: List) -> Dict[str, Any]:
+    """Compute the cube with one scan over the filtered trips (SQLite and others)."""
+    rows = db.query(
+        Trip.start_time,
+        Trip.kwh_per_mile,
+        Trip.electric_miles,
+        Trip.electric_kwh_used,
+        Trip.weather_temp_f,
+        Trip.weather_precipitation_in,
+        Trip.weather_wind_mph,
+        Trip.weather_impact_factor,
+    ).filter(and_(*filters))
+
+    cube = _empty_cube()
+    for start_time, kwh_per_mile, miles, kwh_used, temp, precip, wind, impact in rows:
+        values = (kwh_per_mile, miles, kwh_used, temp, precip, wind, impact)
+        _add_to_cell(cube["total"], *values)
+
+        for dimension, key in (
+            ("temperature", _range_band(temp, TEMP_BANDS)),
+            ("precipitation", _precip_band(precip)),
+            ("wind", _range_band(wind, WIND_BANDS)),
+            ("daily", start_time.date().isoformat() if start_time else None),
+        ):
+            if key is not None:
+                cell = cube[dimension].get(key)
+                if cell is None:
+                    cell = cube[dimension][key] = _empty_cell()
+                _add_to_cell(cell, *values)
+
+    return cube
+
+
+@cache_result(
+    "weather:cube",
+    ttl=CUBE_CACHE_TTL,
+    stale_ttl=CUBE_STALE_TTL,
+    tags=["trips"],
+    key_func=lambda db, start_date=None, end_date=None: generate_cache_key(
+        "weather:cube",
+        start_date.isoformat() if start_date else None,
+        end_date.isoformat() if end_date else None,
+    ),
+)
+def get_weather_cube(
+    db: Session,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Aggregate valid trips by every weather dimension in one pass.
+
+    Args:
+        db: Database session
+        start_date: Start of date range (default: all time)
+        end_date: End of date range (default: no limit)
+
+    Returns:
+        Dict with a "total" cell and cells keyed by band under
+        "temperature", "precipitation", "wind" and "daily" (ISO date).
+        Each cell holds counts and sums (n, eff_sum, eff_min, eff_max,
+        temp_sum/temp_n, precip_sum/precip_n, wind_sum/wind_n, miles, kwh,
+        impact_sum/impact_n). Cached; treat as read-only.
+    """
+    filters = _cube_filters(start_date, end_date)
+    if db.get_bind().dialect.name == "postgresql":
+        return _build_cube_grouping_sets(db, filters)
+    return _build_cube_single_scan(db, filters)
+
+
+def _round_or_none(value: Optional[float], digits: int) -> Optional[float]:
+    """Round a value, mapping None and 0 to None (as the endpoints always have)."""
+    return round(value, digits) if value else None
+
+
 def get_efficiency_by_temperature_bands(
     db: Session,
     start_date: Optional[datetime] = None,
@@ -64,47 +345,8 @@ def get_efficiency_by_temperature_bands(
     Returns:
         Dictionary with temperature band analysis
     """
-    # Build temperature band case expression
-    temp_band_case = case(
-        (Trip.weather_temp_f < 32, "freezing"),
-        (Trip.weather_temp_f < 45, "cold"),
-        (Trip.weather_temp_f < 55, "cool"),
-        (Trip.weather_temp_f < 75, "ideal"),
-        (Trip.weather_temp_f < 85, "warm"),
-        (Trip.weather_temp_f < 95, "hot"),
-        else_="very_hot",
-    )
+    cube = get_weather_cube(db, start_date, end_date)
 
-    # Base query filters
-    filters = [
-        _get_base_trip_filter(),
-        Trip.weather_temp_f.isnot(None),
-    ]
-
-    if start_date:
-        filters.append(Trip.start_time >= start_date)
-    if end_date:
-        filters.append(Trip.start_time <= end_date)
-
-    # Query for aggregated stats by temperature band
-    # Note: stddev is not available in SQLite, so we skip it for test compatibility
-    results = (
-        db.query(
-            temp_band_case.label("band"),
-            func.avg(Trip.kwh_per_mile).label("avg_efficiency"),
-            func.count(Trip.id).label("sample_count"),
-            func.min(Trip.kwh_per_mile).label("best_efficiency"),
-            func.max(Trip.kwh_per_mile).label("worst_efficiency"),
-            func.avg(Trip.weather_temp_f).label("avg_temp"),
-            func.sum(Trip.electric_miles).label("total_miles"),
-        )
-        .filter(and_(*filters))
-        .group_by(temp_band_case)
-        .all()
-    )
-
-    # Format results with band order preserved
-    band_order = ["freezing", "cold", "cool", "ideal", "warm", "hot", "very_hot"]
     band_labels = {
         "freezing": "<32°F",
         "cold": "32-45°F",
@@ -115,26 +357,23 @@ def get_efficiency_by_temperature_bands(
         "very_hot": ">95°F",
     }
 
-    bands_data = {}
-    for row in results:
-        avg_eff = round(row.avg_efficiency, 4) if row.avg_efficiency else None
-        bands_data[row.band] = {
-            "range": band_labels.get(row.band, row.band),
+    bands_list = []
+    for band, _low, _high in TEMP_BANDS:
+        cell = cube["temperature"].get(band)
+        if cell is None:
+            continue
+        avg_eff = _round_or_none(_cell_avg(cell, "eff_sum", "n"), 4)
+        bands_list.append({
+            "range": band_labels.get(band, band),
             "avg_kwh_per_mile": avg_eff,
-            "sample_count": row.sample_count,
-            "best_efficiency": round(row.best_efficiency, 4) if row.best_efficiency else None,
-            "worst_efficiency": round(row.worst_efficiency, 4) if row.worst_efficiency else None,
-            "avg_temp_f": round(row.avg_temp, 1) if row.avg_temp else None,
-            "total_miles": round(row.total_miles, 1) if row.total_miles else None,
+            "sample_count": cell["n"],
+            "best_efficiency": _round_or_none(cell["eff_min"], 4),
+            "worst_efficiency": _round_or_none(cell["eff_max"], 4),
+            "avg_temp_f": _round_or_none(_cell_avg(cell, "temp_sum", "temp_n"), 1),
+            "total_miles": _round_or_none(cell["miles"], 1),
             "efficiency_impact_percent": calculate_efficiency_impact_percent(avg_eff) if avg_eff else None,
-        }
-
-    # Build ordered list
-    bands_list = []
-    for band in band_order:
-        if band in bands_data:
-            bands_data[band]["band"] = band
-            bands_list.append(bands_data[band])
+            "band": band,
+        })
 
     return {
         "temperature_bands": bands_list,
@@ -160,38 +399,7 @@ def get_efficiency_by_precipitation(
     Returns:
         Dictionary with precipitation impact analysis
     """
-    # Build precipitation case expression
-    precip_case = case(
-        (Trip.weather_precipitation_in.is_(None), "unknown"),
-        (Trip.weather_precipitation_in == 0, "dry"),
-        (Trip.weather_precipitation_in <= 0.1, "light_rain"),
-        (Trip.weather_precipitation_in <= 0.25, "moderate_rain"),
-        else_="heavy_rain",
-    )
-
-    # Base query filters
-    filters = [
-        _get_base_trip_filter(),
-        Trip.weather_precipitation_in.isnot(None),
-    ]
-
-    if start_date:
-        filters.append(Trip.start_time >= start_date)
-    if end_date:
-        filters.append(Trip.start_time <= end_date)
-
-    results = (
-        db.query(
-            precip_case.label("condition"),
-            func.avg(Trip.kwh_per_mile).label("avg_efficiency"),
-            func.count(Trip.id).label("sample_count"),
-            func.avg(Trip.weather_precipitation_in).label("avg_precip"),
-            func.sum(Trip.electric_miles).label("total_miles"),
-        )
-        .filter(and_(*filters))
-        .group_by(precip_case)
-        .all()
-    )
+    cube = get_weather_cube(db, start_date, end_date)
 
     condition_labels = {
         "dry": "No Precipitation",
@@ -201,18 +409,17 @@ def get_efficiency_by_precipitation(
     }
 
     conditions = []
-    for row in results:
-        if row.condition == "unknown":
-            continue
-        avg_eff = round(row.avg_efficiency, 4) if row.avg_efficiency else None
+    for condition, cell in cube["precipitation"].items():
+        avg_eff = _round_or_none(_cell_avg(cell, "eff_sum", "n"), 4)
+        avg_precip = _cell_avg(cell, "precip_sum", "precip_n")
         conditions.append(
             {
-                "condition": row.condition,
-                "label": condition_labels.get(row.condition, row.condition),
+                "condition": condition,
+                "label": condition_labels.get(condition, condition),
                 "avg_kwh_per_mile": avg_eff,
-                "sample_count": row.sample_count,
-                "avg_precipitation_in": round(row.avg_precip, 3) if row.avg_precip else 0,
-                "total_miles": round(row.total_miles, 1) if row.total_miles else None,
+                "sample_count": cell["n"],
+                "avg_precipitation_in": round(avg_precip, 3) if avg_precip else 0,
+                "total_miles": _round_or_none(cell["miles"], 1),
                 "efficiency_impact_percent": calculate_efficiency_impact_percent(avg_eff) if avg_eff else None,
             }
         )
@@ -239,37 +446,7 @@ def get_efficiency_by_wind(
     Returns:
         Dictionary with wind impact analysis
     """
-    # Build wind speed case expression
-    wind_case = case(
-        (Trip.weather_wind_mph < 5, "calm"),
-        (Trip.weather_wind_mph < 15, "light"),
-        (Trip.weather_wind_mph < 25, "moderate"),
-        else_="strong",
-    )
-
-    # Base query filters
-    filters = [
-        _get_base_trip_filter(),
-        Trip.weather_wind_mph.isnot(None),
-    ]
-
-    if start_date:
-        filters.append(Trip.start_time >= start_date)
-    if end_date:
-        filters.append(Trip.start_time <= end_date)
-
-    results = (
-        db.query(
-            wind_case.label("band"),
-            func.avg(Trip.kwh_per_mile).label("avg_efficiency"),
-            func.count(Trip.id).label("sample_count"),
-            func.avg(Trip.weather_wind_mph).label("avg_wind"),
-            func.sum(Trip.electric_miles).label("total_miles"),
-        )
-        .filter(and_(*filters))
-        .group_by(wind_case)
-        .all()
-    )
+    cube = get_weather_cube(db, start_date, end_date)
 
     band_labels = {
         "calm": "<5 mph",
@@ -277,23 +454,22 @@ def get_efficiency_by_wind(
         "moderate": "15-25 mph",
         "strong": ">25 mph",
     }
-    band_order = ["calm", "light", "moderate", "strong"]
-
-    bands_data = {}
-    for row in results:
-        avg_eff = round(row.avg_efficiency, 4) if row.avg_efficiency else None
-        bands_data[row.band] = {
-            "band": row.band,
-            "range": band_labels.get(row.band, row.band),
+
+    bands_list = []
+    for band, _low, _high in WIND_BANDS:
+        cell = cube["wind"].get(band)
+        if cell is None:
+            continue
+        avg_eff = _round_or_none(_cell_avg(cell, "eff_sum", "n"), 4)
+        bands_list.append({
+            "band": band,
+            "range": band_labels.get(band, band),
             "avg_kwh_per_mile": avg_eff,
-            "sample_count": row.sample_count,
-            "avg_wind_mph": round(row.avg_wind, 1) if row.avg_wind else None,
-            "total_miles": round(row.total_miles, 1) if row.total_miles else None,
+            "sample_count": cell["n"],
+            "avg_wind_mph": _round_or_none(_cell_avg(cell, "wind_sum", "wind_n"), 1),
+            "total_miles": _round_or_none(cell["miles"], 1),
             "efficiency_impact_percent": calculate_efficiency_impact_percent(avg_eff) if avg_eff else None,
-        }
-
-    # Build ordered list
-    bands_list = [bands_data[band] for band in band_order if band in bands_data]
+        })
 
     return {
         "wind_bands": bands_list,
@@ -308,6 +484,9 @@ def get_seasonal_trends(
     """
     Get efficiency trends by month/season over time.
 
+    Months are rolled up from the cube's daily cells, so the look-back
+    window starts at the beginning of its first day.
+
     Args:
         db: Database session
         months_back: Number of months to look back
@@ -315,44 +494,25 @@ def get_seasonal_trends(
     Returns:
         Dictionary with seasonal trend analysis
     """
-    start_date = utc_now() - timedelta(days=months_back * 30)
-
-    # Use extract for cross-database compatibility (SQLite + PostgreSQL)
-    year_expr = extract("year", Trip.start_time)
-    month_expr = extract("month", Trip.start_time)
-
-    filters = [
-        _get_base_trip_filter(),
-        Trip.start_time >= start_date,
-    ]
-
-    results = (
-        db.query(
-            year_expr.label("year"),
-            month_expr.label("month"),
-            func.avg(Trip.kwh_per_mile).label("avg_efficiency"),
-            func.count(Trip.id).label("trip_count"),
-            func.avg(Trip.weather_temp_f).label("avg_temp"),
-            func.sum(Trip.electric_miles).label("total_miles"),
-        )
-        .filter(and_(*filters))
-        .group_by(year_expr, month_expr)
-        .order_by(year_expr, month_expr)
-        .all()
-    )
+    start_day = (utc_now() - timedelta(days=months_back * 30)).date().isoformat()
+    cube = get_weather_cube(db)
+
+    days_by_month: Dict[str, List[Dict[str, Any]]] = {}
+    for day, cell in cube["daily"].items():
+        if day >= start_day:
+            days_by_month.setdefault(day[:7], []).append(cell)
 
     monthly_data = []
-    for row in results:
-        avg_eff = round(row.avg_efficiency, 4) if row.avg_efficiency else None
-        # Format month as YYYY-MM
-        month_str = f"{int(row.year)}-{int(row.month):02d}" if row.year and row.month else None
+    for month in sorted(days_by_month):
+        cell = _merge_cells(days_by_month[month])
+        avg_eff = _round_or_none(_cell_avg(cell, "eff_sum", "n"), 4)
         monthly_data.append(
             {
-                "month": month_str,
+                "month": month,
                 "avg_kwh_per_mile": avg_eff,
-                "trip_count": row.trip_count,
-                "avg_temp_f": round(row.avg_temp, 1) if row.avg_temp else None,
-                "total_miles": round(row.total_miles, 1) if row.total_miles else None,
+                "trip_count": cell["n"],
+                "avg_temp_f": _round_or_none(_cell_avg(cell, "temp_sum", "temp_n"), 1),
+                "total_miles": _round_or_none(cell["miles"], 1),
                 "efficiency_impact_percent": calculate_efficiency_impact_percent(avg_eff) if avg_eff else None,
             }
         )
@@ -475,62 +635,30 @@ def get_weather_efficiency_correlation(
     Returns:
         Dictionary with correlation analysis
     """
-    filters = [_get_base_trip_filter()]
+    cube = get_weather_cube(db, start_date, end_date)
+    overall = cube["total"]
 
-    if start_date:
-        filters.append(Trip.start_time >= start_date)
-    if end_date:
-        filters.append(Trip.start_time <= end_date)
-
-    # Get overall statistics
-    # Note: stddev is not available in SQLite, so we skip it for test compatibility
-    overall = (
-        db.query(
-            func.count(Trip.id).label("total_trips"),
-            func.avg(Trip.kwh_per_mile).label("avg_efficiency"),
-            func.sum(Trip.electric_miles).label("total_miles"),
-            func.sum(Trip.electric_kwh_used).label("total_kwh"),
-        )
-        .filter(and_(*filters))
-        .first()
-    )
-
-    # Get trips with weather data
-    weather_stats = (
-        db.query(
-            func.count(Trip.id).label("trips_with_weather"),
-            func.avg(Trip.weather_impact_factor).label("avg_impact_factor"),
-        )
-        .filter(
-            and_(
-                *filters,
-                Trip.weather_temp_f.isnot(None),
-            )
-        )
-        .first()
-    )
+    # Trips with weather data are the ones that landed in a temperature band
+    weather = _merge_cells(cube["temperature"].values())
+    avg_impact = _cell_avg(weather, "impact_sum", "impact_n")
 
     return {
         "summary": {
-            "total_trips": overall.total_trips if overall else 0,
-            "trips_with_weather_data": weather_stats.trips_with_weather if weather_stats else 0,
+            "total_trips": overall["n"],
+            "trips_with_weather_data": weather["n"],
             "coverage_percent": (
-                round((weather_stats.trips_with_weather / overall.total_trips) * 100, 1)
-                if overall and overall.total_trips > 0 and weather_stats
+                round((weather["n"] / overall["n"]) * 100, 1)
+                if overall["n"] > 0
                 else 0
             ),
         },
         "efficiency": {
-            "avg_kwh_per_mile": round(overall.avg_efficiency, 4) if overall and overall.avg_efficiency else None,
-            "total_miles": round(overall.total_miles, 1) if overall and overall.total_miles else None,
-            "total_kwh": round(overall.total_kwh, 1) if overall and overall.total_kwh else None,
+            "avg_kwh_per_mile": _round_or_none(_cell_avg(overall, "eff_sum", "n"), 4),
+            "total_miles": _round_or_none(overall["miles"], 1),
+            "total_kwh": _round_or_none(overall["kwh"], 1),
         },
         "weather_impact": {
-            "avg_impact_factor": (
-                round(weather_stats.avg_impact_factor, 3)
-                if weather_stats and weather_stats.avg_impact_factor
-                else None
-            ),
+            "avg_impact_factor": _round_or_none(avg_impact, 3),
             "interpretation": "1.0 = ideal conditions, >1.0 = worse conditions",
         },
         "date_range": {
@@ -244,6 +244,84 @@ async function fetchJson(url, options = {}, timeoutMs = 10000) {
     }
 }
 
+/**
+ * Fetch a trip's telemetry from the columnar binary endpoint.
+ *
+ * Layout: "VTC1" magic, uint32 header length, JSON header, then batches of
+ * [uint32 row count][packed column arrays...] terminated by a zero count.
+ * All values are little-endian; missing floats are NaN.
+ *
+ * @param {number} tripId - Trip ID
+ * @param {number} maxPoints - LTTB point budget for the whole trip
+ * @param {number} timeoutMs - Request timeout
+ * @returns {Promise<Array<Object>>} Telemetry points with the decoded fields
+ */
+async function fetchTelemetryColumns(tripId, maxPoints = 2000, timeoutMs = 10000) {
+    const controller = new AbortController();
+    const timeout = setTimeout(() => controller.abort(), timeoutMs);
+
+    try {
+        const response = await fetch(`/api/trips/${tripId}/telemetry/columnar?max_points=${maxPoints}`, {
+            signal: controller.signal
+        });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        return decodeTelemetryColumns(await response.arrayBuffer());
+    } finally {
+        clearTimeout(timeout);
+    }
+}
+
+/**
+ * Decode a columnar telemetry payload into point objects for the chart/map renderers.
+ * @param {ArrayBuffer} buffer - Response body
+ * @returns {Array<Object>} Telemetry points
+ */
+function decodeTelemetryColumns(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== 'VTC1') {
+        throw new Error('Unexpected telemetry payload');
+    }
+
+    const headerLength = view.getUint32(4, true);
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)));
+    const arrayTypes = { float32: Float32Array, float64: Float64Array, int64: BigInt64Array };
+    const columns = Object.fromEntries(header.columns.map(col => [col.name, []]));
+
+    let offset = 8 + headerLength;
+    for (;;) {
+        const rows = view.getUint32(offset, true);
+        offset += 4;
+        if (rows === 0) break;
+        for (const col of header.columns) {
+            const ArrayType = arrayTypes[col.dtype];
+            const size = rows * ArrayType.BYTES_PER_ELEMENT;
+            // slice() copies into an aligned buffer for the typed array view
+            columns[col.name].push(new ArrayType(buffer.slice(offset, offset + size)));
+            offset += size;
+        }
+    }
+
+    const points = [];
+    for (const col of header.columns) {
+        let index = 0;
+        for (const chunk of columns[col.name]) {
+            for (const value of chunk) {
+                const point = points[index] || (points[index] = {});
+                if (col.dtype === 'int64') {
+                    point[col.name] = Number(value);
+                } else {
+                    point[col.name] = Number.isNaN(value) ? null : value;
+                }
+                index++;
+            }
+        }
+    }
+    return points;
+}
+
 /**
  * Lazy load Chart.js library when needed
  * @returns {Promise<void>}
@@ -1194,7 +1272,8 @@ async function loadMpgTrend(days) {
  */
 async function loadTrips() {
     try {
-        let url = '/api/trips?limit=20';
+        // Request only the columns the list view renders (sparse fieldset)
+        let url = '/api/trips?limit=20&fields=id,start_time,distance_miles,electric_miles,gas_mode_entered,gas_miles,gas_mpg,soc_at_gas_transition';
         if (dateFilter.start) url += `&start_date=${dateFilter.start}`;
         if (dateFilter.end) url += `&end_date=${dateFilter.end}`;
 
@@ -1301,9 +1380,12 @@ async function openTripModal(tripId) {
     }
 
     try {
-        const data = await fetchJson(`/api/trips/${tripId}`);
+        // Trip summary comes from the JSON endpoint; chart series from the columnar stream
+        const [data, telemetry] = await Promise.all([
+            fetchJson(`/api/trips/${tripId}?limit=1&telemetry_fields=id`),
+            fetchTelemetryColumns(tripId),
+        ]);
         const trip = data.trip;
-        const telemetry = data.telemetry;
 
         // Render summary stats
         const summaryEl = document.getElementById('trip-detail-summary');
@@ -10,6 +10,7 @@ let routeLayerGroup = null;
 let heatmapLayer = null;
 let currentLayer = 'routes';
 let allTrips = [];
+let heatmapRequestId = 0; // Latest /api/map/heatmap request (drops stale responses)
 let selectedTripIds = new Set();
 let currentFilters = {
     dateRange: 'last_30_days',
@@ -61,9 +62,73 @@ function initMap() {
 
     routeLayerGroup = L.layerGroup().addTo(map);
 
+    // Heatmap cells are fetched per viewport
+    map.on('moveend', () => {
+        if (currentLayer.startsWith('heatmap')) {
+            renderHeatmap();
+        }
+    });
+
     console.log('[Map] Initialized');
 }
 
+/**
+ * Build /api/trips/map query parameters from the current filters
+ */
+function buildTripParams() {
+    const params = new URLSearchParams();
+    params.append('date_range', currentFilters.dateRange);
+
+    if (currentFilters.mode !== 'all') {
+        params.append(currentFilters.mode, 'true');
+    }
+
+    if (currentFilters.minEfficiency) {
+        params.append('min_efficiency', currentFilters.minEfficiency);
+    }
+    if (currentFilters.maxEfficiency) {
+        params.append('max_efficiency', currentFilters.maxEfficiency);
+    }
+    if (currentFilters.minDistance) {
+        params.append('min_distance', currentFilters.minDistance);
+    }
+    if (currentFilters.maxDistance) {
+        params.append('max_distance', currentFilters.maxDistance);
+    }
+
+    return params;
+}
+
+/**
+ * Decode a Google encoded polyline into [{lat, lon}] points
+ */
+function decodePolyline(encoded) {
+    const points = [];
+    let index = 0;
+    let lat = 0;
+    let lon = 0;
+
+    while (index < encoded.length) {
+        const deltas = [];
+        for (let i = 0; i < 2; i++) {
+            let shift = 0;
+            let result = 0;
+            let byte;
+            do {
+                byte = encoded.charCodeAt(index++) - 63;
+                result |= (byte & 0x1f) << shift;
+                shift += 5;
+            } while (byte >= 0x20);
+            deltas.push(result & 1 ? ~(result >> 1) : result >> 1);
+        }
+        lat += deltas[0];
+        lon += deltas[1];
+        points.push({ lat: lat / 1e5, lon: lon / 1e5 });
+    }
+
+    return points;
+}
+
 /**
  * Load trips from API
  */
@@ -71,32 +136,20 @@ async function loadTrips() {
     showLoading(true);
 
     try {
-        // Build query parameters
-        const params = new URLSearchParams();
-        params.append('date_range', currentFilters.dateRange);
-
-        if (currentFilters.mode !== 'all') {
-            params.append(currentFilters.mode, 'true');
-        }
-
-        if (currentFilters.minEfficiency) {
-            params.append('min_efficiency', currentFilters.minEfficiency);
-        }
-        if (currentFilters.maxEfficiency) {
-            params.append('max_efficiency', currentFilters.maxEfficiency);
-        }
-        if (currentFilters.minDistance) {
-            params.append('min_distance', currentFilters.minDistance);
-        }
-        if (currentFilters.maxDistance) {
-            params.append('max_distance', currentFilters.maxDistance);
-        }
+        // Routes come back as encoded polylines simplified for street-level zoom
+        // (the view is zoomed to fit the trips after loading)
+        const params = buildTripParams();
+        params.append('format', 'polyline');
+        params.append('zoom', Math.max(map.getZoom(), 14));
 
         const response = await fetch(`/api/trips/map?${params.toString()}`);
         if (!response.ok) throw new Error(`HTTP ${response.status}`);
 
         const data = await response.json();
-        allTrips = data.trips || [];
+        allTrips = (data.trips || []).map(trip => ({
+            ...trip,
+            points: trip.polyline ? decodePolyline(trip.polyline) : []
+        }));
 
         console.log(`[Map] Loaded ${allTrips.length} trips`);
 
@@ -216,32 +269,64 @@ function renderRoutes() {
 /**
  * Render heatmap layer
  */
-function renderHeatmap() {
-    const heatmapData = [];
+async function renderHeatmap() {
+    // Cells come pre-aggregated from the server grid, so only the viewport is fetched
+    const requestId = ++heatmapRequestId;
+    const bounds = map.getBounds();
+    const zoom = map.getZoom();
+    const params = new URLSearchParams({
+        bbox: [bounds.getWest(), bounds.getSouth(), bounds.getEast(), bounds.getNorth()]
+            .map(v => v.toFixed(5)).join(','),
+        zoom: zoom
+    });
 
-    allTrips.forEach(trip => {
-        if (!trip.points) return;
+    let data;
+    try {
+        const response = await fetch(`/api/map/heatmap?${params.toString()}`);
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        data = await response.json();
+    } catch (error) {
+        console.error('[Map] Error loading heatmap cells:', error);
+        showError('Failed to load heatmap data');
+        return;
+    }
 
-        trip.points.forEach(point => {
-            let intensity = 1;
+    // Ignore responses superseded by a later pan/zoom or layer change
+    if (requestId !== heatmapRequestId || !currentLayer.startsWith('heatmap')) return;
 
-            if (currentLayer === 'heatmap-speed' && point.speed) {
-                // Speed heatmap: 0-70 mph mapped to 0-1
-                intensity = Math.min(point.speed / 70, 1);
-            } else if (currentLayer === 'heatmap-efficiency' && point.efficiency) {
-                // Efficiency heatmap: inverse (lower is better)
-                intensity = Math.max(0, 1 - (point.efficiency / 0.5));
-            }
+    if (heatmapLayer) {
+        map.removeLayer(heatmapLayer);
+        heatmapLayer = null;
+    }
 
-            heatmapData.push([point.lat, point.lon, intensity]);
-        });
+    const cells = data.cells || [];
+    const maxLogSamples = Math.log1p(Math.max(1, ...cells.map(c => c.samples)));
+    const heatmapData = [];
+
+    cells.forEach(cell => {
+        // Density heatmap: log-scaled sample count
+        let intensity = Math.log1p(cell.samples) / maxLogSamples;
+
+        if (currentLayer === 'heatmap-speed') {
+            if (cell.avg_speed_mph === null) return;
+            // Speed heatmap: 0-70 mph mapped to 0-1
+            intensity = Math.min(cell.avg_speed_mph / 70, 1);
+        } else if (currentLayer === 'heatmap-efficiency') {
+            if (cell.kwh_per_mile === null) return;
+            // Efficiency heatmap: inverse (lower is better)
+            intensity = Math.max(0, 1 - (cell.kwh_per_mile / 0.5));
+        }
+
+        heatmapData.push([cell.lat, cell.lon, intensity]);
     });
 
     if (heatmapData.length > 0) {
+        // Cells are 32px wide at their grid level; scale the blob to match
+        const cellPixels = 32 * Math.pow(2, zoom - data.grid_level);
         heatmapLayer = L.heatLayer(heatmapData, {
-            radius: 15,
+            radius: Math.max(8, Math.min(40, cellPixels * 0.75)),
             blur: 20,
-            maxZoom: 13,
+            maxZoom: zoom,
             max: 1.0,
             gradient: {
                 0.0: 'blue',
@@ -1,12 +1,17 @@
 """
-Redis caching utilities for VoltTracker.
+Caching utilities for VoltTracker.
 
 Provides decorators and helpers for caching expensive queries and computations.
+Everything goes through one tiered cache: a thread-safe in-process LRU (L1)
+in front of Redis (L2, optional).
 
 Features:
 - Query result caching with automatic invalidation
+- Single-flight misses (one worker computes a cold key) and optional
+  stale-while-revalidate refresh
 - Cache warming for frequently accessed data
-- Tag-based cache invalidation
+- Tag-based cache invalidation, triggered automatically by committed writes
+  (see utils.invalidation_bus)
 - Configurable TTL (time-to-live)
 - Metrics and hit/miss tracking
 """
@@ -14,16 +19,22 @@ Features:
 import hashlib
 import json
 import logging
-import pickle
 from functools import wraps
 from typing import Any, Optional, Callable, List, Union
 from datetime import timedelta
 
+from sqlalchemy.orm import Session
+from utils.serialization import decode_cache_value, encode_cache_value
+from utils.tiered_cache import LRUCache, TieredCache
+
 logger = logging.getLogger(__name__)
 
 # Global Redis connection (lazy-loaded)
 _redis_cache = None
 
+# Process-wide tiered cache (created on first use)
+_tiered_cache = None
+
 
 def get_redis_cache():
     """
@@ -54,6 +65,29 @@ def get_redis_cache():
     return _redis_cache
 
 
+def get_tiered_cache() -> TieredCache:
+    """
+    Get the process-wide L1/L2 cache.
+
+    Returns:
+        TieredCache backed by an in-process LRU and (when reachable) Redis
+    """
+    global _tiered_cache
+
+    if _tiered_cache is None:
+        from config import Config
+
+        _tiered_cache = TieredCache(
+            LRUCache(max_entries=Config.CACHE_L1_MAX_ENTRIES, max_bytes=Config.CACHE_L1_MAX_BYTES),
+            # Resolved per call so a Redis outage only disables L2
+            l2_getter=lambda: get_redis_cache(),
+            serialize=encode_cache_value,
+            deserialize=decode_cache_value,
+        )
+
+    return _tiered_cache
+
+
 def generate_cache_key(prefix: str, *args, **kwargs) -> str:
     """
     Generate a cache key from arguments.
@@ -89,20 +123,51 @@ def generate_cache_key(prefix: str, *args, **kwargs) -> str:
     return f"{prefix}:{key_hash}"
 
 
+def _refresh_with_own_session(func: Callable, args: tuple, kwargs: dict) -> Optional[Callable]:
+    """
+    Build a background recompute that opens its own database session.
+
+    The caller's session belongs to its request thread (and is closed when
+    the request ends), so a stale refresh binds a new session to the same
+    engine. Returns None when func doesn't take a session first.
+    """
+    if not args or not isinstance(args[0], Session):
+        return None
+    bind = args[0].get_bind()
+
+    def refresh():
+        db = Session(bind=bind)
+        try:
+            return func(db, *args[1:], **kwargs)
+        finally:
+            db.close()
+
+    return refresh
+
+
 def cache_result(
     prefix: str,
     ttl: int = 300,
     tags: Optional[List[str]] = None,
-    key_func: Optional[Callable] = None
+    key_func: Optional[Callable] = None,
+    stale_ttl: int = 0
 ):
     """
-    Decorator to cache function results in Redis.
+    Decorator to cache function results in the tiered (in-process + Redis) cache.
+
+    Concurrent calls with the same arguments share one computation. Cached
+    values are shared between callers, so treat them as read-only.
 
     Args:
         prefix: Cache key prefix
         ttl: Time to live in seconds (default: 300 = 5 minutes)
         tags: Optional tags for cache invalidation
         key_func: Optional custom key generation function
+        stale_ttl: Seconds an expired value may still be served while it is
+            refreshed in the background (default: 0 = off). Only use for
+            functions that don't need the request context; a database
+            session passed first is replaced with a fresh one for the
+            refresh.
 
     Returns:
         Decorated function
@@ -120,72 +185,29 @@ def cache_result(
         data = get_trip_summary("2024-01-01", "2024-01-31")
     """
     def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            redis = get_redis_cache()
-
-            # If Redis unavailable, execute function directly
-            if redis is None:
-                return func(*args, **kwargs)
-
-            # Generate cache key
+        def make_key(*args, **kwargs):
             if key_func:
-                cache_key = key_func(*args, **kwargs)
-            else:
-                cache_key = generate_cache_key(prefix, *args, **kwargs)
-
-            try:
-                # Try to get cached result
-                cached_value = redis.get(cache_key)
-                if cached_value is not None:
-                    logger.debug(f"Cache hit: {cache_key}")
-                    return pickle.loads(cached_value)
-
-                logger.debug(f"Cache miss: {cache_key}")
-
-                # Execute function
-                result = func(*args, **kwargs)
-
-                # Cache the result
-                try:
-                    serialized = pickle.dumps(result)
-                    redis.setex(cache_key, ttl, serialized)
-
-                    # Add to tag sets if provided
-                    if tags:
-                        for tag in tags:
-                            tag_key = f"tag:{tag}"
-                            redis.sadd(tag_key, cache_key)
-                            # Set TTL on tag set slightly longer than cache entries
-                            redis.expire(tag_key, ttl + 60)
-
-                except Exception as e:
-                    logger.warning(f"Failed to cache result for {cache_key}: {e}")
+                return key_func(*args, **kwargs)
+            return generate_cache_key(prefix, *args, **kwargs)
 
-                return result
-
-            except Exception as e:
-                logger.error(f"Cache error for {cache_key}: {e}")
-                # Fall back to executing function
-                return func(*args, **kwargs)
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = make_key(*args, **kwargs)
+            return get_tiered_cache().get_or_compute(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                ttl=ttl,
+                stale_ttl=stale_ttl,
+                tags=tags,
+                refresh=_refresh_with_own_session(func, args, kwargs) if stale_ttl else None,
+            )
 
         # Add cache invalidation method to the wrapper
         def invalidate(*args, **kwargs):
             """Invalidate cache for specific arguments."""
-            redis = get_redis_cache()
-            if redis is None:
-                return
-
-            if key_func:
-                cache_key = key_func(*args, **kwargs)
-            else:
-                cache_key = generate_cache_key(prefix, *args, **kwargs)
-
-            try:
-                redis.delete(cache_key)
-                logger.info(f"Invalidated cache: {cache_key}")
-            except Exception as e:
-                logger.warning(f"Failed to invalidate cache {cache_key}: {e}")
+            cache_key = make_key(*args, **kwargs)
+            get_tiered_cache().delete(cache_key)
+            logger.info(f"Invalidated cache: {cache_key}")
 
         wrapper.invalidate = invalidate
         return wrapper
@@ -208,16 +230,18 @@ def invalidate_cache_by_tag(tag: str) -> int:
         count = invalidate_cache_by_tag("trips")
         print(f"Invalidated {count} cache entries")
     """
+    local = get_tiered_cache().l1.delete_tag(tag)
+
     redis = get_redis_cache()
     if redis is None:
-        return 0
+        return local
 
     tag_key = f"tag:{tag}"
     try:
         # Get all cache keys for this tag
         cache_keys = redis.smembers(tag_key)
         if not cache_keys:
-            return 0
+            return local
 
         # Delete all cache entries
         deleted = redis.delete(*cache_keys)
@@ -226,11 +250,11 @@ def invalidate_cache_by_tag(tag: str) -> int:
         redis.delete(tag_key)
 
         logger.info(f"Invalidated {deleted} cache entries for tag '{tag}'")
-        return deleted
+        return local + deleted
 
     except Exception as e:
         logger.error(f"Failed to invalidate cache by tag '{tag}': {e}")
-        return 0
+        return local
 
 
 def invalidate_cache_pattern(pattern: str) -> int:
@@ -247,13 +271,15 @@ def invalidate_cache_pattern(pattern: str) -> int:
         # Invalidate all trip caches
         count = invalidate_cache_pattern("trip:*")
     """
+    local = get_tiered_cache().l1.delete_matching(pattern)
+
     redis = get_redis_cache()
     if redis is None:
-        return 0
+        return local
 
     try:
         # Use SCAN to find matching keys (safer than KEYS on large datasets)
-        deleted = 0
+        deleted = local
         cursor = 0
 
         while True:
@@ -269,7 +295,7 @@ def invalidate_cache_pattern(pattern: str) -> int:
 
     except Exception as e:
         logger.error(f"Failed to invalidate cache pattern '{pattern}': {e}")
-        return 0
+        return local
 
 
 def cache_warm_up():
@@ -318,15 +344,18 @@ def get_cache_stats() -> dict:
     Get cache statistics (hit rate, memory usage, etc.).
 
     Returns:
-        Dict with cache statistics
+        Dict with Redis (L2) statistics, plus in-process (L1) statistics
+        under "l1"
 
     Example:
         >>> stats = get_cache_stats()
         >>> print(f"Hit rate: {stats['hit_rate']}%")
     """
+    l1_stats = get_tiered_cache().l1.stats()
+
     redis = get_redis_cache()
     if redis is None:
-        return {"status": "unavailable"}
+        return {"status": "unavailable", "l1": l1_stats}
 
     try:
         info = redis.info("stats")
@@ -347,11 +376,12 @@ def get_cache_stats() -> dict:
             "used_memory_human": memory.get("used_memory_human"),
             "used_memory_peak_human": memory.get("used_memory_peak_human"),
             "connected_clients": redis.info("clients").get("connected_clients", 0),
+            "l1": l1_stats,
         }
 
     except Exception as e:
         logger.error(f"Failed to get cache stats: {e}")
-        return {"status": "error", "error": str(e)}
+        return {"status": "error", "error": str(e), "l1": l1_stats}
 
 
 # Convenience decorators for common TTLs
@@ -0,0 +1,31 @@
+"""
+Packed storage for battery cell voltage snapshots.
+
+Cell voltages are stored as a little-endian float32 blob (384 bytes for the
+Gen 2 Volt's 96 cells) alongside the original JSON array. Missing cells are
+encoded as NaN. float32 keeps ~0.1 mV resolution at cell voltages, well
+below what the OBD PIDs report.
+"""
+
+import math
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Little-endian float32, independent of the host byte order
+CELL_VOLTAGE_DTYPE = np.dtype("<f4")
+
+
+def pack_cell_voltages(voltages: Sequence[Optional[float]]) -> bytes:
+    """Pack cell voltages as little-endian float32 (None becomes NaN)."""
+    return np.array(voltages, dtype=float).astype(CELL_VOLTAGE_DTYPE).tobytes()
+
+
+def unpack_cell_voltages(blob: bytes) -> np.ndarray:
+    """Unpack a stored blob into a read-only float32 array (missing cells are NaN)."""
+    return np.frombuffer(blob, dtype=CELL_VOLTAGE_DTYPE)
+
+
+def is_valid_voltage(value: Optional[float]) -> bool:
+    """Whether a cell value is a real reading (not missing, NaN or zero)."""
+    return value is not None and not math.isnan(value) and value > 0
@@ -0,0 +1,197 @@
+"""
+Columnar binary encoding for telemetry charts.
+
+Trip charts only need a handful of numeric series, but the JSON telemetry
+payload repeats every key and an ISO timestamp per point. This module packs
+selected columns into little-endian typed arrays that browsers can read
+directly into Float32Array/Float64Array/BigInt64Array views.
+
+Stream layout (all integers little-endian):
+
+    magic     4 bytes   b"VTC1"
+    hlen      uint32    length of the JSON header
+    header    hlen      UTF-8 JSON: {"columns": [{"name", "dtype"}], "row_count", ...}
+    batch*    repeated:
+        nrows   uint32  rows in this batch (0 terminates the stream)
+        column  nrows * itemsize bytes per column, in header order
+
+Missing float values are encoded as NaN. Timestamps are int64 milliseconds
+since the Unix epoch.
+"""
+
+import json
+import struct
+import sys
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Boolean, DateTime, Float, Integer
+
+COLUMNAR_MAGIC = b"VTC1"
+COLUMNAR_MIMETYPE = "application/vnd.volttracker.columnar"
+
+# dtype name -> array typecode
+DTYPE_CODES = {"float32": "f", "float64": "d", "int64": "q"}
+
+# Columns that lose meaningful precision as float32 (~1 m for GPS needs float64)
+FLOAT64_COLUMNS = {"latitude", "longitude", "odometer_miles"}
+
+_NAN = float("nan")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def column_dtype(model, name: str) -> Optional[str]:
+    """
+    Get the packed dtype for a model column.
+
+    Args:
+        model: SQLAlchemy model class
+        name: Column name
+
+    Returns:
+        "int64", "float32" or "float64", or None if the column can't be packed
+    """
+    column = model.__table__.columns.get(name)
+    if column is None:
+        return None
+    if isinstance(column.type, (DateTime, Integer)):
+        return "int64"
+    if isinstance(column.type, (Float, Boolean)):
+        return "float64" if name in FLOAT64_COLUMNS else "float32"
+    return None
+
+
+def _to_epoch_ms(value: datetime) -> int:
+    """Convert a datetime (naive values are treated as UTC) to epoch milliseconds."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int((value - _EPOCH).total_seconds() * 1000)
+
+
+def _pack(values: List[Any], dtype: str) -> bytes:
+    """Pack one column of a batch as little-endian bytes."""
+    if dtype == "int64":
+        packed = array("q", (
+            _to_epoch_ms(v) if isinstance(v, datetime) else int(v if v is not None else 0)
+            for v in values
+        ))
+    else:
+        packed = array(DTYPE_CODES[dtype], (_NAN if v is None else float(v) for v in values))
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def encode_header(columns: Sequence[Tuple[str, str]], **meta: Any) -> bytes:
+    """
+    Encode the stream preamble (magic, header length, JSON header).
+
+    Args:
+        columns: (name, dtype) pairs in packing order
+        **meta: Extra header entries (e.g. trip_id, row_count)
+
+    Returns:
+        Preamble bytes
+    """
+    header = dict(meta)
+    header["columns"] = [{"name": name, "dtype": dtype} for name, dtype in columns]
+    header.setdefault("timestamp_unit", "ms")
+    payload = json.dumps(header, separators=(",", ":")).encode()
+    return COLUMNAR_MAGIC + struct.pack("<I", len(payload)) + payload
+
+
+def encode_batch(rows: Sequence[Sequence[Any]], dtypes: Sequence[str]) -> bytes:
+    """
+    Encode a batch of result rows column by column.
+
+    Args:
+        rows: Tuple-like rows with values in column order
+        dtypes: dtype for each column
+
+    Returns:
+        Batch bytes (row count followed by each packed column)
+    """
+    parts = [struct.pack("<I", len(rows))]
+    for index, dtype in enumerate(dtypes):
+        parts.append(_pack([row[index] for row in rows], dtype))
+    return b"".join(parts)
+
+
+def iter_columnar(
+    rows: Iterable[Sequence[Any]],
+    columns: Sequence[Tuple[str, str]],
+    batch_size: int = 4096,
+    **meta: Any,
+) -> Iterator[bytes]:
+    """
+    Stream rows as a columnar binary payload.
+
+    Rows are consumed lazily, so pairing this with a server-side cursor
+    (``query.yield_per()``) keeps memory bounded by batch_size.
+
+    Args:
+        rows: Iterable of tuple-like rows in column order
+        columns: (name, dtype) pairs
+        batch_size: Rows per batch
+        **meta: Extra header entries
+
+    Yields:
+        Chunks of the encoded stream
+
+    Example:
+        >>> rows = query.with_entities(TelemetryRaw.timestamp, TelemetryRaw.speed_mph).yield_per(4096)
+        >>> body = b"".join(iter_columnar(rows, [("timestamp", "int64"), ("speed_mph", "float32")]))
+    """
+    dtypes = [dtype for _, dtype in columns]
+    yield encode_header(columns, batch_size=batch_size, **meta)
+
+    batch: List[Sequence[Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield encode_batch(batch, dtypes)
+            batch = []
+    if batch:
+        yield encode_batch(batch, dtypes)
+
+    yield struct.pack("<I", 0)
+
+
+def decode_columnar(payload: bytes) -> Tuple[Dict[str, Any], Dict[str, List[Any]]]:
+    """
+    Decode a columnar payload (used by tests and scripts).
+
+    Args:
+        payload: Complete encoded stream
+
+    Returns:
+        Tuple of (header dict, {column name: list of values})
+
+    Raises:
+        ValueError: If the payload is not a columnar stream
+    """
+    if payload[:4] != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar telemetry payload")
+
+    (header_len,) = struct.unpack_from("<I", payload, 4)
+    offset = 8 + header_len
+    header = json.loads(payload[8:offset])
+    columns = [(col["name"], col["dtype"]) for col in header["columns"]]
+    data: Dict[str, List[Any]] = {name: [] for name, _ in columns}
+
+    while True:
+        (nrows,) = struct.unpack_from("<I", payload, offset)
+        offset += 4
+        if nrows == 0:
+            break
+        for name, dtype in columns:
+            values = array(DTYPE_CODES[dtype])
+            size = values.itemsize * nrows
+            values.frombytes(payload[offset:offset + size])
+            if sys.byteorder == "big":
+                values.byteswap()
+            data[name].extend(values)
+            offset += size
+
+    return header, data
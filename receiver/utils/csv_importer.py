@@ -5,13 +5,16 @@ import io
 import logging
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Set, Tuple, cast
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, cast
 
 from config import Config
-from exceptions import CSVImportError
+from exceptions import CSVImportError, CSVValidationError
 
 logger = logging.getLogger(__name__)
 
+# Characters read from the start of a file to detect its delimiter
+SNIFF_SAMPLE_CHARS = 2000
 
 # Validation ranges for key fields
 VALIDATION_RANGES = {
@@ -192,21 +195,9 @@ class TorqueCSVImporter:
         return unique_records, duplicate_count
 
     @classmethod
-    def parse_csv(
-        cls, csv_content: str, existing_timestamps: Optional[Set[datetime]] = None
-    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-        """
-        Parse Torque CSV content into telemetry records with validation.
-
-        Args:
-            csv_content: Raw CSV file content as string
-            existing_timestamps: Optional set of existing timestamps to detect duplicates
-
-        Returns:
-            Tuple of (list of telemetry dicts, stats dict with validation info)
-        """
-        records: List[Dict[str, Any]] = []
-        stats: Dict[str, Any] = {
+    def new_stats(cls) -> Dict[str, Any]:
+        """Create an empty import statistics dict, updated as rows are parsed."""
+        return {
             "total_rows": 0,
             "parsed_rows": 0,
             "skipped_rows": 0,
@@ -225,13 +216,82 @@ class TorqueCSVImporter:
             "failure_reason": None,  # High-level reason if import fails
         }
 
+    @classmethod
+    def parse_csv(
+        cls, csv_content: str, existing_timestamps: Optional[Set[datetime]] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Parse Torque CSV content into telemetry records with validation.
+
+        Convenience wrapper around iter_records for content already in memory;
+        imports stream the upload through iter_records instead.
+
+        Args:
+            csv_content: Raw CSV file content as string
+            existing_timestamps: Optional set of existing timestamps to detect duplicates
+
+        Returns:
+            Tuple of (list of telemetry dicts, stats dict with validation info)
+        """
+        stats = cls.new_stats()
+        records = list(cls.iter_records(io.StringIO(csv_content), stats))
+        cls.finalize_stats(stats)
+
+        # Remove duplicates
+        records, duplicate_count = cls._find_duplicates(records, existing_timestamps)
+        stats["duplicates_removed"] = duplicate_count
+
+        return records, stats
+
+    @classmethod
+    def _sniff_dialect(cls, lines: Iterator[str]) -> Tuple[Any, List[str]]:
+        """
+        Detect the CSV dialect from the first lines of a stream.
+
+        Returns:
+            Tuple of (dialect, lines consumed while sniffing)
+        """
+        head: List[str] = []
+        size = 0
+        for line in lines:
+            head.append(line)
+            size += len(line)
+            if size >= SNIFF_SAMPLE_CHARS:
+                break
+
         try:
             # Try to detect delimiter
-            dialect = csv.Sniffer().sniff(csv_content[:2000])
+            dialect = csv.Sniffer().sniff("".join(head)[:SNIFF_SAMPLE_CHARS])
         except csv.Error:
             dialect = csv.excel
+        return dialect, head
+
+    @classmethod
+    def iter_records(
+        cls, lines: Iterable[str], stats: Dict[str, Any], session_id: Optional[uuid.UUID] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Parse Torque CSV lines into telemetry records, one row at a time.
+
+        Only the current row is held in memory, so a text stream over an
+        upload can be parsed regardless of its size. Counters, column
+        information, warnings and errors are accumulated into stats as rows
+        are read; call finalize_stats once the generator is exhausted.
+
+        Args:
+            lines: Iterable of CSV lines (e.g. a text file object)
+            stats: Stats dict from new_stats, updated in place
+            session_id: Session ID for the records (generated if omitted)
 
-        reader = csv.DictReader(io.StringIO(csv_content), dialect=dialect)
+        Yields:
+            Telemetry record dicts with a timestamp
+
+        Raises:
+            CSVValidationError: If the file exceeds Config.MAX_CSV_ROWS
+        """
+        line_iter = iter(lines)
+        dialect, head = cls._sniff_dialect(line_iter)
+        reader = csv.DictReader(chain(head, line_iter), dialect=dialect)
 
         # Map columns to our field names
         column_mapping = {}
@@ -246,12 +306,13 @@ class TorqueCSVImporter:
             stats["timestamp_column_found"] = "timestamp" in stats["columns_mapped"] or "device_time" in stats["columns_mapped"]
 
         # Generate a session ID for this import
-        session_id = uuid.uuid4()
+        if session_id is None:
+            session_id = uuid.uuid4()
 
         for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
             stats["total_rows"] += 1
 
-            # Check row count limit to prevent memory exhaustion
+            # Check row count limit
             if stats["total_rows"] > Config.MAX_CSV_ROWS:
                 stats["failure_reason"] = "too_many_rows"
                 error_msg = f"CSV file exceeds maximum row limit of {Config.MAX_CSV_ROWS:,} rows"
@@ -262,7 +323,7 @@ class TorqueCSVImporter:
                     "reason": error_msg,
                     "error_type": "validation"
                 })
-                raise CSVImportError(error_msg, row_number=row_num, field="row_count")
+                raise CSVValidationError(error_msg, row_number=row_num, field="row_count")
 
             try:
                 record = cls._parse_row(row, column_mapping, session_id)
@@ -274,8 +335,8 @@ class TorqueCSVImporter:
                         if len(stats["warnings"]) < 10:  # Limit warning messages
                             stats["warnings"].append(f"Row {row_num}: {', '.join(warnings)}")
 
-                    records.append(record)
                     stats["parsed_rows"] += 1
+                    yield record
                 else:
                     # Record was parsed but has no timestamp - structured error
                     stats["skipped_rows"] += 1
@@ -314,6 +375,20 @@ class TorqueCSVImporter:
                         "error_type": type(e).__name__
                     })
 
+    @classmethod
+    def finalize_stats(cls, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Complete stats after all rows have been read.
+
+        Sets the failure reason when nothing was parsed and notes errors
+        beyond those kept in stats["errors"].
+
+        Args:
+            stats: Stats dict filled in by iter_records
+
+        Returns:
+            The same stats dict
+        """
         # Determine failure reason if no records were parsed
         if stats["parsed_rows"] == 0:
             if stats["total_rows"] == 0:
@@ -333,11 +408,7 @@ class TorqueCSVImporter:
                 "error_type": "Truncated"
             })
 
-        # Remove duplicates
-        records, duplicate_count = cls._find_duplicates(records, existing_timestamps)
-        stats["duplicates_removed"] = duplicate_count
-
-        return records, stats
+        return stats
 
     @classmethod
     def _parse_row(
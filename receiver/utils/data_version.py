@@ -0,0 +1,258 @@
+"""
+Data-version counters and conditional GET support for VoltTracker.
+
+Every committed write to a tracked table bumps a version counter for its
+entity kind (trips, charging, fuel, battery). Analytics endpoints derive an
+ETag from the versions they depend on plus the request path and query args,
+so a client polling with ``If-None-Match`` gets a 304 without the endpoint
+touching the database until the underlying data actually changes.
+
+Counters live in Redis when available (shared by the web and worker
+processes) and fall back to process-local counters otherwise.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from functools import wraps
+from typing import Dict, Iterable, Optional, Sequence
+
+from flask import current_app, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from utils.cache_utils import get_redis_cache
+from utils.invalidation_bus import publish_entity_changes
+from utils.response_cache import cached_response
+
+logger = logging.getLogger(__name__)
+
+DATA_KINDS = ("trips", "charging", "fuel", "battery")
+
+# Tables whose writes change analytics results, mapped to their entity kind.
+# telemetry_raw is deliberately absent: analytics only read closed trips, and
+# closing a trip writes the trips row.
+TABLE_KINDS: Dict[str, str] = {
+    "trips": "trips",
+    "soc_transitions": "trips",
+    "routes": "trips",
+    "trip_daily_stats": "trips",
+    "monthly_summary": "trips",
+    "map_grid_cells": "trips",
+    "engine_hours_counters": "trips",
+    "charging_sessions": "charging",
+    "charging_hourly_stats": "charging",
+    "fuel_events": "fuel",
+    "battery_health_readings": "battery",
+    "battery_cell_readings": "battery",
+}
+
+REDIS_KEY_PREFIX = "data_version:"
+
+# Body cache lifetime for endpoints without a time bucket (their ETag only
+# changes on writes, which also invalidate the cached body)
+RESPONSE_CACHE_TTL_SECONDS = 3600
+
+# Session.info key holding kinds written since the last commit/rollback
+_PENDING_KEY = "data_version_pending"
+
+_local_versions: Dict[str, int] = {kind: 0 for kind in DATA_KINDS}
+_local_lock = threading.Lock()
+
+# Distinguishes process-local counters across restarts so a stale ETag from a
+# previous process can never match a fresh counter value.
+_BOOT_TOKEN = uuid.uuid4().hex[:8]
+
+
+def bump_data_version(*kinds: str) -> None:
+    """
+    Increment the data version for one or more entity kinds.
+
+    Normally called automatically when a session commits; call it directly
+    (together with utils.invalidation_bus.publish_entity_changes) only for
+    writes that bypass the ORM session (e.g. raw connections).
+
+    Args:
+        *kinds: Entity kinds to bump (see DATA_KINDS)
+    """
+    kinds = tuple(kind for kind in dict.fromkeys(kinds) if kind in _local_versions)
+    if not kinds:
+        return
+
+    with _local_lock:
+        for kind in kinds:
+            _local_versions[kind] += 1
+
+    redis = get_redis_cache()
+    if redis is None:
+        return
+
+    try:
+        pipe = redis.pipeline()
+        for kind in kinds:
+            pipe.incr(f"{REDIS_KEY_PREFIX}{kind}")
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to bump data version in Redis for {kinds}: {e}")
+
+
+def get_data_versions(kinds: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """
+    Get the current data version for each requested entity kind.
+
+    Args:
+        kinds: Entity kinds to read (default: all kinds)
+
+    Returns:
+        Dict mapping kind to an opaque version string
+    """
+    kinds = list(kinds) if kinds is not None else list(DATA_KINDS)
+
+    redis = get_redis_cache()
+    if redis is not None:
+        try:
+            values = redis.mget([f"{REDIS_KEY_PREFIX}{kind}" for kind in kinds])
+            return {kind: f"r{int(value or 0)}" for kind, value in zip(kinds, values)}
+        except Exception as e:
+            logger.warning(f"Failed to read data versions from Redis: {e}")
+
+    with _local_lock:
+        return {kind: f"{_BOOT_TOKEN}.{_local_versions.get(kind, 0)}" for kind in kinds}
+
+
+def compute_etag(kinds: Sequence[str], bucket_seconds: Optional[int] = 3600) -> str:
+    """
+    Build an ETag for the current request from data versions and query args.
+
+    Args:
+        kinds: Entity kinds the endpoint's response depends on
+        bucket_seconds: Fold the current time bucket into the tag so results
+            relative to "now" (e.g. last 30 days) are recomputed at least this
+            often. None disables the time component.
+
+    Returns:
+        Hex digest suitable for an ETag header
+    """
+    versions = get_data_versions(kinds)
+    parts = [request.path]
+    parts.extend(f"{kind}={versions[kind]}" for kind in sorted(versions))
+    parts.extend(f"{key}={value}" for key, value in sorted(request.args.items(multi=True)))
+    if bucket_seconds:
+        parts.append(f"t={int(time.time() // bucket_seconds)}")
+
+    return hashlib.md5("|".join(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def _client_has_etag(etag: str) -> bool:
+    """Check If-None-Match, ignoring the ``:gzip``-style suffix Flask-Compress appends."""
+    if not request.if_none_match:
+        return False
+    if request.if_none_match.star_tag:
+        return True
+    return any(tag.split(":", 1)[0] == etag for tag in request.if_none_match.as_set(include_weak=True))
+
+
+def etag_by_data_version(*kinds: str, bucket_seconds: Optional[int] = 3600, cache_body: bool = True):
+    """
+    Decorator adding data-version ETags and 304 responses to a GET endpoint.
+
+    The ETag is computed before the view runs, so a write that lands while
+    the response is being built only makes the next request miss. Because
+    the ETag fully identifies the response, the rendered body is also cached
+    precompressed under it (see utils.response_cache) and repeat requests
+    skip the view, JSON encoding and compression.
+
+    Args:
+        *kinds: Entity kinds the endpoint's response depends on
+        bucket_seconds: Maximum age of a matching ETag (see compute_etag)
+        cache_body: Cache the rendered body per ETag (disable for views
+            whose output depends on anything besides the path, query args
+            and data)
+
+    Returns:
+        Decorated view function
+
+    Example:
+        @bp.route("/api/analytics/weather/temperature-bands")
+        @etag_by_data_version("trips")
+        def get_temperature_bands():
+            ...
+    """
+    kinds = kinds or DATA_KINDS
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if request.method != "GET":
+                return func(*args, **kwargs)
+
+            etag = compute_etag(kinds, bucket_seconds)
+            if _client_has_etag(etag):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag)
+                return response
+
+            if cache_body:
+                return cached_response(
+                    etag,
+                    lambda: make_response(func(*args, **kwargs)),
+                    ttl=bucket_seconds or RESPONSE_CACHE_TTL_SECONDS,
+                    tags=kinds,
+                )
+
+            response = make_response(func(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _kind_for(target) -> Optional[str]:
+    """Resolve the entity kind for an ORM instance or mapper."""
+    table = getattr(target, "__tablename__", None)
+    if table is None:
+        local_table = getattr(target, "local_table", None)
+        table = getattr(local_table, "name", None)
+    return TABLE_KINDS.get(table)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_kinds(session, flush_context):
+    """Record kinds touched by a flush (new/dirty/deleted still hold pre-flush state here)."""
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        kind = _kind_for(obj)
+        if kind:
+            pending.add(kind)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_kinds(orm_execute_state):
+    """Record kinds touched by bulk query.update()/delete() and ORM insert statements."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    pending = orm_execute_state.session.info.setdefault(_PENDING_KEY, set())
+    for mapper in orm_execute_state.all_mappers:
+        kind = _kind_for(mapper)
+        if kind:
+            pending.add(kind)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_kinds(session):
+    """Bump versions and invalidate caches for everything written in the committed transaction."""
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        bump_data_version(*sorted(pending))
+        publish_entity_changes(*pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_kinds(session):
+    """Forget writes that were rolled back."""
+    session.info.pop(_PENDING_KEY, None)
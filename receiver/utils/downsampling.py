@@ -0,0 +1,197 @@
+"""
+Largest-Triangle-Three-Buckets (LTTB) downsampling for chart series.
+
+Capping a series at its first N points only previews the start of a trip.
+LTTB instead splits the series into max_points buckets and keeps, from each
+bucket, the point forming the largest triangle with its neighbours, which
+preserves visual peaks (regen spikes, engine starts, charging taper) while
+returning a bounded number of points for any trip length.
+
+The selection works on several y series at once: each series is normalized
+by its range and the triangle areas are summed, so a spike in any one series
+is kept. Missing (None) values contribute nothing to a point's score. Each
+bucket's candidates are scored together as NumPy array operations.
+"""
+
+import math
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# LTTB always keeps the first and last point plus at least one bucket
+MIN_POINTS = 3
+
+
+def parse_max_points(raw: Optional[str], cap: int) -> Optional[int]:
+    """
+    Parse a ``max_points`` query parameter.
+
+    Args:
+        raw: Raw parameter value (None if absent)
+        cap: Upper bound; larger values are clamped to it
+
+    Returns:
+        Point budget, or None if no downsampling was requested
+
+    Raises:
+        ValueError: If the value is not an integer >= MIN_POINTS
+    """
+    if raw is None or raw == "":
+        return None
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        raise ValueError("max_points must be an integer")
+    if value < MIN_POINTS:
+        raise ValueError(f"max_points must be at least {MIN_POINTS}")
+    return min(value, cap)
+
+
+def _to_number(value: Any) -> Optional[float]:
+    """Convert a datetime, ISO string or numeric value to float (None stays None)."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        # Stored curves keep ISO timestamps
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
+
+def _to_array(values: Sequence[Any]) -> np.ndarray:
+    """Convert a series to a float array with NaN for missing values."""
+    try:
+        # Plain numeric series (None becomes NaN) convert in one step
+        return np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        return np.array([_to_number(v) for v in values], dtype=float)
+
+
+def lttb_indices(x: Sequence[Any], series: Sequence[Sequence[Any]], max_points: int) -> List[int]:
+    """
+    Select indices of the points to keep with multi-series LTTB.
+
+    Args:
+        x: X values (timestamps or numbers), ascending
+        series: One or more y series, each the same length as x
+        max_points: Maximum number of points to keep
+
+    Returns:
+        Sorted list of indices into the original series
+
+    Example:
+        >>> lttb_indices([0, 1, 2, 3, 4], [[0, 0, 9, 0, 0]], 3)
+        [0, 2, 4]
+    """
+    n = len(x)
+    if max_points >= n or n <= 2:
+        return list(range(n))
+    max_points = max(MIN_POINTS, max_points)
+
+    xs = _to_array(x)
+    # Fall back to positional x for missing timestamps
+    missing_x = np.isnan(xs)
+    xs[missing_x] = np.flatnonzero(missing_x)
+
+    normalized = []
+    for values in series:
+        ys = _to_array(values)
+        present = ys[~np.isnan(ys)]
+        if not present.size:
+            continue
+        low, high = present.min(), present.max()
+        normalized.append((ys - low) / ((high - low) or 1.0))
+
+    if not normalized:
+        step = (n - 1) / (max_points - 1)
+        return sorted({round(i * step) for i in range(max_points)})
+
+    # series x points matrix; missing values are zero-filled with a validity mask
+    ys = np.vstack(normalized)
+    valid = ~np.isnan(ys)
+    filled = np.where(valid, ys, 0.0)
+
+    bucket_size = (n - 2) / (max_points - 2)
+    selected = [0]
+    a = 0
+
+    for bucket in range(max_points - 2):
+        start = int(math.floor(bucket * bucket_size)) + 1
+        end = min(int(math.floor((bucket + 1) * bucket_size)) + 1, n - 1)
+
+        # Average of the next bucket (or the last point) is the third vertex
+        next_start = end
+        next_end = min(int(math.floor((bucket + 2) * bucket_size)) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+        avg_x = xs[next_start:next_end].mean()
+        counts = valid[:, next_start:next_end].sum(axis=1)
+        avg_ys = np.where(counts > 0, filled[:, next_start:next_end].sum(axis=1) / np.maximum(counts, 1), np.nan)
+
+        # Summed triangle area of every candidate in the bucket; NaN terms score nothing
+        ax, ay = xs[a], ys[:, [a]]
+        areas = np.abs((ax - avg_x) * (ys[:, start:end] - ay) - (ax - xs[start:end]) * (avg_ys[:, None] - ay))
+        best_index = start + int(np.argmax(np.nansum(areas, axis=0)))
+
+        selected.append(best_index)
+        a = best_index
+
+    selected.append(n - 1)
+    return selected
+
+
+def downsample_points(
+    points: Sequence[Dict[str, Any]],
+    max_points: int,
+    x_key: str,
+    y_keys: Sequence[str],
+) -> List[Dict[str, Any]]:
+    """
+    Downsample a list of dicts with LTTB.
+
+    Args:
+        points: Series points, ordered by x
+        max_points: Maximum number of points to return
+        x_key: Key holding the x value (e.g. "timestamp")
+        y_keys: Keys of the y series whose peaks should be preserved
+
+    Returns:
+        The selected points in their original order
+    """
+    return downsample(points, max_points, lambda p: p.get(x_key), [lambda p, k=k: p.get(k) for k in y_keys])
+
+
+def downsample(
+    items: Sequence[Any],
+    max_points: int,
+    x_getter: Callable[[Any], Any],
+    y_getters: Sequence[Callable[[Any], Any]],
+) -> List[Any]:
+    """
+    Downsample arbitrary items (ORM objects, rows, dicts) with LTTB.
+
+    Args:
+        items: Items ordered by x
+        max_points: Maximum number of items to return
+        x_getter: Extracts the x value from an item
+        y_getters: Extract each y series value from an item
+
+    Returns:
+        The selected items in their original order
+    """
+    if len(items) <= max_points:
+        return list(items)
+    x = [x_getter(item) for item in items]
+    series = [[getter(item) for item in items] for getter in y_getters]
+    return [items[i] for i in lttb_indices(x, series, max_points)]
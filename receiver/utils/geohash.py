@@ -0,0 +1,153 @@
+"""
+Geohash encoding and radius-search helpers.
+
+A geohash interleaves longitude and latitude bits into a base32 string, so
+points that share a prefix lie in the same rectangular cell. Storing a
+fixed-precision geohash next to a coordinate lets a btree index answer
+"which rows are near here" with a few prefix range scans; the exact
+distance check then only runs on that small candidate set.
+"""
+
+import math
+from typing import List, Tuple
+
+from sqlalchemy import or_
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Precision stored on trips and routes (7 chars ≈ 153 m x 153 m cells)
+GEOHASH_PRECISION = 7
+
+MILES_PER_DEGREE_LAT = 69.0
+
+
+def encode(lat: float, lon: float, precision: int = GEOHASH_PRECISION) -> str:
+    """
+    Encode a coordinate as a geohash.
+
+    Args:
+        lat: Latitude in degrees
+        lon: Longitude in degrees
+        precision: Number of characters
+
+    Returns:
+        Geohash string
+
+    Example:
+        >>> encode(57.64911, 10.40744, 11)
+        'u4pruydqqvj'
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bit = value = 0
+    even = True
+
+    while len(chars) < precision:
+        interval, coord = (lon_range, lon) if even else (lat_range, lat)
+        mid = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(_BASE32[value])
+            bit = value = 0
+
+    return "".join(chars)
+
+
+def cell_dimensions(precision: int) -> Tuple[float, float]:
+    """
+    Get the (lat, lon) size in degrees of a geohash cell.
+
+    Args:
+        precision: Geohash length
+
+    Returns:
+        Tuple of (latitude span, longitude span)
+    """
+    bits = 5 * precision
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+def precision_for_radius(lat: float, radius_miles: float) -> int:
+    """
+    Pick the longest geohash precision whose cells are at least radius_miles wide.
+
+    With cells that large, the 3x3 block of cells around a point covers
+    every point within the radius.
+
+    Args:
+        lat: Latitude of the search center (cells narrow towards the poles)
+        radius_miles: Search radius
+
+    Returns:
+        Precision between 1 and GEOHASH_PRECISION
+    """
+    lat_deg = radius_miles / MILES_PER_DEGREE_LAT
+    # Use the circle's poleward edge, where a mile spans the most longitude
+    edge_lat = min(89.0, abs(lat) + lat_deg)
+    lon_deg = radius_miles / (MILES_PER_DEGREE_LAT * math.cos(math.radians(edge_lat)))
+
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_span, lon_span = cell_dimensions(precision)
+        if lat_span >= lat_deg and lon_span >= lon_deg:
+            return precision
+    return 1
+
+
+def prefixes_for_radius(lat: float, lon: float, radius_miles: float) -> List[str]:
+    """
+    Get the geohash prefixes of the 3x3 cell block covering a search circle.
+
+    Args:
+        lat: Latitude of the search center
+        lon: Longitude of the search center
+        radius_miles: Search radius
+
+    Returns:
+        Sorted, de-duplicated list of prefixes
+    """
+    precision = precision_for_radius(lat, radius_miles)
+    lat_span, lon_span = cell_dimensions(precision)
+
+    prefixes = set()
+    for dlat in (-lat_span, 0.0, lat_span):
+        for dlon in (-lon_span, 0.0, lon_span):
+            cell_lat = max(-89.999999, min(89.999999, lat + dlat))
+            cell_lon = (lon + dlon + 180.0) % 360.0 - 180.0
+            prefixes.add(encode(cell_lat, cell_lon, precision))
+
+    return sorted(prefixes)
+
+
+def prefix_filter(column, prefixes: List[str]):
+    """
+    Build an index-friendly filter matching geohashes that start with any prefix.
+
+    Uses range comparisons instead of LIKE so a plain btree index applies
+    regardless of the database collation.
+
+    Args:
+        column: Geohash column (values stored at GEOHASH_PRECISION)
+        prefixes: Prefixes to match
+
+    Returns:
+        SQLAlchemy boolean expression
+    """
+    return or_(
+        *[
+            column.between(
+                prefix.ljust(GEOHASH_PRECISION, _BASE32[0]),
+                prefix.ljust(GEOHASH_PRECISION, _BASE32[-1]),
+            )
+            for prefix in prefixes
+        ]
+    )
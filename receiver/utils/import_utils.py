@@ -3,14 +3,16 @@ Import utilities for CSV import hardening.
 
 Provides functions for:
 - Generating unique import codes (IMP-YYYYMMDD-XXXXXX)
-- Computing file hashes for duplicate detection
+- Computing file hashes for duplicate detection (whole or streamed)
 - Formatting reportable error strings
 """
 
+import codecs
 import hashlib
 import random
 import string
 from datetime import datetime, timezone
+from typing import BinaryIO, Optional, Tuple
 
 
 # Characters that are unambiguous when read aloud or displayed
@@ -51,6 +53,44 @@ def get_file_hash(content: bytes) -> str:
     return hashlib.sha256(content).hexdigest()
 
 
+def scan_file_stream(stream: BinaryIO, chunk_size: int = 64 * 1024) -> Tuple[str, int, Optional[UnicodeDecodeError]]:
+    """
+    Hash, size and UTF-8 check a file stream in fixed-size chunks.
+
+    Reads the stream once without holding it in memory and rewinds it
+    afterwards, so the content can be streamed again for parsing.
+
+    Args:
+        stream: Seekable binary stream (e.g. an uploaded file's stream)
+        chunk_size: Bytes read at a time
+
+    Returns:
+        Tuple of (hex SHA-256 hash, size in bytes, first decode error or None)
+    """
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    size = 0
+    decode_error = None
+
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        digest.update(chunk)
+        size += len(chunk)
+        if decode_error is None:
+            try:
+                decoder.decode(chunk)
+            except UnicodeDecodeError as e:
+                decode_error = e
+
+    if decode_error is None:
+        try:
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError as e:
+            decode_error = e
+
+    stream.seek(0)
+    return digest.hexdigest(), size, decode_error
+
+
 def format_reportable(
     import_code: str,
     status: str,
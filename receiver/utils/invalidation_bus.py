@@ -0,0 +1,186 @@
+"""
+Write-driven cache invalidation for VoltTracker.
+
+Committed writes publish entity-change events (trips, charging, fuel,
+battery) and cached results subscribe to the kinds they are built from via
+their tags. Publishing drops the subscribed tags from this process's L1,
+deletes them from Redis (shared by every process) and broadcasts the event
+on a Redis pub/sub channel so the other web and worker processes drop their
+own L1 copies.
+
+Events are published automatically when a session commits (see
+utils.data_version), which covers trip finalization, bulk operations, CSV
+import and the fuel/charging endpoints without each of them having to
+remember to invalidate. Because stale entries are removed as soon as the
+data changes, cached results can use long TTLs.
+"""
+
+import json
+import logging
+import threading
+import uuid
+from typing import Dict, Iterable, Set
+
+from utils.cache_utils import get_redis_cache, get_tiered_cache, invalidate_cache_by_tag
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+
+# Seconds to wait before reconnecting the listener after a Redis error
+LISTENER_RETRY_SECONDS = 5
+
+# Cache tags invalidated by a change to each entity kind. A tag named after
+# a kind always depends on it; aggregate tags are registered below.
+_subscriptions: Dict[str, Set[str]] = {
+    "trips": {"trips"},
+    "charging": {"charging"},
+    "fuel": {"fuel"},
+    "battery": {"battery"},
+}
+_subscriptions_lock = threading.Lock()
+
+# Identifies this process's messages so it doesn't invalidate twice
+_PROCESS_ID = uuid.uuid4().hex
+
+_listener_thread = None
+_listener_stop = threading.Event()
+
+
+def subscribe(tag: str, *kinds: str) -> None:
+    """
+    Invalidate a cache tag whenever one of the given entity kinds changes.
+
+    Args:
+        tag: Cache tag used with cache_result/cached_query
+        *kinds: Entity kinds the tagged results are computed from
+
+    Example:
+        subscribe("efficiency", "trips", "charging")
+    """
+    with _subscriptions_lock:
+        for kind in kinds:
+            _subscriptions.setdefault(kind, set()).add(tag)
+
+
+def tags_for_kinds(kinds: Iterable[str]) -> Set[str]:
+    """
+    Get the cache tags subscribed to any of the given entity kinds.
+
+    Args:
+        kinds: Entity kinds that changed
+
+    Returns:
+        Set of cache tags to invalidate
+    """
+    with _subscriptions_lock:
+        tags = set()
+        for kind in kinds:
+            tags |= _subscriptions.get(kind, set())
+        return tags
+
+
+def publish_entity_changes(*kinds: str) -> int:
+    """
+    Invalidate caches depending on the changed entity kinds, in every process.
+
+    Args:
+        *kinds: Entity kinds that changed
+
+    Returns:
+        Number of cache entries invalidated locally and in Redis
+    """
+    kinds = sorted(set(kinds))
+    tags = tags_for_kinds(kinds)
+    if not tags:
+        return 0
+
+    # L1 in this process plus the shared L2 entries and tag sets
+    deleted = sum(invalidate_cache_by_tag(tag) for tag in sorted(tags))
+
+    redis = get_redis_cache()
+    if redis is not None:
+        try:
+            redis.publish(CHANNEL, json.dumps({"origin": _PROCESS_ID, "kinds": kinds}))
+        except Exception as e:
+            logger.warning(f"Failed to publish cache invalidation for {kinds}: {e}")
+
+    logger.debug(f"Invalidated {deleted} cache entries for changes to {kinds}")
+    return deleted
+
+
+def handle_message(data) -> int:
+    """
+    Apply an invalidation event received from another process.
+
+    Only L1 is cleared: the publishing process already removed the entries
+    from Redis.
+
+    Args:
+        data: Raw message payload (JSON bytes or str)
+
+    Returns:
+        Number of L1 entries removed
+    """
+    try:
+        event = json.loads(data)
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring malformed cache invalidation message: {data!r}")
+        return 0
+
+    if event.get("origin") == _PROCESS_ID:
+        return 0
+
+    l1 = get_tiered_cache().l1
+    return sum(l1.delete_tag(tag) for tag in tags_for_kinds(event.get("kinds") or []))
+
+
+def _listen() -> None:
+    """Listener loop: apply remote invalidations until stopped."""
+    while not _listener_stop.is_set():
+        redis = get_redis_cache()
+        if redis is None:
+            _listener_stop.wait(LISTENER_RETRY_SECONDS)
+            continue
+
+        pubsub = None
+        try:
+            pubsub = redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CHANNEL)
+            # Anything cached while disconnected may have missed an event
+            get_tiered_cache().l1.clear()
+            while not _listener_stop.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message and message.get("type") == "message":
+                    handle_message(message["data"])
+        except Exception as e:
+            logger.warning(f"Cache invalidation listener error: {e}")
+            _listener_stop.wait(LISTENER_RETRY_SECONDS)
+        finally:
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+
+def start_invalidation_listener() -> None:
+    """Start the background thread applying other processes' invalidations (idempotent)."""
+    global _listener_thread
+
+    if _listener_thread is not None and _listener_thread.is_alive():
+        return
+
+    _listener_stop.clear()
+    _listener_thread = threading.Thread(target=_listen, name="cache-invalidation", daemon=True)
+    _listener_thread.start()
+    logger.info("Cache invalidation listener started")
+
+
+def stop_invalidation_listener() -> None:
+    """Stop the listener thread."""
+    _listener_stop.set()
+
+
+# Aggregate statistics are computed from every kind of driving/energy record
+subscribe("statistics", "trips", "charging", "fuel")
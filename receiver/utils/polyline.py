@@ -0,0 +1,211 @@
+"""
+Route geometry helpers for map display.
+
+Provides:
+- Ramer-Douglas-Peucker line simplification
+- Zoom-dependent simplification tolerances
+- Google encoded polyline format (compact string form understood by most
+  map libraries)
+- Bounding boxes for GPS tracks
+
+Coordinates are (lat, lon) tuples in degrees throughout.
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Coordinate = Tuple[float, float]
+
+# Geometry stored at trip finalization is simplified to about one pixel at
+# this zoom level (~2 m); requests for lower zooms simplify it further.
+STORED_GEOMETRY_ZOOM = 16
+
+DEFAULT_MAP_ZOOM = 12
+MIN_ZOOM = 0
+MAX_ZOOM = 20
+
+
+def tolerance_for_zoom(zoom: float, pixels: float = 1.0) -> float:
+    """
+    Get the simplification tolerance (degrees) matching a map zoom level.
+
+    At zoom z a 256px Web Mercator tile spans 360 / 2^z degrees of longitude,
+    so detail smaller than ``pixels`` screen pixels can be dropped.
+
+    Args:
+        zoom: Map zoom level (0-20)
+        pixels: Allowed deviation in screen pixels
+
+    Returns:
+        Tolerance in degrees
+    """
+    zoom = max(MIN_ZOOM, min(MAX_ZOOM, zoom))
+    return pixels * 360.0 / (256 * 2 ** zoom)
+
+
+def _perpendicular_distance(point: Coordinate, start: Coordinate, end: Coordinate) -> float:
+    """Distance from point to the segment start-end in degree space."""
+    (py, px), (sy, sx), (ey, ex) = point, start, end
+    dx, dy = ex - sx, ey - sy
+    if dx == 0 and dy == 0:
+        return math.hypot(px - sx, py - sy)
+    t = max(0.0, min(1.0, ((px - sx) * dx + (py - sy) * dy) / (dx * dx + dy * dy)))
+    return math.hypot(px - (sx + t * dx), py - (sy + t * dy))
+
+
+def _rdp_indices(coords: Sequence[Coordinate], tolerance: float) -> List[int]:
+    """Ramer-Douglas-Peucker with an explicit stack (no recursion limit on long tracks)."""
+    n = len(coords)
+    if n <= 2:
+        return list(range(n))
+
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+
+    while stack:
+        first, last = stack.pop()
+        max_distance, index = -1.0, first
+        for i in range(first + 1, last):
+            distance = _perpendicular_distance(coords[i], coords[first], coords[last])
+            if distance > max_distance:
+                max_distance, index = distance, i
+        if max_distance > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return [i for i, kept in enumerate(keep) if kept]
+
+
+def simplify_indices(
+    coords: Sequence[Coordinate], tolerance: float, max_points: Optional[int] = None
+) -> List[int]:
+    """
+    Ramer-Douglas-Peucker simplification returning the kept indices.
+
+    If max_points is given, the tolerance is doubled until the result fits.
+
+    Args:
+        coords: Track coordinates in order
+        tolerance: Maximum allowed deviation in degrees
+        max_points: Optional hard cap on returned points (at least 2)
+
+    Returns:
+        Sorted indices of the points to keep (always includes both ends)
+
+    Example:
+        >>> simplify_indices([(0, 0), (0, 1), (0, 2), (1, 3)], 0.1)
+        [0, 2, 3]
+    """
+    indices = _rdp_indices(coords, tolerance)
+    if max_points:
+        tolerance = tolerance or tolerance_for_zoom(MAX_ZOOM)
+        while len(indices) > max(max_points, 2):
+            tolerance *= 2
+            indices = _rdp_indices(coords, tolerance)
+    return indices
+
+
+def simplify(coords: Sequence[Coordinate], tolerance: float, max_points: Optional[int] = None) -> List[Coordinate]:
+    """
+    Simplify a track, optionally growing the tolerance until it fits max_points.
+
+    Args:
+        coords: Track coordinates in order
+        tolerance: Initial tolerance in degrees
+        max_points: Optional hard cap on returned points
+
+    Returns:
+        Simplified coordinates
+    """
+    return [coords[i] for i in simplify_indices(coords, tolerance, max_points)]
+
+
+def _encode_value(value: int) -> str:
+    """Encode one signed integer delta in polyline format."""
+    value = ~(value << 1) if value < 0 else value << 1
+    chunks = []
+    while value >= 0x20:
+        chunks.append(chr((0x20 | (value & 0x1F)) + 63))
+        value >>= 5
+    chunks.append(chr(value + 63))
+    return "".join(chunks)
+
+
+def encode_polyline(coords: Sequence[Coordinate], precision: int = 5) -> str:
+    """
+    Encode coordinates with the Google polyline algorithm.
+
+    Args:
+        coords: (lat, lon) pairs
+        precision: Decimal places kept (5 = ~1 m)
+
+    Returns:
+        Encoded polyline string
+
+    Example:
+        >>> encode_polyline([(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)])
+        '_p~iF~ps|U_ulLnnqC_mqNvxq`@'
+    """
+    factor = 10 ** precision
+    output = []
+    prev_lat = prev_lon = 0
+    for lat, lon in coords:
+        lat_i, lon_i = int(round(lat * factor)), int(round(lon * factor))
+        output.append(_encode_value(lat_i - prev_lat))
+        output.append(_encode_value(lon_i - prev_lon))
+        prev_lat, prev_lon = lat_i, lon_i
+    return "".join(output)
+
+
+def decode_polyline(encoded: str, precision: int = 5) -> List[Coordinate]:
+    """
+    Decode a Google encoded polyline.
+
+    Args:
+        encoded: Encoded polyline string
+        precision: Decimal places used when encoding
+
+    Returns:
+        List of (lat, lon) pairs
+    """
+    factor = 10 ** precision
+    coords = []
+    index = lat = lon = 0
+    length = len(encoded)
+
+    while index < length:
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1F) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lon += deltas[1]
+        coords.append((lat / factor, lon / factor))
+
+    return coords
+
+
+def calculate_bounds(coords: Sequence[Coordinate]) -> Optional[Dict[str, float]]:
+    """
+    Calculate the bounding box of a track.
+
+    Args:
+        coords: (lat, lon) pairs
+
+    Returns:
+        Dict with north, south, east, west, or None for an empty track
+    """
+    if not coords:
+        return None
+    lats = [lat for lat, _ in coords]
+    lons = [lon for _, lon in coords]
+    return {"north": max(lats), "south": min(lats), "east": max(lons), "west": min(lons)}
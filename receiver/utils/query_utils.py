@@ -5,10 +5,13 @@ Provides helpers for:
 - Eager loading relationships to avoid N+1 queries
 - Optimized query builders
 - Common query patterns
+- Sparse fieldsets (column-projected queries for ``fields=`` parameters)
 """
 
 import logging
-from typing import List, Optional, Any
+import uuid
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Union
 from sqlalchemy.orm import Query, joinedload, subqueryload, selectinload
 from sqlalchemy import and_, or_
 
@@ -314,3 +317,117 @@ def batch_load_relationships(items: List[Any], relationship_name: str) -> List[A
     )
 
     return loaded_items
+
+
+# Cache of serializable field names per model (derived once from to_dict())
+_serializable_fields_cache: Dict[type, List[str]] = {}
+
+
+def get_serializable_fields(model) -> List[str]:
+    """
+    Get the column names a model exposes through its to_dict() serializer.
+
+    Only real columns are returned, so computed keys (e.g. ChargingSession's
+    duration_minutes) and internal columns not present in to_dict() (e.g.
+    TelemetryRaw.raw_data) cannot be selected through a fields parameter.
+
+    Args:
+        model: SQLAlchemy model class with a to_dict() method
+
+    Returns:
+        List of field names in to_dict() order
+    """
+    fields = _serializable_fields_cache.get(model)
+    if fields is None:
+        column_names = set(model.__table__.columns.keys())
+        fields = [name for name in model().to_dict().keys() if name in column_names]
+        _serializable_fields_cache[model] = fields
+    return fields
+
+
+def parse_fields_param(raw: Union[str, Iterable[str], None], model) -> Optional[List[str]]:
+    """
+    Parse a sparse fieldset parameter into a validated list of field names.
+
+    Accepts a comma-separated string (query params) or a list (JSON bodies).
+    Duplicates are dropped while preserving the requested order.
+
+    Args:
+        raw: Raw fields value, e.g. "id,start_time,distance_miles"
+        model: SQLAlchemy model class the fields belong to
+
+    Returns:
+        List of field names, or None if no fieldset was requested
+
+    Raises:
+        ValueError: If the value is malformed or names an unknown field
+
+    Example:
+        >>> parse_fields_param("id,start_time", Trip)
+        ['id', 'start_time']
+    """
+    if raw is None:
+        return None
+
+    if isinstance(raw, str):
+        names = [name.strip() for name in raw.split(",")]
+    elif isinstance(raw, (list, tuple)):
+        if not all(isinstance(name, str) for name in raw):
+            raise ValueError("fields must be a list of field names")
+        names = [name.strip() for name in raw]
+    else:
+        raise ValueError("fields must be a comma-separated string or a list of field names")
+
+    names = [name for name in names if name]
+    if not names:
+        return None
+
+    allowed = get_serializable_fields(model)
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    return list(dict.fromkeys(names))
+
+
+def project_columns(model, fields: List[str]) -> List[Any]:
+    """
+    Map field names to column attributes for a column-only SELECT.
+
+    Use with ``query.with_entities(*project_columns(Trip, fields))`` so the
+    database only reads the requested columns and no ORM objects are built.
+
+    Args:
+        model: SQLAlchemy model class
+        fields: Validated field names (see parse_fields_param)
+
+    Returns:
+        List of InstrumentedAttribute columns
+    """
+    return [getattr(model, name) for name in fields]
+
+
+def _serialize_value(value: Any) -> Any:
+    """Serialize a column value the same way the models' to_dict() methods do."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def serialize_row(row, fields: List[str]) -> Dict[str, Any]:
+    """
+    Serialize a projected result row into a dict keyed by field name.
+
+    Lightweight counterpart of to_dict() for rows returned by a
+    column-projected query.
+
+    Args:
+        row: Result row (tuple-like) from a column-projected query
+        fields: Field names in the same order as the projected columns
+
+    Returns:
+        Dict with only the requested fields
+    """
+    return {name: _serialize_value(value) for name, value in zip(fields, row)}
@@ -0,0 +1,152 @@
+"""
+Precompressed response body cache for VoltTracker.
+
+Endpoints using data-version ETags (see utils.data_version) return the same
+bytes for as long as their ETag is unchanged. Instead of re-running the view,
+re-encoding the JSON and letting Flask-Compress gzip it again on every
+request, the first response for an ETag is stored in the tiered cache as
+identity, gzip and (when the brotli package is installed) brotli bodies.
+Later requests with the same ETag are served straight from those bytes in
+whichever encoding the client accepts.
+
+Flask-Compress leaves responses that already carry a Content-Encoding
+header alone, so cached bodies are never compressed twice.
+"""
+
+import gzip
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from flask import current_app, request
+
+from utils.cache_utils import get_tiered_cache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised only without brotli
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "response:"
+
+# Bodies are compressed once per ETag, so spend more CPU than Flask-Compress
+# does per request for smaller payloads
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+# Responses larger than this aren't cached (keeps big exports out of L1)
+MAX_CACHED_BODY_BYTES = 8 * 1024 * 1024
+
+
+def _compress(body: bytes) -> Dict[str, Optional[bytes]]:
+    """Build the encoded variants of a body (None where not worth it or unavailable)."""
+    encodings = {"gzip": None, "br": None}
+    if len(body) < current_app.config.get("COMPRESS_MIN_SIZE", 500):
+        return encodings
+
+    encodings["gzip"] = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if brotli is not None:
+        encodings["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+    return encodings
+
+
+def _choose_encoding(entry: Dict[str, Any]) -> Optional[str]:
+    """Pick the best stored encoding the client accepts (None for identity)."""
+    accept = request.accept_encodings
+    best, best_quality = None, 0.0
+    # Prefer brotli on ties: smaller bodies for the same client preference
+    for encoding in ("br", "gzip"):
+        if entry.get(encoding) is None:
+            continue
+        quality = accept.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def build_entry(response) -> Optional[Dict[str, Any]]:
+    """
+    Capture a view response for the body cache.
+
+    Args:
+        response: Flask response returned by the view
+
+    Returns:
+        Dict with the identity body, compressed variants and mimetype, or
+        None if the response isn't cacheable
+    """
+    if response.status_code != 200 or response.is_streamed or response.headers.get("Content-Encoding"):
+        return None
+
+    body = response.get_data()
+    if len(body) > MAX_CACHED_BODY_BYTES:
+        return None
+
+    return {"body": body, "mimetype": response.mimetype, **_compress(body)}
+
+
+def serve_entry(entry: Dict[str, Any], etag: str):
+    """
+    Build a response from a cached entry in the client's preferred encoding.
+
+    Args:
+        entry: Entry created by build_entry
+        etag: ETag of the entry (suffixed with the encoding, like
+            Flask-Compress does, when a compressed body is sent)
+
+    Returns:
+        Flask response
+    """
+    encoding = _choose_encoding(entry)
+    response = current_app.response_class(entry[encoding] if encoding else entry["body"], mimetype=entry["mimetype"])
+    response.headers["Vary"] = "Accept-Encoding"
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+        response.set_etag(f"{etag}:{encoding}")
+    else:
+        response.set_etag(etag)
+    return response
+
+
+def cached_response(etag: str, render: Callable[[], Any], ttl: int, tags: Iterable[str] = ()):
+    """
+    Serve the response for an ETag from the body cache, rendering it once on a miss.
+
+    Args:
+        etag: Data-version ETag identifying the response
+        render: Runs the view and returns a Flask response
+        ttl: Seconds to keep the bodies
+        tags: Cache tags (entity kinds) for invalidation
+
+    Returns:
+        Flask response (uncached responses, e.g. errors, are returned as rendered)
+    """
+    key = f"{KEY_PREFIX}{etag}"
+    uncacheable = {}
+
+    def compute():
+        response = render()
+        entry = build_entry(response)
+        if entry is None:
+            uncacheable["response"] = response
+            raise _Uncacheable()
+        return entry
+
+    try:
+        entry = get_tiered_cache().get_or_compute(key, compute, ttl=ttl, tags=list(tags))
+    except _Uncacheable:
+        response = uncacheable.get("response")
+        if response is None:
+            # Another request rendered an uncacheable response for this
+            # ETag at the same moment: render our own
+            response = render()
+        if response.status_code == 200:
+            response.set_etag(etag)
+        return response
+
+    return serve_entry(entry, etag)
+
+
+class _Uncacheable(Exception):
+    """Raised inside the cache computation so uncacheable responses aren't stored."""
@@ -7,13 +7,26 @@ and cluster trips based on geographic proximity.
 
 import logging
 import math
-from typing import List, Dict, Any, Tuple, Optional
+import sys
+from array import array
+from typing import List, Dict, Any, Sequence, Tuple, Optional
 
-from sqlalchemy.orm import Session
+import numpy as np
+from sqlalchemy import or_
+from sqlalchemy.orm import Query, Session
 from models import Trip, TelemetryRaw
+from utils.geohash import prefix_filter, prefixes_for_radius
 
 logger = logging.getLogger(__name__)
 
+# Start points further apart than this can't reach a start/end similarity of 30
+SIMILAR_ENDPOINT_RADIUS_MILES = 4.0
+
+# Points in a stored route fingerprint (same sample size as calculate_route_similarity)
+FINGERPRINT_POINTS = 20
+
+EARTH_RADIUS_MILES = 3959
+
 
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -36,10 +49,7 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
     c = 2 * math.asin(math.sqrt(a))
 
-    # Radius of Earth in miles
-    r = 3959
-
-    return c * r
+    return c * EARTH_RADIUS_MILES
 
 
 def calculate_route_similarity(
@@ -83,7 +93,19 @@ def calculate_route_similarity(
 
     avg_distance = total_distance / len(sampled1)
 
-    # Convert distance to similarity score
+    return similarity_from_distance(avg_distance)
+
+
+def similarity_from_distance(avg_distance: float) -> float:
+    """
+    Convert the average distance between corresponding route points to a score.
+
+    Args:
+        avg_distance: Mean distance in miles between corresponding points
+
+    Returns:
+        Similarity score from 0 to 100
+    """
     # Routes within 0.5 miles average distance = 90+ similarity
     # Routes within 1 mile = 70+ similarity
     # Routes > 5 miles apart = <20 similarity
@@ -153,6 +175,149 @@ def get_trip_gps_points(db: Session, trip: Trip) -> List[Tuple[float, float]]:
     return [(float(t.latitude), float(t.longitude)) for t in telemetry]
 
 
+def compute_route_fingerprint(
+    points: Sequence[Tuple[float, float]],
+    n: int = FINGERPRINT_POINTS
+) -> List[Tuple[float, float]]:
+    """
+    Resample a GPS track to n points evenly spaced by distance along the route.
+
+    Unlike index-based sampling, the result doesn't depend on how often the
+    logger recorded, so two drives of the same road line up point for point.
+
+    Args:
+        points: List of (lat, lon) tuples in chronological order
+        n: Number of points in the fingerprint
+
+    Returns:
+        List of n (lat, lon) tuples, or [] if the track has fewer than 2 points
+    """
+    if len(points) < 2:
+        return []
+
+    cumulative = [0.0]
+    for (lat1, lon1), (lat2, lon2) in zip(points, points[1:]):
+        cumulative.append(cumulative[-1] + haversine_distance(lat1, lon1, lat2, lon2))
+
+    total = cumulative[-1]
+    if total == 0:
+        return [tuple(points[0])] * n
+
+    fingerprint = []
+    segment = 0
+    for i in range(n):
+        target = total * i / (n - 1)
+        while segment < len(points) - 2 and cumulative[segment + 1] < target:
+            segment += 1
+        length = cumulative[segment + 1] - cumulative[segment]
+        t = min(1.0, max(0.0, (target - cumulative[segment]) / length)) if length else 0.0
+        (lat1, lon1), (lat2, lon2) = points[segment], points[segment + 1]
+        fingerprint.append((lat1 + (lat2 - lat1) * t, lon1 + (lon2 - lon1) * t))
+
+    return fingerprint
+
+
+def pack_fingerprint(fingerprint: Sequence[Tuple[float, float]]) -> bytes:
+    """Pack a fingerprint as little-endian float64 lat, lon pairs."""
+    values = array("d", (coord for point in fingerprint for coord in point))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def unpack_fingerprint(blob: bytes) -> array:
+    """Unpack a stored fingerprint into a flat float64 array (lat0, lon0, lat1, ...)."""
+    values = array("d")
+    values.frombytes(blob)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def fingerprint_distances(reference: Sequence[float], candidates: Sequence[Sequence[float]]) -> List[float]:
+    """
+    Mean point-to-point distance between a reference fingerprint and each candidate.
+
+    Candidates are stacked into a (candidates x points x 2) matrix and
+    compared in one vectorized pass. Uses an equirectangular projection
+    around the reference points, which is well under 1% off haversine at the
+    few-mile separations that survive the endpoint prefilter.
+
+    Args:
+        reference: Flat (lat, lon, lat, lon, ...) reference fingerprint
+        candidates: Flat fingerprints of the same length
+
+    Returns:
+        Mean distance in miles for each candidate
+    """
+    if not len(candidates):
+        return []
+
+    ref = np.asarray(reference, dtype=float).reshape(-1, 2)
+    matrix = np.asarray(candidates, dtype=float).reshape(len(candidates), -1, 2)
+    cosines = np.cos(np.radians(ref[:, 0]))
+
+    d_lat = matrix[:, :, 0] - ref[:, 0]
+    d_lon = (matrix[:, :, 1] - ref[:, 1]) * cosines
+    mean_degrees = np.hypot(d_lat, d_lon).mean(axis=1)
+    return (np.radians(mean_degrees) * EARTH_RADIUS_MILES).tolist()
+
+
+def trip_fingerprint(db: Session, trip) -> array:
+    """
+    Get a trip's flat route fingerprint.
+
+    Uses the fingerprint stored at finalization, falling back to computing
+    it from telemetry for older trips.
+
+    Args:
+        db: Database session
+        trip: Trip (or row with id, session_id and route_fingerprint)
+
+    Returns:
+        Flat float64 array (lat0, lon0, lat1, ...), empty if the trip has
+        fewer than 2 GPS points
+    """
+    if trip.route_fingerprint:
+        return unpack_fingerprint(trip.route_fingerprint)
+    fingerprint = compute_route_fingerprint(get_trip_gps_points(db, trip))
+    return array("d", (coord for point in fingerprint for coord in point))
+
+
+def find_trip_ids_near(query: Query, lat: float, lon: float, radius_miles: float) -> List[int]:
+    """
+    Find trips that start or end within a radius of a point.
+
+    Geohash prefixes covering the circle prefilter candidates through the
+    indexed start/end geohash columns; exact haversine distance is then
+    checked on that small set only.
+
+    Args:
+        query: Trip query with any other filters already applied
+        lat: Latitude of the search center
+        lon: Longitude of the search center
+        radius_miles: Search radius in miles
+
+    Returns:
+        IDs of trips with an endpoint within the radius
+    """
+    prefixes = prefixes_for_radius(lat, lon, radius_miles)
+
+    candidates = (
+        query.with_entities(Trip.id, Trip.start_lat, Trip.start_lon, Trip.end_lat, Trip.end_lon)
+        .filter(or_(prefix_filter(Trip.start_geohash, prefixes), prefix_filter(Trip.end_geohash, prefixes)))
+        .order_by(None)
+        .all()
+    )
+
+    return [
+        row.id
+        for row in candidates
+        if (row.start_lat is not None and haversine_distance(lat, lon, row.start_lat, row.start_lon) <= radius_miles)
+        or (row.end_lat is not None and haversine_distance(lat, lon, row.end_lat, row.end_lon) <= radius_miles)
+    ]
+
+
 def calculate_route_bounds(points: List[Tuple[float, float]]) -> Dict[str, float]:
     """
     Calculate bounding box for a route.
@@ -191,6 +356,9 @@ def find_similar_trips(
     """
     Find trips with similar routes to the reference trip.
 
+    Compares the fixed-length route fingerprints stored at finalization, so
+    candidates finalized with a fingerprint need no telemetry reads.
+
     Args:
         db: Database session
         reference_trip: Reference trip to compare against
@@ -200,50 +368,76 @@ def find_similar_trips(
     Returns:
         List of dicts with trip info and similarity score, sorted by similarity (highest first)
     """
-    # Get GPS points for reference trip
-    ref_points = get_trip_gps_points(db, reference_trip)
+    ref_fingerprint = trip_fingerprint(db, reference_trip)
 
-    if len(ref_points) < 2:
+    if not ref_fingerprint:
         logger.warning(f"Reference trip {reference_trip.id} has insufficient GPS data")
         return []
 
-    ref_start = ref_points[0]
-    ref_end = ref_points[-1]
-    ref_bounds = calculate_route_bounds(ref_points)
+    ref_start = (ref_fingerprint[0], ref_fingerprint[1])
+    ref_end = (ref_fingerprint[-2], ref_fingerprint[-1])
 
     # Query candidate trips (exclude reference trip itself)
-    # Filter by approximate location using database query for efficiency
-    distance_tolerance = 0.2  # ~0.2 degrees latitude ≈ 14 miles
-
-    candidate_trips = db.query(Trip).filter(
+    # Prefilter by start location through the indexed geohash column; trips
+    # finalized before endpoints were stored have no geohash and are kept
+    prefixes = prefixes_for_radius(ref_start[0], ref_start[1], SIMILAR_ENDPOINT_RADIUS_MILES)
+
+    candidates = db.query(
+        Trip.id,
+        Trip.session_id,
+        Trip.start_time,
+        Trip.distance_miles,
+        Trip.kwh_per_mile,
+        Trip.gas_mpg,
+        Trip.start_lat,
+        Trip.start_lon,
+        Trip.end_lat,
+        Trip.end_lon,
+        Trip.route_fingerprint,
+    ).filter(
         Trip.id != reference_trip.id,
         Trip.is_closed.is_(True),
-        Trip.deleted_at.is_(None)
+        Trip.deleted_at.is_(None),
+        or_(prefix_filter(Trip.start_geohash, prefixes), Trip.start_geohash.is_(None))
     ).limit(500).all()  # Limit to recent trips for performance
 
-    similar_trips = []
-
-    for candidate in candidate_trips:
-        # Get candidate GPS points
-        candidate_points = get_trip_gps_points(db, candidate)
-
-        if len(candidate_points) < 2:
+    # Collect fingerprints, skipping candidates whose endpoints are too different
+    matched = []
+    fingerprints = []
+    for candidate in candidates:
+        # Fast pre-filter on stored endpoints before touching any telemetry
+        if candidate.start_lat is not None and candidate.end_lat is not None:
+            stored_similarity = calculate_start_end_similarity(
+                ref_start, ref_end,
+                (candidate.start_lat, candidate.start_lon), (candidate.end_lat, candidate.end_lon)
+            )
+            if stored_similarity < 30:
+                continue
+
+        if candidate.route_fingerprint:
+            fingerprint = unpack_fingerprint(candidate.route_fingerprint)
+        else:
+            # Trips finalized before fingerprints were stored
+            fingerprint = trip_fingerprint(db, candidate)
+            if not fingerprint:
+                continue
+            start_end_similarity = calculate_start_end_similarity(
+                ref_start, ref_end,
+                (fingerprint[0], fingerprint[1]), (fingerprint[-2], fingerprint[-1])
+            )
+            if start_end_similarity < 30:
+                continue
+
+        if len(fingerprint) != len(ref_fingerprint):
             continue
+        matched.append(candidate)
+        fingerprints.append(fingerprint)
 
-        # Fast pre-filter: Check start/end point similarity
-        cand_start = candidate_points[0]
-        cand_end = candidate_points[-1]
-
-        start_end_similarity = calculate_start_end_similarity(
-            ref_start, ref_end, cand_start, cand_end
-        )
-
-        # Skip if start/end points are too different
-        if start_end_similarity < 30:
-            continue
+    similar_trips = []
+    distances = fingerprint_distances(ref_fingerprint, fingerprints)
 
-        # Full route comparison for promising candidates
-        route_similarity = calculate_route_similarity(ref_points, candidate_points)
+    for candidate, fingerprint, distance in zip(matched, fingerprints, distances):
+        route_similarity = similarity_from_distance(distance)
 
         if route_similarity >= min_similarity:
             similar_trips.append({
@@ -253,8 +447,8 @@ def find_similar_trips(
                 'kwh_per_mile': round(candidate.kwh_per_mile, 3) if candidate.kwh_per_mile else None,
                 'gas_mpg': round(candidate.gas_mpg, 1) if candidate.gas_mpg else None,
                 'similarity_score': round(route_similarity, 1),
-                'start_point': {'lat': cand_start[0], 'lon': cand_start[1]},
-                'end_point': {'lat': cand_end[0], 'lon': cand_end[1]}
+                'start_point': {'lat': fingerprint[0], 'lon': fingerprint[1]},
+                'end_point': {'lat': fingerprint[-2], 'lon': fingerprint[-1]}
             })
 
     # Sort by similarity (highest first) and limit results
@@ -270,11 +464,14 @@ def cluster_trips_by_route(
     """
     Cluster trips into groups with similar routes.
 
-    Uses a simple greedy clustering approach:
+    Uses a simple greedy clustering approach over route fingerprints:
     1. Start with first trip as cluster center
     2. Add similar trips to cluster
     3. Repeat with remaining trips
 
+    Persistent clustering of finalized trips is done incrementally by
+    services.route_service.assign_trip_to_route; this is for ad-hoc groups.
+
     Args:
         db: Database session
         trips: List of Trip objects to cluster
@@ -286,39 +483,35 @@ def cluster_trips_by_route(
     if not trips:
         return []
 
-    # Get GPS points for all trips
-    trip_points = {}
+    # Stored fingerprints (telemetry only for trips finalized before them)
+    fingerprints = {}
     for trip in trips:
-        points = get_trip_gps_points(db, trip)
-        if len(points) >= 2:
-            trip_points[trip.id] = points
+        fingerprint = trip_fingerprint(db, trip)
+        if fingerprint:
+            fingerprints[trip.id] = fingerprint
 
-    if not trip_points:
+    if not fingerprints:
         return []
 
     clusters = []
-    unclustered = set(trip_points.keys())
+    unclustered = list(fingerprints.keys())
 
     while unclustered:
         # Start new cluster with first unclustered trip
-        center_id = next(iter(unclustered))
-        cluster = [center_id]
-        unclustered.remove(center_id)
-
-        center_points = trip_points[center_id]
+        center_id = unclustered[0]
+        others = unclustered[1:]
 
-        # Find similar trips
-        to_remove = []
-        for trip_id in unclustered:
-            similarity = calculate_route_similarity(center_points, trip_points[trip_id])
-            if similarity >= similarity_threshold:
+        # Compare the center against every remaining trip in one pass
+        distances = fingerprint_distances(fingerprints[center_id], [fingerprints[trip_id] for trip_id in others])
+        cluster = [center_id]
+        remaining = []
+        for trip_id, distance in zip(others, distances):
+            if similarity_from_distance(distance) >= similarity_threshold:
                 cluster.append(trip_id)
-                to_remove.append(trip_id)
-
-        # Remove clustered trips from unclustered set
-        for trip_id in to_remove:
-            unclustered.remove(trip_id)
+            else:
+                remaining.append(trip_id)
 
         clusters.append(cluster)
+        unclustered = remaining
 
     return clusters
@@ -0,0 +1,251 @@
+"""
+Serialization helpers for VoltTracker.
+
+Two codecs live here:
+
+- JSON for HTTP responses. Uses orjson when installed (several times faster
+  than the stdlib on large lists of trip/telemetry dicts) and natively
+  encodes datetime, date, UUID, Decimal and NumPy values, so response data
+  doesn't need to be converted first. Falls back to the stdlib json
+  module with an equivalent ``default`` hook.
+- Cache payloads for Redis. Uses msgpack when installed, with extension
+  types for the values cached results commonly contain (datetimes, UUIDs,
+  Decimals, tuples). Anything msgpack can't represent is pickled, so every
+  value that could be cached before still can be.
+
+orjson and msgpack are optional: the app works (more slowly) without them.
+"""
+
+import dataclasses
+import datetime as dt
+import decimal
+import json
+import logging
+import pickle
+import uuid
+from typing import Any
+
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - exercised only without msgpack
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# JSON
+# ============================================================================
+
+
+def _json_default(obj: Any) -> Any:
+    """Encode types the JSON encoders don't handle natively."""
+    if isinstance(obj, (dt.datetime, dt.date, dt.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)  # Same as Flask's default provider
+    if isinstance(obj, np.generic):
+        return obj.item()  # NumPy scalars (int64, float32, bool_, ...)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    # Non-string keys (e.g. {2024: ...} year buckets) are accepted by the
+    # stdlib encoder, so keep accepting them. NumPy scalars and arrays from
+    # the vectorized services are encoded natively.
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def dumps_json(obj: Any, indent: bool = False) -> bytes:
+    """
+    Encode a value as UTF-8 JSON.
+
+    Args:
+        obj: Value to encode (may contain datetime, date, UUID, Decimal and
+            NumPy values)
+        indent: Pretty-print with two-space indentation
+
+    Returns:
+        JSON document as bytes
+
+    Example:
+        >>> dumps_json({"start": datetime(2024, 1, 1, 8, 30)})
+        b'{"start":"2024-01-01T08:30:00"}'
+    """
+    if orjson is not None:
+        options = _ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, default=_json_default, option=options)
+        except TypeError as e:
+            # orjson rejects a few values the stdlib accepts (e.g. ints over
+            # 64 bits, mixed key types); those payloads take the slow path
+            logger.debug(f"orjson could not encode response, using json: {e}")
+
+    return json.dumps(
+        obj,
+        default=_json_default,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+    ).encode("utf-8")
+
+
+def loads_json(data) -> Any:
+    """
+    Decode a JSON document.
+
+    Args:
+        data: JSON as bytes or str
+
+    Returns:
+        Decoded value
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by dumps_json/loads_json.
+
+    Install with ``app.json = FastJSONProvider(app)``; jsonify() and
+    returning dicts/lists from views then use it.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize to a JSON string."""
+        return dumps_json(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        """Deserialize a JSON string or bytes."""
+        return loads_json(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """Build a JSON response without the intermediate str round trip."""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = dumps_json(obj, indent=indent)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+# ============================================================================
+# Cache payloads
+# ============================================================================
+
+# Leading byte identifying the payload format. Raw pickles (cached before
+# this codec existed) start with the pickle PROTO opcode, b"\x80".
+_MSGPACK_FORMAT = b"M"
+_PICKLE_FORMAT = b"P"
+
+# msgpack extension type codes
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_TIME = 3
+_EXT_UUID = 4
+_EXT_DECIMAL = 5
+_EXT_TUPLE = 6
+
+
+def _pack_ext(obj: Any):
+    """Encode non-msgpack types as extension types (raises TypeError otherwise)."""
+    # datetime is a date subclass, so check it first
+    if isinstance(obj, dt.datetime):
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode())
+    if isinstance(obj, dt.date):
+        return msgpack.ExtType(_EXT_DATE, obj.isoformat().encode())
+    if isinstance(obj, dt.time):
+        return msgpack.ExtType(_EXT_TIME, obj.isoformat().encode())
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(_EXT_UUID, obj.bytes)
+    if isinstance(obj, decimal.Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(obj).encode())
+    if type(obj) is tuple:
+        return msgpack.ExtType(_EXT_TUPLE, _packb(list(obj)))
+    raise TypeError(f"Cannot msgpack {type(obj).__name__}")
+
+
+def _unpack_ext(code: int, data: bytes) -> Any:
+    """Decode extension types written by _pack_ext."""
+    if code == _EXT_DATETIME:
+        return dt.datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return dt.date.fromisoformat(data.decode())
+    if code == _EXT_TIME:
+        return dt.time.fromisoformat(data.decode())
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    if code == _EXT_DECIMAL:
+        return decimal.Decimal(data.decode())
+    if code == _EXT_TUPLE:
+        return tuple(_unpackb(data))
+    return msgpack.ExtType(code, data)
+
+
+def _packb(obj: Any) -> bytes:
+    # strict_types routes tuples and subclasses (named tuples, OrderedDict,
+    # enums) through _pack_ext, so nothing is silently changed in transit
+    return msgpack.packb(obj, default=_pack_ext, strict_types=True, use_bin_type=True)
+
+
+def _unpackb(data: bytes) -> Any:
+    return msgpack.unpackb(data, ext_hook=_unpack_ext, raw=False, strict_map_key=False)
+
+
+def encode_cache_value(value: Any) -> bytes:
+    """
+    Encode a value for storage in Redis.
+
+    Args:
+        value: Value to cache
+
+    Returns:
+        Payload bytes (decode with decode_cache_value)
+    """
+    if msgpack is not None:
+        try:
+            return _MSGPACK_FORMAT + _packb(value)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return _PICKLE_FORMAT + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def decode_cache_value(payload: bytes) -> Any:
+    """
+    Decode a payload written by encode_cache_value (or a legacy raw pickle).
+
+    Args:
+        payload: Bytes read from Redis
+
+    Returns:
+        Cached value
+
+    Raises:
+        ValueError: If the payload format is unknown or needs msgpack when
+            it isn't installed
+    """
+    marker = payload[:1]
+    if marker == _MSGPACK_FORMAT:
+        if msgpack is None:
+            raise ValueError("Cache payload requires msgpack")
+        return _unpackb(payload[1:])
+    if marker in (_PICKLE_FORMAT, b"\x80"):
+        # Tagged pickle fallback, or a bare pickle written before the codec
+        return pickle.loads(payload[1:] if marker == _PICKLE_FORMAT else payload)
+    raise ValueError(f"Unknown cache payload format: {marker!r}")
@@ -0,0 +1,167 @@
+"""
+Square spatial grid for map heatmaps.
+
+Telemetry is binned into fixed-size lat/lon cells at a few grid levels so a
+heatmap can be drawn from pre-aggregated cells instead of raw points. Each
+level's cell is 1/8 of a Web Mercator tile at that zoom (about 32 screen
+pixels), and a request at any map zoom is served from the finest level that
+does not exceed it.
+
+Cells are keyed by (level, cell_x, cell_y) where cell_x/cell_y count cells
+from longitude -180 and latitude -90.
+"""
+
+import math
+from typing import Dict, Iterable, Optional, Tuple
+
+# Grid levels maintained in map_grid_cells (map zoom levels)
+GRID_LEVELS = (8, 11, 14)
+
+# Cells per tile edge at each grid level
+CELLS_PER_TILE = 8
+
+# Samples slower than this (mph) don't contribute to efficiency
+MIN_MOVING_SPEED_MPH = 5
+
+CellKey = Tuple[int, int, int]
+
+
+def cell_size(level: int) -> float:
+    """
+    Get the cell edge length in degrees for a grid level.
+
+    Args:
+        level: Grid level (map zoom)
+
+    Returns:
+        Cell size in degrees
+    """
+    return 360.0 / (2 ** level) / CELLS_PER_TILE
+
+
+def grid_level_for_zoom(zoom: float) -> int:
+    """
+    Pick the grid level used to serve a map zoom.
+
+    Args:
+        zoom: Map zoom level
+
+    Returns:
+        Finest grid level <= zoom (coarsest level for very low zooms)
+    """
+    eligible = [level for level in GRID_LEVELS if level <= zoom]
+    return max(eligible) if eligible else GRID_LEVELS[0]
+
+
+def cell_index(lat: float, lon: float, level: int) -> Tuple[int, int]:
+    """
+    Get the (cell_x, cell_y) index containing a coordinate.
+
+    Args:
+        lat: Latitude in degrees
+        lon: Longitude in degrees
+        level: Grid level
+
+    Returns:
+        Tuple of (cell_x, cell_y)
+    """
+    size = cell_size(level)
+    return int(math.floor((lon + 180.0) / size)), int(math.floor((lat + 90.0) / size))
+
+
+def cell_center(level: int, cell_x: int, cell_y: int) -> Tuple[float, float]:
+    """
+    Get the (lat, lon) center of a cell.
+
+    Args:
+        level: Grid level
+        cell_x: Cell column
+        cell_y: Cell row
+
+    Returns:
+        Tuple of (lat, lon)
+    """
+    size = cell_size(level)
+    return (cell_y + 0.5) * size - 90.0, (cell_x + 0.5) * size - 180.0
+
+
+def cell_id(level: int, cell_x: int, cell_y: int) -> str:
+    """Format a cell key as a stable string id ("level:x:y")."""
+    return f"{level}:{cell_x}:{cell_y}"
+
+
+def new_cell_totals() -> Dict[str, float]:
+    """Create an empty set of per-cell running totals."""
+    return {
+        "sample_count": 0,
+        "speed_sum": 0.0,
+        "moving_count": 0,
+        "moving_speed_sum": 0.0,
+        "moving_power_kw_sum": 0.0,
+    }
+
+
+def accumulate_cells(points: Iterable[dict], levels: Iterable[int] = GRID_LEVELS) -> Dict[CellKey, Dict[str, float]]:
+    """
+    Bin telemetry points into grid cells at every level.
+
+    Efficiency totals only include moving samples with a power reading, so
+    a cell's kWh/mile is sum(kW) / sum(mph) over those samples (a time-
+    weighted ratio rather than an average of noisy per-point ratios).
+
+    Args:
+        points: Telemetry dicts with latitude, longitude, speed_mph and
+            hv_battery_power_kw
+        levels: Grid levels to accumulate
+
+    Returns:
+        Dict of (level, cell_x, cell_y) -> running totals
+    """
+    levels = tuple(levels)
+    cells: Dict[CellKey, Dict[str, float]] = {}
+
+    for point in points:
+        lat, lon = point.get("latitude"), point.get("longitude")
+        if lat is None or lon is None:
+            continue
+        speed = point.get("speed_mph")
+        power = point.get("hv_battery_power_kw")
+        moving = speed is not None and speed > MIN_MOVING_SPEED_MPH and power is not None
+
+        for level in levels:
+            cell_x, cell_y = cell_index(float(lat), float(lon), level)
+            totals = cells.get((level, cell_x, cell_y))
+            if totals is None:
+                totals = cells[(level, cell_x, cell_y)] = new_cell_totals()
+            totals["sample_count"] += 1
+            totals["speed_sum"] += speed or 0.0
+            if moving:
+                totals["moving_count"] += 1
+                totals["moving_speed_sum"] += speed
+                totals["moving_power_kw_sum"] += power
+
+    return cells
+
+
+def parse_bbox(raw: Optional[str]) -> Optional[Tuple[float, float, float, float]]:
+    """
+    Parse a ``bbox`` query parameter.
+
+    Args:
+        raw: "west,south,east,north" in degrees (None if absent)
+
+    Returns:
+        Tuple of (west, south, east, north), or None if absent
+
+    Raises:
+        ValueError: If the value is malformed
+    """
+    if raw is None or raw == "":
+        return None
+    try:
+        west, south, east, north = (float(part) for part in raw.split(","))
+    except ValueError:
+        raise ValueError("bbox must be west,south,east,north")
+    if west > east or south > north:
+        raise ValueError("bbox must be west,south,east,north with west <= east and south <= north")
+    return west, south, east, north
@@ -0,0 +1,483 @@
+"""
+Tiered cache: in-process LRU (L1) in front of optional Redis (L2).
+
+Provides:
+- A thread-safe LRU bounded by entry count and an approximate byte budget
+- Per-key single-flight, so a cold key is computed once no matter how many
+  requests ask for it at the same time (threads in this process wait for the
+  in-flight computation; other processes wait on a short Redis lock and read
+  the value it writes)
+- Stale-while-revalidate: entries can be served for a grace period after
+  their TTL while one background refresh recomputes them
+- Tag-based invalidation across both tiers
+
+Redis is looked up through a getter on every call, so the cache keeps
+working (L1 only) when Redis is down and picks it up again when it returns.
+"""
+
+import fnmatch
+import logging
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# L1 defaults
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+
+# Cross-process single-flight lock
+LOCK_TIMEOUT_SECONDS = 30  # Lock expiry if the computing process dies
+LOCK_WAIT_SECONDS = 5  # How long other processes wait for the value
+LOCK_POLL_SECONDS = 0.05
+
+# Sentinel for "not cached" (None is a valid cached value)
+MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate the memory held by a cached value.
+
+    Uses the pickled size, which tracks the real footprint of nested dicts
+    and lists far better than sys.getsizeof (which ignores contents).
+
+    Args:
+        value: Value to measure
+
+    Returns:
+        Size in bytes
+    """
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+@dataclass
+class _Entry:
+    """One L1 entry."""
+
+    value: Any
+    size: int
+    fresh_until: float
+    stale_until: float
+    tags: FrozenSet[str]
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with TTLs and a byte budget.
+
+    Entries past their TTL but within their stale grace period are still
+    returned, flagged as stale.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Maximum number of entries
+            max_bytes: Maximum total estimated size of the cached values
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = self.stale_hits = self.misses = self.evictions = 0
+        # Bumped by every invalidation, so a computation that started before
+        # one can tell its result may already be out of date
+        self.generation = 0
+
+    def get(self, key: str) -> Tuple[Any, bool]:
+        """
+        Look up a key.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (value or MISSING, is_stale)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING, False
+
+            now = self._clock()
+            if now >= entry.stale_until:
+                self._remove(key)
+                self.misses += 1
+                return MISSING, False
+
+            self._entries.move_to_end(key)
+            if now >= entry.fresh_until:
+                self.stale_hits += 1
+                return entry.value, True
+
+            self.hits += 1
+            return entry.value, False
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: float,
+        stale_ttl: float = 0,
+        tags: Iterable[str] = (),
+        size: Optional[int] = None,
+    ) -> bool:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache (callers must not mutate it afterwards)
+            ttl: Seconds the value is fresh
+            stale_ttl: Extra seconds the value may be served stale
+            tags: Tags for invalidate_tag
+            size: Size in bytes if already known
+
+        Returns:
+            False if the value alone exceeds the byte budget (not stored)
+        """
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            return False
+
+        now = self._clock()
+        entry = _Entry(value, size, now + ttl, now + ttl + stale_ttl, frozenset(tags))
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Remove a key. Returns True if it was cached."""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def delete_matching(self, pattern: str) -> int:
+        """
+        Remove keys matching a glob pattern (e.g. "stats:*").
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            self.generation += 1
+            keys = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def delete_tag(self, tag: str) -> int:
+        """
+        Remove entries carrying a tag.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            self.generation += 1
+            keys = [key for key, entry in self._entries.items() if tag in entry.tags]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get entry count, memory use and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.stale_hits) / lookups * 100, 2) if lookups else 0,
+            }
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry (caller holds the lock)."""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+
+class _Flight:
+    """A computation in progress that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = MISSING
+        self.error: Optional[BaseException] = None
+
+
+class TieredCache:
+    """
+    L1/L2 cache facade with single-flight and stale-while-revalidate.
+
+    Example:
+        >>> cache = TieredCache(LRUCache())
+        >>> cache.get_or_compute("answer", lambda: 42, ttl=60)
+        42
+    """
+
+    def __init__(
+        self,
+        l1: LRUCache,
+        l2_getter: Callable[[], Any] = lambda: None,
+        serialize: Callable[[Any], bytes] = pickle.dumps,
+        deserialize: Callable[[bytes], Any] = pickle.loads,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            l1: In-process LRU
+            l2_getter: Returns a Redis client, or None when Redis is unavailable
+            serialize: Encodes values for L2
+            deserialize: Decodes L2 payloads
+        """
+        self.l1 = l1
+        self._l2_getter = l2_getter
+        self._serialize = serialize
+        self._deserialize = deserialize
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._refreshing: set = set()
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: int,
+        stale_ttl: int = 0,
+        tags: Optional[Iterable[str]] = None,
+        refresh: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        """
+        Return the cached value for key, computing it once on a miss.
+
+        Args:
+            key: Cache key
+            compute: Produces the value (only called by one caller per key)
+            ttl: Seconds the value is fresh (also the Redis TTL)
+            stale_ttl: Seconds a stale L1 value may be served while a
+                background refresh runs (0 disables). The refresh runs on
+                another thread, so it must not depend on request context.
+            tags: Tags for invalidate_tag
+            refresh: Recomputes the value in the background (default:
+                compute), e.g. with its own database session
+
+        Returns:
+            Cached or freshly computed value
+        """
+        tags = tuple(tags or ())
+        value, stale = self.l1.get(key)
+        if value is not MISSING:
+            if stale:
+                self._refresh_in_background(key, refresh or compute, ttl, stale_ttl, tags)
+            return value
+
+        return self._single_flight(key, lambda: self._load(key, compute, ttl, stale_ttl, tags))
+
+    def get(self, key: str) -> Any:
+        """Get a value from L1, then L2 (returns MISSING if absent)."""
+        value, _ = self.l1.get(key)
+        if value is not MISSING:
+            return value
+        redis = self._l2_getter()
+        return self._l2_get(redis, key) if redis is not None else MISSING
+
+    def set(self, key: str, value: Any, ttl: int, stale_ttl: int = 0, tags: Optional[Iterable[str]] = None) -> None:
+        """Store a value in both tiers."""
+        self._store(key, value, ttl, stale_ttl, tuple(tags or ()), self._l2_getter())
+
+    def delete(self, key: str) -> None:
+        """Remove a key from both tiers."""
+        self.l1.delete(key)
+        redis = self._l2_getter()
+        if redis is not None:
+            try:
+                redis.delete(key)
+            except Exception as e:
+                logger.warning(f"Failed to delete cache key {key}: {e}")
+
+    def _single_flight(self, key: str, load: Callable[[], Any]) -> Any:
+        """Run load once per key; concurrent callers share its result."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = load()
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _load(self, key: str, compute: Callable[[], Any], ttl: int, stale_ttl: int, tags: Tuple[str, ...]) -> Any:
+        """Read L2, or compute under a cross-process lock, and fill both tiers."""
+        redis = self._l2_getter()
+        locked = False
+
+        if redis is not None:
+            value = self._l2_get(redis, key)
+            if value is not MISSING:
+                self.l1.set(key, value, ttl, stale_ttl, tags)
+                return value
+
+            locked = self._acquire_lock(redis, key)
+            if not locked:
+                # Another process is computing it: wait for its result
+                value = self._wait_for_l2(redis, key)
+                if value is not MISSING:
+                    self.l1.set(key, value, ttl, stale_ttl, tags)
+                    return value
+
+        generation = self.l1.generation
+        try:
+            value = compute()
+            if self.l1.generation == generation:
+                self._store(key, value, ttl, stale_ttl, tags, redis)
+            else:
+                # Invalidated mid-computation: the value may predate the write
+                logger.debug(f"Not caching {key}: invalidated while computing")
+            return value
+        finally:
+            if locked:
+                self._release_lock(redis, key)
+
+    def _refresh_in_background(
+        self, key: str, compute: Callable[[], Any], ttl: int, stale_ttl: int, tags: Tuple[str, ...]
+    ) -> None:
+        """Start one background recompute of a stale key."""
+        with self._lock:
+            if key in self._refreshing or key in self._flights:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._single_flight(key, lambda: self._load(key, compute, ttl, stale_ttl, tags))
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name="cache-refresh", daemon=True).start()
+
+    def _store(self, key: str, value: Any, ttl: int, stale_ttl: int, tags: Tuple[str, ...], redis) -> None:
+        """Write a value to L1 and (if available) L2 with its tags."""
+        payload = None
+        if redis is not None:
+            try:
+                payload = self._serialize(value)
+            except Exception as e:
+                logger.warning(f"Failed to serialize cache value for {key}: {e}")
+
+        self.l1.set(key, value, ttl, stale_ttl, tags, size=len(payload) if payload is not None else None)
+
+        if payload is None:
+            return
+        try:
+            redis.setex(key, ttl, payload)
+            for tag in tags:
+                tag_key = f"tag:{tag}"
+                redis.sadd(tag_key, key)
+                # Set TTL on tag set slightly longer than cache entries
+                redis.expire(tag_key, ttl + 60)
+        except Exception as e:
+            logger.warning(f"Failed to cache result for {key}: {e}")
+
+    def _l2_get(self, redis, key: str) -> Any:
+        """Read and decode an L2 value (MISSING on miss or error)."""
+        try:
+            payload = redis.get(key)
+            if payload is None:
+                return MISSING
+            return self._deserialize(payload)
+        except Exception as e:
+            logger.error(f"Cache error for {key}: {e}")
+            return MISSING
+
+    def _acquire_lock(self, redis, key: str) -> bool:
+        """Try to become the process that computes key."""
+        try:
+            return bool(redis.set(f"lock:{key}", b"1", nx=True, ex=LOCK_TIMEOUT_SECONDS))
+        except Exception:
+            # Can't coordinate through Redis: compute locally
+            return True
+
+    def _release_lock(self, redis, key: str) -> None:
+        """Release the compute lock for key."""
+        try:
+            redis.delete(f"lock:{key}")
+        except Exception as e:
+            logger.warning(f"Failed to release cache lock for {key}: {e}")
+
+    def _wait_for_l2(self, redis, key: str) -> Any:
+        """Poll L2 for a value another process is computing."""
+        deadline = time.monotonic() + LOCK_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_SECONDS)
+            value = self._l2_get(redis, key)
+            if value is not MISSING:
+                return value
+            try:
+                if not redis.exists(f"lock:{key}"):
+                    break
+            except Exception:
+                break
+        return MISSING
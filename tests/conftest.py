@@ -35,7 +35,6 @@ database.SessionLocal = Session
 
 # Now import app (which will use our patched database module)
 from app import app as flask_app  # noqa: E402
-from app import init_cache  # noqa: E402
 
 
 @pytest.fixture(autouse=True)
@@ -45,6 +44,10 @@ def clear_caches():
     from utils import weather
     weather._weather_cache.clear()
 
+    # Clear the in-process tier of the shared cache
+    from utils.cache_utils import get_tiered_cache
+    get_tiered_cache().l1.clear()
+
     # Reset rate limiter
     from extensions import limiter
     try:
@@ -59,6 +62,7 @@ def clear_caches():
 
     # Clean up after test as well
     weather._weather_cache.clear()
+    get_tiered_cache().l1.clear()
 
 
 @pytest.fixture
@@ -66,9 +70,6 @@ def app():
     """Create application for testing."""
     flask_app.config["TESTING"] = True
 
-    # Reinitialize cache to ensure it uses NullCache
-    init_cache(flask_app)
-
     # Create all tables in the test database
     Base.metadata.create_all(engine)
 
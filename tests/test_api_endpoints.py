@@ -306,6 +306,27 @@ class TestExportEndpoints:
         data = response.get_json()
         assert "summary" in data or "trips" in data
 
+    def test_export_all_sparse_trip_fields(self, client, db_session):
+        """Export all restricts trip columns when fields is given."""
+        trip = Trip(
+            session_id=uuid.uuid4(),
+            start_time=datetime.utcnow(),
+            distance_miles=30.0,
+            is_closed=True,
+        )
+        db_session.add(trip)
+        db_session.commit()
+        trip_id = trip.id
+
+        response = client.get("/api/export/all?fields=id,distance_miles")
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["trips"] == [{"id": trip_id, "distance_miles": 30.0}]
+        assert data["filters"]["fields"] == ["id", "distance_miles"]
+
+        response = client.get("/api/export/all?fields=bogus")
+        assert response.status_code == 400
+
     def test_export_torque_pids_returns_csv(self, client):
         """Torque PIDs export returns CSV."""
         response = client.get("/api/export/torque-pids")
@@ -0,0 +1,171 @@
+"""
+Tests for the battery cell analysis service.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "receiver"))
+
+from models import BatteryCellReading  # noqa: E402
+from services.battery_cell_service import (  # noqa: E402
+    analyze_cell_history,
+    analyze_cell_matrix,
+    backfill_packed_cell_voltages,
+    load_cell_matrix,
+    stack_cell_rows,
+)
+from utils.cell_voltages import pack_cell_voltages, unpack_cell_voltages  # noqa: E402
+
+
+def _voltages(day, weak_cell=None, drift_per_day=0.0):
+    """96 cells at 3.8V with an optional cell drifting down from 3.8V."""
+    voltages = [3.8] * 96
+    if weak_cell is not None:
+        voltages[weak_cell] = round(3.8 - drift_per_day * day, 4)
+    return voltages
+
+
+class TestPackedCellVoltages:
+    """Tests for the packed float32 storage."""
+
+    def test_round_trip(self):
+        """Packed voltages unpack to float32 precision with NaN for missing cells."""
+        voltages = [3.7512, None, 4.1] + [3.8] * 93
+        blob = pack_cell_voltages(voltages)
+
+        assert len(blob) == 96 * 4
+        unpacked = unpack_cell_voltages(blob)
+        assert unpacked[0] == pytest.approx(3.7512, abs=1e-6)
+        assert unpacked[1] != unpacked[1]  # NaN
+        assert unpacked[2] == pytest.approx(4.1, abs=1e-6)
+
+    def test_new_readings_are_packed(self):
+        """from_cell_voltages stores both JSON and packed voltages."""
+        voltages = [3.8] * 96
+        reading = BatteryCellReading.from_cell_voltages(timestamp=datetime.now(timezone.utc), cell_voltages=voltages)
+
+        assert reading.cell_voltages == voltages
+        assert list(unpack_cell_voltages(reading.cell_voltages_packed)) == pytest.approx(voltages)
+
+    def test_legacy_rows_read_from_json_and_backfilled(self, db_session):
+        """Unpacked readings fall back to JSON until the backfill packs them."""
+        now = datetime.now(timezone.utc)
+        reading = BatteryCellReading.from_cell_voltages(timestamp=now, cell_voltages=_voltages(0, weak_cell=5))
+        reading.cell_voltages_packed = None
+        db_session.add(reading)
+        db_session.commit()
+
+        (timestamps, rows), _ = load_cell_matrix(db_session, now - timedelta(days=1))
+        assert rows.shape == (1, 96)
+        assert rows[0][5] == pytest.approx(3.8)
+
+        last_id, packed = backfill_packed_cell_voltages(db_session)
+        db_session.commit()
+        assert (last_id, packed) == (reading.id, 1)
+        assert backfill_packed_cell_voltages(db_session, after_id=last_id) == (None, 0)
+
+        db_session.refresh(reading)
+        assert list(unpack_cell_voltages(reading.cell_voltages_packed)) == pytest.approx(reading.cell_voltages)
+
+
+class TestCellMatrixAnalysis:
+    """Tests for the one-pass matrix analysis."""
+
+    def test_drift_and_weak_score(self):
+        """A cell losing 1 mV/day drifts ~30 mV/month and becomes persistently weak."""
+        start = datetime(2024, 1, 1)
+        timestamps = [start + timedelta(days=d) for d in range(120)]
+        rows = [_voltages(d, weak_cell=42, drift_per_day=0.001) for d in range(120)]
+
+        result = analyze_cell_matrix((timestamps, rows))
+
+        trends = {c["cell_index"]: c for c in result["cell_trends"]}
+        assert trends[43]["drift_mv_per_month"] == pytest.approx(-30, abs=1)
+        assert abs(trends[1]["drift_mv_per_month"]) < 1
+
+        # 2% of ~3.8V is ~76 mV, crossed after ~77 days
+        assert trends[43]["weak_score"] == pytest.approx(43 / 120, abs=0.02)
+        assert trends[1]["weak_score"] == 0
+        assert result["drifting_cells"][0]["cell_index"] == 43
+        assert result["persistent_weak_cells"] == []
+
+    def test_persistent_weak_cells(self):
+        """A cell that is weak in most readings is reported."""
+        start = datetime(2024, 1, 1)
+        timestamps = [start + timedelta(days=d) for d in range(10)]
+        rows = [_voltages(0) for _ in range(10)]
+        for row in rows[:8]:
+            row[10] = 3.6
+
+        result = analyze_cell_matrix((timestamps, rows))
+
+        assert [c["cell_index"] for c in result["persistent_weak_cells"]] == [11]
+        assert result["persistent_weak_cells"][0]["weak_score"] == pytest.approx(0.8)
+
+    def test_module_balance_trend(self):
+        """A module sagging over time widens the module delta."""
+        start = datetime(2024, 1, 1)
+        timestamps = [start + timedelta(days=d) for d in range(60)]
+        rows = []
+        for d in range(60):
+            rows.append([3.8] * 64 + [3.8 - 0.0005 * d] * 32)
+
+        trend = analyze_cell_matrix((timestamps, rows))["module_balance_trend"]
+
+        assert trend["readings"] == 60
+        assert trend["first_module_delta"] == pytest.approx(0, abs=1e-4)
+        assert trend["last_module_delta"] == pytest.approx(0.0295, abs=1e-4)
+        assert trend["delta_mv_per_month"] == pytest.approx(15, abs=0.1)
+
+    def test_ragged_rows_and_invalid_cells_are_masked(self):
+        """Short rows are NaN-padded; NaN and zero cells don't count as readings."""
+        matrix = stack_cell_rows([[3.8, 3.8, 3.8], [3.8, 0.0], []])
+
+        assert matrix.shape == (3, 3)
+        assert np.isnan(matrix[1, 2]) and np.isnan(matrix[2]).all()
+
+        timestamps = [datetime(2024, 1, 1) + timedelta(days=d) for d in range(3)]
+        trends = analyze_cell_matrix((timestamps, matrix))["cell_trends"]
+        assert [(c["cell_index"], c["readings"]) for c in trends] == [(1, 2), (2, 1), (3, 1)]
+
+    def test_single_reading_has_no_drift(self):
+        """Drift needs readings at more than one time."""
+        result = analyze_cell_matrix(([datetime(2024, 1, 1)], [_voltages(0)]))
+
+        assert all(c["drift_mv_per_month"] is None for c in result["cell_trends"])
+        assert result["module_balance_trend"]["delta_mv_per_month"] is None
+
+
+class TestAnalyzeCellHistory:
+    """Tests for the combined period analysis."""
+
+    def test_empty_period(self, db_session):
+        """No readings gives no analysis."""
+        assert analyze_cell_history(db_session, datetime.now(timezone.utc) - timedelta(days=30)) is None
+
+    def test_mixed_packed_and_legacy_readings(self, db_session):
+        """Packed and JSON-only readings are analyzed together."""
+        now = datetime.now(timezone.utc)
+        for day in range(20):
+            reading = BatteryCellReading.from_cell_voltages(
+                timestamp=now - timedelta(days=20 - day),
+                cell_voltages=_voltages(day, weak_cell=7, drift_per_day=0.005),
+            )
+            if day % 2:
+                reading.cell_voltages_packed = None
+            db_session.add(reading)
+        db_session.commit()
+
+        analysis = analyze_cell_history(db_session, now - timedelta(days=30))
+
+        assert analysis["reading_count"] == 20
+        assert [c["cell_index"] for c in analysis["weak_cells"]] == [8]
+        assert analysis["weak_cells"][0]["voltage"] == 3.705
+        assert analysis["drifting_cells"][0]["cell_index"] == 8
+        assert analysis["drifting_cells"][0]["drift_mv_per_month"] == pytest.approx(-150, abs=3)
+        assert analysis["module_balance"]["balanced"] is True
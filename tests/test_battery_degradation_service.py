@@ -13,7 +13,12 @@ from datetime import datetime, timedelta, timezone
 
 import pytest
 from models import BatteryHealthReading
-from services.battery_degradation_service import forecast_degradation, get_degradation_history, simple_linear_regression
+from services.battery_degradation_service import (
+    forecast_degradation,
+    get_degradation_history,
+    refit_degradation_stats,
+    simple_linear_regression,
+)
 
 
 class TestGetDegradationHistory:
@@ -540,3 +545,88 @@ class TestBatteryDegradationValidation:
 
         # Should include both or handle duplicates gracefully
         assert len(history) >= 1
+
+
+class TestRunningRegression:
+    """Tests for the regression sums maintained as readings are inserted."""
+
+    def _add_readings(self, db_session, points, start):
+        for i, (odometer, capacity) in enumerate(points):
+            db_session.add(
+                BatteryHealthReading(
+                    timestamp=start + timedelta(days=i),
+                    capacity_kwh=capacity,
+                    odometer_miles=odometer,
+                )
+            )
+
+    def test_sums_match_full_regression(self, app, db_session):
+        """Folding readings in across several flushes matches a fit over the full history."""
+        from models import BatteryDegradationStats
+
+        start = datetime.now(timezone.utc) - timedelta(days=100)
+        self._add_readings(db_session, [(40000.0, 18.0), (45000.0, 17.9)], start)
+        db_session.commit()
+        self._add_readings(db_session, [(50000.0, 17.7), (55000.0, 17.6), (60000.0, 17.4)], start + timedelta(days=10))
+        db_session.commit()
+
+        stats = db_session.query(BatteryDegradationStats).one()
+        assert stats.n == 5
+
+        forecast = forecast_degradation(db_session)
+        slope, intercept = simple_linear_regression(get_degradation_history(db_session))
+        assert forecast["data_points"] == 5
+        assert forecast["model"]["slope"] == pytest.approx(slope)
+        assert forecast["model"]["intercept"] == pytest.approx(intercept)
+
+    def test_odometer_resolved_from_telemetry(self, app, db_session):
+        """A reading without an odometer stores the latest telemetry odometer."""
+        import uuid
+
+        from models import TelemetryRaw
+
+        now = datetime.now(timezone.utc)
+        db_session.add(
+            TelemetryRaw(session_id=uuid.uuid4(), timestamp=now - timedelta(minutes=5), odometer_miles=51234.0)
+        )
+        db_session.add(
+            TelemetryRaw(session_id=uuid.uuid4(), timestamp=now + timedelta(minutes=5), odometer_miles=51240.0)
+        )
+        db_session.commit()
+        reading = BatteryHealthReading(timestamp=now, capacity_kwh=17.8)
+        db_session.add(reading)
+        db_session.commit()
+
+        assert reading.odometer_miles == 51234.0
+
+    def test_refit_resolves_legacy_readings_and_fits_robust_trend(self, app, db_session):
+        """The background refit stores missing odometers and a robust fit that ignores outliers."""
+        import uuid
+
+        from models import Trip
+
+        start = datetime.now(timezone.utc) - timedelta(days=100)
+        points = [(40000.0 + i * 2000, 18.0 - i * 0.04) for i in range(8)]
+        points[3] = (points[3][0], 15.0)  # Bad reading
+        self._add_readings(db_session, points, start)
+        legacy = BatteryHealthReading(timestamp=start + timedelta(days=50), capacity_kwh=17.65)
+        db_session.add(legacy)
+        db_session.commit()
+        assert legacy.odometer_miles is None
+
+        db_session.add(
+            Trip(session_id=uuid.uuid4(), start_time=start + timedelta(days=51), end_odometer=57000.0, is_closed=True)
+        )
+        db_session.commit()
+
+        stats = refit_degradation_stats(db_session)
+        db_session.commit()
+
+        assert legacy.odometer_miles == 57000.0
+        assert stats.n == 9
+        assert stats.robust_slope == pytest.approx(-0.04 / 2000, rel=0.05)
+
+        forecast = forecast_degradation(db_session)
+        assert forecast["data_points"] == 9
+        assert forecast["robust_model"]["method"] == "theil_sen"
+        assert forecast["robust_model"]["slope"] == stats.robust_slope
@@ -284,6 +284,40 @@ class TestBulkExportTrips:
         assert response.mimetype == "text/csv"
         assert b"id,session_id" in response.data
 
+    def test_bulk_export_trips_sparse_fields(self, client, db_session):
+        """Export only the requested fields in JSON and CSV."""
+        from models import Trip
+
+        trip = Trip(
+            session_id=uuid.uuid4(),
+            start_time=datetime.now(timezone.utc),
+            distance_miles=12.5,
+            is_closed=True,
+        )
+        db_session.add(trip)
+        db_session.commit()
+        trip_id = trip.id
+
+        response = client.post(
+            "/api/bulk/trips/export",
+            json={"trip_ids": [trip_id], "format": "json", "fields": ["id", "distance_miles"]}
+        )
+        assert response.status_code == 200
+        assert response.get_json() == [{"id": trip_id, "distance_miles": 12.5}]
+
+        response = client.post(
+            "/api/bulk/trips/export",
+            json={"trip_ids": [trip_id], "format": "csv", "fields": ["id", "distance_miles", "gas_mpg"]}
+        )
+        assert response.status_code == 200
+        lines = response.data.decode().splitlines()
+        assert lines == ["id,distance_miles,gas_mpg", f"{trip_id},12.5,"]
+
+    def test_bulk_export_invalid_fields(self, client):
+        """Unknown export fields return 400."""
+        response = client.post("/api/bulk/trips/export", json={"trip_ids": [1], "fields": ["bogus"]})
+        assert response.status_code == 400
+
     def test_bulk_export_missing_trip_ids(self, client):
         """Request without trip_ids returns 400."""
         response = client.post("/api/bulk/trips/export", json={})
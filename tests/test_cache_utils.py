@@ -7,9 +7,12 @@ Tests Redis caching decorators, cache invalidation, and cache management.
 import os
 import sys
 import pickle
+import threading
 from unittest.mock import MagicMock, Mock, patch
 
 import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "receiver"))
 
@@ -26,6 +29,8 @@ from utils.cache_utils import (  # noqa: E402
     invalidate_cache_by_tag,
     invalidate_cache_pattern,
 )
+from utils.serialization import decode_cache_value  # noqa: E402
+from utils.tiered_cache import LRUCache, TieredCache  # noqa: E402
 
 
 class TestGenerateCacheKey:
@@ -144,7 +149,7 @@ class TestCacheResultDecorator:
     """Tests for cache_result decorator."""
 
     def test_cache_result_no_redis(self):
-        """Decorator works without Redis (fallback to direct execution)."""
+        """Decorator works without Redis (in-process cache only)."""
         with patch("utils.cache_utils.get_redis_cache", return_value=None):
             call_count = 0
 
@@ -159,8 +164,8 @@ class TestCacheResultDecorator:
 
             assert result1 == 10
             assert result2 == 10
-            # Should call function both times (no cache)
-            assert call_count == 2
+            # Second call served from the in-process tier
+            assert call_count == 1
 
     def test_cache_result_cache_hit(self):
         """Decorator returns cached value on cache hit."""
@@ -200,7 +205,7 @@ class TestCacheResultDecorator:
             mock_redis.setex.assert_called_once()
             call_args = mock_redis.setex.call_args
             assert call_args[0][1] == 60  # TTL
-            assert pickle.loads(call_args[0][2]) == 42  # Cached value
+            assert decode_cache_value(call_args[0][2]) == 42  # Cached value
 
     def test_cache_result_with_tags(self):
         """Decorator adds cache keys to tag sets."""
@@ -270,7 +275,8 @@ class TestCacheResultDecorator:
         mock_redis.get.return_value = None
 
         with patch("utils.cache_utils.get_redis_cache", return_value=mock_redis):
-            with patch("pickle.dumps", side_effect=Exception("Cannot pickle")):
+            with patch("pickle.dumps", side_effect=Exception("Cannot pickle")), \
+                    patch("utils.serialization._packb", side_effect=TypeError("Cannot msgpack")):
                 @cache_result("test", ttl=60)
                 def test_func(x):
                     return x * 2
@@ -279,6 +285,33 @@ class TestCacheResultDecorator:
                 result = test_func(21)
                 assert result == 42
 
+    def test_cache_result_stale_refresh_uses_own_session(self):
+        """Background refreshes get a new session on the caller's engine."""
+        engine = create_engine("sqlite://")
+        clock = [1000.0]
+        cache = TieredCache(LRUCache(clock=lambda: clock[0]))
+        sessions = []
+        refreshed = threading.Event()
+
+        with patch("utils.cache_utils.get_tiered_cache", return_value=cache):
+            @cache_result("test", ttl=10, stale_ttl=60, key_func=lambda db, x: f"test:{x}")
+            def test_func(db, x):
+                sessions.append(db)
+                if len(sessions) > 1:
+                    refreshed.set()
+                return x * len(sessions)
+
+            caller = Session(bind=engine)
+            assert test_func(caller, 21) == 21
+            clock[0] += 11
+
+            # Stale value is served while the refresh runs
+            assert test_func(caller, 21) == 21
+            assert refreshed.wait(2)
+
+        assert sessions[1] is not caller
+        assert sessions[1].get_bind() is engine
+
 
 class TestInvalidateCacheByTag:
     """Tests for invalidate_cache_by_tag function."""
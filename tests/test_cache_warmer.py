@@ -0,0 +1,193 @@
+"""
+Tests for the dashboard cache warmer.
+"""
+
+import os
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "receiver"))
+
+import services.cache_warmer as cache_warmer  # noqa: E402
+from config import Config  # noqa: E402
+from services.cache_warmer import (  # noqa: E402
+    get_last_warm_report,
+    init_cache_warmer,
+    schedule_cache_warm,
+    warm_dashboard_cache,
+)
+
+
+@pytest.fixture
+def registered_warmer(app):
+    """Register the app with the warmer for the duration of a test."""
+    init_cache_warmer(app)
+    yield app
+    init_cache_warmer(None)
+    cache_warmer._running = False
+    cache_warmer._rerun_reason = None
+
+
+class TestWarmDashboardCache:
+    """Tests for synchronous warming."""
+
+    def test_warm_fills_cache(self, app, client, db_session):
+        """A dashboard request after a warm is served without queries."""
+        from models import Trip
+
+        now = datetime.now(timezone.utc)
+        db_session.add(Trip(
+            session_id=uuid.uuid4(),
+            start_time=now - timedelta(days=1),
+            distance_miles=10.0,
+            electric_miles=10.0,
+            kwh_per_mile=0.3,
+            is_closed=True,
+        ))
+        db_session.commit()
+
+        report = warm_dashboard_cache(app, ["/api/efficiency/summary"], concurrency=1)
+        assert report["warmed"] == 1
+
+        statements = []
+        engine = db_session.get_bind()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            response = client.get("/api/efficiency/summary")
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert response.status_code == 200
+        assert statements == []
+
+    def test_report_durations_and_failures(self, app, db_session):
+        """Each endpoint's status and duration are reported."""
+        report = warm_dashboard_cache(
+            app, ["/api/stats/quick/7d", "/api/does-not-exist"], concurrency=2, reason="test"
+        )
+
+        assert report["reason"] == "test"
+        assert report["warmed"] == 1
+        assert report["failed"] == 1
+        by_path = {result["path"]: result for result in report["endpoints"]}
+        assert by_path["/api/stats/quick/7d"]["status"] == 200
+        assert by_path["/api/does-not-exist"]["status"] == 404
+        assert all(result["duration_ms"] >= 0 for result in report["endpoints"])
+        assert get_last_warm_report() is report
+
+    def test_default_paths_all_succeed(self, app, db_session):
+        """Every configured dashboard endpoint responds successfully on an empty database."""
+        report = warm_dashboard_cache(app, concurrency=1)
+
+        assert report["failed"] == 0, report["endpoints"]
+        assert report["warmed"] == len(Config.CACHE_WARM_PATHS)
+
+    def test_warm_requests_bypass_rate_limits(self, app, client, db_session, monkeypatch):
+        """Warm requests don't consume or get blocked by the shared per-IP budget."""
+        from extensions import limiter
+
+        monkeypatch.setattr(limiter, "_enabled", True)
+
+        # /api/status allows 60 per minute per address
+        report = warm_dashboard_cache(app, paths=["/api/status"] * 65, concurrency=1)
+        assert report["warmed"] == 65
+
+        statuses = [client.get("/api/status").status_code for _ in range(61)]
+        assert statuses[:60] == [200] * 60
+        assert statuses[60] == 429
+
+    def test_spoofed_warm_header_is_rate_limited(self, app, client, db_session, monkeypatch):
+        """Only the warmer's own token exempts a request."""
+        from extensions import limiter
+
+        monkeypatch.setattr(limiter, "_enabled", True)
+
+        headers = {cache_warmer.WARM_REQUEST_HEADER: "guess"}
+        statuses = [client.get("/api/status", headers=headers).status_code for _ in range(61)]
+        assert statuses[-1] == 429
+
+    def test_requires_app(self):
+        """Warming without an app is an error."""
+        with pytest.raises(RuntimeError):
+            warm_dashboard_cache(paths=["/api/stats/quick/7d"])
+
+
+class TestScheduleCacheWarm:
+    """Tests for background scheduling."""
+
+    def test_noop_without_registered_app(self):
+        """Nothing is scheduled until an app is registered."""
+        with patch("services.cache_warmer.warm_dashboard_cache") as warm:
+            assert schedule_cache_warm("test") is False
+        warm.assert_not_called()
+
+    def test_disabled_by_config(self, registered_warmer, monkeypatch):
+        """CACHE_WARM_ENABLED=false turns the warmer off."""
+        monkeypatch.setattr(Config, "CACHE_WARM_ENABLED", False)
+        assert schedule_cache_warm("test") is False
+
+    def test_triggers_during_warm_are_coalesced(self, registered_warmer):
+        """Triggers while a warm runs produce exactly one follow-up warm."""
+        started = threading.Event()
+        release = threading.Event()
+        reasons = []
+        done = threading.Event()
+
+        def fake_warm(reason):
+            reasons.append(reason)
+            if len(reasons) == 1:
+                started.set()
+                release.wait(2)
+            else:
+                done.set()
+
+        with patch("services.cache_warmer.warm_dashboard_cache", side_effect=fake_warm):
+            assert schedule_cache_warm("first") is True
+            assert started.wait(2)
+            assert schedule_cache_warm("second") is True
+            assert schedule_cache_warm("third") is True
+            release.set()
+            assert done.wait(2)
+            for _ in range(100):
+                if not cache_warmer._running:
+                    break
+                time.sleep(0.01)
+
+        assert reasons == ["first", "third"]
+        assert cache_warmer._running is False
+
+    def test_close_stale_trips_schedules_warm(self, app, db_session):
+        """Closing stale trips triggers a warm."""
+        from models import TelemetryRaw, Trip
+        from services.scheduler import close_stale_trips
+
+        session_id = uuid.uuid4()
+        old_time = datetime.utcnow() - timedelta(seconds=Config.TRIP_TIMEOUT_SECONDS + 60)
+        db_session.add(Trip(session_id=session_id, start_time=old_time, start_odometer=50000.0, is_closed=False))
+        db_session.add(TelemetryRaw(session_id=session_id, timestamp=old_time, odometer_miles=50000.0))
+        db_session.commit()
+
+        with patch("services.scheduler.schedule_cache_warm") as schedule:
+            close_stale_trips()
+
+        schedule.assert_called_once_with("trip_finalized")
+
+    def test_no_warm_without_closed_trips(self, app, db_session):
+        """Scheduler runs that close nothing don't warm."""
+        from services.scheduler import close_stale_trips
+
+        with patch("services.scheduler.schedule_cache_warm") as schedule:
+            close_stale_trips()
+
+        schedule.assert_not_called()
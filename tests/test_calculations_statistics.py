@@ -2,8 +2,15 @@
 Tests for statistical calculations
 """
 
+import bisect
+import random
+import statistics
+
 import pytest
 from receiver.calculations.statistics import (
+    QuantileSketch,
+    RunningCovariance,
+    RunningStats,
     calculate_confidence_interval,
     calculate_trend_vs_previous,
     calculate_percent_change,
@@ -12,6 +19,9 @@ from receiver.calculations.statistics import (
     filter_outliers,
     calculate_correlation_simple,
     calculate_z_score,
+    iter_moving_average,
+    iter_within_bounds,
+    outlier_bounds_from_sketch,
 )
 
 
@@ -229,3 +239,150 @@ class TestZScore:
         """Value 3+ std away"""
         result = calculate_z_score(130, 100, 10)
         assert result == 3.0
+
+
+class TestRunningStats:
+    """Test streaming mean/variance accumulator"""
+
+    def test_matches_statistics_module(self):
+        """Streamed values give the same mean and stdev as the full list"""
+        rng = random.Random(1)
+        values = [rng.gauss(0.3, 0.05) for _ in range(10000)]
+        stats = RunningStats.from_values(v for v in values)
+        assert stats.count == 10000
+        assert stats.mean == pytest.approx(statistics.mean(values), rel=1e-12)
+        assert stats.std_dev == pytest.approx(statistics.stdev(values), rel=1e-9)
+        assert stats.min == min(values)
+        assert stats.max == max(values)
+
+    def test_add_matches_batch_update(self):
+        """One-at-a-time and batched updates agree"""
+        values = [1.5, 2.5, 10.0, -3.0, 7.25]
+        single = RunningStats()
+        for v in values:
+            single.add(v)
+        batch = RunningStats.from_values(values)
+        assert single.mean == pytest.approx(batch.mean)
+        assert single.variance == pytest.approx(batch.variance)
+
+    def test_merge_shards(self):
+        """Merged shards equal the statistics of all values"""
+        values = list(range(1, 101))
+        merged = RunningStats()
+        for start in range(0, 100, 30):
+            merged.merge(RunningStats.from_values(values[start:start + 30]))
+        merged.merge(RunningStats())
+        assert merged.count == 100
+        assert merged.mean == pytest.approx(50.5)
+        assert merged.variance == pytest.approx(statistics.variance(values))
+
+    def test_insufficient_data(self):
+        """Variance needs two values"""
+        stats = RunningStats.from_values([4.0])
+        assert stats.variance is None
+        assert stats.std_dev is None
+        assert stats.population_variance == 0
+
+    def test_confidence_interval_from_generator(self):
+        """Confidence intervals accept generators"""
+        values = [0.28, 0.30, 0.32, 0.29, 0.31, 0.30, 0.28, 0.32]
+        assert calculate_confidence_interval(v for v in values) == calculate_confidence_interval(values)
+
+
+class TestRunningCovariance:
+    """Test streaming covariance accumulator"""
+
+    def test_matches_full_calculation(self):
+        """Covariance and correlation match the list-based calculation"""
+        rng = random.Random(2)
+        xs = [rng.uniform(0, 100) for _ in range(5000)]
+        ys = [0.5 * x + rng.gauss(0, 10) for x in xs]
+        cov = RunningCovariance.from_pairs(zip(xs, ys))
+        assert cov.covariance == pytest.approx(statistics.covariance(xs, ys), rel=1e-9)
+        assert cov.correlation == pytest.approx(statistics.correlation(xs, ys), rel=1e-9)
+
+    def test_merge_shards(self):
+        """Merged shards equal the full accumulator"""
+        pairs = [(x, x * x) for x in range(50)]
+        merged = RunningCovariance()
+        for start in range(0, 50, 7):
+            shard = RunningCovariance()
+            for x, y in pairs[start:start + 7]:
+                shard.add(x, y)
+            merged.merge(shard)
+        full = RunningCovariance.from_pairs(pairs)
+        assert merged.count == 50
+        assert merged.covariance == pytest.approx(full.covariance)
+        assert merged.correlation == pytest.approx(full.correlation)
+
+    def test_constant_values(self):
+        """No spread gives no correlation"""
+        assert RunningCovariance.from_pairs([(1, 2), (1, 3), (1, 4)]).correlation is None
+
+
+class TestQuantileSketch:
+    """Test mergeable quantile sketch"""
+
+    def test_small_inputs_are_exact(self):
+        """Below the compression limit quantiles are exact"""
+        values = [7, 1, 3, 9, 5]
+        sketch = QuantileSketch.from_values(values)
+        assert sketch.quantile(0.0) == 1
+        assert sketch.quantile(0.5) == 5
+        assert sketch.quantile(0.25) == 3
+        assert sketch.quantile(1.0) == 9
+
+    def test_large_stream_accuracy(self):
+        """Quantiles of a large stream are close to the exact ones"""
+        rng = random.Random(3)
+        values = [rng.expovariate(1.0) for _ in range(50000)]
+        sketch = QuantileSketch()
+        sketch.update(iter(values))
+        ordered = sorted(values)
+        for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+            # Rank of the estimate is within half a percentile of the target
+            rank = bisect.bisect_left(ordered, sketch.quantile(q)) / len(ordered)
+            assert rank == pytest.approx(q, abs=0.005)
+        assert sketch.quantile(0.0) == min(values)
+        assert sketch.quantile(1.0) == max(values)
+
+    def test_tail_accuracy_at_default_compression(self):
+        """Far tails of a skewed stream stay close to the exact quantiles"""
+        rng = random.Random(0)
+        values = [rng.lognormvariate(0, 1) for _ in range(200000)]
+        sketch = QuantileSketch.from_values(values)
+        ordered = sorted(values)
+        for q in (0.001, 0.999):
+            exact = ordered[round(q * (len(ordered) - 1))]
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.05)
+
+    def test_merge_shards(self):
+        """Merged sketches estimate quantiles of the combined data"""
+        rng = random.Random(4)
+        values = [rng.uniform(0, 1000) for _ in range(20000)]
+        merged = QuantileSketch()
+        for start in range(0, 20000, 5000):
+            merged.merge(QuantileSketch.from_values(values[start:start + 5000]))
+        assert merged.count == 20000
+        assert merged.quantile(0.5) == pytest.approx(statistics.median(values), rel=0.02)
+        assert merged.quantile(0.9) == pytest.approx(sorted(values)[17999], rel=0.02)
+
+    def test_empty(self):
+        """Empty sketches have no quantiles"""
+        assert QuantileSketch().quantile(0.5) is None
+
+    def test_outlier_bounds_streaming(self):
+        """Sketch-based bounds drop the same extreme value as the list version"""
+        values = [1, 2, 3, 4, 5, 100]
+        bounds = outlier_bounds_from_sketch(QuantileSketch.from_values(values))
+        assert bounds["upper_bound"] < 100
+        assert list(iter_within_bounds(iter(values), bounds)) == [1, 2, 3, 4, 5]
+        assert outlier_bounds_from_sketch(QuantileSketch.from_values([1, 2]))["q1"] is None
+
+
+class TestIterMovingAverage:
+    """Test streaming moving average"""
+
+    def test_generator_input(self):
+        """Moving averages stream from a generator"""
+        assert list(iter_moving_average((v for v in [10, 100, 10, 10, 10]), 3)) == [40.0, 40.0, 10.0]
@@ -476,3 +476,77 @@ class TestFinalizingExceptionHandling:
                 assert False, "Should have raised Exception"
             except Exception as e:
                 assert "Test error" in str(e)
+
+
+class TestChargingCurveCapture:
+    """Tests for capturing the charging curve at finalization."""
+
+    def _add_charging_telemetry(self, db_session, start, minutes):
+        """One charger-connected reading per minute with a tapering power curve."""
+        for i in range(minutes):
+            db_session.add(TelemetryRaw(
+                session_id=uuid.uuid4(),
+                timestamp=start + timedelta(minutes=i),
+                charger_connected=True,
+                charger_ac_power_kw=6.6 if i < minutes * 0.8 else 1.2,
+                state_of_charge=20.0 + i * 60.0 / minutes,
+            ))
+        db_session.flush()
+
+    def test_finalizing_stores_downsampled_curve(self, app, db_session, monkeypatch):
+        """The curve is stored once at finalization, bounded and keeping the taper."""
+        monkeypatch.setattr(Config, "MAX_CHARGING_CURVE_POINTS", 50)
+        start = datetime.now(timezone.utc) - timedelta(hours=5)
+        self._add_charging_telemetry(db_session, start, minutes=240)
+        session = ChargingSession(start_time=start, start_soc=20.0, is_complete=False)
+        db_session.add(session)
+        db_session.flush()
+        latest = TelemetryRaw(session_id=uuid.uuid4(), timestamp=start + timedelta(minutes=240), state_of_charge=80.0)
+
+        detect_and_finalize_charging_session(db_session, session, latest)
+
+        db_session.expire_all()
+        stored = db_session.query(ChargingSession).one().charging_curve
+        assert len(stored) == 50
+        assert stored[0]["power_kw"] == 6.6
+        assert 1.2 in [point["power_kw"] for point in stored]
+
+    def test_keeps_live_curve_without_telemetry(self, app, db_session):
+        """A curve collected while charging is kept when there's no telemetry to rebuild from."""
+        now = datetime.now(timezone.utc)
+        live_curve = [{"timestamp": now.isoformat(), "power_kw": 3.3, "soc": 50.0}]
+        session = ChargingSession(
+            start_time=now - timedelta(hours=1), start_soc=40.0, charging_curve=live_curve, is_complete=False
+        )
+        db_session.add(session)
+        db_session.flush()
+
+        detect_and_finalize_charging_session(db_session, session, None)
+
+        assert session.charging_curve == live_curve
+
+    def test_backfill_captures_missing_curves(self, app, db_session):
+        """Completed sessions without a curve get one; others are left alone."""
+        from services.charging_service import backfill_charging_curves
+
+        start = datetime.now(timezone.utc) - timedelta(days=2)
+        self._add_charging_telemetry(db_session, start, minutes=30)
+        missing = ChargingSession(start_time=start, end_time=start + timedelta(minutes=30), is_complete=True)
+        existing_curve = [{"timestamp": start.isoformat(), "power_kw": 1.0, "soc": 10.0}]
+        stored = ChargingSession(
+            start_time=start - timedelta(days=1),
+            end_time=start - timedelta(days=1) + timedelta(hours=1),
+            charging_curve=existing_curve,
+            is_complete=True,
+        )
+        db_session.add_all([missing, stored])
+        db_session.commit()
+
+        last_id, captured = backfill_charging_curves(db_session)
+        db_session.commit()
+
+        assert captured == 1
+        assert last_id == max(missing.id, stored.id)
+        assert len(missing.charging_curve) == 30
+        assert stored.charging_curve == existing_curve
+        assert backfill_charging_curves(db_session, after_id=last_id) == (None, 0)
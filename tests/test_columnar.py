@@ -0,0 +1,76 @@
+"""
+Tests for columnar telemetry encoding utilities.
+"""
+
+import os
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "receiver"))
+
+from utils.columnar import (  # noqa: E402
+    COLUMNAR_MAGIC,
+    column_dtype,
+    decode_columnar,
+    encode_batch,
+    iter_columnar,
+)
+
+
+class TestColumnDtype:
+    """Tests for column_dtype."""
+
+    def test_dtypes_by_column_type(self):
+        """Timestamps pack as int64, GPS as float64, other floats as float32."""
+        from models import TelemetryRaw
+
+        assert column_dtype(TelemetryRaw, "timestamp") == "int64"
+        assert column_dtype(TelemetryRaw, "latitude") == "float64"
+        assert column_dtype(TelemetryRaw, "speed_mph") == "float32"
+        assert column_dtype(TelemetryRaw, "charger_connected") == "float32"
+
+    def test_non_numeric_column(self):
+        """UUID and unknown columns cannot be packed."""
+        from models import TelemetryRaw
+
+        assert column_dtype(TelemetryRaw, "session_id") is None
+        assert column_dtype(TelemetryRaw, "nope") is None
+
+
+class TestIterColumnar:
+    """Tests for encoding and decoding columnar streams."""
+
+    def test_batches_and_terminator(self):
+        """Rows are split into batches and the stream ends with a zero count."""
+        rows = [(i, float(i)) for i in range(5)]
+        chunks = list(iter_columnar(rows, [("id", "int64"), ("speed_mph", "float32")], batch_size=2))
+
+        assert chunks[0].startswith(COLUMNAR_MAGIC)
+        assert len(chunks) == 1 + 3 + 1  # header, 3 batches, terminator
+        assert chunks[-1] == b"\x00\x00\x00\x00"
+
+        header, columns = decode_columnar(b"".join(chunks))
+        assert header["batch_size"] == 2
+        assert columns["id"] == [0, 1, 2, 3, 4]
+        assert columns["speed_mph"] == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+    def test_timestamps_as_epoch_ms(self):
+        """Aware and naive datetimes encode as UTC epoch milliseconds."""
+        rows = [
+            (datetime(2024, 1, 1, tzinfo=timezone.utc),),
+            (datetime(2024, 1, 1, 0, 0, 1),),
+        ]
+        _, columns = decode_columnar(b"".join(iter_columnar(rows, [("timestamp", "int64")])))
+
+        assert columns["timestamp"] == [1704067200000, 1704067201000]
+
+    def test_batch_size_is_compact(self):
+        """A float32 column costs four bytes per row plus the row count."""
+        assert len(encode_batch([(1.0,), (2.0,)], ["float32"])) == 4 + 2 * 4
+
+    def test_decode_rejects_other_payloads(self):
+        """Non-columnar payloads raise ValueError."""
+        with pytest.raises(ValueError):
+            decode_columnar(b'{"json": true}')
@@ -12,6 +12,7 @@ Tests the Torque Pro CSV import functionality including:
 - Edge cases and malformed data
 """
 
+import io
 import uuid
 from datetime import datetime, timezone
 from typing import Set
@@ -568,6 +569,65 @@ invalid-timestamp,90.0
         # So total_errors might be 0, and that's ok
 
 
+class TestStreamingParse:
+    """Tests for row-at-a-time parsing."""
+
+    def test_iter_records_is_lazy(self):
+        """Records are yielded as lines are consumed, with stats kept up to date."""
+        consumed = []
+
+        def lines():
+            yield "GPS Time,Latitude\n"
+            for i in range(500):
+                consumed.append(i)
+                yield f"2024-01-01 12:{i // 60:02d}:{i % 60:02d},37.77\n"
+
+        stats = TorqueCSVImporter.new_stats()
+        records = TorqueCSVImporter.iter_records(lines(), stats)
+
+        first = next(records)
+        assert first["timestamp"] == datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        assert stats["parsed_rows"] == 1
+        # Only the delimiter-sniffing sample has been read ahead
+        assert len(consumed) < 100
+
+        assert len(list(records)) == 499
+        assert stats["total_rows"] == 500
+        assert stats["columns_mapped"] == ["timestamp", "latitude"]
+
+    def test_iter_records_matches_parse_csv(self):
+        """Streaming a file gives the same records and stats as parsing it whole."""
+        rows = ["GPS Time;Latitude;Speed (GPS)(mph)"]
+        rows += [f"2024-01-01 12:{i // 60:02d}:{i % 60:02d};37.{i:04d};{i % 90}" for i in range(500)]
+        rows += ["bad;1;2"] * 60
+        csv_content = "\n".join(rows)
+        session_id = uuid.uuid4()
+
+        stats = TorqueCSVImporter.new_stats()
+        streamed = list(TorqueCSVImporter.iter_records(io.StringIO(csv_content), stats, session_id=session_id))
+        TorqueCSVImporter.finalize_stats(stats)
+        records, expected_stats = TorqueCSVImporter.parse_csv(csv_content)
+
+        assert len(streamed) == len(records) == 500
+        assert all(r["session_id"] == session_id for r in streamed)
+        assert [r["timestamp"] for r in streamed] == [r["timestamp"] for r in records]
+        assert stats == expected_stats
+
+    def test_row_limit_raised_while_streaming(self, monkeypatch):
+        """The row limit is enforced as rows are read."""
+        from config import Config
+        from exceptions import CSVValidationError
+
+        monkeypatch.setattr(Config, "MAX_CSV_ROWS", 3)
+        lines = ["GPS Time,Latitude\n"] + [f"2024-01-01 12:00:0{i},37.77\n" for i in range(5)]
+        stats = TorqueCSVImporter.new_stats()
+
+        with pytest.raises(CSVValidationError):
+            list(TorqueCSVImporter.iter_records(lines, stats))
+        assert stats["failure_reason"] == "too_many_rows"
+        assert stats["parsed_rows"] == 3
+
+
 class TestEdgeCases:
     """Tests for edge cases and error handling."""
 
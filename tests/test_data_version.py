@@ -0,0 +1,156 @@
+"""
+Tests for data-version counters and ETag/304 handling on analytics endpoints.
+"""
+
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "receiver"))
+
+from utils.data_version import bump_data_version, get_data_versions  # noqa: E402
+
+
+def _make_trip(**overrides):
+    from models import Trip
+
+    now = datetime.now(timezone.utc)
+    values = {
+        "session_id": uuid.uuid4(),
+        "start_time": now - timedelta(days=1),
+        "end_time": now - timedelta(days=1) + timedelta(minutes=30),
+        "distance_miles": 12.0,
+        "electric_miles": 12.0,
+        "kwh_per_mile": 0.28,
+        "is_closed": True,
+    }
+    values.update(overrides)
+    return Trip(**values)
+
+
+class TestDataVersionCounters:
+    """Tests for version bumping on committed writes."""
+
+    def test_bump_changes_only_requested_kind(self):
+        """Bumping one kind leaves the others untouched."""
+        before = get_data_versions()
+        bump_data_version("charging")
+        after = get_data_versions()
+
+        assert after["charging"] != before["charging"]
+        assert after["trips"] == before["trips"]
+        assert after["fuel"] == before["fuel"]
+
+    def test_unknown_kind_ignored(self):
+        """Unknown kinds are silently ignored."""
+        before = get_data_versions()
+        bump_data_version("not-a-kind")
+        assert get_data_versions() == before
+
+    def test_commit_bumps_trips(self, db_session):
+        """Committing a trip bumps the trips version."""
+        before = get_data_versions(["trips", "fuel"])
+        db_session.add(_make_trip())
+        db_session.commit()
+        after = get_data_versions(["trips", "fuel"])
+
+        assert after["trips"] != before["trips"]
+        assert after["fuel"] == before["fuel"]
+
+    def test_rollback_does_not_bump(self, db_session):
+        """Flushed but rolled-back writes do not bump the version."""
+        before = get_data_versions(["trips"])
+        db_session.add(_make_trip())
+        db_session.flush()
+        db_session.rollback()
+
+        assert get_data_versions(["trips"]) == before
+
+    def test_bulk_delete_bumps(self, db_session):
+        """Bulk query.delete() bumps the version of the affected kind."""
+        from models import FuelEvent
+
+        before = get_data_versions(["fuel"])
+        db_session.query(FuelEvent).delete()
+        db_session.commit()
+
+        assert get_data_versions(["fuel"]) != before
+
+    def test_telemetry_insert_does_not_bump(self, db_session):
+        """Raw telemetry writes leave analytics versions alone."""
+        from models import TelemetryRaw
+
+        before = get_data_versions()
+        db_session.add(TelemetryRaw(session_id=uuid.uuid4(), timestamp=datetime.now(timezone.utc)))
+        db_session.commit()
+
+        assert get_data_versions() == before
+
+
+class TestAnalyticsEtags:
+    """Tests for conditional GET on analytics endpoints."""
+
+    def test_response_has_etag(self, client, db_session):
+        """Analytics responses include an ETag."""
+        response = client.get("/api/efficiency/summary")
+
+        assert response.status_code == 200
+        assert response.headers.get("ETag")
+
+    def test_if_none_match_returns_304_without_db(self, client, db_session):
+        """A matching If-None-Match is answered with 304 before the view runs."""
+        first = client.get("/api/analytics/weather/temperature-bands")
+        etag = first.headers["ETag"]
+
+        with patch("routes.weather_analytics.get_db") as mock_get_db:
+            second = client.get("/api/analytics/weather/temperature-bands", headers={"If-None-Match": etag})
+
+        assert second.status_code == 304
+        assert second.headers["ETag"] == etag
+        mock_get_db.assert_not_called()
+
+    def test_compressed_etag_suffix_matches(self, client, db_session):
+        """ETags suffixed by response compression (":gzip") still match."""
+        etag = client.get("/api/soc/analysis").headers["ETag"].strip('"')
+
+        response = client.get("/api/soc/analysis", headers={"If-None-Match": f'"{etag}:gzip"'})
+
+        assert response.status_code == 304
+
+    def test_write_invalidates_etag(self, client, db_session):
+        """Closing a trip changes the ETag so clients refetch."""
+        etag = client.get("/api/stats/detailed").headers["ETag"]
+
+        db_session.add(_make_trip())
+        db_session.commit()
+
+        response = client.get("/api/stats/detailed", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_unrelated_kind_keeps_etag(self, client, db_session):
+        """Charging writes do not invalidate trip-only analytics."""
+        etag = client.get("/api/mpg/trend").headers["ETag"]
+
+        bump_data_version("charging")
+
+        response = client.get("/api/mpg/trend", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_fuel_write_invalidates_efficiency_summary(self, client, db_session):
+        """The efficiency summary depends on fuel events too."""
+        etag = client.get("/api/efficiency/summary").headers["ETag"]
+
+        bump_data_version("fuel")
+
+        response = client.get("/api/efficiency/summary", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+
+    def test_query_args_change_etag(self, client, db_session):
+        """Different query args produce different ETags."""
+        first = client.get("/api/mpg/trend?days=30").headers["ETag"]
+        second = client.get("/api/mpg/trend?days=90").headers["ETag"]
+
+        assert first != second
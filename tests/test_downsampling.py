@@ -0,0 +1,111 @@
+"""
+Tests for LTTB downsampling utilities.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "receiver"))
+
+from utils.downsampling import (  # noqa: E402
+    downsample,
+    downsample_points,
+    lttb_indices,
+    parse_max_points,
+)
+
+
+class TestParseMaxPoints:
+    """Tests for parse_max_points."""
+
+    def test_absent(self):
+        """No parameter means no downsampling."""
+        assert parse_max_points(None, 100) is None
+        assert parse_max_points("", 100) is None
+
+    def test_clamped_to_cap(self):
+        """Values above the cap are clamped."""
+        assert parse_max_points("50", 100) == 50
+        assert parse_max_points("5000", 100) == 100
+
+    @pytest.mark.parametrize("raw", ["abc", "2", "-10"])
+    def test_invalid(self, raw):
+        """Non-integers and values below 3 are rejected."""
+        with pytest.raises(ValueError, match="max_points"):
+            parse_max_points(raw, 100)
+
+
+class TestLttbIndices:
+    """Tests for lttb_indices."""
+
+    def test_short_series_unchanged(self):
+        """Series within budget are returned whole."""
+        assert lttb_indices([0, 1, 2], [[1, 2, 3]], 10) == [0, 1, 2]
+
+    def test_keeps_endpoints_and_budget(self):
+        """Output is bounded and always includes first and last points."""
+        x = list(range(1000))
+        y = [i % 7 for i in x]
+        indices = lttb_indices(x, [y], 50)
+
+        assert len(indices) == 50
+        assert indices[0] == 0 and indices[-1] == 999
+        assert indices == sorted(indices)
+
+    def test_keeps_spike(self):
+        """A single spike survives heavy downsampling."""
+        x = list(range(500))
+        y = [0.0] * 500
+        y[321] = 60.0
+        assert 321 in lttb_indices(x, [y], 20)
+
+    def test_keeps_spike_in_secondary_series(self):
+        """A spike in any series is preserved, not only the first."""
+        x = list(range(500))
+        speed = [30.0 + (i % 3) for i in x]
+        rpm = [0.0] * 500
+        rpm[123] = 2500.0
+        assert 123 in lttb_indices(x, [speed, rpm], 20)
+
+    def test_missing_values_and_datetimes(self):
+        """None values are ignored and datetime x values are supported."""
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        x = [start + timedelta(seconds=i) for i in range(100)]
+        y = [None if i % 2 else float(i) for i in range(100)]
+        y[50] = 1000.0
+        indices = lttb_indices(x, [y], 10)
+
+        assert len(indices) == 10
+        assert 50 in indices
+
+    def test_no_numeric_series_falls_back_to_even_spacing(self):
+        """All-missing series still return a bounded, evenly spaced selection."""
+        indices = lttb_indices(list(range(100)), [[None] * 100], 5)
+        assert indices == [0, 25, 50, 74, 99]
+
+
+class TestDownsampleHelpers:
+    """Tests for downsample and downsample_points."""
+
+    def test_downsample_points_with_iso_timestamps(self):
+        """Dict points with ISO timestamps keep their original objects and order."""
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        points = [
+            {"timestamp": (start + timedelta(seconds=i)).isoformat(), "power_kw": 6.6, "soc": i / 10}
+            for i in range(300)
+        ]
+        points[200]["power_kw"] = 0.5
+
+        result = downsample_points(points, 30, "timestamp", ["power_kw", "soc"])
+
+        assert len(result) == 30
+        assert points[200] in result
+        assert result == sorted(result, key=lambda p: p["timestamp"])
+
+    def test_downsample_within_budget_returns_copy(self):
+        """Items within budget are returned unchanged."""
+        items = [(1, 2), (2, 3)]
+        assert downsample(items, 10, lambda r: r[0], [lambda r: r[1]]) == items
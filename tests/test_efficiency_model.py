@@ -0,0 +1,263 @@
+"""
+Tests for the fitted multi-factor efficiency model.
+"""
+
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "receiver"))
+
+from services import combined_analytics_service  # noqa: E402
+from services.efficiency_model_service import (  # noqa: E402
+    FEATURES,
+    MIN_MODEL_TRIPS,
+    add_trip_to_model,
+    fit_from_stats,
+    get_efficiency_model,
+    predict_kwh_per_mile,
+    refit_efficiency_model,
+    refit_if_stale,
+)
+
+# Coefficients used to generate synthetic trips
+TRUE_COEFFICIENTS = {
+    "intercept": 0.25,
+    "cold_degrees_f": 0.004,
+    "heat_degrees_f": 0.002,
+    "grade_m_per_mile": 0.0008,
+    "speed_mph": 0.0015,
+    "precipitation_in": 0.1,
+    "battery_health_loss_pct": 0.0,
+}
+
+
+def _make_trip(rng, days_ago):
+    """A closed trip whose efficiency follows TRUE_COEFFICIENTS exactly."""
+    from models import Trip
+
+    temp = rng.uniform(10, 100)
+    speed = rng.uniform(15, 65)
+    miles = rng.uniform(3, 30)
+    grade = rng.uniform(-20, 20)
+    precip = rng.choice([0.0, 0.0, 0.05, 0.3])
+
+    kwh_per_mile = (
+        TRUE_COEFFICIENTS["intercept"]
+        + TRUE_COEFFICIENTS["cold_degrees_f"] * max(0, 55 - temp)
+        + TRUE_COEFFICIENTS["heat_degrees_f"] * max(0, temp - 75)
+        + TRUE_COEFFICIENTS["grade_m_per_mile"] * grade
+        + TRUE_COEFFICIENTS["speed_mph"] * (speed - 30)
+        + TRUE_COEFFICIENTS["precipitation_in"] * precip
+    )
+    start = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    return Trip(
+        session_id=uuid.uuid4(),
+        start_time=start,
+        end_time=start + timedelta(hours=miles / speed),
+        distance_miles=miles,
+        electric_miles=miles,
+        kwh_per_mile=kwh_per_mile,
+        weather_temp_f=temp,
+        weather_precipitation_in=precip,
+        elevation_net_change_m=grade * miles,
+        is_closed=True,
+    )
+
+
+@pytest.fixture
+def synthetic_trips(db_session):
+    rng = random.Random(42)
+    trips = [_make_trip(rng, days_ago=i) for i in range(60)]
+    db_session.add_all(trips)
+    db_session.commit()
+    return trips
+
+
+class TestFit:
+    """Tests for fitting from trip history."""
+
+    def test_recovers_known_coefficients(self, db_session, synthetic_trips):
+        """A full refit recovers the coefficients that generated the data."""
+        model = refit_efficiency_model(db_session)
+
+        assert model.trip_count == 60
+        for feature, expected in TRUE_COEFFICIENTS.items():
+            assert model.coefficients[feature] == pytest.approx(expected, abs=1e-3)
+        assert model.r_squared == pytest.approx(1.0, abs=1e-3)
+        assert model.data_version
+
+    def test_incremental_matches_full_refit(self, db_session, synthetic_trips):
+        """Folding trips in one at a time gives the same fit as a full refit."""
+        rng = random.Random(7)
+        refit_efficiency_model(db_session)
+        db_session.commit()
+
+        for i in range(5):
+            trip = _make_trip(rng, days_ago=100 + i)
+            trip.is_closed = False
+            db_session.add(trip)
+            db_session.flush()
+            assert add_trip_to_model(db_session, trip) is True
+            trip.is_closed = True
+        db_session.commit()
+
+        from models import EfficiencyModel
+
+        incremental = db_session.query(EfficiencyModel).one()
+        incremental_coefficients = dict(incremental.coefficients)
+        assert incremental.trip_count == 65
+
+        full = refit_efficiency_model(db_session)
+        for feature in FEATURES:
+            assert incremental_coefficients[feature] == pytest.approx(full.coefficients[feature], abs=1e-9)
+
+    def test_vectorized_refit_handles_missing_conditions(self, db_session):
+        """Trips missing weather, elevation or duration fit the same in bulk as one at a time."""
+        from models import EfficiencyModel
+
+        refit_efficiency_model(db_session)
+        db_session.commit()
+
+        rng = random.Random(11)
+        for i in range(30):
+            trip = _make_trip(rng, days_ago=i)
+            if i % 3 == 0:
+                trip.weather_temp_f = None
+            if i % 4 == 0:
+                trip.elevation_net_change_m = None
+            if i % 5 == 0:
+                trip.end_time = None
+            if i % 7 == 0:
+                trip.distance_miles = None
+            trip.is_closed = False
+            db_session.add(trip)
+            db_session.flush()
+            assert add_trip_to_model(db_session, trip) is True
+            trip.is_closed = True
+        db_session.commit()
+
+        incremental = db_session.query(EfficiencyModel).one()
+        incremental_stats = dict(incremental.stats)
+
+        full = refit_efficiency_model(db_session)
+        assert full.trip_count == 30
+        assert full.stats["miles_sum"] == pytest.approx(incremental_stats["miles_sum"])
+        assert full.stats["yty"] == pytest.approx(incremental_stats["yty"])
+        for full_row, incremental_row in zip(full.stats["xtx"], incremental_stats["xtx"]):
+            assert full_row == pytest.approx(incremental_row)
+        assert full.stats["xty"] == pytest.approx(incremental_stats["xty"])
+
+    def test_first_trip_fits_history(self, db_session, synthetic_trips):
+        """Without a model, finalizing a trip fits existing history first."""
+        rng = random.Random(3)
+        trip = _make_trip(rng, days_ago=0)
+        trip.is_closed = False
+        db_session.add(trip)
+        db_session.flush()
+
+        add_trip_to_model(db_session, trip)
+
+        from models import EfficiencyModel
+
+        assert db_session.query(EfficiencyModel).one().trip_count == 61
+
+    def test_unusable_trip_skipped(self, db_session):
+        """Trips without valid efficiency aren't added."""
+        from models import Trip
+
+        trip = Trip(session_id=uuid.uuid4(), start_time=datetime.now(timezone.utc), kwh_per_mile=None)
+        db_session.add(trip)
+        db_session.flush()
+
+        assert add_trip_to_model(db_session, trip) is False
+
+    def test_constant_feature_gets_zero_coefficient(self):
+        """A feature with no variation (e.g. never rained) is pinned to zero."""
+        stats = {"xtx": [[0.0] * len(FEATURES) for _ in FEATURES], "xty": [0.0] * len(FEATURES), "yty": 0.0}
+        for y in (0.3, 0.3, 0.3):
+            stats["xtx"][0][0] += 1
+            stats["xty"][0] += y
+            stats["yty"] += y * y
+
+        fit = fit_from_stats(stats, 3)
+
+        assert fit["coefficients"]["intercept"] == pytest.approx(0.3)
+        assert fit["coefficients"]["precipitation_in"] == 0
+        assert fit["r_squared"] is None
+
+    def test_refit_if_stale(self, db_session, synthetic_trips):
+        """The scheduled refit only runs when data changed since the last fit."""
+        assert refit_if_stale(db_session) is True
+        assert refit_if_stale(db_session) is False
+
+        db_session.add(_make_trip(random.Random(1), days_ago=3))
+        db_session.commit()
+
+        assert refit_if_stale(db_session) is True
+
+
+class TestPredictions:
+    """Tests for serving predictions."""
+
+    def test_predict_kwh_per_mile(self, db_session, synthetic_trips):
+        """Predictions follow the fitted coefficients."""
+        refit_efficiency_model(db_session)
+        db_session.commit()
+        model = get_efficiency_model(db_session)
+
+        assert predict_kwh_per_mile(model) == pytest.approx(0.25, abs=1e-3)
+        assert predict_kwh_per_mile(model, temperature_f=25.0) == pytest.approx(0.25 + 30 * 0.004, abs=1e-3)
+
+    def test_cached_model_serves_without_queries(self, db_session, synthetic_trips):
+        """Once loaded, predictions don't touch the database."""
+        refit_efficiency_model(db_session)
+        db_session.commit()
+        combined_analytics_service.get_efficiency_predictions(db_session, temperature_f=20.0)
+
+        statements = []
+        engine = db_session.get_bind()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            result = combined_analytics_service.get_efficiency_predictions(
+                db_session, temperature_f=20.0, elevation_change_m=100.0, is_raining=True
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert statements == []
+        assert result["source"] == "model"
+        assert [a["factor"] for a in result["adjustments"]] == ["temperature", "elevation", "precipitation"]
+        assert all(a["impact_percent"] > 0 for a in result["adjustments"])
+        assert result["model"]["trip_count"] == 60
+
+    def test_factor_fallback_with_few_trips(self, db_session):
+        """Below MIN_MODEL_TRIPS the hand-tuned factors are used."""
+        rng = random.Random(5)
+        db_session.add_all([_make_trip(rng, days_ago=i) for i in range(MIN_MODEL_TRIPS - 1)])
+        db_session.commit()
+        refit_efficiency_model(db_session)
+        db_session.commit()
+
+        result = combined_analytics_service.get_efficiency_predictions(db_session, temperature_f=25.0)
+
+        assert result["source"] == "factors"
+
+    def test_multi_factor_includes_model(self, db_session, synthetic_trips):
+        """Multi-factor analysis reports the model's fit."""
+        refit_efficiency_model(db_session)
+        db_session.commit()
+
+        result = combined_analytics_service.get_multi_factor_analysis(db_session)
+
+        assert result["model"]["r_squared"] == pytest.approx(1.0, abs=1e-3)
+        assert set(result["model"]["coefficients"]) == set(FEATURES)
@@ -0,0 +1,62 @@
+"""
+Tests for geohash encoding and radius prefilter helpers.
+"""
+
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "receiver"))
+
+from utils.geohash import (  # noqa: E402
+    GEOHASH_PRECISION,
+    cell_dimensions,
+    encode,
+    precision_for_radius,
+    prefixes_for_radius,
+)
+from utils.route_clustering import haversine_distance  # noqa: E402
+
+
+class TestEncode:
+    """Tests for geohash encoding."""
+
+    def test_reference_value(self):
+        """Matches the well-known reference geohash."""
+        assert encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+    def test_default_precision(self):
+        assert len(encode(41.5, -81.7)) == GEOHASH_PRECISION
+
+    def test_prefix_is_coarser_cell(self):
+        """Shorter geohashes are prefixes of longer ones."""
+        assert encode(41.5, -81.7, 9).startswith(encode(41.5, -81.7, 5))
+
+    def test_cell_dimensions(self):
+        lat_span, lon_span = cell_dimensions(5)
+        assert math.isclose(lat_span, 180 / 2 ** 12)
+        assert math.isclose(lon_span, 360 / 2 ** 13)
+
+
+class TestRadiusPrefixes:
+    """Tests for radius covering prefixes."""
+
+    def test_larger_radius_uses_shorter_prefixes(self):
+        assert precision_for_radius(41.5, 50) < precision_for_radius(41.5, 0.5)
+
+    def test_covers_every_point_in_radius(self):
+        """Every point within the radius falls in one of the prefixes."""
+        rng = random.Random(42)
+        for center_lat, center_lon, radius in [(41.5, -81.7, 5), (64.1, -21.9, 2), (-33.9, 151.2, 0.5)]:
+            prefixes = prefixes_for_radius(center_lat, center_lon, radius)
+            for _ in range(300):
+                lat = center_lat + rng.uniform(-1, 1) * radius / 69.0
+                lon = center_lon + rng.uniform(-1, 1) * radius / (69.0 * math.cos(math.radians(center_lat)))
+                if haversine_distance(center_lat, center_lon, lat, lon) <= radius:
+                    assert any(encode(lat, lon).startswith(p) for p in prefixes)
+
+    def test_antimeridian(self):
+        """Neighbouring cells wrap around longitude ±180."""
+        prefixes = prefixes_for_radius(0.0, 179.999, 5)
+        assert any(encode(0.0, -179.999).startswith(p) for p in prefixes)
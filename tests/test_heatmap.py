@@ -0,0 +1,272 @@
+"""
+Tests for the spatial heatmap grid and /api/map/heatmap endpoint.
+"""
+
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "receiver"))
+
+from utils.spatial_grid import (  # noqa: E402
+    GRID_LEVELS,
+    accumulate_cells,
+    cell_center,
+    cell_index,
+    cell_size,
+    grid_level_for_zoom,
+    parse_bbox,
+)
+
+
+def _points(count=10, lat=41.5, lon=-81.7, speed=30.0, power=9.0):
+    # Start at a finest-level cell center so the track stays in one cell per level
+    lat, lon = cell_center(GRID_LEVELS[-1], *cell_index(lat, lon, GRID_LEVELS[-1]))
+    return [
+        {
+            "latitude": lat + i * 0.00001,
+            "longitude": lon,
+            "speed_mph": speed,
+            "hv_battery_power_kw": power,
+        }
+        for i in range(count)
+    ]
+
+
+def _make_trip(db_session, **overrides):
+    from models import Trip
+
+    values = {
+        "session_id": uuid.uuid4(),
+        "start_time": datetime.now(timezone.utc) - timedelta(hours=1),
+        "is_closed": True,
+    }
+    values.update(overrides)
+    trip = Trip(**values)
+    db_session.add(trip)
+    db_session.flush()
+    return trip
+
+
+def _add_telemetry(db_session, trip, points):
+    from models import TelemetryRaw
+
+    now = datetime.now(timezone.utc)
+    for i, point in enumerate(points):
+        db_session.add(TelemetryRaw(session_id=trip.session_id, timestamp=now + timedelta(seconds=i), **point))
+    db_session.flush()
+
+
+class TestSpatialGrid:
+    """Tests for grid cell math."""
+
+    def test_cell_center_round_trip(self):
+        """A cell's center maps back to the same cell."""
+        for level in GRID_LEVELS:
+            cell_x, cell_y = cell_index(41.4993, -81.6944, level)
+            lat, lon = cell_center(level, cell_x, cell_y)
+            assert cell_index(lat, lon, level) == (cell_x, cell_y)
+            assert abs(lat - 41.4993) <= cell_size(level)
+
+    def test_grid_level_for_zoom(self):
+        """The finest grid level not exceeding the zoom is used."""
+        assert grid_level_for_zoom(3) == GRID_LEVELS[0]
+        assert grid_level_for_zoom(12) == 11
+        assert grid_level_for_zoom(19) == GRID_LEVELS[-1]
+
+    def test_accumulate_cells(self):
+        """Points are binned at every level, efficiency only while moving."""
+        points = _points(count=4)
+        points.append({"latitude": 41.5, "longitude": -81.7, "speed_mph": 0.0, "hv_battery_power_kw": 1.0})
+        points.append({"latitude": None, "longitude": None, "speed_mph": 50.0})
+
+        cells = accumulate_cells(points, levels=(8,))
+
+        assert len(cells) == 1
+        totals = next(iter(cells.values()))
+        assert totals["sample_count"] == 5
+        assert totals["moving_count"] == 4
+        assert totals["moving_power_kw_sum"] / totals["moving_speed_sum"] == pytest.approx(0.3)
+
+    def test_parse_bbox(self):
+        assert parse_bbox(None) is None
+        assert parse_bbox("-82,41,-81,42") == (-82.0, 41.0, -81.0, 42.0)
+        with pytest.raises(ValueError):
+            parse_bbox("1,2,3")
+        with pytest.raises(ValueError):
+            parse_bbox("-81,41,-82,42")
+
+
+class TestHeatmapGrid:
+    """Tests for incremental grid maintenance."""
+
+    def test_update_is_incremental_and_idempotent(self, app, db_session):
+        """Trips add to existing cells once; re-indexing a trip is a no-op."""
+        from models import MapGridCell
+        from services.heatmap_service import update_heatmap_grid
+
+        first = _make_trip(db_session)
+        second = _make_trip(db_session)
+
+        assert update_heatmap_grid(db_session, first, _points(speed=30.0)) == len(GRID_LEVELS)
+        update_heatmap_grid(db_session, second, _points(speed=50.0))
+        update_heatmap_grid(db_session, first, _points(speed=30.0))
+        db_session.commit()
+
+        cell = db_session.query(MapGridCell).filter(MapGridCell.level == GRID_LEVELS[0]).one()
+        assert cell.sample_count == 20
+        assert cell.avg_speed_mph == pytest.approx(40.0)
+        assert first.heatmap_indexed and second.heatmap_indexed
+
+    def test_finalize_trip_updates_grid(self, app, db_session, monkeypatch):
+        """Trip finalization adds the trip's telemetry to the grid."""
+        monkeypatch.setattr("config.Config.FEATURE_WEATHER_INTEGRATION", False)
+        monkeypatch.setattr("config.Config.FEATURE_ELEVATION_TRACKING", False)
+        from models import MapGridCell, TelemetryRaw
+        from services.trip_service import finalize_trip
+
+        trip = _make_trip(db_session, is_closed=False, start_odometer=1000.0)
+        now = datetime.now(timezone.utc)
+        for i, point in enumerate(_points()):
+            db_session.add(TelemetryRaw(session_id=trip.session_id, timestamp=now + timedelta(seconds=i), **point))
+        db_session.commit()
+
+        finalize_trip(db_session, trip)
+        db_session.commit()
+
+        assert trip.heatmap_indexed
+        assert db_session.query(MapGridCell).count() == len(GRID_LEVELS)
+
+    def test_backfill_indexes_existing_trips(self, app, db_session):
+        """Closed trips without grid data are backfilled from telemetry."""
+        from models import TelemetryRaw
+        from services.heatmap_service import index_unindexed_trips
+
+        trip = _make_trip(db_session)
+        now = datetime.now(timezone.utc)
+        for i, point in enumerate(_points(count=3)):
+            db_session.add(TelemetryRaw(session_id=trip.session_id, timestamp=now + timedelta(seconds=i), **point))
+        db_session.commit()
+
+        assert index_unindexed_trips(db_session) == (1, len(GRID_LEVELS))
+        assert index_unindexed_trips(db_session) == (0, 0)
+
+    def test_delete_subtracts_trip_cells(self, client, db_session):
+        """Hard-deleting a trip removes its samples; emptied cells are dropped."""
+        from models import MapGridCell
+        from services.heatmap_service import index_unindexed_trips
+
+        kept = _make_trip(db_session)
+        deleted = _make_trip(db_session)
+        _add_telemetry(db_session, kept, _points(count=4, speed=30.0))
+        _add_telemetry(db_session, deleted, _points(count=6, speed=50.0))
+        _add_telemetry(db_session, deleted, _points(count=2, lat=34.0, lon=-118.2))
+        index_unindexed_trips(db_session)
+        db_session.commit()
+        assert db_session.query(MapGridCell).count() == 2 * len(GRID_LEVELS)
+
+        response = client.delete(f"/api/trips/{deleted.id}")
+        assert response.status_code == 200
+
+        db_session.expire_all()
+        cell = db_session.query(MapGridCell).filter(MapGridCell.level == GRID_LEVELS[0]).one()
+        assert cell.sample_count == 4
+        assert cell.avg_speed_mph == pytest.approx(30.0)
+        assert db_session.query(MapGridCell).count() == len(GRID_LEVELS)
+
+    def test_soft_delete_and_restore(self, client, db_session):
+        """Soft-deleted trips stop contributing until they are restored."""
+        from models import MapGridCell
+        from services.heatmap_service import index_unindexed_trips
+
+        trip = _make_trip(db_session, is_imported=True)
+        trip_id = trip.id
+        _add_telemetry(db_session, trip, _points(count=5))
+        index_unindexed_trips(db_session)
+        db_session.commit()
+
+        assert client.delete(f"/api/trips/{trip_id}").status_code == 200
+        db_session.expire_all()
+        assert db_session.query(MapGridCell).count() == 0
+        assert index_unindexed_trips(db_session) == (0, 0)
+
+        assert client.post(f"/api/trips/{trip_id}/restore").status_code == 200
+        db_session.expire_all()
+        cell = db_session.query(MapGridCell).filter(MapGridCell.level == GRID_LEVELS[0]).one()
+        assert cell.sample_count == 5
+
+    def test_rebuild_excludes_deleted_trips(self, app, db_session):
+        """A rebuild recomputes the grid from trips that aren't deleted."""
+        from models import MapGridCell
+        from services.heatmap_service import rebuild_heatmap_grid, update_heatmap_grid
+
+        kept = _make_trip(db_session)
+        _add_telemetry(db_session, kept, _points(count=3))
+        update_heatmap_grid(db_session, kept, _points(count=3))
+        # Totals left behind by a trip deleted before deletes subtracted cells
+        update_heatmap_grid(db_session, _make_trip(db_session), _points(count=7))
+        stale = _make_trip(db_session, deleted_at=datetime.now(timezone.utc))
+        _add_telemetry(db_session, stale, _points(count=2))
+        update_heatmap_grid(db_session, stale, _points(count=2))
+        db_session.commit()
+
+        assert rebuild_heatmap_grid(db_session) == (2, len(GRID_LEVELS))
+        db_session.commit()
+
+        cell = db_session.query(MapGridCell).filter(MapGridCell.level == GRID_LEVELS[0]).one()
+        assert cell.sample_count == 3
+        assert not stale.heatmap_indexed
+
+
+class TestHeatmapEndpoint:
+    """Tests for /api/map/heatmap."""
+
+    def test_returns_cells_in_bbox(self, client, db_session):
+        """Only cells inside the viewport are returned."""
+        from services.heatmap_service import update_heatmap_grid
+
+        update_heatmap_grid(db_session, _make_trip(db_session), _points(lat=41.5, lon=-81.7))
+        update_heatmap_grid(db_session, _make_trip(db_session), _points(lat=34.0, lon=-118.2))
+        db_session.commit()
+
+        response = client.get("/api/map/heatmap?bbox=-82,41,-81,42&zoom=15")
+        assert response.status_code == 200
+        data = response.get_json()
+
+        assert data["grid_level"] == 14
+        assert data["total_cells"] == len(data["cells"]) >= 1
+        for cell in data["cells"]:
+            assert 41 <= cell["lat"] <= 42
+            assert cell["kwh_per_mile"] == pytest.approx(0.3)
+            assert cell["color"] == "#f59e0b"
+
+    def test_without_bbox_returns_everything(self, client, db_session):
+        from services.heatmap_service import update_heatmap_grid
+
+        update_heatmap_grid(db_session, _make_trip(db_session), _points(lat=41.5, lon=-81.7))
+        update_heatmap_grid(db_session, _make_trip(db_session), _points(lat=34.0, lon=-118.2))
+        db_session.commit()
+
+        data = client.get("/api/map/heatmap?zoom=8").get_json()
+        assert data["total_cells"] == 2
+
+    def test_invalid_bbox(self, client, db_session):
+        response = client.get("/api/map/heatmap?bbox=abc")
+        assert response.status_code == 400
+        assert "bbox" in response.get_json()["error"]
+
+    def test_etag_changes_after_trip_indexed(self, client, db_session):
+        """Indexing a trip invalidates cached heatmap responses."""
+        from services.heatmap_service import update_heatmap_grid
+
+        etag = client.get("/api/map/heatmap").headers["ETag"]
+
+        update_heatmap_grid(db_session, _make_trip(db_session), _points())
+        db_session.commit()
+
+        response = client.get("/api/map/heatmap", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.get_json()["total_cells"] > 0
@@ -20,6 +20,7 @@ from receiver.utils.import_utils import (
     generate_import_code,
     get_failure_suggestion,
     get_file_hash,
+    scan_file_stream,
 )
 
 
@@ -98,6 +99,26 @@ class TestFileHash:
         # SHA-256 of empty string
         assert len(hash_value) == 64
 
+    def test_scan_file_stream_matches_file_hash(self):
+        """Streamed hashing matches hashing the whole content and rewinds the stream."""
+        content = ("GPS Time,Latitude\n" + "2026-01-06 10:30:00,37.7749\n" * 5000).encode()
+        stream = io.BytesIO(content)
+
+        file_hash, size, decode_error = scan_file_stream(stream, chunk_size=1000)
+
+        assert file_hash == get_file_hash(content)
+        assert size == len(content)
+        assert decode_error is None
+        assert stream.tell() == 0
+
+    def test_scan_file_stream_detects_invalid_utf8(self):
+        """Invalid UTF-8 is reported, including multi-byte sequences split across chunks."""
+        valid = "Température (°F)\n".encode() * 100
+        assert scan_file_stream(io.BytesIO(valid), chunk_size=7)[2] is None
+
+        _, _, decode_error = scan_file_stream(io.BytesIO(valid + b"\xff\xfe"), chunk_size=7)
+        assert isinstance(decode_error, UnicodeDecodeError)
+
 
 class TestReportableFormat:
     """Tests for reportable string generation."""
@@ -527,3 +548,65 @@ class TestStatsMapping:
         # Should report 2 duplicates (the overlapping timestamps)
         assert json_data["stats"]["duplicate_rows"] == 2
         assert json_data["stats"]["total_rows"] == 3
+
+
+class TestStreamingImport:
+    """Tests for the chunked import pipeline."""
+
+    def _csv(self, start, count):
+        lines = ["GPS Time,Latitude,Fuel Level (%)"]
+        for i in range(count):
+            ts = start + timedelta(seconds=5 * i)
+            lines.append(f"{ts:%Y-%m-%d %H:%M:%S},37.{i:04d},{80 - i * 0.01:.2f}")
+        return ("\n".join(lines) + "\n").encode()
+
+    def test_chunked_import_dedupes_and_tracks_range(self, client, db_session, monkeypatch):
+        """Rows are deduplicated and inserted per chunk with a rolling timestamp range."""
+        from config import Config
+
+        monkeypatch.setattr(Config, "CSV_IMPORT_CHUNK_SIZE", 7)
+        start = datetime(2026, 3, 1, 8, 0, 0)
+
+        first = client.post(
+            "/api/import/csv",
+            data={"file": (io.BytesIO(self._csv(start, 20)), "first.csv")},
+            content_type="multipart/form-data",
+        )
+        assert first.status_code == 200
+        assert db_session.query(TelemetryRaw).count() == 20
+
+        # Overlaps the last 10 rows of the first file
+        second = client.post(
+            "/api/import/csv",
+            data={"file": (io.BytesIO(self._csv(start + timedelta(seconds=50), 30)), "second.csv")},
+            content_type="multipart/form-data",
+        )
+        data = second.get_json()
+
+        assert second.status_code == 200
+        assert data["status"] == "partial"
+        assert data["stats"]["total_rows"] == 30
+        assert data["stats"]["duplicate_rows"] == 10
+        assert db_session.query(TelemetryRaw).count() == 40
+        assert data["stats"]["timestamp_range"]["start"].startswith("2026-03-01T08:01:40")
+        assert data["stats"]["timestamp_range"]["end"].startswith("2026-03-01T08:03:15")
+
+        trip = db_session.query(Trip).filter(Trip.id == data["trip_id"]).one()
+        assert trip.fuel_level_at_end == pytest.approx(79.71)
+
+    def test_row_limit_rolls_back_inserted_chunks(self, client, db_session, monkeypatch):
+        """Chunks inserted before the row limit is hit are rolled back."""
+        from config import Config
+
+        monkeypatch.setattr(Config, "CSV_IMPORT_CHUNK_SIZE", 5)
+        monkeypatch.setattr(Config, "MAX_CSV_ROWS", 12)
+
+        response = client.post(
+            "/api/import/csv",
+            data={"file": (io.BytesIO(self._csv(datetime(2026, 3, 2, 8, 0, 0), 20)), "big.csv")},
+            content_type="multipart/form-data",
+        )
+
+        assert response.status_code == 400
+        assert response.get_json()["failure_reason"] == "csv_import_error"
+        assert db_session.query(TelemetryRaw).count() == 0
@@ -0,0 +1,171 @@
+"""
+Tests for write-driven cache invalidation.
+"""
+
+import json
+import os
+import sys
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "receiver"))
+
+from utils.cache_utils import cache_result, get_tiered_cache  # noqa: E402
+from utils.invalidation_bus import (  # noqa: E402
+    CHANNEL,
+    handle_message,
+    publish_entity_changes,
+    subscribe,
+    tags_for_kinds,
+)
+from utils.tiered_cache import MISSING, LRUCache, TieredCache  # noqa: E402
+
+
+def _make_trip(**overrides):
+    from models import Trip
+
+    now = datetime.now(timezone.utc)
+    values = {
+        "session_id": uuid.uuid4(),
+        "start_time": now - timedelta(days=2),
+        "end_time": now - timedelta(days=2) + timedelta(minutes=30),
+        "distance_miles": 20.0,
+        "electric_miles": 20.0,
+        "is_closed": True,
+    }
+    values.update(overrides)
+    return Trip(**values)
+
+
+class TestSubscriptions:
+    """Tests for the kind -> tag registry."""
+
+    def test_kind_tags_and_statistics(self):
+        """Each kind invalidates its own tag; statistics depend on driving and energy data."""
+        assert tags_for_kinds(["trips"]) >= {"trips", "statistics"}
+        assert tags_for_kinds(["fuel"]) >= {"fuel", "statistics"}
+        assert "statistics" not in tags_for_kinds(["battery"])
+
+    def test_subscribe_adds_tag(self):
+        """Custom tags can subscribe to several kinds."""
+        subscribe("test-efficiency", "trips", "charging")
+
+        assert "test-efficiency" in tags_for_kinds(["charging"])
+        assert "test-efficiency" not in tags_for_kinds(["fuel"])
+
+
+class TestPublish:
+    """Tests for publishing entity changes."""
+
+    def test_publish_clears_subscribed_l1_entries(self):
+        """Only entries tagged with a subscribed tag are dropped."""
+        l1 = get_tiered_cache().l1
+        l1.set("stats:a", 1, ttl=3600, tags=["statistics"])
+        l1.set("battery:a", 2, ttl=3600, tags=["battery"])
+
+        assert publish_entity_changes("trips") == 1
+        assert l1.get("stats:a") == (MISSING, False)
+        assert l1.get("battery:a")[0] == 2
+
+    def test_publish_broadcasts_to_other_processes(self):
+        """Redis tag sets are deleted and the event is published."""
+        redis = MagicMock()
+        redis.smembers.return_value = set()
+
+        with patch("utils.invalidation_bus.get_redis_cache", return_value=redis), \
+                patch("utils.cache_utils.get_redis_cache", return_value=redis):
+            publish_entity_changes("fuel")
+
+        channel, payload = redis.publish.call_args[0]
+        assert channel == CHANNEL
+        assert json.loads(payload)["kinds"] == ["fuel"]
+        redis.smembers.assert_any_call("tag:fuel")
+        redis.smembers.assert_any_call("tag:statistics")
+
+    def test_commit_invalidates_cached_result(self, db_session):
+        """Committing a trip drops cached results that depend on trips."""
+        calls = []
+
+        @cache_result("test:trip_count", ttl=3600, tags=["trips"])
+        def trip_count():
+            calls.append(1)
+            return len(calls)
+
+        assert trip_count() == 1
+        assert trip_count() == 1
+
+        db_session.add(_make_trip())
+        db_session.commit()
+
+        assert trip_count() == 2
+
+    def test_rollback_does_not_invalidate(self, db_session):
+        """Rolled-back writes leave the cache alone."""
+        l1 = get_tiered_cache().l1
+        l1.set("stats:a", 1, ttl=3600, tags=["trips"])
+
+        db_session.add(_make_trip())
+        db_session.flush()
+        db_session.rollback()
+
+        assert l1.get("stats:a")[0] == 1
+
+    def test_quick_stats_reflect_new_trip(self, client, db_session):
+        """The long-lived quick stats cache picks up a newly committed trip."""
+        first = client.get("/api/stats/quick/7d").get_json()["stats"]["trip_count"]
+
+        db_session.add(_make_trip())
+        db_session.commit()
+
+        second = client.get("/api/stats/quick/7d").get_json()["stats"]["trip_count"]
+        assert second == first + 1
+
+
+class TestRemoteMessages:
+    """Tests for invalidations received from other processes."""
+
+    def test_remote_message_clears_l1_only(self):
+        """Another process's event clears this process's L1 entries."""
+        l1 = get_tiered_cache().l1
+        l1.set("stats:a", 1, ttl=3600, tags=["statistics"])
+
+        assert handle_message(json.dumps({"origin": "other", "kinds": ["charging"]}).encode()) == 1
+        assert l1.get("stats:a") == (MISSING, False)
+
+    def test_own_and_malformed_messages_ignored(self):
+        """Echoes of our own events and garbage payloads are ignored."""
+        from utils.invalidation_bus import _PROCESS_ID
+
+        l1 = get_tiered_cache().l1
+        l1.set("stats:a", 1, ttl=3600, tags=["statistics"])
+
+        assert handle_message(json.dumps({"origin": _PROCESS_ID, "kinds": ["trips"]})) == 0
+        assert handle_message(b"not json") == 0
+        assert l1.get("stats:a")[0] == 1
+
+
+class TestInvalidationRace:
+    """Tests for writes that land while a value is being computed."""
+
+    def test_result_computed_across_invalidation_not_cached(self):
+        """A value whose computation overlapped an invalidation isn't stored."""
+        cache = TieredCache(LRUCache())
+        started = threading.Event()
+        release = threading.Event()
+
+        def compute():
+            started.set()
+            release.wait(2)
+            return "old"
+
+        thread = threading.Thread(target=lambda: cache.get_or_compute("key", compute, ttl=60, tags=["trips"]))
+        thread.start()
+        assert started.wait(2)
+        cache.l1.delete_tag("trips")
+        release.set()
+        thread.join()
+
+        assert cache.l1.get("key") == (MISSING, False)
+        assert cache.get_or_compute("key", lambda: "new", ttl=60) == "new"
@@ -14,7 +14,14 @@ from datetime import datetime, timedelta, timezone
 
 import pytest
 from models import MaintenanceRecord, TelemetryRaw
-from services.maintenance_service import MAINTENANCE_INTERVALS, calculate_engine_hours, get_maintenance_summary
+from services.maintenance_service import (
+    MAINTENANCE_INTERVALS,
+    add_trip_engine_hours,
+    backfill_engine_hours,
+    calculate_engine_hours,
+    calculate_engine_seconds,
+    get_maintenance_summary,
+)
 
 
 class TestCalculateEngineHours:
@@ -359,3 +366,128 @@ class TestMaintenanceValidation:
 
         # Should not count negative duration
         assert hours >= 0
+
+
+class TestEngineHoursCounter:
+    """Tests for per-trip engine runtime and the lifetime counter."""
+
+    def _add_trip(self, db_session, start, minutes, rpm=1500.0):
+        """A trip with one telemetry reading per minute."""
+        from models import Trip
+
+        session_id = uuid.uuid4()
+        trip = Trip(session_id=session_id, start_time=start, is_closed=False)
+        db_session.add(trip)
+        telemetry = [
+            TelemetryRaw(session_id=session_id, timestamp=start + timedelta(minutes=i), engine_rpm=rpm)
+            for i in range(minutes + 1)
+        ]
+        db_session.add_all(telemetry)
+        db_session.flush()
+        return trip, telemetry
+
+    def test_finalized_trips_add_to_counter(self, app, db_session):
+        """Each finalized trip stores its runtime and adds it to the lifetime total."""
+        from models import EngineHoursCounter
+
+        now = datetime.now(timezone.utc)
+        trip1, telemetry1 = self._add_trip(db_session, now - timedelta(hours=5), minutes=30)
+        trip2, telemetry2 = self._add_trip(db_session, now - timedelta(hours=3), minutes=90)
+
+        add_trip_engine_hours(db_session, trip1, telemetry1)
+        add_trip_engine_hours(db_session, trip2, telemetry2)
+        db_session.commit()
+
+        assert trip1.engine_seconds == 30 * 60
+        assert trip2.engine_seconds == 90 * 60
+        counter = db_session.query(EngineHoursCounter).one()
+        assert counter.total_seconds == 120 * 60
+        assert counter.trip_count == 2
+        assert calculate_engine_hours(db_session) == pytest.approx(2.0)
+
+    def test_refinalizing_does_not_double_count(self, app, db_session):
+        """Finalizing a trip again only applies the change in runtime."""
+        from models import EngineHoursCounter
+
+        trip, telemetry = self._add_trip(db_session, datetime.now(timezone.utc) - timedelta(hours=2), minutes=60)
+
+        add_trip_engine_hours(db_session, trip, telemetry)
+        add_trip_engine_hours(db_session, trip, telemetry[:31])
+        db_session.commit()
+
+        counter = db_session.query(EngineHoursCounter).one()
+        assert counter.total_seconds == 30 * 60
+        assert counter.trip_count == 1
+
+    def test_lifetime_hours_include_unfinalized_telemetry(self, app, db_session):
+        """Telemetry after the last finalized trip (e.g. a trip in progress) is included."""
+        now = datetime.now(timezone.utc)
+        trip, telemetry = self._add_trip(db_session, now - timedelta(hours=4), minutes=60)
+        add_trip_engine_hours(db_session, trip, telemetry)
+        self._add_trip(db_session, now - timedelta(hours=1), minutes=30)
+        db_session.commit()
+
+        assert calculate_engine_hours(db_session) == pytest.approx(1.5)
+
+    def test_lifetime_hours_do_not_load_telemetry(self, app, db_session):
+        """Lifetime hours read the counter and aggregate the remainder in SQL."""
+        from sqlalchemy import event
+
+        trip, telemetry = self._add_trip(db_session, datetime.now(timezone.utc) - timedelta(hours=2), minutes=60)
+        add_trip_engine_hours(db_session, trip, telemetry)
+        db_session.commit()
+
+        statements = []
+        engine = db_session.get_bind()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            calculate_engine_hours(db_session)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert len(statements) == 2
+        assert "telemetry_raw.latitude" not in " ".join(statements)
+
+    def test_committed_trip_clears_cached_hours(self, app, db_session):
+        """Cached engine hours and summary pick up a newly finalized trip."""
+        now = datetime.now(timezone.utc)
+        trip, telemetry = self._add_trip(db_session, now - timedelta(hours=5), minutes=30)
+        add_trip_engine_hours(db_session, trip, telemetry)
+        db_session.commit()
+
+        assert calculate_engine_hours(db_session) == pytest.approx(0.5)
+        assert get_maintenance_summary(db_session)["total_engine_hours"] == pytest.approx(0.5)
+
+        trip, telemetry = self._add_trip(db_session, now - timedelta(hours=3), minutes=90)
+        add_trip_engine_hours(db_session, trip, telemetry)
+        db_session.commit()
+
+        assert calculate_engine_hours(db_session) == pytest.approx(2.0)
+        assert get_maintenance_summary(db_session)["total_engine_hours"] == pytest.approx(2.0)
+
+    def test_backfill_matches_finalization(self, app, db_session):
+        """The window-function backfill gives the same per-trip runtime and total."""
+        from models import EngineHoursCounter
+
+        now = datetime.now(timezone.utc)
+        trips = []
+        for hours_ago, minutes in ((10, 45), (6, 20), (3, 75)):
+            trip, telemetry = self._add_trip(db_session, now - timedelta(hours=hours_ago), minutes=minutes)
+            trip.is_closed = True
+            trip.end_time = telemetry[-1].timestamp
+            trips.append((trip, calculate_engine_seconds(telemetry)))
+        db_session.commit()
+
+        counter = backfill_engine_hours(db_session)
+        db_session.commit()
+
+        for trip, expected in trips:
+            db_session.refresh(trip)
+            assert trip.engine_seconds == pytest.approx(expected, abs=0.01)
+        assert counter.total_seconds == pytest.approx(140 * 60, abs=0.1)
+        assert db_session.query(EngineHoursCounter).one().trip_count == 3
+        assert calculate_engine_hours(db_session) == pytest.approx(140 / 60, abs=1e-4)
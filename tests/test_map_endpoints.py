@@ -222,6 +222,134 @@ class TestMapDataEndpoint:
 
         assert data['total_trips'] <= 100
 
+    def test_map_data_polyline_uses_stored_geometry(self, client, db_session):
+        """format=polyline serves geometry stored at finalization without telemetry"""
+        from receiver.utils.polyline import decode_polyline, encode_polyline
+
+        coords = [(41.5, -81.7), (41.51, -81.69), (41.52, -81.71)]
+        trip = Trip(
+            session_id=uuid.uuid4(),
+            start_time=datetime.now(timezone.utc),
+            distance_miles=5.0,
+            is_closed=True,
+            route_polyline=encode_polyline(coords),
+            route_bounds_north=41.52,
+            route_bounds_south=41.5,
+            route_bounds_east=-81.69,
+            route_bounds_west=-81.71,
+            gps_point_count=240
+        )
+        db_session.add(trip)
+        db_session.commit()
+
+        response = client.get('/api/trips/map?format=polyline&zoom=16')
+        assert response.status_code == 200
+        data = response.get_json()
+
+        trip_data = data['trips'][0]
+        assert 'points' not in trip_data
+        assert decode_polyline(trip_data['polyline']) == coords
+        assert trip_data['point_count'] == 240
+        assert trip_data['bounds']['north'] == 41.52
+        assert trip_data['bounds']['center']['lat'] == pytest.approx(41.51)
+
+    def test_map_data_polyline_falls_back_to_telemetry(self, client, db_session):
+        """Trips without stored geometry are built from telemetry"""
+        session_id = uuid.uuid4()
+        db_session.add(Trip(
+            session_id=session_id,
+            start_time=datetime.now(timezone.utc),
+            distance_miles=5.0,
+            is_closed=True
+        ))
+        base_time = datetime.now(timezone.utc)
+        for i in range(20):
+            db_session.add(TelemetryRaw(
+                session_id=session_id,
+                timestamp=base_time + timedelta(seconds=i),
+                latitude=41.5 + i * 0.001,
+                longitude=-81.7
+            ))
+        db_session.commit()
+
+        response = client.get('/api/trips/map?format=polyline')
+        assert response.status_code == 200
+
+        trip_data = response.get_json()['trips'][0]
+        assert trip_data['polyline']
+        assert trip_data['point_count'] == 20
+
+    def test_map_data_zoom_simplifies(self, client, db_session):
+        """Lower zoom levels return fewer points for a curvy route"""
+        import math
+
+        session_id = uuid.uuid4()
+        db_session.add(Trip(
+            session_id=session_id,
+            start_time=datetime.now(timezone.utc),
+            distance_miles=20.0,
+            is_closed=True
+        ))
+        base_time = datetime.now(timezone.utc)
+        for i in range(400):
+            db_session.add(TelemetryRaw(
+                session_id=session_id,
+                timestamp=base_time + timedelta(seconds=i),
+                latitude=41.5 + math.sin(i / 10) * 0.01,
+                longitude=-81.7 + i * 0.0005,
+                speed_mph=40.0
+            ))
+        db_session.commit()
+
+        far = client.get('/api/trips/map?zoom=8&max_points_per_trip=500').get_json()
+        near = client.get('/api/trips/map?zoom=18&max_points_per_trip=500').get_json()
+
+        assert len(far['trips'][0]['points']) < len(near['trips'][0]['points'])
+        assert near['trips'][0]['points'][0]['speed'] == 40.0
+
+    def test_map_data_invalid_format(self, client, db_session):
+        """Unknown formats are rejected"""
+        response = client.get('/api/trips/map?format=geojson')
+        assert response.status_code == 400
+        assert 'format' in response.get_json()['error']
+
+    def test_map_data_single_telemetry_query(self, client, db_session):
+        """Telemetry for all trips is loaded with one query"""
+        from sqlalchemy import event
+
+        for i in range(5):
+            session_id = uuid.uuid4()
+            db_session.add(Trip(
+                session_id=session_id,
+                start_time=datetime.now(timezone.utc) - timedelta(days=i),
+                distance_miles=3.0,
+                is_closed=True
+            ))
+            for j in range(3):
+                db_session.add(TelemetryRaw(
+                    session_id=session_id,
+                    timestamp=datetime.now(timezone.utc) + timedelta(seconds=j),
+                    latitude=41.5 + j * 0.01,
+                    longitude=-81.7 + i * 0.01
+                ))
+        db_session.commit()
+
+        statements = []
+        engine = db_session.get_bind()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if 'telemetry_raw' in statement:
+                statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            response = client.get('/api/trips/map')
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+
+        assert response.get_json()['total_trips'] == 5
+        assert len(statements) == 1
+
 
 class TestDetailedRouteEndpoint:
     """Tests for /api/trips/<id>/route endpoint"""
@@ -149,6 +149,39 @@ class TestPowertrainEndpoints:
         assert "mode_percentages" in data
         assert "total_samples" in data
 
+    def test_powertrain_analysis_max_points(self, client, db_session):
+        """GET /api/analytics/powertrain/<trip_id>?max_points=N bounds the timeline."""
+        session_id = uuid.uuid4()
+        now = datetime.now(timezone.utc)
+
+        trip = Trip(session_id=session_id, start_time=now - timedelta(hours=1), end_time=now, is_closed=True)
+        db_session.add(trip)
+        db_session.flush()
+        trip_id = trip.id
+
+        for i in range(200):
+            db_session.add(TelemetryRaw(
+                session_id=session_id,
+                timestamp=now - timedelta(seconds=200 - i),
+                motor_a_rpm=1500.0,
+                engine_rpm=0.0,
+                speed_mph=40.0,
+            ))
+        db_session.commit()
+
+        response = client.get(f"/api/analytics/powertrain/{trip_id}?max_points=25")
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert len(data["timeline"]) == 25
+        assert data["total_samples"] == 200
+
+    def test_powertrain_analysis_invalid_max_points(self, client, db_session):
+        """GET /api/analytics/powertrain/<trip_id> rejects invalid max_points."""
+        response = client.get("/api/analytics/powertrain/1?max_points=zero")
+
+        assert response.status_code == 400
+
     def test_powertrain_summary_endpoint(self, client, db_session):
         """GET /api/analytics/powertrain/summary/<trip_id> returns summary."""
         session_id = uuid.uuid4()
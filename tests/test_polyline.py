@@ -0,0 +1,96 @@
+"""
+Tests for route geometry helpers (RDP simplification and encoded polylines).
+"""
+
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "receiver"))
+
+from utils.polyline import (  # noqa: E402
+    calculate_bounds,
+    decode_polyline,
+    encode_polyline,
+    simplify,
+    simplify_indices,
+    tolerance_for_zoom,
+)
+
+
+class TestEncodedPolyline:
+    """Tests for Google encoded polyline format."""
+
+    def test_encode_reference_example(self):
+        """Matches the reference example from the format specification."""
+        coords = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+        assert encode_polyline(coords) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+
+    def test_round_trip(self):
+        """Decoding an encoded track returns the coordinates to 5 decimals."""
+        coords = [(41.5 + i * 0.00123, -81.7 - i * 0.00077) for i in range(50)]
+        decoded = decode_polyline(encode_polyline(coords))
+
+        assert len(decoded) == len(coords)
+        for (lat, lon), (dlat, dlon) in zip(coords, decoded):
+            assert abs(lat - dlat) < 1e-5
+            assert abs(lon - dlon) < 1e-5
+
+    def test_empty(self):
+        """Empty tracks encode to an empty string."""
+        assert encode_polyline([]) == ""
+        assert decode_polyline("") == []
+
+
+class TestSimplify:
+    """Tests for Ramer-Douglas-Peucker simplification."""
+
+    def test_straight_line_keeps_endpoints(self):
+        """Collinear points collapse to the two ends."""
+        coords = [(41.5 + i * 0.001, -81.7 + i * 0.001) for i in range(100)]
+        assert simplify_indices(coords, 1e-6) == [0, 99]
+
+    def test_keeps_corner(self):
+        """A sharp turn is preserved."""
+        coords = [(0.0, i * 0.01) for i in range(10)] + [(i * 0.01, 0.09) for i in range(1, 10)]
+        kept = simplify(coords, 1e-4)
+
+        assert (0.0, 0.09) in kept
+        assert len(kept) == 3
+
+    def test_max_points_cap(self):
+        """A wiggly track is coarsened until it fits max_points."""
+        coords = [(math.sin(i / 5) * 0.01, i * 0.001) for i in range(2000)]
+
+        assert len(simplify_indices(coords, 1e-7)) > 100
+        indices = simplify_indices(coords, 1e-7, max_points=50)
+        assert len(indices) <= 50
+        assert indices[0] == 0 and indices[-1] == 1999
+
+    def test_short_tracks_unchanged(self):
+        """Tracks of one or two points are returned as-is."""
+        assert simplify_indices([(1.0, 2.0)], 0.1) == [0]
+        assert simplify_indices([(1.0, 2.0), (1.0, 2.0)], 0.1) == [0, 1]
+
+    def test_lower_zoom_means_fewer_points(self):
+        """Tolerance grows as zoom decreases, so fewer points are kept."""
+        coords = [(math.sin(i / 20) * 0.05, i * 0.0005) for i in range(2000)]
+
+        assert tolerance_for_zoom(8) > tolerance_for_zoom(16)
+        assert len(simplify(coords, tolerance_for_zoom(8))) < len(simplify(coords, tolerance_for_zoom(16)))
+
+    def test_tolerance_clamped(self):
+        """Out-of-range zooms are clamped."""
+        assert tolerance_for_zoom(50) == tolerance_for_zoom(20)
+        assert tolerance_for_zoom(-3) == tolerance_for_zoom(0)
+
+
+class TestCalculateBounds:
+    """Tests for track bounding boxes."""
+
+    def test_bounds(self):
+        bounds = calculate_bounds([(41.5, -81.7), (41.6, -81.9), (41.55, -81.8)])
+        assert bounds == {"north": 41.6, "south": 41.5, "east": -81.7, "west": -81.9}
+
+    def test_empty(self):
+        assert calculate_bounds([]) is None
@@ -16,8 +16,11 @@ from models import TelemetryRaw, Trip
 from services.powertrain_service import (
     PowertrainMode,
     analyze_trip_powertrain,
+    classify_modes,
     detect_operating_mode,
     get_powertrain_summary,
+    run_length_encode,
+    store_trip_powertrain,
 )
 
 
@@ -359,6 +362,89 @@ class TestAnalyzeTripPowertrain:
             assert curr_time >= prev_time
 
 
+class TestAnalyzeTripPowertrainDownsampled:
+    """Tests for analyze_trip_powertrain with max_points."""
+
+    def test_keeps_engine_start_and_full_statistics(self, app, db_session):
+        """Timeline is bounded while durations and transitions use every sample."""
+        session_id = uuid.uuid4()
+        now = datetime.now(timezone.utc)
+
+        for i in range(400):
+            engine_on = 300 <= i < 305
+            db_session.add(TelemetryRaw(
+                session_id=session_id,
+                timestamp=now - timedelta(seconds=400 - i),
+                motor_a_rpm=1500.0,
+                motor_b_rpm=1000.0,
+                generator_rpm=1800.0 if engine_on else 0.0,
+                engine_rpm=1500.0 if engine_on else 0.0,
+                hv_battery_power_kw=0.5,
+            ))
+        db_session.commit()
+
+        result = analyze_trip_powertrain(db_session, str(session_id), max_points=30)
+
+        assert result["total_samples"] == 400
+        assert result["timeline_points"] == 30
+        assert any(p["engine_rpm"] == 1500.0 for p in result["timeline"])
+        assert result["statistics"]["transitions"] == 2
+        assert result["statistics"]["duration_seconds"][PowertrainMode.HOLD_MODE] == 5
+
+
+class TestColumnarClassification:
+    """Tests for classify_modes and run-length encoding."""
+
+    def test_matches_per_point_detection(self):
+        """Column classification agrees with detect_operating_mode for every combination."""
+        import itertools
+
+        rpm_values = [None, 0.0, 100.0, 101.0, 400.0, 401.0, 1500.0, 1501.0, -50.0]
+        power_values = [None, 0.0, -1.0, -0.5, 5.0]
+        combos = list(itertools.product(rpm_values, rpm_values, rpm_values[:4], rpm_values[4:7], power_values))
+
+        modes = classify_modes(*(list(column) for column in zip(*combos)))
+
+        assert modes == [detect_operating_mode(*combo) for combo in combos]
+
+    def test_run_length_encode(self):
+        """Consecutive equal modes collapse into segments."""
+        assert run_length_encode([]) == []
+        assert run_length_encode(["ev", "ev", "hold", "hold", "hold", "ev"]) == [
+            ("ev", 0, 1),
+            ("hold", 2, 4),
+            ("ev", 5, 5),
+        ]
+
+    def test_long_trip_analyzed_completely(self, app, db_session):
+        """Trips longer than the default timeline are classified in full."""
+        session_id = uuid.uuid4()
+        start = datetime.now(timezone.utc) - timedelta(hours=4)
+        db_session.bulk_insert_mappings(
+            TelemetryRaw,
+            [
+                {
+                    "session_id": session_id,
+                    "timestamp": start + timedelta(seconds=i),
+                    "motor_a_rpm": 1500.0,
+                    "motor_b_rpm": 1000.0,
+                    "generator_rpm": 1800.0 if i >= 11000 else 0.0,
+                    "engine_rpm": 1500.0 if i >= 11000 else 0.0,
+                    "hv_battery_power_kw": 0.5,
+                }
+                for i in range(12000)
+            ],
+        )
+        db_session.commit()
+
+        result = analyze_trip_powertrain(db_session, str(session_id))
+
+        assert result["total_samples"] == 12000
+        assert result["timeline_points"] == 10000
+        assert result["statistics"]["duration_seconds"][PowertrainMode.HOLD_MODE] == 1000
+        assert [segment["mode"] for segment in result["segments"]] == [PowertrainMode.EV_MODE, PowertrainMode.HOLD_MODE]
+
+
 class TestGetPowertrainSummary:
     """Tests for get_powertrain_summary function."""
 
@@ -396,6 +482,47 @@ class TestGetPowertrainSummary:
         assert "mode_percentages" in result
         assert "total_samples" in result
 
+    def test_uses_summary_stored_at_finalization(self, app, db_session):
+        """Trips with a stored summary don't read telemetry."""
+        from sqlalchemy import event
+
+        session_id = uuid.uuid4()
+        now = datetime.now(timezone.utc)
+        telemetry = [
+            TelemetryRaw(
+                session_id=session_id,
+                timestamp=now - timedelta(minutes=10 - i),
+                motor_a_rpm=1500.0,
+                motor_b_rpm=1000.0,
+                generator_rpm=1800.0 if i >= 6 else 0.0,
+                engine_rpm=1500.0 if i >= 6 else 0.0,
+                hv_battery_power_kw=0.5,
+            )
+            for i in range(10)
+        ]
+        trip = Trip(session_id=session_id, start_time=now - timedelta(minutes=10), is_closed=True)
+        store_trip_powertrain(trip, telemetry)
+        db_session.add(trip)
+        db_session.commit()
+
+        statements = []
+        engine = db_session.get_bind()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            result = get_powertrain_summary(db_session, trip.id)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert not any("telemetry_raw" in statement for statement in statements)
+        assert result["transitions"] == 1
+        assert result["total_samples"] == 10
+        assert result["primary_mode"] == PowertrainMode.EV_MODE
+        assert result["mode_percentages"][PowertrainMode.HOLD_MODE] == pytest.approx(4 / 9 * 100)
+
     def test_handles_nonexistent_trip(self, app, db_session):
         """Nonexistent trip returns None."""
         result = get_powertrain_summary(db_session, "00000000-0000-0000-0000-000000000000")
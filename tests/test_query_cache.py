@@ -1,12 +1,11 @@
 """
 Tests for query cache utility.
 
-Tests the TTLCache class and caching decorator.
+Tests cache key generation and the caching decorator.
 """
 
 import os
 import sys
-import time
 from unittest.mock import patch
 
 import pytest
@@ -14,7 +13,6 @@ import pytest
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "receiver"))
 
 from utils.query_cache import (
-    TTLCache,
     cache_key,
     cached_query,
     clear_cache,
@@ -23,112 +21,6 @@ from utils.query_cache import (
 )
 
 
-class TestTTLCache:
-    """Tests for TTLCache class."""
-
-    def test_set_and_get_basic(self):
-        """Basic set and get works."""
-        cache = TTLCache(max_size=10, default_ttl=60)
-        cache.set("key1", "value1")
-        assert cache.get("key1") == "value1"
-
-    def test_get_missing_key_returns_none(self):
-        """Getting a missing key returns None."""
-        cache = TTLCache(max_size=10, default_ttl=60)
-        assert cache.get("missing") is None
-
-    def test_expired_entry_returns_none(self):
-        """Expired entries return None and are removed."""
-        cache = TTLCache(max_size=10, default_ttl=1)  # 1 second TTL
-        cache.set("key1", "value1")
-
-        # Should be there immediately
-        assert cache.get("key1") == "value1"
-
-        # Wait for expiration
-        time.sleep(1.1)
-
-        # Should be None now (expired)
-        assert cache.get("key1") is None
-
-    def test_eviction_at_capacity(self):
-        """Oldest entries are evicted when at capacity."""
-        cache = TTLCache(max_size=3, default_ttl=60)
-
-        # Fill cache
-        cache.set("key1", "value1")
-        cache.set("key2", "value2")
-        cache.set("key3", "value3")
-
-        # Add one more - should evict key1
-        cache.set("key4", "value4")
-
-        # key1 should be evicted
-        assert cache.get("key1") is None
-        # key2, key3, key4 should still exist
-        assert cache.get("key2") == "value2"
-        assert cache.get("key3") == "value3"
-        assert cache.get("key4") == "value4"
-
-    def test_clear_removes_all(self):
-        """Clear removes all entries."""
-        cache = TTLCache(max_size=10, default_ttl=60)
-        cache.set("key1", "value1")
-        cache.set("key2", "value2")
-
-        cache.clear()
-
-        assert cache.get("key1") is None
-        assert cache.get("key2") is None
-        assert len(cache._cache) == 0
-
-    def test_invalidate_pattern(self):
-        """Invalidate pattern removes matching keys."""
-        cache = TTLCache(max_size=10, default_ttl=60)
-        cache.set("weather:temp", 70)
-        cache.set("weather:wind", 10)
-        cache.set("trips:total", 50)
-
-        cache.invalidate_pattern("weather")
-
-        # Weather keys should be gone
-        assert cache.get("weather:temp") is None
-        assert cache.get("weather:wind") is None
-        # Trips key should still exist
-        assert cache.get("trips:total") == 50
-
-    def test_stats_returns_info(self):
-        """Stats returns cache information."""
-        cache = TTLCache(max_size=10, default_ttl=300)
-        cache.set("key1", "value1")
-        cache.set("key2", "value2")
-
-        stats = cache.stats()
-
-        assert stats["size"] == 2
-        assert stats["max_size"] == 10
-        assert stats["default_ttl"] == 300
-
-    def test_move_to_end_on_access(self):
-        """Accessed items are moved to end (LRU behavior)."""
-        cache = TTLCache(max_size=3, default_ttl=60)
-
-        cache.set("key1", "value1")
-        cache.set("key2", "value2")
-        cache.set("key3", "value3")
-
-        # Access key1 to move it to end
-        cache.get("key1")
-
-        # Now add key4 - key2 should be evicted (oldest unused)
-        cache.set("key4", "value4")
-
-        # key1 should still exist (accessed recently)
-        assert cache.get("key1") == "value1"
-        # key2 should be evicted
-        assert cache.get("key2") is None
-
-
 class TestCacheKey:
     """Tests for cache_key function."""
 
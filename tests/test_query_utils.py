@@ -17,13 +17,17 @@ import pytest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "receiver"))
 
-from models import Base, Trip  # noqa: E402
+from models import Base, ChargingSession, TelemetryRaw, Trip  # noqa: E402
 from utils.query_utils import (  # noqa: E402
     TripQueryBuilder,
     batch_load_relationships,
     eager_load_charging_session_relationships,
     eager_load_trip_relationships,
+    get_serializable_fields,
     optimize_trip_list_query,
+    parse_fields_param,
+    project_columns,
+    serialize_row,
 )
 
 
@@ -482,3 +486,50 @@ class TestBatchLoadRelationships:
 
         assert isinstance(loaded_trips, list)
         assert all(isinstance(trip, Trip) for trip in loaded_trips)
+
+
+class TestSparseFieldsets:
+    """Tests for fields= parsing, column projection and row serialization."""
+
+    def test_serializable_fields_match_to_dict(self):
+        """Serializable fields are the to_dict() keys that are real columns."""
+        fields = get_serializable_fields(Trip)
+        assert fields[:3] == ["id", "session_id", "start_time"]
+        assert set(fields) == set(Trip().to_dict().keys())
+
+    def test_serializable_fields_exclude_computed_and_internal(self):
+        """Computed keys and columns missing from to_dict() are not selectable."""
+        assert "duration_minutes" not in get_serializable_fields(ChargingSession)
+        assert "raw_data" not in get_serializable_fields(TelemetryRaw)
+
+    def test_parse_fields_none_and_empty(self):
+        """Missing or empty fieldsets mean 'all fields'."""
+        assert parse_fields_param(None, Trip) is None
+        assert parse_fields_param("", Trip) is None
+        assert parse_fields_param(" , ", Trip) is None
+
+    def test_parse_fields_string_and_list(self):
+        """Comma strings and lists parse the same, dropping duplicates."""
+        assert parse_fields_param("id, start_time,id", Trip) == ["id", "start_time"]
+        assert parse_fields_param(["id", "gas_mpg"], Trip) == ["id", "gas_mpg"]
+
+    def test_parse_fields_unknown_field(self):
+        """Unknown fields raise ValueError naming the field."""
+        with pytest.raises(ValueError, match="deleted_at"):
+            parse_fields_param("id,deleted_at", Trip)
+
+    def test_parse_fields_invalid_type(self):
+        """Non-string fieldsets raise ValueError."""
+        with pytest.raises(ValueError):
+            parse_fields_param(123, Trip)
+        with pytest.raises(ValueError):
+            parse_fields_param(["id", 5], Trip)
+
+    def test_projected_query_serializes_like_to_dict(self, db_session, sample_trips):
+        """Projected rows serialize to the same values as to_dict()."""
+        fields = ["id", "session_id", "start_time", "distance_miles"]
+        trip = db_session.query(Trip).order_by(Trip.id).first()
+        row = db_session.query(*project_columns(Trip, fields)).filter(Trip.id == trip.id).one()
+
+        expected = {name: trip.to_dict()[name] for name in fields}
+        assert serialize_row(row, fields) == expected
@@ -608,6 +608,84 @@ class TestHistoricalEfficiencyEdgeCases:
         assert isinstance(result, list)
 
 
+class TestHistoricalEfficiencyBatteryMerge:
+    """Tests for joining battery health readings onto trips."""
+
+    def _add_trip(self, db_session, start_time):
+        db_session.add(
+            Trip(
+                session_id=uuid.uuid4(),
+                start_time=start_time,
+                electric_miles=25.0,
+                kwh_per_mile=0.2,
+                is_closed=True,
+            )
+        )
+
+    def test_constant_queries_and_cached(self, app, db_session):
+        """Trips and readings are read once each, regardless of trip count; repeats hit the cache."""
+        from models import BatteryHealthReading
+        from sqlalchemy import event
+
+        now = datetime.now(timezone.utc)
+        for i in range(20):
+            self._add_trip(db_session, now - timedelta(days=i))
+            db_session.add(BatteryHealthReading(timestamp=now - timedelta(days=i, hours=1), capacity_kwh=17.0))
+        db_session.commit()
+
+        statements = []
+        engine = db_session.get_bind()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            first = get_historical_efficiency(db_session, days=30)
+            queries_first = len(statements)
+            second = get_historical_efficiency(db_session, days=30)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert len(first) == 20
+        assert queries_first == 2
+        assert len(statements) == 2
+        assert second == first
+
+    def test_reading_as_of_trip_start(self, app, db_session):
+        """Each trip uses the latest reading up to a week after it started."""
+        from models import BatteryHealthReading
+
+        now = datetime.now(timezone.utc)
+        self._add_trip(db_session, now - timedelta(days=20))
+        self._add_trip(db_session, now - timedelta(days=5))
+        db_session.add_all([
+            BatteryHealthReading(timestamp=now - timedelta(days=30), capacity_kwh=18.4),
+            BatteryHealthReading(timestamp=now - timedelta(days=16), capacity_kwh=17.48),
+            BatteryHealthReading(timestamp=now - timedelta(days=1), normalized_capacity_kwh=16.56),
+        ])
+        db_session.commit()
+
+        result = sorted(get_historical_efficiency(db_session, days=30), key=lambda row: row[1])
+
+        # Trip 20 days ago: reading 4 days later (95%); trip 5 days ago: reading 4 days later (90%)
+        assert [round(row[1], 1) for row in result] == [90.0, 95.0]
+
+    def test_new_reading_invalidates_cache(self, app, db_session):
+        """Committing a battery reading is reflected in the training set."""
+        from models import BatteryHealthReading
+
+        now = datetime.now(timezone.utc)
+        self._add_trip(db_session, now - timedelta(days=2))
+        db_session.commit()
+        assert get_historical_efficiency(db_session, days=30)[0][1] == 100.0
+
+        db_session.add(BatteryHealthReading(timestamp=now - timedelta(days=3), capacity_kwh=16.56))
+        db_session.commit()
+
+        assert get_historical_efficiency(db_session, days=30)[0][1] == pytest.approx(90.0)
+
+
 class TestGetCurrentConditions:
     """Tests for get_current_conditions function."""
 
@@ -0,0 +1,142 @@
+"""
+Tests for the precompressed response body cache on data-version endpoints.
+"""
+
+import gzip
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import brotli
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "receiver"))
+
+from utils.cache_utils import get_tiered_cache  # noqa: E402
+from utils.tiered_cache import MISSING  # noqa: E402
+
+ENDPOINT = "/api/efficiency/summary"
+
+
+@pytest.fixture
+def compress_everything(app):
+    """Compress bodies regardless of size so small test payloads are encoded."""
+    original = app.config.get("COMPRESS_MIN_SIZE")
+    app.config["COMPRESS_MIN_SIZE"] = 0
+    yield
+    app.config["COMPRESS_MIN_SIZE"] = original
+
+
+def _add_trip(db_session):
+    from models import Trip
+
+    now = datetime.now(timezone.utc)
+    db_session.add(
+        Trip(
+            session_id=uuid.uuid4(),
+            start_time=now - timedelta(days=1),
+            end_time=now - timedelta(days=1) + timedelta(minutes=30),
+            distance_miles=15.0,
+            electric_miles=15.0,
+            kwh_per_mile=0.3,
+            is_closed=True,
+        )
+    )
+    db_session.commit()
+
+
+class TestResponseBodyCache:
+    """Tests for serving cached bodies per ETag."""
+
+    def test_repeat_request_skips_view(self, client, db_session):
+        """A second request with the same ETag runs no queries."""
+        _add_trip(db_session)
+        first = client.get(ENDPOINT)
+
+        statements = []
+        engine = db_session.get_bind()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            second = client.get(ENDPOINT)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert second.status_code == 200
+        assert second.data == first.data
+        assert second.headers["ETag"] == first.headers["ETag"]
+        assert statements == []
+
+    def test_gzip_variant(self, client, db_session, compress_everything):
+        """Clients accepting only gzip get the stored gzip body."""
+        identity = client.get(ENDPOINT)
+        response = client.get(ENDPOINT, headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert gzip.decompress(response.data) == identity.data
+        assert response.headers["ETag"] == identity.headers["ETag"][:-1] + ':gzip"'
+
+    def test_brotli_preferred(self, client, db_session, compress_everything):
+        """Brotli is served when the client accepts both."""
+        identity = client.get(ENDPOINT)
+        response = client.get(ENDPOINT, headers={"Accept-Encoding": "gzip, deflate, br"})
+
+        assert response.headers["Content-Encoding"] == "br"
+        assert brotli.decompress(response.data) == identity.data
+
+    def test_client_quality_respected(self, client, db_session, compress_everything):
+        """A lower q-value for brotli makes gzip win."""
+        response = client.get(ENDPOINT, headers={"Accept-Encoding": "br;q=0.5, gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+
+    def test_compressed_etag_revalidates(self, client, db_session, compress_everything):
+        """The encoding-suffixed ETag produces a 304."""
+        etag = client.get(ENDPOINT, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+        response = client.get(ENDPOINT, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+
+        assert response.status_code == 304
+
+    def test_small_bodies_not_compressed(self, client, db_session, app):
+        """Bodies under the compression threshold are sent as-is."""
+        original = app.config.get("COMPRESS_MIN_SIZE")
+        app.config["COMPRESS_MIN_SIZE"] = 10 ** 6
+        try:
+            response = client.get(ENDPOINT, headers={"Accept-Encoding": "gzip"})
+        finally:
+            app.config["COMPRESS_MIN_SIZE"] = original
+
+        assert "Content-Encoding" not in response.headers
+
+    def test_write_renders_new_body(self, client, db_session):
+        """Committed writes change the ETag, so the next response is rebuilt."""
+        first = client.get(ENDPOINT).get_json()
+        _add_trip(db_session)
+        second = client.get(ENDPOINT).get_json()
+
+        assert second != first
+
+    def test_error_responses_not_cached(self, app):
+        """Non-200 responses are returned but never stored."""
+        from flask import make_response
+        from utils.response_cache import cached_response
+
+        calls = []
+
+        def render():
+            calls.append(1)
+            return make_response({"error": "not found"}, 404)
+
+        with app.test_request_context("/api/example"):
+            first = cached_response("etag-404", render, ttl=60)
+            second = cached_response("etag-404", render, ttl=60)
+
+        assert first.status_code == second.status_code == 404
+        assert "ETag" not in first.headers
+        assert len(calls) == 2
+        assert get_tiered_cache().get("response:etag-404") is MISSING
@@ -9,8 +9,13 @@ from receiver.utils.route_clustering import (
     calculate_route_similarity,
     calculate_start_end_similarity,
     calculate_route_bounds,
+    compute_route_fingerprint,
+    pack_fingerprint,
+    unpack_fingerprint,
+    fingerprint_distances,
     find_similar_trips,
-    cluster_trips_by_route
+    cluster_trips_by_route,
+    FINGERPRINT_POINTS
 )
 
 
@@ -166,6 +171,73 @@ class TestCalculateRouteBounds:
         assert bounds['west'] == -170
 
 
+class TestRouteFingerprint:
+    """Tests for fixed-length route fingerprints"""
+
+    def test_fixed_length_with_endpoints(self):
+        """Fingerprint has FINGERPRINT_POINTS points and keeps both ends"""
+        points = [(41.5 + i * 0.001, -81.7) for i in range(137)]
+        fingerprint = compute_route_fingerprint(points)
+
+        assert len(fingerprint) == FINGERPRINT_POINTS
+        assert fingerprint[0] == points[0]
+        assert fingerprint[-1] == pytest.approx(points[-1])
+
+    def test_independent_of_sampling_rate(self):
+        """Dense and sparse logs of the same road give the same fingerprint"""
+        dense = [(41.5 + i * 0.0001, -81.7 + i * 0.0001) for i in range(1001)]
+        sparse = dense[::50]
+
+        distance = fingerprint_distances(
+            [c for p in compute_route_fingerprint(dense) for c in p],
+            [[c for p in compute_route_fingerprint(sparse) for c in p]]
+        )[0]
+
+        assert distance < 0.001
+
+    def test_too_few_points(self):
+        """Tracks with fewer than 2 points have no fingerprint"""
+        assert compute_route_fingerprint([]) == []
+        assert compute_route_fingerprint([(41.5, -81.7)]) == []
+
+    def test_stationary_track(self):
+        """Zero-length tracks repeat the single location"""
+        fingerprint = compute_route_fingerprint([(41.5, -81.7)] * 5)
+        assert fingerprint == [(41.5, -81.7)] * FINGERPRINT_POINTS
+
+    def test_pack_round_trip(self):
+        """Packed fingerprints unpack to the flat coordinate list"""
+        fingerprint = compute_route_fingerprint([(41.5, -81.7), (41.6, -81.8)])
+        blob = pack_fingerprint(fingerprint)
+
+        assert len(blob) == FINGERPRINT_POINTS * 2 * 8
+        assert list(unpack_fingerprint(blob)) == [c for p in fingerprint for c in p]
+
+    def test_distances_match_haversine(self):
+        """Parallel routes 0.01 degrees of latitude apart are ~0.69 miles apart"""
+        reference = [c for i in range(20) for c in (41.5 + i * 0.001, -81.7)]
+        shifted = [c for i in range(20) for c in (41.51 + i * 0.001, -81.7)]
+
+        distances = fingerprint_distances(reference, [reference, shifted])
+
+        assert distances[0] == 0
+        assert distances[1] == pytest.approx(haversine_distance(41.5, -81.7, 41.51, -81.7), rel=0.01)
+
+    def test_distances_over_packed_candidates(self):
+        """Unpacked stored fingerprints are compared as one matrix; no candidates gives no distances"""
+        reference = compute_route_fingerprint([(41.5, -81.7), (41.6, -81.7)])
+        candidates = [
+            unpack_fingerprint(pack_fingerprint(compute_route_fingerprint([(41.5 + d, -81.7), (41.6 + d, -81.7)])))
+            for d in (0.0, 0.01, 0.02)
+        ]
+
+        distances = fingerprint_distances(unpack_fingerprint(pack_fingerprint(reference)), candidates)
+
+        assert distances[0] == pytest.approx(0.0, abs=1e-9)
+        assert distances[2] == pytest.approx(2 * distances[1], rel=0.01)
+        assert fingerprint_distances(unpack_fingerprint(pack_fingerprint(reference)), []) == []
+
+
 class TestFindSimilarTrips:
     """Tests for finding similar trips (requires database)"""
 
@@ -216,6 +288,102 @@ class TestFindSimilarTrips:
         similar = find_similar_trips(db_session, trip)
         assert similar == []
 
+    def test_find_similar_trips_uses_stored_endpoints(self, app, db_session):
+        """Candidates are prefiltered by stored geohashed endpoints"""
+        from receiver.models import Trip, TelemetryRaw
+        from receiver.utils.geohash import encode
+        from datetime import datetime, timezone, timedelta
+
+        path = [(41.50 + i * 0.002, -81.70 + i * 0.002) for i in range(10)]
+        far_path = [(lat - 1.0, lon) for lat, lon in path]
+        now = datetime.now(timezone.utc)
+
+        def add_trip(points, stored, days_ago):
+            session_id = uuid.uuid4()
+            values = {}
+            if stored:
+                values = dict(
+                    start_lat=points[0][0], start_lon=points[0][1],
+                    end_lat=points[-1][0], end_lon=points[-1][1],
+                    start_geohash=encode(*points[0]), end_geohash=encode(*points[-1])
+                )
+            trip = Trip(
+                session_id=session_id,
+                start_time=now - timedelta(days=days_ago),
+                distance_miles=10.0,
+                is_closed=True,
+                **values
+            )
+            db_session.add(trip)
+            for i, (lat, lon) in enumerate(points):
+                db_session.add(TelemetryRaw(
+                    session_id=session_id,
+                    timestamp=now - timedelta(days=days_ago) + timedelta(seconds=i),
+                    latitude=lat,
+                    longitude=lon
+                ))
+            return trip
+
+        reference = add_trip(path, True, 0)
+        same = add_trip(path, True, 1)
+        legacy = add_trip(path, False, 2)  # No stored endpoints: still compared
+        add_trip(far_path, True, 3)
+        db_session.commit()
+
+        similar = find_similar_trips(db_session, reference)
+
+        assert {s['trip_id'] for s in similar} == {same.id, legacy.id}
+
+    def test_find_similar_trips_reads_no_telemetry_with_fingerprints(self, app, db_session):
+        """Fingerprinted trips are compared without loading telemetry"""
+        from receiver.models import Trip
+        from receiver.utils.geohash import encode
+        from datetime import datetime, timezone, timedelta
+        from sqlalchemy import event
+
+        path = [(41.50 + i * 0.002, -81.70 + i * 0.002) for i in range(10)]
+        detour = [(lat, lon + 0.05) for lat, lon in path]
+        detour[0], detour[-1] = path[0], path[-1]
+        now = datetime.now(timezone.utc)
+
+        def add_trip(points, days_ago):
+            trip = Trip(
+                session_id=uuid.uuid4(),
+                start_time=now - timedelta(days=days_ago),
+                distance_miles=10.0,
+                is_closed=True,
+                gps_point_count=len(points),
+                start_lat=points[0][0], start_lon=points[0][1],
+                end_lat=points[-1][0], end_lon=points[-1][1],
+                start_geohash=encode(*points[0]), end_geohash=encode(*points[-1]),
+                route_fingerprint=pack_fingerprint(compute_route_fingerprint(points))
+            )
+            db_session.add(trip)
+            return trip
+
+        reference = add_trip(path, 0)
+        same = add_trip(path, 1)
+        add_trip(detour, 2)  # Same endpoints, different road
+        db_session.commit()
+
+        statements = []
+        engine = db_session.get_bind()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if 'telemetry_raw' in statement:
+                statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            similar = find_similar_trips(db_session, reference)
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+
+        assert [s['trip_id'] for s in similar] == [same.id]
+        assert similar[0]['similarity_score'] == 100
+        assert similar[0]['start_point'] == {'lat': path[0][0], 'lon': path[0][1]}
+        assert statements == []
+
 
 class TestClusterTripsByRoute:
     """Tests for trip clustering"""
@@ -15,12 +15,49 @@ from datetime import datetime, timedelta, timezone
 import pytest
 from models import Route, TelemetryRaw, Trip
 from services.route_service import (
+    assign_trip_to_route,
     detect_routes,
     find_matching_route,
     get_route_summary,
     get_trip_endpoints,
     haversine_distance,
+    merge_similar_routes,
+    recluster_all_routes,
+    refresh_route_stats,
+    remove_trips_from_routes,
+    split_drifted_routes,
 )
+from utils.geohash import encode as encode_geohash
+from utils.route_clustering import compute_route_fingerprint, pack_fingerprint
+
+# Straight commute and a same-endpoint detour through a different road
+COMMUTE = [(37.7749 + i * 0.003, -122.4194 + i * 0.003) for i in range(11)]
+DETOUR = [COMMUTE[0]] + [(lat, lon + 0.04) for lat, lon in COMMUTE[1:-1]] + [COMMUTE[-1]]
+
+
+def make_finalized_trip(db_session, path, days_ago=0, kwh_per_mile=0.25):
+    """Create a closed trip with the geometry finalization would store."""
+    now = datetime.now(timezone.utc)
+    trip = Trip(
+        session_id=uuid.uuid4(),
+        start_time=now - timedelta(days=days_ago, minutes=20),
+        end_time=now - timedelta(days=days_ago),
+        distance_miles=2.0,
+        electric_miles=2.0,
+        kwh_per_mile=kwh_per_mile,
+        is_closed=True,
+        gps_point_count=len(path),
+        start_lat=path[0][0],
+        start_lon=path[0][1],
+        end_lat=path[-1][0],
+        end_lon=path[-1][1],
+        start_geohash=encode_geohash(*path[0]),
+        end_geohash=encode_geohash(*path[-1]),
+        route_fingerprint=pack_fingerprint(compute_route_fingerprint(path)),
+    )
+    db_session.add(trip)
+    db_session.flush()
+    return trip
 
 
 class TestHaversineDistance:
@@ -227,6 +264,38 @@ class TestFindMatchingRoute:
         assert found is not None
         assert found.name == "Route 2"
 
+    def test_geohash_prefilter_skips_distant_routes(self, app, db_session):
+        """Routes with geohashes outside the search cells are not matched."""
+        from utils.geohash import encode
+
+        near = Route(
+            name="Near",
+            start_lat=37.7749,
+            start_lon=-122.4194,
+            end_lat=37.8044,
+            end_lon=-122.2712,
+            start_geohash=encode(37.7749, -122.4194),
+            end_geohash=encode(37.8044, -122.2712),
+        )
+        # Geohash deliberately points elsewhere: the prefilter must exclude it
+        mislabeled = Route(
+            name="Mislabeled",
+            start_lat=37.7749,
+            start_lon=-122.4194,
+            end_lat=37.8044,
+            end_lon=-122.2712,
+            start_geohash=encode(40.0, -100.0),
+            end_geohash=encode(40.0, -100.0),
+        )
+        db_session.add_all([mislabeled, near])
+        db_session.commit()
+
+        found = find_matching_route(
+            db_session, start_lat=37.7749, start_lon=-122.4194, end_lat=37.8044, end_lon=-122.2712
+        )
+
+        assert found.name == "Near"
+
 
 class TestGetTripEndpoints:
     """Tests for get_trip_endpoints function."""
@@ -369,6 +438,10 @@ class TestDetectRoutes:
         assert len(routes) >= 1
         # Should create at least one route
 
+        route = db_session.query(Route).first()
+        assert route.start_geohash is not None
+        assert route.end_geohash is not None
+
     def test_groups_similar_trips_into_route(self, app, db_session):
         """Groups trips with similar endpoints into same route."""
         now = datetime.now(timezone.utc)
@@ -406,6 +479,223 @@ class TestDetectRoutes:
         assert len(routes) >= 1
 
 
+class TestAssignTripToRoute:
+    """Tests for incremental route assignment."""
+
+    def test_creates_route_for_first_trip(self, app, db_session):
+        """First trip on a path starts a new route."""
+        trip = make_finalized_trip(db_session, COMMUTE)
+
+        route = assign_trip_to_route(db_session, trip)
+
+        assert trip.route_id == route.id
+        assert route.name == f"Route {route.id}"
+        assert route.trip_count == 1
+        assert route.fingerprint == trip.route_fingerprint
+        assert route.start_geohash == encode_geohash(*COMMUTE[0])
+
+    def test_running_aggregates(self, app, db_session):
+        """Repeat trips update the route's running averages."""
+        first = make_finalized_trip(db_session, COMMUTE, days_ago=2, kwh_per_mile=0.2)
+        second = make_finalized_trip(db_session, COMMUTE, days_ago=1, kwh_per_mile=0.3)
+        gas_only = make_finalized_trip(db_session, COMMUTE, kwh_per_mile=None)
+
+        for trip in (first, second, gas_only):
+            route = assign_trip_to_route(db_session, trip)
+
+        assert first.route_id == second.route_id == gas_only.route_id == route.id
+        assert route.trip_count == 3
+        assert route.efficiency_trip_count == 2
+        assert route.avg_efficiency_kwh_per_mile == pytest.approx(0.25)
+        assert route.best_efficiency == 0.2
+        assert route.worst_efficiency == 0.3
+        assert route.avg_duration_minutes == pytest.approx(20)
+
+    def test_same_endpoints_different_road_is_new_route(self, app, db_session):
+        """Fingerprints separate routes that share endpoints."""
+        commute = make_finalized_trip(db_session, COMMUTE)
+        detour = make_finalized_trip(db_session, DETOUR)
+
+        assert assign_trip_to_route(db_session, commute).id != assign_trip_to_route(db_session, detour).id
+
+    def test_already_assigned_trip_not_recounted(self, app, db_session):
+        """Assigning a trip twice doesn't change the route stats."""
+        trip = make_finalized_trip(db_session, COMMUTE)
+        route = assign_trip_to_route(db_session, trip)
+
+        assert assign_trip_to_route(db_session, trip) is route
+        assert route.trip_count == 1
+
+    def test_short_trip_not_assigned(self, app, db_session):
+        """Trips under the minimum distance are left unassigned."""
+        trip = make_finalized_trip(db_session, COMMUTE)
+        trip.distance_miles = 0.2
+
+        assert assign_trip_to_route(db_session, trip) is None
+        assert trip.route_id is None
+
+    def test_gas_only_trip_not_assigned(self, app, db_session):
+        """Trips with no electric miles are left out of route clustering."""
+        trip = make_finalized_trip(db_session, COMMUTE)
+        trip.electric_miles = 0.0
+        db_session.commit()
+
+        assert assign_trip_to_route(db_session, trip) is None
+        assert detect_routes(db_session, min_trips=1) == []
+        assert trip.route_id is None
+
+    def test_detect_routes_is_incremental(self, app, db_session):
+        """Repeated detection doesn't count trips again."""
+        for days_ago in range(3):
+            make_finalized_trip(db_session, COMMUTE, days_ago=days_ago)
+        db_session.commit()
+
+        detect_routes(db_session, min_trips=1)
+        routes = detect_routes(db_session, min_trips=1)
+
+        assert len(routes) == 1
+        assert routes[0]["trip_count"] == 3
+
+
+class TestRebalanceRoutes:
+    """Tests for the route merge/split maintenance pass."""
+
+    def test_split_reassigns_drifted_trip(self, app, db_session):
+        """Trips far from their route's mean fingerprint are moved out."""
+        commutes = [make_finalized_trip(db_session, COMMUTE, days_ago=i) for i in range(3)]
+        for trip in commutes:
+            route = assign_trip_to_route(db_session, trip)
+        # Simulate a detour that was assigned before the mean settled
+        detour = make_finalized_trip(db_session, DETOUR, days_ago=5)
+        detour.route_id = route.id
+        db_session.commit()
+
+        assert split_drifted_routes(db_session) == 1
+
+        assert detour.route_id not in (None, route.id)
+        assert all(trip.route_id == route.id for trip in commutes)
+        assert route.trip_count == 3
+
+    def test_merge_converged_routes(self, app, db_session):
+        """Routes with near-identical mean fingerprints are merged into the larger."""
+        trips = [make_finalized_trip(db_session, COMMUTE, days_ago=i) for i in range(3)]
+        big = Route(name="Commute", trip_count=0, start_lat=0, start_lon=0, end_lat=0, end_lon=0)
+        small = Route(name="Duplicate", trip_count=0, start_lat=0, start_lon=0, end_lat=0, end_lon=0)
+        db_session.add_all([big, small])
+        db_session.flush()
+        for trip, route in zip(trips, (big, big, small)):
+            trip.route_id = route.id
+        refresh_route_stats(db_session, big)
+        refresh_route_stats(db_session, small)
+        db_session.commit()
+
+        assert merge_similar_routes(db_session) == 1
+
+        assert db_session.query(Route).count() == 1
+        assert all(trip.route_id == big.id for trip in trips)
+        assert big.trip_count == 3
+        assert big.name == "Commute"
+
+
+class TestRouteTripDeletes:
+    """Tests for keeping route stats in step with trip deletes and restores."""
+
+    def test_soft_delete_and_restore(self, client, db_session):
+        """Archived trips leave the route's stats until they are restored."""
+        cheap = make_finalized_trip(db_session, COMMUTE, days_ago=2, kwh_per_mile=0.2)
+        dear = make_finalized_trip(db_session, COMMUTE, days_ago=1, kwh_per_mile=0.3)
+        dear.is_imported = True
+        for trip in (cheap, dear):
+            route = assign_trip_to_route(db_session, trip)
+        route_id, dear_id = route.id, dear.id
+        db_session.commit()
+
+        assert client.delete(f"/api/trips/{dear_id}").status_code == 200
+        db_session.expire_all()
+        route = db_session.get(Route, route_id)
+        assert route.trip_count == 1
+        assert route.avg_efficiency_kwh_per_mile == pytest.approx(0.2)
+        assert route.worst_efficiency == 0.2
+        assert db_session.get(Trip, dear_id).route_id is None
+
+        assert client.post(f"/api/trips/{dear_id}/restore").status_code == 200
+        db_session.expire_all()
+        route = db_session.get(Route, route_id)
+        assert db_session.get(Trip, dear_id).route_id == route_id
+        assert route.trip_count == 2
+        assert route.avg_efficiency_kwh_per_mile == pytest.approx(0.25)
+        assert route.worst_efficiency == 0.3
+
+    def test_hard_delete_drops_trip_and_empty_route(self, client, db_session):
+        """Hard deletes shrink the route; deleting its last trip deletes it."""
+        trips = [make_finalized_trip(db_session, COMMUTE, days_ago=i) for i in range(2)]
+        for trip in trips:
+            route = assign_trip_to_route(db_session, trip)
+        route_id, trip_ids = route.id, [trip.id for trip in trips]
+        db_session.commit()
+
+        assert client.delete(f"/api/trips/{trip_ids[0]}").status_code == 200
+        db_session.expire_all()
+        assert db_session.get(Route, route_id).trip_count == 1
+
+        assert client.delete(f"/api/trips/{trip_ids[1]}").status_code == 200
+        db_session.expire_all()
+        assert db_session.get(Route, route_id) is None
+
+    def test_bulk_delete_and_restore(self, client, db_session):
+        """Bulk soft deletes and restores update each route once."""
+        trips = [make_finalized_trip(db_session, COMMUTE, days_ago=i) for i in range(3)]
+        for trip in trips:
+            route = assign_trip_to_route(db_session, trip)
+        route_id, trip_ids = route.id, [trip.id for trip in trips[:2]]
+        db_session.commit()
+
+        response = client.post("/api/bulk/trips/delete", json={"trip_ids": trip_ids})
+        assert response.status_code == 200
+        db_session.expire_all()
+        assert db_session.get(Route, route_id).trip_count == 1
+
+        response = client.post("/api/bulk/trips/restore", json={"trip_ids": trip_ids})
+        assert response.status_code == 200
+        db_session.expire_all()
+        assert db_session.get(Route, route_id).trip_count == 3
+
+    def test_refresh_skips_deleted_members(self, app, db_session):
+        """Trips archived while still attached don't count towards the route."""
+        trips = [make_finalized_trip(db_session, COMMUTE, days_ago=i) for i in range(3)]
+        for trip in trips:
+            route = assign_trip_to_route(db_session, trip)
+        trips[0].deleted_at = datetime.now(timezone.utc)
+
+        refresh_route_stats(db_session, route)
+
+        assert route.trip_count == 2
+        assert trips[0].route_id == route.id
+
+    def test_remove_without_route_is_noop(self, app, db_session):
+        """Unassigned trips don't touch any route."""
+        assert remove_trips_from_routes(db_session, [make_finalized_trip(db_session, COMMUTE)]) == 0
+
+
+class TestReclusterAllRoutes:
+    """Tests for the offline full recluster."""
+
+    def test_rebuilds_assignments_and_drops_stale_routes(self, app, db_session):
+        """Stale route stats are replaced and empty routes deleted."""
+        stale = Route(name="Stale", trip_count=42, start_lat=10, start_lon=10, end_lat=11, end_lon=11)
+        db_session.add(stale)
+        for days_ago in range(2):
+            make_finalized_trip(db_session, COMMUTE, days_ago=days_ago)
+        make_finalized_trip(db_session, DETOUR, days_ago=3)
+        db_session.commit()
+
+        result = recluster_all_routes(db_session, batch_size=2)
+
+        assert result == {"trips_assigned": 3, "routes": 2, "routes_deleted": 1}
+        counts = sorted(route.trip_count for route in db_session.query(Route).all())
+        assert counts == [1, 2]
+
+
 class TestGetRouteSummary:
     """Tests for get_route_summary function."""
 
@@ -309,6 +309,38 @@ class TestGetChargingCurve:
         # May be empty if no telemetry available
         assert isinstance(result["curve"], list)
 
+    def test_get_charging_curve_downsampled(self, client, charging_sessions, db_session):
+        """Test max_points downsamples a stored curve and keeps the taper."""
+        session = charging_sessions[0]
+        session_id = session.id
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        curve = [
+            {
+                "timestamp": (start + timedelta(minutes=i)).isoformat(),
+                "power_kw": 6.6 if i < 180 else 1.2,
+                "soc": 20 + i / 4,
+            }
+            for i in range(240)
+        ]
+        session.charging_curve = curve
+        db_session.commit()
+
+        response = client.get(f"/api/charging/{session_id}/curve?max_points=24")
+
+        assert response.status_code == 200
+        result = json.loads(response.data)
+        assert len(result["curve"]) == 24
+        assert result["total_points"] == 240
+        assert result["curve"][0] == curve[0]
+        assert result["curve"][-1] == curve[-1]
+        assert 1.2 in [p["power_kw"] for p in result["curve"]]
+
+    def test_get_charging_curve_invalid_max_points(self, client, charging_sessions):
+        """Test invalid max_points returns 400."""
+        response = client.get(f"/api/charging/{charging_sessions[0].id}/curve?max_points=abc")
+
+        assert response.status_code == 400
+
     def test_get_charging_curve_not_found(self, client):
         """Test getting curve for non-existent session returns 404."""
         response = client.get("/api/charging/99999/curve")
@@ -228,6 +228,34 @@ class TestGetTrips:
             for i in range(len(data["trips"]) - 1):
                 assert data["trips"][i]["distance_miles"] >= data["trips"][i + 1]["distance_miles"]
 
+    def test_get_trips_sparse_fields(self, client, sample_trips):
+        """Test fields param returns only the requested fields."""
+        response = client.get("/api/trips?fields=id,start_time,distance_miles")
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert len(data["trips"]) == 3
+        for trip in data["trips"]:
+            assert set(trip.keys()) == {"id", "start_time", "distance_miles"}
+        assert data["pagination"]["total"] == 3
+
+    def test_get_trips_sparse_fields_keeps_sorting(self, client, sample_trips):
+        """Test fields param works with sorting on a non-selected column."""
+        expected_ids = [t.id for t in sorted(sample_trips, key=lambda t: t.distance_miles)]
+
+        response = client.get("/api/trips?fields=id&sort_by=distance_miles&sort_order=asc")
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [t["id"] for t in data["trips"]] == expected_ids
+
+    def test_get_trips_invalid_field(self, client, sample_trips):
+        """Test unknown fields are rejected."""
+        response = client.get("/api/trips?fields=id,not_a_field")
+
+        assert response.status_code == 400
+        assert "not_a_field" in json.loads(response.data)["error"]
+
 
 # ============================================================================
 # Get Trip Detail Tests
@@ -280,6 +308,165 @@ class TestGetTripDetail:
         assert "telemetry_pagination" in data
         assert data["telemetry_pagination"]["total"] == 5
 
+    def test_get_trip_detail_sparse_fields(self, client, sample_trips, db_session):
+        """Test fields and telemetry_fields restrict the returned columns."""
+        from models import TelemetryRaw
+
+        trip = sample_trips[0]
+        db_session.add(TelemetryRaw(session_id=trip.session_id, timestamp=trip.start_time, speed_mph=40.0))
+        db_session.commit()
+
+        response = client.get(f"/api/trips/{trip.id}?fields=id,kwh_per_mile&telemetry_fields=timestamp,speed_mph")
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["trip"] == {"id": trip.id, "kwh_per_mile": 0.30}
+        assert data["telemetry"] == [{"timestamp": data["telemetry"][0]["timestamp"], "speed_mph": 40.0}]
+        assert data["telemetry_pagination"]["total"] == 1
+
+    def test_get_trip_detail_sparse_fields_not_found(self, client):
+        """Test fields param still returns 404 for missing trips."""
+        response = client.get("/api/trips/99999?fields=id")
+
+        assert response.status_code == 404
+
+    def test_get_trip_detail_invalid_telemetry_field(self, client, sample_trips):
+        """Test unknown telemetry fields are rejected."""
+        response = client.get(f"/api/trips/{sample_trips[0].id}?telemetry_fields=raw_data")
+
+        assert response.status_code == 400
+
+
+class TestGetTripDetailDownsampled:
+    """Tests for GET /api/trips/<id>?max_points=N."""
+
+    def test_downsamples_whole_trip(self, client, sample_trips, db_session):
+        """Test max_points covers the whole trip and keeps peaks."""
+        from models import TelemetryRaw
+
+        trip = sample_trips[0]
+        trip_id = trip.id
+        for i in range(300):
+            db_session.add(TelemetryRaw(
+                session_id=trip.session_id,
+                timestamp=trip.start_time + timedelta(seconds=i),
+                speed_mph=40.0,
+                hv_battery_power_kw=-45.0 if i == 250 else 10.0,
+            ))
+        db_session.commit()
+
+        response = client.get(f"/api/trips/{trip_id}?max_points=20&telemetry_fields=timestamp,hv_battery_power_kw")
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert len(data["telemetry"]) == 20
+        assert data["telemetry_downsampling"] == {"method": "lttb", "max_points": 20, "total": 300, "returned": 20}
+        assert -45.0 in [t["hv_battery_power_kw"] for t in data["telemetry"]]
+        timestamps = [t["timestamp"] for t in data["telemetry"]]
+        assert timestamps == sorted(timestamps)
+        assert "telemetry_pagination" not in data
+
+    def test_short_trip_returned_whole(self, client, sample_trips, db_session):
+        """Test trips within budget are not reduced."""
+        from models import TelemetryRaw
+
+        trip = sample_trips[0]
+        trip_id = trip.id
+        for i in range(5):
+            db_session.add(TelemetryRaw(session_id=trip.session_id, timestamp=trip.start_time + timedelta(seconds=i)))
+        db_session.commit()
+
+        data = json.loads(client.get(f"/api/trips/{trip_id}?max_points=100").data)
+
+        assert len(data["telemetry"]) == 5
+
+    def test_invalid_max_points(self, client, sample_trips):
+        """Test invalid max_points returns 400."""
+        response = client.get(f"/api/trips/{sample_trips[0].id}?max_points=1")
+
+        assert response.status_code == 400
+        assert "max_points" in json.loads(response.data)["error"]
+
+
+class TestTripTelemetryColumnar:
+    """Tests for GET /api/trips/<id>/telemetry/columnar."""
+
+    def test_columnar_round_trip(self, client, sample_trips, db_session):
+        """Test packed columns decode back to the stored telemetry."""
+        from models import TelemetryRaw
+        from utils.columnar import COLUMNAR_MIMETYPE, decode_columnar
+
+        trip = sample_trips[0]
+        trip_id = trip.id
+        start = trip.start_time
+        for i in range(5):
+            db_session.add(TelemetryRaw(
+                session_id=trip.session_id,
+                timestamp=start + timedelta(seconds=i),
+                latitude=37.7749123 if i else None,
+                speed_mph=float(i * 10),
+            ))
+        db_session.commit()
+
+        response = client.get(f"/api/trips/{trip_id}/telemetry/columnar?fields=timestamp,latitude,speed_mph")
+
+        assert response.status_code == 200
+        assert response.mimetype == COLUMNAR_MIMETYPE
+        header, columns = decode_columnar(response.data)
+        assert header["trip_id"] == trip_id
+        assert header["row_count"] == 5
+        assert [c["dtype"] for c in header["columns"]] == ["int64", "float64", "float32"]
+        assert columns["speed_mph"] == [0.0, 10.0, 20.0, 30.0, 40.0]
+        assert columns["latitude"][0] != columns["latitude"][0]  # NaN for missing value
+        assert columns["latitude"][1] == 37.7749123
+        assert columns["timestamp"][1] - columns["timestamp"][0] == 1000
+
+    def test_columnar_default_fields(self, client, sample_trips):
+        """Test default fields cover the chart and map series."""
+        from utils.columnar import decode_columnar
+
+        response = client.get(f"/api/trips/{sample_trips[0].id}/telemetry/columnar")
+
+        assert response.status_code == 200
+        header, columns = decode_columnar(response.data)
+        assert header["row_count"] == 0
+        assert "timestamp" in columns and "state_of_charge" in columns
+
+    def test_columnar_max_points(self, client, sample_trips, db_session):
+        """Test max_points streams an LTTB selection of the whole trip."""
+        from models import TelemetryRaw
+        from utils.columnar import decode_columnar
+
+        trip = sample_trips[0]
+        trip_id = trip.id
+        for i in range(100):
+            db_session.add(TelemetryRaw(
+                session_id=trip.session_id,
+                timestamp=trip.start_time + timedelta(seconds=i),
+                engine_rpm=2200.0 if i == 77 else 0.0,
+            ))
+        db_session.commit()
+
+        response = client.get(f"/api/trips/{trip_id}/telemetry/columnar?fields=engine_rpm&max_points=10")
+
+        header, columns = decode_columnar(response.data)
+        assert header["row_count"] == 10
+        assert header["total_points"] == 100
+        assert 2200.0 in columns["engine_rpm"]
+
+    def test_columnar_not_found(self, client):
+        """Test missing trips return 404."""
+        response = client.get("/api/trips/99999/telemetry/columnar")
+
+        assert response.status_code == 404
+
+    def test_columnar_rejects_non_numeric_field(self, client, sample_trips):
+        """Test non-numeric columns cannot be packed."""
+        response = client.get(f"/api/trips/{sample_trips[0].id}/telemetry/columnar?fields=session_id")
+
+        assert response.status_code == 400
+        assert "session_id" in json.loads(response.data)["error"]
+
 
 # ============================================================================
 # Delete Trip Tests
@@ -734,6 +921,89 @@ class TestTripsFilterValidation:
 # ============================================================================
 
 
+class TestTripsNearFilter:
+    """Tests for near_lat/near_lon/radius_miles proximity search."""
+
+    @pytest.fixture
+    def located_trips(self, db_session):
+        """Trips with stored endpoints at known distances from downtown Cleveland."""
+        from models import Trip
+        from utils.geohash import encode
+
+        now = datetime.now(timezone.utc)
+        locations = {
+            "downtown": ((41.4993, -81.6944), (41.5050, -81.6900)),
+            "lakewood": ((41.4820, -81.7982), (41.4993, -81.6944)),  # Ends downtown
+            "akron": ((41.0814, -81.5190), (41.0900, -81.5100)),  # ~30 miles away
+        }
+        trips = {}
+        for i, (name, ((s_lat, s_lon), (e_lat, e_lon))) in enumerate(locations.items()):
+            trip = Trip(
+                session_id=uuid.uuid4(),
+                start_time=now - timedelta(days=i + 1),
+                distance_miles=10.0,
+                is_closed=True,
+                start_lat=s_lat,
+                start_lon=s_lon,
+                end_lat=e_lat,
+                end_lon=e_lon,
+                start_geohash=encode(s_lat, s_lon),
+                end_geohash=encode(e_lat, e_lon),
+            )
+            db_session.add(trip)
+            trips[name] = trip
+        # Trip without stored endpoints never matches
+        db_session.add(Trip(session_id=uuid.uuid4(), start_time=now, distance_miles=5.0, is_closed=True))
+        db_session.commit()
+        return {name: trip.id for name, trip in trips.items()}
+
+    def test_radius_matches_start_or_end(self, client, located_trips):
+        """Trips starting or ending within the radius are returned."""
+        response = client.get("/api/trips?near_lat=41.4993&near_lon=-81.6944&radius_miles=2")
+        assert response.status_code == 200
+        data = json.loads(response.data)
+
+        ids = {trip["id"] for trip in data["trips"]}
+        assert ids == {located_trips["downtown"], located_trips["lakewood"]}
+        assert data["pagination"]["total"] == 2
+
+    def test_default_radius(self, client, located_trips):
+        """The default 5 mile radius excludes trips 30 miles away."""
+        response = client.get("/api/trips?near_lat=41.4993&near_lon=-81.6944")
+        ids = {trip["id"] for trip in json.loads(response.data)["trips"]}
+
+        assert located_trips["akron"] not in ids
+        assert located_trips["downtown"] in ids
+
+    def test_large_radius(self, client, located_trips):
+        response = client.get("/api/trips?near_lat=41.4993&near_lon=-81.6944&radius_miles=40")
+        ids = {trip["id"] for trip in json.loads(response.data)["trips"]}
+
+        assert ids == set(located_trips.values())
+
+    def test_combines_with_other_filters(self, client, located_trips):
+        response = client.get("/api/trips?near_lat=41.4993&near_lon=-81.6944&radius_miles=40&min_distance=20")
+        assert json.loads(response.data)["trips"] == []
+
+    def test_requires_both_coordinates(self, client, located_trips):
+        response = client.get("/api/trips?near_lat=41.5")
+        assert response.status_code == 400
+        assert "near_lon" in json.loads(response.data)["error"]
+
+    def test_invalid_coordinates(self, client, located_trips):
+        response = client.get("/api/trips?near_lat=abc&near_lon=-81.7")
+        assert response.status_code == 400
+        assert "near_lat" in json.loads(response.data)["error"]
+
+        response = client.get("/api/trips?near_lat=95&near_lon=-81.7")
+        assert response.status_code == 400
+
+    def test_invalid_radius(self, client, located_trips):
+        response = client.get("/api/trips?near_lat=41.5&near_lon=-81.7&radius_miles=-1")
+        assert response.status_code == 400
+        assert "radius_miles" in json.loads(response.data)["error"]
+
+
 class TestTripsSorting:
     """Tests for trip sorting functionality."""
 
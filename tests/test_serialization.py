@@ -0,0 +1,178 @@
+"""
+Tests for JSON response and cache payload serialization.
+"""
+
+import json
+import os
+import pickle
+import sys
+import uuid
+from collections import namedtuple
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "receiver"))
+
+from utils.serialization import (  # noqa: E402
+    FastJSONProvider,
+    decode_cache_value,
+    dumps_json,
+    encode_cache_value,
+    loads_json,
+)
+
+Point = namedtuple("Point", ["lat", "lon"])
+
+
+class TestDumpsJson:
+    """Tests for the JSON encoder."""
+
+    def test_native_types(self):
+        """Datetimes, dates, UUIDs and Decimals are encoded without pre-conversion."""
+        session_id = uuid.uuid4()
+        start = datetime(2024, 1, 1, 8, 30, 15, 123456, tzinfo=timezone.utc)
+        data = {
+            "start": start,
+            "day": date(2024, 1, 1),
+            "session_id": session_id,
+            "cost": Decimal("3.50"),
+        }
+
+        assert json.loads(dumps_json(data)) == {
+            "start": start.isoformat(),
+            "day": "2024-01-01",
+            "session_id": str(session_id),
+            "cost": "3.50",
+        }
+
+    def test_naive_datetime_matches_isoformat(self):
+        """Naive datetimes are encoded exactly like isoformat()."""
+        value = datetime(2024, 6, 1, 12, 0, 0, 5)
+        assert json.loads(dumps_json([value])) == [value.isoformat()]
+
+    def test_non_string_keys_and_dataclasses(self):
+        """Integer keys and dataclasses are accepted like the stdlib encoder."""
+
+        @dataclass
+        class Stat:
+            name: str
+            value: float
+
+        assert json.loads(dumps_json({2024: Stat("miles", 12.5)})) == {"2024": {"name": "miles", "value": 12.5}}
+
+    def test_numpy_values(self):
+        """NumPy scalars and arrays encode like Python numbers, on both encoders."""
+        data = {
+            "count": np.int64(3),
+            "flag": np.bool_(True),
+            "mean": np.float64(0.25),
+            "cells": np.array([3.5, 3.75], dtype=np.float32),
+            "strided": np.arange(6)[::2],
+        }
+        expected = {"count": 3, "flag": True, "mean": 0.25, "cells": [3.5, 3.75], "strided": [0, 2, 4]}
+
+        with patch("utils.serialization.json.dumps", side_effect=AssertionError("slow path")):
+            assert json.loads(dumps_json(data)) == expected
+        with patch("utils.serialization.orjson", None):
+            assert json.loads(dumps_json(data)) == expected
+
+    def test_unserializable_raises(self):
+        """Unknown objects raise TypeError."""
+        with pytest.raises(TypeError):
+            dumps_json({"bad": object()})
+
+    def test_stdlib_fallback(self):
+        """Without orjson the stdlib encoder produces the same document."""
+        data = {"start": datetime(2024, 1, 1), "values": [1, 2.5, None, "ü"]}
+
+        with patch("utils.serialization.orjson", None):
+            fallback = dumps_json(data)
+
+        assert json.loads(fallback) == json.loads(dumps_json(data))
+        assert loads_json(fallback) == json.loads(fallback)
+
+    def test_indent(self):
+        """Indented output is pretty-printed."""
+        assert b"\n  " in dumps_json({"a": 1}, indent=True)
+
+
+class TestFastJSONProvider:
+    """Tests for the Flask JSON provider."""
+
+    def test_app_uses_provider(self, app):
+        """The app serializes responses with the fast provider."""
+        assert isinstance(app.json, FastJSONProvider)
+
+    def test_jsonify_datetime_is_iso(self, app):
+        """jsonify encodes datetimes as ISO 8601 (not HTTP dates)."""
+        from flask import jsonify
+
+        with app.test_request_context():
+            response = jsonify({"at": datetime(2024, 1, 1, 8, 30)})
+
+        assert response.mimetype == "application/json"
+        assert response.get_json() == {"at": "2024-01-01T08:30:00"}
+
+    def test_request_json_parsing(self, client):
+        """Request bodies are still parsed through the provider."""
+        response = client.post(
+            "/cache/invalidate",
+            data=json.dumps({"tag": "trips"}),
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+
+
+class TestCachePayloadCodec:
+    """Tests for Redis cache payload encoding."""
+
+    def test_round_trip_preserves_types(self):
+        """Common cached value types survive the round trip unchanged."""
+        value = {
+            "start": datetime(2024, 1, 1, 8, 30, tzinfo=timezone.utc),
+            "naive": datetime(2024, 1, 1, 8, 30),
+            "day": date(2024, 1, 1),
+            "id": uuid.uuid4(),
+            "cost": Decimal("1.23"),
+            "range": (1, 2.5),
+            "nested": [{"a": None, "b": True}, b"raw"],
+            7: "int key",
+        }
+
+        payload = encode_cache_value(value)
+
+        assert payload[:1] == b"M"
+        assert decode_cache_value(payload) == value
+        assert isinstance(decode_cache_value(payload)["range"], tuple)
+
+    def test_unsupported_types_fall_back_to_pickle(self):
+        """Values msgpack can't represent exactly are pickled."""
+        value = [Point(1.0, 2.0)]
+
+        payload = encode_cache_value(value)
+
+        assert payload[:1] == b"P"
+        assert decode_cache_value(payload) == value
+        assert isinstance(decode_cache_value(payload)[0], Point)
+
+    def test_legacy_pickle_payload(self):
+        """Entries written before the codec (raw pickles) are still readable."""
+        assert decode_cache_value(pickle.dumps({"a": 1})) == {"a": 1}
+
+    def test_without_msgpack(self):
+        """Without msgpack every value is pickled."""
+        with patch("utils.serialization.msgpack", None):
+            payload = encode_cache_value({"a": 1})
+
+        assert payload[:1] == b"P"
+        assert decode_cache_value(payload) == {"a": 1}
+
+    def test_unknown_format_raises(self):
+        """Corrupt payloads raise ValueError."""
+        with pytest.raises(ValueError):
+            decode_cache_value(b"Xjunk")
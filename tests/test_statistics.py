@@ -8,9 +8,13 @@ Tests statistics calculations including:
 - Quick stats endpoints
 """
 
+import statistics
 import uuid
 from datetime import datetime, timedelta, timezone
 
+import pytest
+from sqlalchemy import event
+
 
 class TestConfidenceInterval:
     """Tests for confidence interval calculation."""
@@ -54,6 +58,25 @@ class TestConfidenceInterval:
         assert result is not None
         assert result["sample_size"] == 40
 
+    def test_confidence_interval_from_sums_matches_values(self):
+        """Sufficient statistics give the same interval as the raw values."""
+        from routes.statistics import calculate_confidence_interval, confidence_interval_from_sums
+
+        values = [10.0, 12.0, 11.0, 13.0, 10.5, 11.5, 12.5]
+        result = confidence_interval_from_sums(len(values), sum(values), sum(v * v for v in values))
+
+        assert result == calculate_confidence_interval(values)
+        assert result["std_dev"] == round(statistics.stdev(values), 2)
+
+    def test_confidence_interval_identical_values(self):
+        """Identical values have zero spread rather than a negative variance."""
+        from routes.statistics import calculate_confidence_interval
+
+        result = calculate_confidence_interval([0.1] * 50)
+
+        assert result["std_dev"] == 0
+        assert result["margin"] == 0
+
 
 class TestTrendCalculation:
     """Tests for trend calculation."""
@@ -334,3 +357,118 @@ class TestStatisticsIntegration:
         data = response.get_json()
         assert "stats" in data
         assert "previous_period" not in data or data.get("previous_period") is None
+
+
+def _period_trips(now):
+    """Closed trips spread over the last two weeks, plus ones that must be ignored."""
+    from models import Trip
+
+    trips = []
+    for i in range(10):
+        trips.append(Trip(
+            session_id=uuid.uuid4(),
+            start_time=now - timedelta(days=i * 1.3 + 0.4),
+            distance_miles=10.0 + i * 3,
+            electric_miles=8.0 + i,
+            gas_miles=2.0 + i * 2,
+            gas_mode_entered=i % 3 == 0,
+            gas_mpg=35.0 + i if i % 3 == 0 else None,
+            kwh_per_mile=0.25 + i * 0.01 if i % 4 else None,
+            is_closed=True,
+        ))
+    trips.append(Trip(session_id=uuid.uuid4(), start_time=now - timedelta(days=2), distance_miles=99.0,
+                      is_closed=False))
+    trips.append(Trip(session_id=uuid.uuid4(), start_time=now - timedelta(days=2), distance_miles=99.0,
+                      is_closed=True, deleted_at=now))
+    return trips
+
+
+class TestPeriodAggregates:
+    """Tests for SQL-side period aggregation."""
+
+    def test_query_matches_in_memory_stats(self, db_session):
+        """Aggregates from the database match the in-memory calculation per period."""
+        from models import Trip
+        from routes.statistics import aggregate_trips, query_period_aggregates
+
+        now = datetime.now(timezone.utc)
+        trips = _period_trips(now)
+        # The first six trips started within the last week, the next four the week before
+        expected = {"current": aggregate_trips(trips[:6]), "previous": aggregate_trips(trips[6:10])}
+        db_session.add_all(trips)
+        db_session.commit()
+
+        week_ago = now - timedelta(days=7)
+        periods = {
+            "current": Trip.start_time >= week_ago,
+            "previous": (Trip.start_time >= week_ago - timedelta(days=7)) & (Trip.start_time < week_ago),
+        }
+        aggregates = query_period_aggregates(db_session, periods, include_median=True)
+
+        for name, actual in aggregates.items():
+            assert actual["trip_count"] == expected[name]["trip_count"]
+            assert actual["total_distance"] == pytest.approx(expected[name]["total_distance"])
+            for metric in ("mpg", "kwh_per_mile", "distance"):
+                for key in ("n", "total", "sum_sq", "min", "max", "median"):
+                    assert actual[metric][key] == pytest.approx(expected[name][metric][key]), (name, metric, key)
+
+    def test_medians_without_trips(self, app, db_session):
+        """Periods without matching trips have no medians."""
+        from models import Trip
+        from routes.statistics import query_period_aggregates
+
+        aggregates = query_period_aggregates(db_session, {"current": Trip.id > 0}, include_median=True)
+
+        assert aggregates["current"]["trip_count"] == 0
+        assert all(aggregates["current"][metric]["median"] is None for metric in ("mpg", "kwh_per_mile", "distance"))
+
+    def test_quick_stats_single_query(self, app, db_session):
+        """Both periods of the quick stats come from one statement."""
+        from routes.statistics import compute_quick_stats
+        from utils.time_utils import parse_date_shortcut
+
+        now = datetime.now(timezone.utc)
+        db_session.add_all(_period_trips(now))
+        db_session.commit()
+
+        statements = []
+        engine = db_session.get_bind()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            result = compute_quick_stats.__wrapped__(
+                db_session, "7d", parse_date_shortcut("last_7_days"), True, "imperial"
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert len(statements) == 1
+        assert result["stats"]["trip_count"] == 6
+        assert result["previous_period"]["stats"]["trip_count"] == 4
+        assert "distance" in result["trends"]
+
+    def test_detailed_stats_medians_and_intervals(self, client, db_session):
+        """Detailed stats report medians and confidence intervals from the aggregates."""
+        now = datetime.now(timezone.utc)
+        trips = _period_trips(now)
+        kwh_values = [t.kwh_per_mile for t in trips[:10] if t.kwh_per_mile]
+        distances = [t.distance_miles for t in trips[:10]]
+        db_session.add_all(trips)
+        db_session.commit()
+
+        response = client.get("/api/stats/detailed?date_range=last_30_days")
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["trip_count"] == 10
+
+        kwh = data["kwh_per_mile_analysis"]
+        assert kwh["trip_count"] == len(kwh_values)
+        assert kwh["median"] == round(statistics.median(kwh_values), 3)
+        assert kwh["confidence_interval"]["std_dev"] == round(statistics.stdev(kwh_values), 2)
+
+        assert data["distance_analysis"]["median"] == round(statistics.median(distances), 2)
+        assert data["mpg_analysis"]["trip_count"] == 4
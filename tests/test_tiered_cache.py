@@ -0,0 +1,212 @@
+"""
+Tests for the tiered (L1 in-process / L2 Redis) cache.
+"""
+
+import pickle
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from utils.tiered_cache import MISSING, LRUCache, TieredCache
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCache:
+    """Tests for the in-process LRU tier."""
+
+    def test_set_and_get(self):
+        """Fresh values are returned and not flagged stale."""
+        cache = LRUCache()
+        cache.set("key", {"a": 1}, ttl=60)
+
+        assert cache.get("key") == ({"a": 1}, False)
+        assert cache.get("missing") == (MISSING, False)
+
+    def test_none_is_cacheable(self):
+        """None is a valid cached value, distinct from a miss."""
+        cache = LRUCache()
+        cache.set("key", None, ttl=60)
+
+        assert cache.get("key") == (None, False)
+
+    def test_ttl_and_stale_window(self):
+        """Values are stale after their TTL and gone after the grace period."""
+        clock = FakeClock()
+        cache = LRUCache(clock=clock)
+        cache.set("key", "value", ttl=10, stale_ttl=5)
+
+        clock.now += 11
+        assert cache.get("key") == ("value", True)
+
+        clock.now += 5
+        assert cache.get("key") == (MISSING, False)
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        """Entries are evicted oldest-first once the byte budget is exceeded."""
+        cache = LRUCache(max_bytes=250)
+        cache.set("a", "x", ttl=60, size=100)
+        cache.set("b", "y", ttl=60, size=100)
+        cache.get("a")  # a is now most recently used
+        cache.set("c", "z", ttl=60, size=100)
+
+        assert cache.get("b") == (MISSING, False)
+        assert cache.get("a")[0] == "x"
+        assert cache.stats()["bytes"] == 200
+        assert cache.stats()["evictions"] == 1
+
+    def test_oversized_value_not_stored(self):
+        """A value larger than the whole budget is skipped."""
+        cache = LRUCache(max_bytes=10)
+
+        assert cache.set("big", "x" * 100, ttl=60) is False
+        assert cache.get("big") == (MISSING, False)
+
+    def test_entry_limit(self):
+        """Entry count is bounded independently of bytes."""
+        cache = LRUCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.set(key, key, ttl=60)
+
+        assert cache.stats()["size"] == 2
+        assert cache.get("a") == (MISSING, False)
+
+    def test_delete_tag_and_pattern(self):
+        """Entries can be removed by tag or glob pattern."""
+        cache = LRUCache()
+        cache.set("stats:1", 1, ttl=60, tags=["trips"])
+        cache.set("stats:2", 2, ttl=60, tags=["charging"])
+        cache.set("map:1", 3, ttl=60, tags=["trips"])
+
+        assert cache.delete_tag("trips") == 2
+        assert cache.delete_matching("stats:*") == 1
+        assert cache.stats()["size"] == 0
+
+
+class TestTieredCache:
+    """Tests for the L1/L2 facade."""
+
+    def test_computes_once_then_serves_from_l1(self):
+        """Repeated calls reuse the first computation."""
+        cache = TieredCache(LRUCache())
+        compute = MagicMock(return_value=42)
+
+        assert cache.get_or_compute("key", compute, ttl=60) == 42
+        assert cache.get_or_compute("key", compute, ttl=60) == 42
+        assert compute.call_count == 1
+
+    def test_single_flight_under_concurrency(self):
+        """Concurrent misses for one key run the computation once."""
+        cache = TieredCache(LRUCache())
+        calls = []
+        started = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute("key", compute, ttl=60)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ["value"] * 8
+
+    def test_single_flight_shares_errors(self):
+        """Waiters see the leader's exception, and the key isn't cached."""
+        cache = TieredCache(LRUCache())
+
+        with pytest.raises(ValueError):
+            cache.get_or_compute("key", MagicMock(side_effect=ValueError("boom")), ttl=60)
+
+        assert cache.get_or_compute("key", lambda: "ok", ttl=60) == "ok"
+
+    def test_stale_while_revalidate(self):
+        """Stale values are returned immediately while one refresh runs."""
+        clock = FakeClock()
+        cache = TieredCache(LRUCache(clock=clock))
+        cache.get_or_compute("key", lambda: "old", ttl=10, stale_ttl=60)
+        clock.now += 11
+
+        refreshed = threading.Event()
+
+        def compute():
+            refreshed.set()
+            return "new"
+
+        assert cache.get_or_compute("key", compute, ttl=10, stale_ttl=60) == "old"
+        assert refreshed.wait(2)
+        for _ in range(50):
+            if cache.l1.get("key")[0] == "new":
+                break
+            time.sleep(0.01)
+        assert cache.get_or_compute("key", compute, ttl=10, stale_ttl=60) == "new"
+
+    def test_l2_hit_fills_l1(self):
+        """Values found in Redis are not recomputed and are kept in L1."""
+        redis = MagicMock()
+        redis.get.return_value = pickle.dumps("from redis")
+        cache = TieredCache(LRUCache(), l2_getter=lambda: redis)
+        compute = MagicMock()
+
+        assert cache.get_or_compute("key", compute, ttl=60) == "from redis"
+        assert cache.get_or_compute("key", compute, ttl=60) == "from redis"
+        compute.assert_not_called()
+        redis.get.assert_called_once()
+
+    def test_miss_writes_l2_with_tags_and_releases_lock(self):
+        """Computed values are written to Redis with their tags."""
+        redis = MagicMock()
+        redis.get.return_value = None
+        redis.set.return_value = True
+        cache = TieredCache(LRUCache(), l2_getter=lambda: redis)
+
+        cache.get_or_compute("key", lambda: 7, ttl=60, tags=["trips"])
+
+        redis.set.assert_called_once_with("lock:key", b"1", nx=True, ex=30)
+        redis.setex.assert_called_once_with("key", 60, pickle.dumps(7))
+        redis.sadd.assert_called_once_with("tag:trips", "key")
+        redis.delete.assert_called_once_with("lock:key")
+
+    def test_waits_for_other_process(self):
+        """When another process holds the lock, its result is read from Redis."""
+        redis = MagicMock()
+        redis.get.side_effect = [None, None, pickle.dumps("theirs")]
+        redis.set.return_value = False  # Lock held elsewhere
+        redis.exists.return_value = True
+        cache = TieredCache(LRUCache(), l2_getter=lambda: redis)
+        compute = MagicMock()
+
+        with patch("utils.tiered_cache.LOCK_POLL_SECONDS", 0):
+            assert cache.get_or_compute("key", compute, ttl=60) == "theirs"
+
+        compute.assert_not_called()
+        redis.setex.assert_not_called()
+
+    def test_redis_errors_fall_back_to_compute(self):
+        """Redis failures degrade to computing locally."""
+        redis = MagicMock()
+        redis.get.side_effect = Exception("down")
+        redis.set.side_effect = Exception("down")
+        redis.setex.side_effect = Exception("down")
+        cache = TieredCache(LRUCache(), l2_getter=lambda: redis)
+
+        assert cache.get_or_compute("key", lambda: 5, ttl=60) == 5
+        assert cache.l1.get("key") == (5, False)
@@ -17,6 +17,7 @@ from models import TelemetryRaw, Trip
 from services.trip_service import (
     calculate_electric_efficiency,
     calculate_trip_basics,
+    compute_trip_geometry,
     fetch_trip_weather,
     finalize_trip,
     process_gas_mode,
@@ -292,6 +293,47 @@ class TestCalculateElectricEfficiency:
         assert trip.electric_kwh_used is None
 
 
+class TestComputeTripGeometry:
+    """Tests for compute_trip_geometry function."""
+
+    def test_stores_simplified_polyline_and_bounds(self, app):
+        """Should store an encoded polyline, bounds, endpoints and original GPS count."""
+        from utils.geohash import encode as encode_geohash
+        from utils.polyline import decode_polyline
+        from utils.route_clustering import FINGERPRINT_POINTS, unpack_fingerprint
+
+        trip = Trip(session_id=uuid.uuid4(), start_time=datetime.now(timezone.utc))
+        points = [{"latitude": 41.5 + i * 0.001, "longitude": -81.7 + i * 0.001} for i in range(50)]
+        points.append({"latitude": None, "longitude": None})
+
+        compute_trip_geometry(trip, points)
+
+        assert trip.gps_point_count == 50
+        assert len(decode_polyline(trip.route_polyline)) == 2  # Straight line
+        assert trip.route_bounds_north == 41.549
+        assert trip.route_bounds_south == 41.5
+        assert trip.route_bounds_west == -81.7
+        assert (trip.start_lat, trip.start_lon) == (41.5, -81.7)
+        assert trip.end_lat == 41.549
+        assert trip.start_geohash == encode_geohash(41.5, -81.7)
+        assert len(trip.end_geohash) == 7
+        fingerprint = unpack_fingerprint(trip.route_fingerprint)
+        assert len(fingerprint) == 2 * FINGERPRINT_POINTS
+        assert fingerprint[:2].tolist() == [41.5, -81.7]
+
+    def test_no_gps_clears_geometry(self, app):
+        """Trips with fewer than two GPS points get no geometry."""
+        trip = Trip(session_id=uuid.uuid4(), start_time=datetime.now(timezone.utc))
+
+        compute_trip_geometry(trip, [{"latitude": 41.5, "longitude": -81.7}])
+
+        assert trip.gps_point_count == 1
+        assert trip.route_polyline is None
+        assert trip.route_bounds_north is None
+        assert trip.start_geohash is None
+        assert trip.route_fingerprint is None
+
+
 class TestFetchTripWeather:
     """Tests for fetch_trip_weather function."""
 
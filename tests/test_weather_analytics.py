@@ -506,6 +506,110 @@ class TestInvalidDataHandling:
         assert result["total_trips_analyzed"] == 0
 
 
+class TestWeatherCube:
+    """Tests for the single-pass weather cube behind the analytics endpoints."""
+
+    def test_all_endpoints_share_one_scan(self, db_session, sample_trips):
+        """The five cube-backed endpoints issue a single trips query together."""
+        from sqlalchemy import event
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            get_efficiency_by_temperature_bands(db_session)
+            get_efficiency_by_precipitation(db_session)
+            get_efficiency_by_wind(db_session)
+            get_seasonal_trends(db_session)
+            get_weather_efficiency_correlation(db_session)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert len([s for s in statements if "FROM trips" in s]) == 1
+
+    def test_cube_invalidated_by_commit(self, db_session, sample_trips):
+        """Committing a trip is reflected on the next call."""
+        before = get_weather_efficiency_correlation(db_session)["summary"]["total_trips"]
+
+        db_session.add(
+            Trip(
+                session_id=uuid.uuid4(),
+                start_time=datetime.now(timezone.utc) - timedelta(days=2),
+                is_closed=True,
+                kwh_per_mile=0.3,
+                electric_miles=10.0,
+                weather_temp_f=60.0,
+            )
+        )
+        db_session.commit()
+
+        assert get_weather_efficiency_correlation(db_session)["summary"]["total_trips"] == before + 1
+
+    def test_python_bands_match_sql_bands(self, db_session):
+        """The single-scan classifiers agree with the SQL CASE expressions at band edges."""
+        from sqlalchemy import literal, select
+
+        from services.weather_analytics_service import (
+            TEMP_BANDS,
+            WIND_BANDS,
+            _precip_band,
+            _precip_band_case,
+            _range_band,
+            _range_band_case,
+        )
+
+        for value in (None, 0.0, 0.1, 0.25, 0.3, 4.99, 5.0, 25.0, 31.9, 32.0, 55.0, 75.0, 95.0, 120.0):
+            column = literal(value)
+            temp, wind, precip = db_session.execute(
+                select(
+                    _range_band_case(column, TEMP_BANDS),
+                    _range_band_case(column, WIND_BANDS),
+                    _precip_band_case(column),
+                )
+            ).one()
+            assert temp == _range_band(value, TEMP_BANDS)
+            assert wind == _range_band(value, WIND_BANDS)
+            assert precip == _precip_band(value)
+
+    def test_grouping_sets_rows(self):
+        """GROUPING SETS rows are routed to their dimension by the grouping bitmask."""
+        from datetime import date
+
+        from services.weather_analytics_service import _build_cube_grouping_sets, _cube_filters
+
+        def row(temp_band, precip_band, wind_band, day, grouping, n):
+            return MagicMock(
+                temp_band=temp_band, precip_band=precip_band, wind_band=wind_band, day=day,
+                grouping=grouping, n=n, eff_sum=0.3 * n, eff_min=0.3, eff_max=0.3,
+                temp_sum=60.0 * n, temp_n=n, precip_sum=0.0, precip_n=n, wind_sum=3.0 * n, wind_n=n,
+                miles=10.0 * n, kwh=3.0 * n, impact_sum=None, impact_n=0,
+            )
+
+        db = MagicMock()
+        db.execute.return_value = [
+            row("ideal", None, None, None, 0b0111, 2),
+            row(None, None, None, None, 0b0111, 1),  # trips without a temperature
+            row(None, "dry", None, None, 0b1011, 3),
+            row(None, None, "calm", None, 0b1101, 3),
+            row(None, None, None, date(2024, 1, 5), 0b1110, 3),
+            row(None, None, None, None, 0b1111, 3),
+        ]
+
+        cube = _build_cube_grouping_sets(db, _cube_filters(None, None))
+
+        assert cube["temperature"]["ideal"]["n"] == 2
+        assert list(cube["temperature"]) == ["ideal"]
+        assert cube["precipitation"]["dry"]["n"] == 3
+        assert cube["wind"]["calm"]["n"] == 3
+        assert cube["daily"]["2024-01-05"]["miles"] == 30.0
+        assert cube["total"]["n"] == 3
+        assert cube["total"]["impact_sum"] == 0
+
+
 class TestParseDateHelper:
     """Tests for _parse_date helper function."""
 